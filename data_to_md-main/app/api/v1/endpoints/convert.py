@@ -2,16 +2,21 @@
 转换接口
 处理文件上传和转换请求
 """
+import asyncio
 import logging
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status
+from fastapi.responses import StreamingResponse, JSONResponse, FileResponse
 from typing import Optional, List
 import json
-from app.models.request import ConvertOptions
-from app.models.response import ConvertResponse, ConvertSyncResponse, ErrorResponse
+from app.models.request import ConvertOptions, RenderOptions
+from app.models.response import ConvertResponse, ConvertSyncResponse, ErrorResponse, RenderResponse
 from app.services.conversion.conversion_service import ConversionService
 from app.services.storage.file_service import FileService
+from app.services.storage.chunk_store import get_chunk_store
 from app.config import get_settings
 from app.exceptions.base_exceptions import BaseAppException
+from app.exceptions.service_exceptions import TaskNotFoundException, TaskProcessingException
+from app.exceptions.converter_exceptions import InvalidPageRangeException
 
 logger = logging.getLogger(__name__)
 
@@ -22,9 +27,11 @@ router = APIRouter()
     "/convert",
     response_model=ConvertSyncResponse,
     responses={
+        202: {"model": ConvertResponse},
         400: {"model": ErrorResponse},
         413: {"model": ErrorResponse},
-        500: {"model": ErrorResponse}
+        500: {"model": ErrorResponse},
+        503: {"model": ErrorResponse}
     }
 )
 async def convert_file(
@@ -47,6 +54,7 @@ async def convert_file(
     - frame_quality: 帧质量 (1-100)
     - include_metadata: 是否包含元数据
     - include_frames: 是否包含关键帧
+    - async: 为 true 时立即返回 202 和任务ID，通过 /status/{task_id} 查询进度和结果
     """
     settings = get_settings()
     conversion_service = ConversionService()
@@ -93,14 +101,36 @@ async def convert_file(
         # 4. 保存上传的文件
         file_path = await file_service.save_upload_file(file, temp_task_id)
         
-        # 5. 执行转换（同步模式）
+        # 5. 异步模式：入队后立即返回任务ID，由后台 worker 执行
+        if convert_options.async_mode:
+            task = conversion_service.submit(
+                file_path=file_path,
+                filename=file.filename,
+                options=convert_options.model_dump()
+            )
+            response = ConvertResponse(
+                success=True,
+                task_id=task.task_id,
+                message="任务已提交，正在排队处理",
+                filename=file.filename,
+                file_type=task.file_type,
+                file_size=file_size,
+                status_url=f"/api/v1/status/{task.task_id}"
+            )
+            logger.info(f"Conversion queued: {task.task_id}")
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content=response.model_dump()
+            )
+        
+        # 6. 执行转换（同步模式）
         result = await conversion_service.convert(
             file_path=file_path,
             filename=file.filename,
             options=convert_options.model_dump()
         )
         
-        # 6. 构建响应
+        # 7. 构建响应
         markdown_content = result.get('markdown_content', '') or ''
         output_type = result.get('output_type', 'markdown')
         
@@ -119,11 +149,15 @@ async def convert_file(
                 'pages_processed': result['metadata'].get('total_pages', 0),
                 'ocr_pages': result['metadata'].get('ocr_pages', 0),
                 'text_pages': result['metadata'].get('text_pages', 0),
+                'blank_pages_skipped': result['metadata'].get('blank_pages_skipped', 0),
+                'duplicate_pages': result['metadata'].get('duplicate_pages', 0),
+                'bounded_memory': result['metadata'].get('bounded_memory', False),
                 'processing_time': result['metadata'].get('processing_time', 0),
                 'file_size': result['metadata'].get('output_file_size', 0),
                 'output_type': output_type,
                 'frames_extracted': result['metadata'].get('frames_extracted', 0),
                 'duration': result['metadata'].get('duration', 0),
+                'cache_hit': result['metadata'].get('cache_hit', False),
             }
         )
         
@@ -132,6 +166,18 @@ async def convert_file(
         
     except HTTPException:
         raise
+    except TaskProcessingException as e:
+        logger.warning(f"Task rejected: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=e.to_dict()
+        )
+    except InvalidPageRangeException as e:
+        logger.warning(f"Invalid page range: {e.details}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=e.to_dict()
+        )
     except BaseAppException as e:
         logger.error(f"Application error: {str(e)}")
         raise HTTPException(
@@ -150,6 +196,172 @@ async def convert_file(
         )
 
 
+@router.post(
+    "/convert/stream",
+    responses={
+        200: {"content": {"application/x-ndjson": {}}},
+        400: {"model": ErrorResponse},
+        413: {"model": ErrorResponse}
+    }
+)
+async def convert_file_stream(
+    file: UploadFile = File(..., description="要转换的文件"),
+    options: Optional[str] = Form(None, description="转换选项（JSON格式）")
+):
+    """
+    流式转换文件（NDJSON，每行一个事件）
+    
+    PDF 每完成一页（且之前的页面均已完成）即输出该页的 Markdown，
+    无需等待整份文档转换结束。事件类型：
+    - start: {"event": "start", "task_id", "total_pages", "pdf_type"}
+    - page: {"event": "page", "task_id", "page_number", "chunk_type", "markdown"}
+    - done: {"event": "done", "task_id", "output_type", "download_url", "metadata"}
+    - error: {"event": "error", "task_id", "code", "message", "details"}（页码超出文档范围时 code 为 InvalidPageRangeException）
+    
+    转换选项与 /convert 相同；完整文档仍可通过 download_url 下载。
+    """
+    settings = get_settings()
+    conversion_service = ConversionService()
+    file_service = FileService()
+    
+    # 1. 验证文件
+    if not file.filename:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="文件名不能为空"
+        )
+    
+    content = await file.read()
+    file_size = len(content)
+    await file.seek(0)
+    
+    max_size = settings.max_request_size_mb * 1024 * 1024
+    if file_size > max_size:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"文件过大，最大支持 {settings.max_request_size_mb}MB"
+        )
+    
+    # 2. 解析选项
+    convert_options = ConvertOptions()
+    if options:
+        try:
+            options_dict = json.loads(options)
+            convert_options = ConvertOptions(**options_dict)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"选项格式错误: {str(e)}"
+            )
+    
+    # 3. 保存上传的文件
+    import uuid
+    temp_task_id = f"temp_{uuid.uuid4().hex[:12]}"
+    file_path = await file_service.save_upload_file(file, temp_task_id)
+    
+    # 4. 逐个事件输出
+    async def event_stream():
+        async for event in conversion_service.convert_stream(
+            file_path=file_path,
+            filename=file.filename,
+            options=convert_options.model_dump()
+        ):
+            yield json.dumps(event, ensure_ascii=False, default=str) + "\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post(
+    "/render/{task_id}",
+    response_model=RenderResponse,
+    responses={
+        404: {"model": ErrorResponse},
+        500: {"model": ErrorResponse}
+    }
+)
+async def render_task(task_id: str, options: Optional[RenderOptions] = None):
+    """
+    按新的输出选项重新生成已完成任务的Markdown
+    
+    使用转换时保存的逐页内容片段（PDF 转 Markdown 任务），不重新上传和 OCR，
+    在模式A（带页码+元数据）与模式B（纯内容阅读）之间切换只需毫秒级时间。
+    任务原有的下载文件不变。有界内存模式的任务与转换时一样不返回全文：
+    markdown_content 为空，通过 download_url 下载重新生成的文件。
+    
+    请求体（JSON，可省略）：
+    - show_page_number: 是否显示页码标记
+    - include_metadata: 是否包含文档元数据
+    - no_pagination_and_metadata: 兼容参数，等同于两者都为 false
+    """
+    conversion_service = ConversionService()
+    
+    try:
+        # 解压与生成都是同步操作，放到线程中执行，不阻塞事件循环
+        result = await asyncio.to_thread(
+            conversion_service.render,
+            task_id,
+            (options or RenderOptions()).model_dump()
+        )
+        return RenderResponse(
+            success=True,
+            task_id=task_id,
+            message="Markdown 已重新生成",
+            markdown_content=result['markdown_content'],
+            download_url=result['download_url'],
+            metadata=result['metadata']
+        )
+        
+    except TaskNotFoundException as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=e.to_dict()
+        )
+    except Exception as e:
+        logger.error(f"Failed to render task: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "code": "INTERNAL_ERROR",
+                "message": "重新生成Markdown失败",
+                "details": str(e)
+            }
+        )
+
+
+@router.get("/render/{task_id}/download")
+async def download_rendered(task_id: str):
+    """
+    下载有界内存模式任务最近一次重新生成的Markdown
+    
+    Args:
+        task_id: 任务ID
+        
+    Returns:
+        Markdown文件
+    """
+    render_path = get_chunk_store().render_path(task_id)
+    
+    if render_path is None or not render_path.exists():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "code": "FILE_NOT_FOUND",
+                "message": "文件不存在",
+                "details": f"任务 {task_id} 没有重新生成的结果文件"
+            }
+        )
+    
+    return FileResponse(
+        path=str(render_path),
+        media_type="text/markdown",
+        filename=f"{task_id}.md"
+    )
+
+
 @router.post(
     "/convert/images",
     response_model=ConvertSyncResponse,
@@ -6,6 +6,13 @@ from datetime import datetime
 from fastapi import APIRouter
 from app.models.response import HealthResponse
 from app.config import get_settings
+from app.services.storage.ocr_cache import get_ocr_cache
+from app.services.storage.result_cache import get_result_cache
+from app.services.conversion.job_queue import get_job_queue
+from app.services.external.concurrency_limiter import get_limiter_stats
+from app.services.external.ocr_scheduler import get_ocr_scheduler
+from app.services.external.ocr_hedger import get_hedger_stats
+from app.services.external.mineru_poller import get_mineru_poller
 
 logger = logging.getLogger(__name__)
 
@@ -38,7 +45,14 @@ async def health_check():
             "uptime_seconds": 0,  # TODO: 实现实际的运行时间统计
             "total_requests": 0,  # TODO: 实现请求计数
             "active_tasks": 0,    # TODO: 从TaskManager获取
-            "queue_size": 0
+            "queue_size": 0,
+            "ocr_cache": get_ocr_cache().stats(),
+            "result_cache": get_result_cache().stats(),
+            "job_queue": get_job_queue().stats(),
+            "api_concurrency": get_limiter_stats(),
+            "ocr_scheduler": get_ocr_scheduler().stats(),
+            "ocr_hedging": get_hedger_stats(),
+            "mineru_polling": get_mineru_poller().stats()
         }
     )
     
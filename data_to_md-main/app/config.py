@@ -38,6 +38,8 @@ class Settings(BaseSettings):
     )
     deepseek_max_tokens: int = Field(default=4096, env="DEEPSEEK_MAX_TOKENS")
     deepseek_timeout: int = Field(default=60, env="DEEPSEEK_TIMEOUT")
+    deepseek_http2: bool = Field(default=True, env="DEEPSEEK_HTTP2")
+    deepseek_max_connections: int = Field(default=20, env="DEEPSEEK_MAX_CONNECTIONS")
 
     # MinerU API配置（占位，需根据实际部署填写环境变量）
     mineru_api_key: str = Field(
@@ -49,24 +51,83 @@ class Settings(BaseSettings):
         env="MINERU_BASE_URL"
     )
     mineru_timeout: int = Field(default=60, env="MINERU_TIMEOUT")
+    mineru_max_connections: int = Field(default=10, env="MINERU_MAX_CONNECTIONS")
+    mineru_poll_interval: float = Field(default=2.0, env="MINERU_POLL_INTERVAL")  # 最小轮询间隔，也是全局限速的时间窗口（秒）
+    mineru_poll_max_interval: float = Field(default=30.0, env="MINERU_POLL_MAX_INTERVAL")  # 退避后的最大轮询间隔（秒）
+    mineru_poll_max_requests: int = Field(default=4, env="MINERU_POLL_MAX_REQUESTS")  # 每个轮询间隔内最多发出的状态查询数
+    mineru_poll_timeout: float = Field(default=600.0, env="MINERU_POLL_TIMEOUT")  # 单个任务的最长等待时间（秒）
+    mineru_shard_pages: int = Field(default=0, env="MINERU_SHARD_PAGES")  # 按页数把文档切分为多个子文档并行解析，0 表示整文档提交
+    mineru_hybrid_mixed: bool = Field(default=True, env="MINERU_HYBRID_MIXED")  # 图文混排文档只把含图像的页面交给 MinerU，其余页面本地提取文本
+    
+    # 本地 OCR 配置（ocr_engine="local"）
+    local_ocr_backend: str = Field(default="auto", env="LOCAL_OCR_BACKEND")  # auto / rapidocr / tesseract
+    local_ocr_lang: str = Field(default="chi_sim+eng", env="LOCAL_OCR_LANG")  # Tesseract 识别语言
     
     # PDF处理配置
     pdf_max_size_mb: int = Field(default=500, env="PDF_MAX_SIZE_MB")
-    pdf_max_pages: int = Field(default=100, env="PDF_MAX_PAGES")
+    pdf_max_pages: int = Field(default=100, env="PDF_MAX_PAGES")  # 最大处理页数，请求选项 max_pages 与有界内存模式阈值都受此限制
     pdf_render_dpi: int = Field(default=144, env="PDF_RENDER_DPI")
     pdf_text_threshold: int = Field(default=10, env="PDF_TEXT_THRESHOLD")
+    pdf_render_lookahead: int = Field(default=4, env="PDF_RENDER_LOOKAHEAD")
+    pdf_text_shard_pages: int = Field(default=32, env="PDF_TEXT_SHARD_PAGES")  # 纯文本PDF每个并行提取分片的页数
+    pdf_adaptive_min_dpi: int = Field(default=72, env="PDF_ADAPTIVE_MIN_DPI")  # 自适应 DPI 下限
+    pdf_adaptive_glyph_px: int = Field(default=20, env="PDF_ADAPTIVE_GLYPH_PX")  # 最小字号渲染后的目标像素高度
+    pdf_adaptive_long_side: int = Field(default=1600, env="PDF_ADAPTIVE_LONG_SIDE")  # 无文本层页面的目标长边像素
+    pdf_region_ocr_enabled: bool = Field(default=True, env="PDF_REGION_OCR_ENABLED")  # 混排页只 OCR 图像/表格区域
+    pdf_region_min_size: int = Field(default=24, env="PDF_REGION_MIN_SIZE")  # 忽略宽或高小于该值（pt）的区域
+    pdf_region_max_coverage: float = Field(default=0.85, env="PDF_REGION_MAX_COVERAGE")  # 区域占页面比例超过该值时整页 OCR
+    pdf_skip_blank_pages: bool = Field(default=True, env="PDF_SKIP_BLANK_PAGES")  # 纯图片PDF在 OCR 前跳过空白页
+    pdf_blank_ink_ratio: float = Field(default=0.0001, env="PDF_BLANK_INK_RATIO")  # 深色像素占比低于该值的页面视为空白页
+    pdf_dedup_pages: bool = Field(default=True, env="PDF_DEDUP_PAGES")  # 近似重复页复用首次出现页面的 OCR 结果
+    pdf_dedup_max_diff: float = Field(default=0.00001, env="PDF_DEDUP_MAX_DIFF")  # 重复页复核允许的差异像素占比
+    # 处理页数不少于该值时使用有界内存模式，0 表示关闭；处理页数不超过 PDF_MAX_PAGES，
+    # 默认配置（100 页上限）下不会自动启用，处理上千页文档时需同时调高 PDF_MAX_PAGES
+    pdf_bounded_memory_pages: int = Field(default=500, env="PDF_BOUNDED_MEMORY_PAGES")
+    pdf_memory_ceiling_mb: int = Field(default=1024, env="PDF_MEMORY_CEILING_MB")  # 有界内存模式下进程常驻内存上限，超过时暂停启动新页面，0 表示不限制
+    pdf_page_window: int = Field(default=32, env="PDF_PAGE_WINDOW")  # 有界内存模式下在途（已启动未产出）页面数上限
     
     # 并发配置
-    max_concurrent_tasks: int = Field(default=5, env="MAX_CONCURRENT_TASKS")
-    max_concurrent_api_calls: int = Field(default=3, env="MAX_CONCURRENT_API_CALLS")
+    max_concurrent_tasks: int = Field(default=5, env="MAX_CONCURRENT_TASKS")  # 异步任务后台 worker 数
+    task_queue_max_size: int = Field(default=100, env="TASK_QUEUE_MAX_SIZE")  # 异步任务排队上限
+    max_concurrent_api_calls: int = Field(default=3, env="MAX_CONCURRENT_API_CALLS")  # 外部 API 初始并发数
+    api_concurrency_adaptive: bool = Field(default=True, env="API_CONCURRENCY_ADAPTIVE")  # 按 AIMD 动态调整 API 并发
+    api_concurrency_min: int = Field(default=1, env="API_CONCURRENCY_MIN")
+    api_concurrency_max: int = Field(default=16, env="API_CONCURRENCY_MAX")
+    api_latency_target: float = Field(default=30.0, env="API_LATENCY_TARGET")  # 超过该延迟（秒）时不再增大并发，0 表示不限制
+    ocr_hedge_enabled: bool = Field(default=True, env="OCR_HEDGE_ENABLED")  # 慢页面发起对冲请求
+    ocr_hedge_percentile: float = Field(default=0.95, env="OCR_HEDGE_PERCENTILE")  # 超过该延迟分位时对冲
+    ocr_hedge_min_delay: float = Field(default=5.0, env="OCR_HEDGE_MIN_DELAY")  # 对冲前至少等待的秒数
+    ocr_hedge_min_samples: int = Field(default=20, env="OCR_HEDGE_MIN_SAMPLES")  # 延迟样本不足时不对冲
+    ocr_hedge_engine: str = Field(default="", env="OCR_HEDGE_ENGINE")  # auto 模式下对冲请求使用的引擎，为空时与主引擎相同（明确指定引擎时只对冲到同一引擎）
+    ocr_scheduler_global_slots: int = Field(default=0, env="OCR_SCHEDULER_GLOBAL_SLOTS")  # 同一进程组内所有 worker 合计的 OCR 并发上限，0 表示与 API_CONCURRENCY_MAX 相同
+    cpu_pool_workers: int = Field(default=0, env="CPU_POOL_WORKERS")  # 0 表示使用 CPU 核数
     
     # 存储配置
     upload_dir: str = Field(default="./storage/uploads", env="UPLOAD_DIR")
     output_dir: str = Field(default="./storage/outputs", env="OUTPUT_DIR")
     log_dir: str = Field(default="./storage/logs", env="LOG_DIR")
     cache_dir: str = Field(default="./storage/cache", env="CACHE_DIR")
+    chunk_dir: str = Field(default="./storage/chunks", env="CHUNK_DIR")  # 逐页内容片段（用于按新的输出选项重新生成 Markdown）
+    chunk_store_enabled: bool = Field(default=True, env="CHUNK_STORE_ENABLED")
+    chunk_store_ttl_hours: int = Field(default=24, env="CHUNK_STORE_TTL_HOURS")  # 逐页内容片段保留时间（按最近使用时间），0 表示不过期
+    chunk_store_max_mb: int = Field(default=2048, env="CHUNK_STORE_MAX_MB")  # 逐页内容片段目录总大小上限，超过时淘汰最久未使用的文件，0 表示不限制
+    spool_dir: str = Field(default="./storage/spool", env="SPOOL_DIR")  # 有界内存模式下已完成页面与 Markdown 的落盘目录
     file_retention_days: int = Field(default=7, env="FILE_RETENTION_DAYS")
     
+    # 任务存储配置
+    task_store_backend: str = Field(default="sqlite", env="TASK_STORE_BACKEND")  # sqlite（所有 worker 共享）/ memory（仅单进程）
+    task_db_path: str = Field(default="./storage/tasks.db", env="TASK_DB_PATH")
+    task_ttl_hours: int = Field(default=24, env="TASK_TTL_HOURS")  # 任务状态保留时间（按最后更新时间），0 表示不淘汰
+    
+    # OCR 结果缓存配置
+    ocr_cache_enabled: bool = Field(default=True, env="OCR_CACHE_ENABLED")
+    ocr_cache_max_mb: int = Field(default=512, env="OCR_CACHE_MAX_MB")
+    
+    # 转换结果缓存配置
+    result_cache_enabled: bool = Field(default=True, env="RESULT_CACHE_ENABLED")
+    result_cache_ttl_hours: int = Field(default=24, env="RESULT_CACHE_TTL_HOURS")
+    result_cache_max_mb: int = Field(default=2048, env="RESULT_CACHE_MAX_MB")
+    
     # 图片压缩配置
     image_max_size_mb: int = Field(default=20, env="IMAGE_MAX_SIZE_MB")
     image_default_quality: int = Field(default=90, env="IMAGE_DEFAULT_QUALITY")
@@ -106,7 +167,7 @@ class Settings(BaseSettings):
         env_file_encoding = "utf-8"
         case_sensitive = False
     
-    @validator("upload_dir", "output_dir", "log_dir", "cache_dir")
+    @validator("upload_dir", "output_dir", "log_dir", "cache_dir", "chunk_dir", "spool_dir")
     def create_directories(cls, v):
         """确保目录存在"""
         path = Path(v)
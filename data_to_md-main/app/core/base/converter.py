@@ -16,6 +16,9 @@ class ConversionResult:
     status: str = "pending"
     error: str = None
     output_type: str = "markdown"  # 'markdown' 或 'pdf'
+    content_chunks: List[Any] = None  # PDF → Markdown 时的逐页内容片段（用于按新的输出选项重新生成）
+    file_info: Any = None  # 生成 Markdown 使用的文件信息
+    markdown_path: str = None  # 有界内存模式下已写入磁盘的 Markdown 文件（此时 markdown 为空）
 
 
 class BaseConverter(ABC):
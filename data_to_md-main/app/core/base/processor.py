@@ -2,11 +2,14 @@
 抽象处理器基类
 用于处理文件内容
 """
+import logging
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, AsyncIterator, Callable, Optional
 from dataclasses import dataclass
 from app.core.base.analyzer import FileInfo
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class ContentChunk:
@@ -27,6 +30,9 @@ class BaseProcessor(ABC):
     用于处理文件内容
     """
     
+    # 进度回调：progress_callback(current_page, total_pages)
+    progress_callback: Optional[Callable[[int, int], None]] = None
+    
     @abstractmethod
     async def process(self, file_path: str, file_info: FileInfo) -> List[ContentChunk]:
         """
@@ -40,4 +46,39 @@ class BaseProcessor(ABC):
             List[ContentChunk]: 内容片段列表
         """
         pass
-
+    
+    async def iter_chunks(
+        self,
+        file_path: str,
+        file_info: FileInfo
+    ) -> AsyncIterator[ContentChunk]:
+        """
+        按页序逐个产出内容片段（用于流式输出）
+        
+        默认实现等待 process 完成后依次产出；支持逐页处理的
+        子类应覆盖此方法，在某页及其之前的页面都完成后立即产出。
+        
+        Args:
+            file_path: 文件路径
+            file_info: 文件信息
+            
+        Yields:
+            ContentChunk: 内容片段
+        """
+        for chunk in await self.process(file_path, file_info):
+            yield chunk
+    
+    def _report_progress(self, current_page: int, total_pages: int):
+        """
+        上报处理进度（回调异常不影响转换）
+        
+        Args:
+            current_page: 已完成页数
+            total_pages: 总页数
+        """
+        if self.progress_callback is None:
+            return
+        try:
+            self.progress_callback(current_page, total_pages)
+        except Exception as e:
+            logger.warning(f"Progress callback failed: {str(e)}")
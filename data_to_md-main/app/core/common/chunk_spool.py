@@ -0,0 +1,89 @@
+"""
+内容片段落盘队列
+有界内存模式下，已完成的页面按页序追加写入磁盘文件，不在内存中保留片段列表
+
+说明：
+- 文件为 JSON Lines，每行一个片段 [content, page_number, chunk_type, metadata]，只追加写入
+- 迭代时从头逐行读取，可重复迭代（生成 Markdown、统计元数据、保存片段各读一遍）
+- 用完后调用 discard 删除文件
+"""
+import os
+import json
+import uuid
+import logging
+from pathlib import Path
+from typing import Iterator, Optional
+from app.core.base.processor import ContentChunk
+from app.models.enums import ChunkType
+
+logger = logging.getLogger(__name__)
+
+
+def restore_chunk_type(value: str):
+    """还原片段类型：已知类型还原为 ChunkType，页面标记与内存中的片段一致"""
+    try:
+        return ChunkType(value)
+    except ValueError:
+        return value
+
+
+class ChunkSpool:
+    """内容片段落盘队列"""
+
+    def __init__(self, spool_dir: str, name: Optional[str] = None):
+        """
+        创建落盘文件
+
+        Args:
+            spool_dir: 落盘目录
+            name: 文件名（不含扩展名），为空时随机生成
+        """
+        directory = Path(spool_dir)
+        directory.mkdir(parents=True, exist_ok=True)
+        self.path = directory / f"{name or uuid.uuid4().hex}.jsonl"
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self._count = 0
+
+    def append(self, chunk: ContentChunk):
+        """
+        追加一个片段
+
+        Args:
+            chunk: 内容片段
+        """
+        record = [chunk.content, chunk.page_number, chunk.chunk_type, chunk.metadata]
+        self._file.write(json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=str))
+        self._file.write('\n')
+        self._count += 1
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[ContentChunk]:
+        """从头逐行读取片段"""
+        if not self._file.closed:
+            self._file.flush()
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                content, page_number, chunk_type, metadata = json.loads(line)
+                yield ContentChunk(
+                    content=content,
+                    page_number=page_number,
+                    chunk_type=restore_chunk_type(chunk_type),
+                    metadata=metadata
+                )
+
+    def close(self):
+        """结束写入"""
+        if not self._file.closed:
+            self._file.close()
+
+    def discard(self):
+        """关闭并删除落盘文件"""
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Failed to remove spool file {self.path}: {str(e)}")
@@ -118,12 +118,75 @@ class ImageProcessor:
             logger.error(f"Failed to optimize image: {str(e)}")
             raise
     
+    def get_render_zoom(
+        self,
+        page: fitz.Page,
+        dpi: int = 144,
+        max_size: int = None,
+        clip: fitz.Rect = None
+    ) -> float:
+        """
+        计算渲染缩放比例
+        
+        直接按最终目标尺寸计算缩放，使渲染结果无需再次缩放。
+        
+        Args:
+            page: PyMuPDF页面对象
+            dpi: 渲染分辨率
+            max_size: 最大尺寸（宽或高），None 表示不限制
+            clip: 渲染区域（为空时渲染整页）
+            
+        Returns:
+            float: 缩放比例
+        """
+        zoom = dpi / 72.0
+        
+        if max_size:
+            rect = clip if clip is not None else page.rect
+            longest = max(rect.width, rect.height) * zoom
+            if longest > max_size:
+                zoom *= max_size / longest
+        
+        return zoom
+    
+    def render_page_to_png(
+        self,
+        page: fitz.Page,
+        dpi: int = 144,
+        max_size: int = None,
+        clip: fitz.Rect = None
+    ) -> bytes:
+        """
+        将PDF页面直接渲染为PNG字节
+        
+        按目标尺寸一次光栅化（RGB、无alpha），并直接由pixmap的
+        像素缓冲区编码为PNG，不经过PIL解码、缩放和二次编码。
+        
+        Args:
+            page: PyMuPDF页面对象
+            dpi: 渲染分辨率
+            max_size: 最大尺寸（宽或高），None 表示不限制
+            clip: 渲染区域（为空时渲染整页）
+            
+        Returns:
+            bytes: PNG图像数据
+        """
+        try:
+            zoom = self.get_render_zoom(page, dpi, max_size, clip=clip)
+            pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False, clip=clip)
+            return pix.tobytes("png")
+            
+        except Exception as e:
+            logger.error(f"Failed to render page to png: {str(e)}")
+            raise
+    
     def render_page_to_base64(
         self,
         page: fitz.Page,
         dpi: int = 144,
         optimize: bool = True,
-        max_size: int = 2048
+        max_size: int = 2048,
+        clip: fitz.Rect = None
     ) -> str:
         """
         将PDF页面渲染为Base64字符串（一步到位）
@@ -131,21 +194,20 @@ class ImageProcessor:
         Args:
             page: PyMuPDF页面对象
             dpi: 渲染分辨率
-            optimize: 是否优化图像
+            optimize: 是否限制图像尺寸
             max_size: 最大尺寸
+            clip: 渲染区域（为空时渲染整页）
             
         Returns:
             str: Base64编码的字符串
         """
-        # 渲染为图像
-        image = self.render_page_to_image(page, dpi)
-        
-        # 优化图像（可选）
-        if optimize:
-            image = self.optimize_image(image, max_size)
+        # 按目标尺寸渲染并一次编码
+        png_bytes = self.render_page_to_png(
+            page,
+            dpi=dpi,
+            max_size=max_size if optimize else None,
+            clip=clip
+        )
         
         # 转换为Base64
-        base64_str = self.image_to_base64(image)
-        
-        return base64_str
-
+        return base64.b64encode(png_bytes).decode('utf-8')
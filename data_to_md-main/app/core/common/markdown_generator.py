@@ -3,11 +3,11 @@ Markdown生成器
 将内容片段合并为完整的Markdown文档
 """
 import logging
-from typing import List
+from typing import Callable, Iterable, Iterator, List, Optional, TextIO
 from datetime import datetime
 from app.core.base.processor import ContentChunk
 from app.models.file_info import PDFInfo
-from app.core.common.content_cleaner import ContentCleaner
+from app.core.common.markdown_postprocessor import MarkdownPostProcessor
 
 logger = logging.getLogger(__name__)
 
@@ -44,58 +44,123 @@ class MarkdownGenerator:
             self.include_metadata = include_metadata
         
         self.no_pagination_and_metadata = no_pagination_and_metadata
-        self.cleaner = ContentCleaner()
+        self.postprocessor = MarkdownPostProcessor()
     
     def generate(
         self,
-        content_chunks: List[ContentChunk],
+        content_chunks: Iterable[ContentChunk],
         file_info: PDFInfo
     ) -> str:
         """
         生成Markdown文档
 
         Args:
-            content_chunks: 内容片段列表
+            content_chunks: 内容片段（列表或可重复迭代的落盘队列）
             file_info: 文件信息
 
         Returns:
             str: 完整的Markdown文档
         """
+        # 逐片段后处理并合并（结果与合并后再后处理一致）
+        return self.postprocessor.process_parts(self._parts(content_chunks, file_info))
+    
+    def write(
+        self,
+        content_chunks: Iterable[ContentChunk],
+        file_info: PDFInfo,
+        out: TextIO
+    ) -> None:
+        """
+        生成Markdown文档并逐批写入文件（有界内存模式），内容与 generate 的结果一致
+        
+        Args:
+            content_chunks: 内容片段（需可重复迭代，后处理回退时会再次读取）
+            file_info: 文件信息
+            out: 可定位的文本文件对象
+        """
+        self.postprocessor.write_parts(self._parts(content_chunks, file_info), out)
+    
+    def _parts(self, content_chunks: Iterable[ContentChunk], file_info: PDFInfo) -> "_DocumentParts":
+        """
+        按输出模式组织文档片段（可重复迭代，元数据只生成一次）
+        
+        Args:
+            content_chunks: 内容片段
+            file_info: 文件信息
+            
+        Returns:
+            _DocumentParts: 文档片段
+        """
         # 模式B: 纯内容阅读模式（不显示页码也不显示元数据）
         if not self.show_page_number and not self.include_metadata:
-            return self._generate_unpaginated(content_chunks)
-
-        parts = []
-
+            return _DocumentParts(self._iter_unpaginated_parts, content_chunks)
+        
         # 添加元数据（模式A或单独启用）
-        if self.include_metadata:
-            metadata = self._generate_metadata(file_info)
-            parts.append(metadata)
+        metadata = self._generate_metadata(file_info) if self.include_metadata else None
+        return _DocumentParts(self._iter_paginated_parts, content_chunks, metadata)
+    
+    def _iter_paginated_parts(self, content_chunks: Iterable[ContentChunk], metadata: Optional[str]) -> Iterator[str]:
+        """
+        产出带页码标记（或简单分隔）的文档片段
+        
+        Args:
+            content_chunks: 内容片段
+            metadata: 文档元数据，为空时不添加
+            
+        Yields:
+            str: 文档片段
+        """
+        if metadata is not None:
+            yield metadata
 
         # 合并各页内容
         for chunk in content_chunks:
             # 添加页面标记（如果启用）
             if self.show_page_number:
-                page_marker = f"\n\n<!-- Page {chunk.page_number} ({chunk.chunk_type}) -->\n\n"
-                parts.append(page_marker)
+                yield f"\n\n{self._page_marker(chunk)}\n\n"
             else:
                 # 不显示页码时，只添加简单的分隔
-                parts.append("\n\n")
+                yield "\n\n"
 
             # 添加内容
-            parts.append(chunk.content)
+            yield chunk.content
 
             # 添加页面分隔符（如果显示页码）
             if self.show_page_number:
-                parts.append("\n\n---\n\n")
-
-        # 合并所有部分
-        markdown = "".join(parts)
-
-        # 后处理
-        markdown = self.post_process(markdown)
-
-        return markdown
+                yield "\n\n---\n\n"
+    
+    def render_page(self, chunk: ContentChunk) -> str:
+        """
+        渲染单个页面的Markdown片段（用于流式输出）
+        
+        流式片段仅用于实时预览，完整文档仍以 generate 的结果为准。
+        
+        Args:
+            chunk: 内容片段
+            
+        Returns:
+            str: 该页的Markdown片段
+        """
+        content = self.post_process(chunk.content)
+        if self.show_page_number:
+            return f"{self._page_marker(chunk)}\n\n{content}"
+        return content
+    
+    def _page_marker(self, chunk: ContentChunk) -> str:
+        """
+        生成页面标记
+        
+        覆盖多页的片段（如 MinerU 分片）在 metadata["pages"] 中记录页码范围，
+        标记显示该范围，例如 <!-- Page 21-40 (ocr) -->。
+        
+        Args:
+            chunk: 内容片段
+            
+        Returns:
+            str: 页面标记
+        """
+        pages = chunk.metadata.get("pages") or chunk.page_number
+        return f"<!-- Page {pages} ({chunk.chunk_type}) -->"
     
     def _generate_metadata(self, file_info: PDFInfo) -> str:
         """
@@ -129,49 +194,52 @@ class MarkdownGenerator:
         Returns:
             str: 处理后的Markdown
         """
-        # 清理特殊标记
-        markdown = self.cleaner.remove_special_markers(markdown)
-        
-        # 清理Markdown格式
-        markdown = self.cleaner.clean_markdown(markdown)
-        
-        # 规范化空白字符
-        markdown = self.cleaner.normalize_whitespace(markdown)
-        
-        return markdown
+        # 清理特殊标记、清理Markdown格式、规范化空白字符（单遍完成）
+        return self.postprocessor.process(markdown)
     
-    def _generate_unpaginated(self, content_chunks: List[ContentChunk]) -> str:
+    def _generate_unpaginated(self, content_chunks: Iterable[ContentChunk]) -> str:
         """
         生成无分页的Markdown（不包含元数据、页面标记和分隔符）
 
+        Args:
+            content_chunks: 内容片段
+
+        Returns:
+            str: 无分页的Markdown文档
+        """
+        return self.postprocessor.process_parts(_DocumentParts(self._iter_unpaginated_parts, content_chunks))
+
+    def _iter_unpaginated_parts(self, content_chunks: Iterable[ContentChunk]) -> Iterator[str]:
+        """
+        产出无分页文档的片段
+
         智能拼接规则:
         - 如果页面末尾是句号等标点,添加一个换行符
         - 否则直接拼接
+        - 换行符在下一个片段出现时才产出，最后一个片段之后不添加
 
         Args:
-            content_chunks: 内容片段列表
+            content_chunks: 内容片段
 
-        Returns:
-            str: 无分页的Markdown文档
+        Yields:
+            str: 文档片段
         """
-        parts = []
         sentence_endings = {'.', '!', '?', '。', '!', '?'}
+        separator = None
+
+        for chunk in content_chunks:
+            if separator:
+                yield separator
+                separator = None
 
-        for i, chunk in enumerate(content_chunks):
             content = chunk.content.rstrip()  # 去掉末尾空白
 
             if content:
-                parts.append(content)
+                yield content
 
-                # 如果不是最后一个chunk,根据末尾字符决定是否添加换行
-                if i < len(content_chunks) - 1:
-                    if content[-1] in sentence_endings:
-                        parts.append("\n")
-
-        markdown = "".join(parts)
-        markdown = self.post_process(markdown)
-
-        return markdown
+                # 后面还有片段时，根据末尾字符决定是否添加换行
+                if content[-1] in sentence_endings:
+                    separator = "\n"
 
     def generate_simple(self, content_chunks: List[ContentChunk]) -> str:
         """
@@ -189,8 +257,15 @@ class MarkdownGenerator:
             parts.append(chunk.content)
             parts.append("\n\n")
 
-        markdown = "".join(parts)
-        markdown = self.post_process(markdown)
+        return self.postprocessor.process_parts(parts)
+
+
+class _DocumentParts:
+    """可重复迭代的文档片段：每次迭代重新从内容片段生成"""
 
-        return markdown
+    def __init__(self, iter_parts: Callable[..., Iterator[str]], *args):
+        self._iter_parts = iter_parts
+        self._args = args
 
+    def __iter__(self) -> Iterator[str]:
+        return self._iter_parts(*self._args)
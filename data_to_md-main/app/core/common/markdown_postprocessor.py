@@ -0,0 +1,294 @@
+"""
+Markdown 单遍后处理器
+把 ContentCleaner 的多次整文档替换合并为一次逐行扫描
+
+说明：
+- 输出与 reference_post_process（remove_special_markers → clean_markdown →
+  normalize_whitespace 串联）逐字节一致
+- 按片段流式处理：文档由多个片段拼接而成时不生成拼接后的中间文档，
+  每个片段按行进入状态机，只在最后拼接一次结果；write_parts 逐批写入文件，不拼接结果
+- 状态机按原有替换的顺序分为几个逐行阶段，各阶段只保留常数大小的状态：
+    1. 移除特殊标记、统一换行符、合并空格与制表符、去除行首行尾空白
+    2. 合并空行，移除行尾的代码块标记（标记后紧跟的空行一并移除）
+    3. 移除行首的代码块标记（标记后只剩空白时与下一个非空行合并）
+    4. 标题前后补空行（与上一行已补空行的标题相邻时不补）
+    5. 合并空行、去除首尾空白与行尾空格
+- 只含 # 的行（如 "#" 或 "## "）在原有规则下会跨行匹配标题，遇到时对整个文档
+  回退到原有实现，保证输出一致
+"""
+import re
+import logging
+from typing import Iterable, Iterator, List, TextIO
+from app.core.common.content_cleaner import ContentCleaner
+
+logger = logging.getLogger(__name__)
+
+# 与 ContentCleaner.remove_special_markers 相同的标记，按相同顺序移除
+SPECIAL_MARKERS = ('<|end_of_sentence|>', '<|end_of_text|>', '<|ref|>', '<|det|>')
+
+# 制表符先替换为空格，再合并连续空格，等价于 [ \t]+ -> ' '
+_SPACE_RUN = re.compile(r' {2,}')
+
+FENCE = '```'
+
+# 写入文件时每批合并的行数
+WRITE_BATCH_LINES = 4096
+
+
+class _Fallback(Exception):
+    """遇到逐行状态机无法等价处理的结构"""
+
+
+def reference_post_process(markdown: str) -> str:
+    """
+    原有的多遍后处理实现（输出基准，也是回退路径）
+
+    Args:
+        markdown: 原始Markdown
+
+    Returns:
+        str: 处理后的Markdown
+    """
+    markdown = ContentCleaner.remove_special_markers(markdown)
+    markdown = ContentCleaner.clean_markdown(markdown)
+    return ContentCleaner.normalize_whitespace(markdown)
+
+
+def _split_lines(parts: Iterable[str]) -> Iterator[str]:
+    """
+    阶段1：把片段流切分为行，移除特殊标记、统一换行符，合并空格与制表符并去除行首行尾空白
+
+    特殊标记不跨行，按 "\\n" 切分后逐行移除，与整文档替换等价；移除标记后再处理 "\\r"
+    与合并空白，与原有实现的先后顺序一致。
+    """
+    pending = ''
+    for part in parts:
+        if '\n' not in part:
+            pending += part
+            continue
+        # 首尾两行与相邻片段相连，可能含有跨片段的标记或 "\r\n"，逐行处理
+        head, part = part.split('\n', 1)
+        yield from _clean_line(pending + head, last=False)
+        body, sep, pending = part.rpartition('\n')
+        if not sep:
+            continue
+        # 中间各行不含特殊标记时可以整体统一换行符与合并空白
+        if '<|' not in body and not body.endswith('\r'):
+            if '\r' in body:
+                body = body.replace('\r\n', '\n').replace('\r', '\n')
+            if '\t' in body:
+                body = body.replace('\t', ' ')
+            lines = [line.strip() for line in body.split('\n')]
+            if '  ' in body:
+                lines = [_SPACE_RUN.sub(' ', line) if '  ' in line else line for line in lines]
+            yield from lines
+        else:
+            for line in body.split('\n'):
+                yield from _clean_line(line, last=False)
+    yield from _clean_line(pending, last=True)
+
+
+def _clean_line(line: str, last: bool) -> Iterator[str]:
+    """清理一行：移除特殊标记，把行内的 "\\r" 换行展开为多行，合并空白并去除首尾空白"""
+    if '<|' in line:
+        for marker in SPECIAL_MARKERS:
+            line = line.replace(marker, '')
+    if '\r' in line:
+        if not last and line.endswith('\r'):
+            # "\r\n" 视为一个换行
+            line = line[:-1]
+        sublines = line.split('\r')
+    else:
+        sublines = (line,)
+    for subline in sublines:
+        yield _collapse_spaces(subline.strip())
+
+
+def _collapse_spaces(text: str) -> str:
+    """连续的空格与制表符合并为一个空格（去除首尾空白前后合并结果相同）"""
+    if '\t' in text:
+        text = text.replace('\t', ' ')
+    if '  ' in text:
+        text = _SPACE_RUN.sub(' ', text)
+    return text
+
+
+def _strip_trailing_fences(lines: Iterator[str]) -> Iterator[str]:
+    """
+    阶段2：连续空行合并为一个、去掉首尾空行，并移除行尾的 ``` 标记
+
+    原有规则 ```+\\s*$ 中的 \\s* 会越过换行，标记所在行之后的一个空行随之被移除。
+    """
+    started = False
+    blank = False
+    after_fence = False
+    for line in lines:
+        if not line:
+            blank = True
+            continue
+        if blank and started and not after_fence:
+            yield ''
+        started = True
+        blank = False
+        after_fence = line.endswith(FENCE)
+        if after_fence:
+            line = line.rstrip('`')
+        yield line
+
+
+def _strip_leading_fences(lines: Iterator[str]) -> Iterator[str]:
+    """
+    阶段3：移除行首的 ``` 标记及其后的空白
+
+    标记后只剩空白时，原有规则 ^```+\\s* 会吞掉换行，该行与下一个非空行合并，
+    合并后的行首仍可能是 ``` 标记。
+    """
+    lines = iter(lines)
+    for line in lines:
+        while line.startswith(FENCE):
+            rest = line.lstrip('`').lstrip()
+            if rest:
+                line = rest
+                break
+            following = next((candidate for candidate in lines if candidate.strip()), None)
+            if following is None:
+                line = ''
+                break
+            line = following.lstrip()
+            if line != following:
+                # 吞掉了下一行的行首空白，合并位置不再是行首
+                break
+        yield line
+
+
+def _heading_level(line: str) -> int:
+    """返回行首 # 的个数"""
+    return len(line) - len(line.lstrip('#'))
+
+
+def _pad_headings(lines: Iterator[str]) -> Iterator[str]:
+    """
+    阶段4：标题前后补空行
+
+    原有规则 \\n(#{1,6}\\s+.+)\\n 需要标题前后各有一个换行，且匹配会消耗标题后的换行，
+    所以紧跟在已匹配标题之后的标题行不补空行；第一行与最后一行不匹配。
+    """
+    lines = iter(lines)
+    previous = next(lines, None)
+    if previous is None:
+        return
+    # 第一行前没有换行，不能匹配
+    available = False
+    for line in lines:
+        matched = False
+        if available and previous.startswith('#'):
+            level = _heading_level(previous)
+            if level <= 6:
+                rest = previous[level:]
+                if not rest.strip():
+                    raise _Fallback()
+                matched = rest[0].isspace()
+        if matched:
+            yield ''
+            yield previous
+            yield ''
+        else:
+            yield previous
+        available = not matched
+        previous = line
+    yield previous
+
+
+def _finish_lines(lines: Iterator[str]) -> Iterator[str]:
+    """
+    阶段5：连续空白行合并为一个空行，去掉首尾空白行与首尾空白，去除行尾空格
+
+    最后一行还要去除行尾所有空白，所以每行延后到下一个非空行出现时产出。
+    """
+    previous = None
+    blank = False
+    for line in lines:
+        if not line.strip():
+            blank = True
+            continue
+        if previous is None:
+            line = line.lstrip()
+        else:
+            yield previous
+            if blank:
+                yield ''
+        blank = False
+        previous = line.rstrip(' \t') if line.endswith((' ', '\t')) else line
+    if previous is not None:
+        yield previous.rstrip()
+
+
+class MarkdownPostProcessor:
+    """Markdown 单遍后处理器"""
+
+    def process(self, markdown: str) -> str:
+        """
+        后处理一段Markdown
+
+        Args:
+            markdown: 原始Markdown
+
+        Returns:
+            str: 处理后的Markdown
+        """
+        if not markdown:
+            return ""
+        return self.process_parts((markdown,))
+
+    def process_parts(self, parts: Iterable[str]) -> str:
+        """
+        后处理由多个片段顺序拼接而成的文档，不生成拼接后的中间文档
+
+        Args:
+            parts: 文档片段（需可重复迭代，回退时会再次读取）
+
+        Returns:
+            str: 处理后的Markdown，与处理拼接后的文档结果一致
+        """
+        try:
+            return '\n'.join(self._iter_lines(parts))
+        except _Fallback:
+            logger.debug("Heading-only line found, falling back to reference post-processing")
+            return reference_post_process(''.join(parts))
+
+    def write_parts(self, parts: Iterable[str], out: TextIO) -> None:
+        """
+        后处理由多个片段顺序拼接而成的文档，逐批写入文件，不在内存中保留结果
+
+        回退到原有实现时（文档含只有 # 的行）需要在内存中拼接整个文档，
+        已写入的内容会被截断后重写。
+
+        Args:
+            parts: 文档片段（需可重复迭代，回退时会再次读取）
+            out: 可定位的文本文件对象，从当前位置开始写入
+        """
+        start = out.tell()
+        try:
+            batch: List[str] = []
+            first = True
+            for line in self._iter_lines(parts):
+                batch.append(line)
+                if len(batch) >= WRITE_BATCH_LINES:
+                    out.write(('' if first else '\n') + '\n'.join(batch))
+                    batch.clear()
+                    first = False
+            if batch:
+                out.write(('' if first else '\n') + '\n'.join(batch))
+        except _Fallback:
+            logger.warning("Heading-only line found, falling back to in-memory post-processing")
+            out.seek(start)
+            out.truncate()
+            out.write(reference_post_process(''.join(parts)))
+
+    def _iter_lines(self, parts: Iterable[str]) -> Iterator[str]:
+        """串联各阶段，逐行产出处理结果"""
+        stages = _split_lines(parts)
+        stages = _strip_trailing_fences(stages)
+        stages = _strip_leading_fences(stages)
+        stages = _pad_headings(stages)
+        return _finish_lines(stages)
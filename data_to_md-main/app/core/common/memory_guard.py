@@ -0,0 +1,64 @@
+"""
+内存上限检查
+读取当前进程的常驻内存（RSS），用于有界内存模式下的页面准入控制
+
+说明：
+- Linux 下读取 /proc/self/statm（开销约数微秒，可在每页准入时调用）
+- 无法读取时视为未超限，不影响转换
+- 只统计当前进程；进程池中渲染页面的工作进程各自占用内存，不计入
+"""
+import os
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+def current_rss() -> Optional[int]:
+    """
+    读取当前进程的常驻内存
+
+    Returns:
+        Optional[int]: RSS（字节）；无法读取时为 None
+    """
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class MemoryGuard:
+    """内存上限检查器"""
+
+    def __init__(self, ceiling_mb: int):
+        """
+        初始化检查器
+
+        Args:
+            ceiling_mb: 常驻内存上限（MB），0 表示不限制
+        """
+        self.ceiling = ceiling_mb * 1024 * 1024
+        self.peak_rss = 0
+        self.throttled = 0  # 因超限暂停准入的次数
+
+    def exceeded(self) -> bool:
+        """
+        当前常驻内存是否超过上限
+
+        Returns:
+            bool: 是否超限
+        """
+        rss = current_rss()
+        if rss is None:
+            return False
+        self.peak_rss = max(self.peak_rss, rss)
+        if self.ceiling <= 0 or rss <= self.ceiling:
+            return False
+        self.throttled += 1
+        return True
@@ -0,0 +1,68 @@
+"""
+页面滑动窗口
+按页序启动页面处理并按页序产出结果，同时在途（已启动但尚未产出）的页面数不超过窗口大小
+
+说明：
+- 窗口为空（None）时一次启动全部页面，与逐页创建任务后依次等待等价
+- 指定窗口时，队首页面产出后才启动下一页，已完成但排在慢页面之后的结果最多保留窗口大小个
+- 提供 MemoryGuard 时，常驻内存超过上限后暂停启动新页面，直到在途页面全部产出；
+  没有在途页面时仍启动一页，保证进度
+"""
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Deque, Iterable, Optional
+from app.core.common.memory_guard import MemoryGuard
+
+logger = logging.getLogger(__name__)
+
+
+class PageWindow:
+    """页面滑动窗口（异步迭代器）"""
+
+    def __init__(
+        self,
+        starters: Iterable[Callable[[], Awaitable]],
+        size: Optional[int] = None,
+        memory_guard: Optional[MemoryGuard] = None
+    ):
+        """
+        初始化窗口
+
+        Args:
+            starters: 按页序排列的启动函数，调用后返回该页的协程、任务或 Future
+            size: 窗口大小（在途页面数上限），为空时不限制
+            memory_guard: 内存上限检查器，为空时不检查
+        """
+        self._starters = iter(starters)
+        self.size = max(size, 1) if size else None
+        self.memory_guard = memory_guard
+        self._pending: Deque[asyncio.Future] = deque()
+        self._exhausted = False
+
+    def __aiter__(self) -> "PageWindow":
+        return self
+
+    async def __anext__(self):
+        self._fill()
+        if not self._pending:
+            raise StopAsyncIteration
+        return await self._pending.popleft()
+
+    def _fill(self):
+        """按窗口大小与内存上限启动后续页面"""
+        while not self._exhausted and (self.size is None or len(self._pending) < self.size):
+            if self._pending and self.memory_guard is not None and self.memory_guard.exceeded():
+                break
+            starter = next(self._starters, None)
+            if starter is None:
+                self._exhausted = True
+                break
+            self._pending.append(asyncio.ensure_future(starter()))
+
+    def cancel(self):
+        """取消已启动但尚未完成的页面（提前结束时调用）"""
+        for future in self._pending:
+            if not future.done():
+                future.cancel()
+        self._pending.clear()
@@ -0,0 +1,45 @@
+"""
+进程池管理
+为页面渲染等 CPU 密集型任务提供进程内共享的进程池
+
+说明：
+- 进程池按需创建，避免在导入阶段（包括子进程导入）启动多余进程
+- 工作进程数量由 CPU_POOL_WORKERS 配置，0 表示使用 CPU 核数
+"""
+import os
+import logging
+import concurrent.futures
+from typing import Optional
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[concurrent.futures.ProcessPoolExecutor] = None
+
+
+def get_process_pool() -> concurrent.futures.ProcessPoolExecutor:
+    """
+    获取共享进程池（首次调用时创建）
+
+    Returns:
+        ProcessPoolExecutor: 进程池
+    """
+    global _executor
+
+    if _executor is None:
+        settings = get_settings()
+        max_workers = settings.cpu_pool_workers or os.cpu_count() or 1
+        _executor = concurrent.futures.ProcessPoolExecutor(max_workers=max_workers)
+        logger.info(f"Process pool created: {max_workers} workers")
+
+    return _executor
+
+
+def shutdown_process_pool():
+    """关闭共享进程池（应用关闭时调用）"""
+    global _executor
+
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+        logger.info("Process pool shut down")
@@ -0,0 +1,115 @@
+"""
+页面渲染分辨率策略
+
+- fixed:    所有页面使用请求（或配置）的 DPI
+- adaptive: 按页选择 DPI，以请求 DPI 为上限：
+    * 有文本层：让最小字号渲染后约为 target_glyph_px 像素，大字号页面用更低的分辨率
+    * 无文本层：按页面尺寸，让长边约为 target_long_side 像素
+"""
+import logging
+from typing import Optional
+from app.core.converters.pdf.pdf_document import PDFDocumentSession
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class PageDPIPolicy:
+    """页面渲染分辨率策略"""
+
+    def __init__(
+        self,
+        dpi: int,
+        mode: str = "fixed",
+        min_dpi: int = 72,
+        target_glyph_px: int = 20,
+        target_long_side: int = 1600
+    ):
+        """
+        初始化策略
+
+        Args:
+            dpi: 固定模式下的 DPI，自适应模式下的 DPI 上限
+            mode: "fixed" / "adaptive"
+            min_dpi: 自适应模式下的 DPI 下限
+            target_glyph_px: 最小字号渲染后的目标像素高度
+            target_long_side: 无文本层页面渲染后的目标长边像素
+        """
+        self.dpi = dpi
+        self.mode = mode
+        self.min_dpi = min(min_dpi, dpi)
+        self.target_glyph_px = target_glyph_px
+        self.target_long_side = target_long_side
+
+    @property
+    def adaptive(self) -> bool:
+        """是否为自适应模式"""
+        return self.mode == "adaptive"
+
+    def choose(self, page_rect: tuple, min_font_size: Optional[float]) -> int:
+        """
+        根据页面尺寸与最小字号选择 DPI
+
+        Args:
+            page_rect: 页面边界 (x0, y0, x1, y1)，单位 pt
+            min_font_size: 页面最小字号（pt），无文本层时为 None
+
+        Returns:
+            int: 渲染 DPI
+        """
+        if not self.adaptive:
+            return self.dpi
+
+        if min_font_size:
+            # 字号 pt × DPI / 72 = 渲染后的像素高度
+            dpi = self.target_glyph_px * 72.0 / min_font_size
+        else:
+            x0, y0, x1, y1 = page_rect
+            long_side = max(x1 - x0, y1 - y0)
+            dpi = self.target_long_side * 72.0 / long_side if long_side > 0 else self.dpi
+
+        return int(max(self.min_dpi, min(self.dpi, round(dpi))))
+
+    def for_page(self, session: Optional[PDFDocumentSession], page_num: int) -> int:
+        """
+        选择指定页面的 DPI
+
+        Args:
+            session: 文档会话（固定模式下可为空）
+            page_num: 页码（从0开始）
+
+        Returns:
+            int: 渲染 DPI
+        """
+        if not self.adaptive or session is None:
+            return self.dpi
+
+        try:
+            return self.choose(
+                tuple(session.page(page_num).rect),
+                session.get_min_font_size(page_num)
+            )
+        except Exception as e:
+            logger.warning(f"Failed to choose adaptive DPI for page {page_num + 1}: {str(e)}")
+            return self.dpi
+
+
+def create_dpi_policy(dpi: int, mode: str = "fixed") -> PageDPIPolicy:
+    """
+    按配置创建渲染分辨率策略
+
+    Args:
+        dpi: 固定 DPI / 自适应上限
+        mode: "fixed" / "adaptive"
+
+    Returns:
+        PageDPIPolicy: 策略实例
+    """
+    settings = get_settings()
+    return PageDPIPolicy(
+        dpi=dpi,
+        mode=mode,
+        min_dpi=settings.pdf_adaptive_min_dpi,
+        target_glyph_px=settings.pdf_adaptive_glyph_px,
+        target_long_side=settings.pdf_adaptive_long_side
+    )
@@ -4,15 +4,20 @@
 """
 import logging
 import asyncio
-import fitz  # PyMuPDF
-from typing import List
+from functools import partial
+from typing import Dict, List, AsyncIterator, Optional, Callable
 from app.core.base.processor import BaseProcessor, ContentChunk
 from app.models.file_info import PDFInfo
 from app.models.enums import ChunkType
-from app.core.common.image_processor import ImageProcessor
-from app.services.external.deepseek_client import DeepSeekClient
+from app.core.common.memory_guard import MemoryGuard
+from app.core.common.page_window import PageWindow
+from app.core.converters.pdf.page_renderer import render_page_in_pool
+from app.core.converters.pdf.page_screening import PageScreen, PageScreenStream
+from app.core.converters.pdf.pdf_document import PDFDocumentSession
+from app.core.converters.pdf.mineru_pages import parse_pages_with_mineru
+from app.core.converters.pdf.dpi_policy import create_dpi_policy
+from app.core.converters.pdf.ocr_runner import PageOCRRunner
 from app.services.external.mineru_client import MinerUClient
-from app.exceptions.service_exceptions import MinerUAPIException
 from app.config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -21,19 +26,45 @@ logger = logging.getLogger(__name__)
 class ImagePDFProcessor(BaseProcessor):
     """纯图片PDF处理器"""
     
-    def __init__(self, ocr_engine: str = "auto"):
+    def __init__(
+        self,
+        ocr_engine: str = "auto",
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        dpi: Optional[int] = None,
+        dpi_mode: str = "fixed",
+        session: Optional[PDFDocumentSession] = None,
+        mineru_shard_pages: Optional[int] = None,
+        page_window: Optional[int] = None,
+        memory_guard: Optional[MemoryGuard] = None
+    ):
         """初始化处理器
 
         Args:
-            ocr_engine: OCR 引擎选择："deepseek" / "mineru" / "auto"。
+            ocr_engine: OCR 引擎选择："deepseek" / "mineru" / "local" / "auto"。
+            progress_callback: 进度回调，每按页序完成一页调用一次。
+            dpi: 渲染 DPI（为空时使用配置 PDF_RENDER_DPI）。
+            dpi_mode: "fixed" / "adaptive"（按页选择 DPI，dpi 作为上限）。
+            session: 共享的文档会话（自适应模式下读取页面尺寸与字号）。
+            mineru_shard_pages: MinerU 分片页数（为空时使用配置 MINERU_SHARD_PAGES，0 表示不分片）。
+            page_window: 在途页面数上限（有界内存模式），为空时一次启动全部页面。
+            memory_guard: 内存上限检查器（有界内存模式），超限时暂停启动新页面。
         """
         self.settings = get_settings()
-        self.image_processor = ImageProcessor()
-        self.deepseek_client = DeepSeekClient()
+        self.ocr_runner = PageOCRRunner(ocr_engine=ocr_engine)
         self.mineru_client = MinerUClient()
         self.ocr_engine = ocr_engine
-        self.dpi = self.settings.pdf_render_dpi
-        self.max_concurrent = self.settings.max_concurrent_api_calls
+        self.progress_callback = progress_callback
+        self.session = session
+        self.dpi = dpi or self.settings.pdf_render_dpi
+        self.dpi_policy = create_dpi_policy(self.dpi, dpi_mode)
+        # 实际并发由 API 限制器动态控制，这里只限制单个文档的在途页面数
+        self.max_concurrent = self.ocr_runner.max_concurrency
+        self.render_lookahead = self.settings.pdf_render_lookahead
+        self.mineru_shard_pages = (
+            self.settings.mineru_shard_pages if mineru_shard_pages is None else mineru_shard_pages
+        )
+        self.page_window = page_window
+        self.memory_guard = memory_guard
     
     async def process(
         self,
@@ -50,107 +81,271 @@ class ImagePDFProcessor(BaseProcessor):
         Returns:
             List[ContentChunk]: 内容片段列表
         """
+        return [chunk async for chunk in self.iter_chunks(file_path, file_info)]
+    
+    async def iter_chunks(
+        self,
+        file_path: str,
+        file_info: PDFInfo
+    ) -> AsyncIterator[ContentChunk]:
+        """
+        按页序产出内容片段：某页及其之前的页面都完成后立即产出
+        
+        Args:
+            file_path: PDF文件路径
+            file_info: PDF文件信息
+            
+        Yields:
+            ContentChunk: 内容片段
+        """
         logger.info(f"Processing image PDF: {file_path}, {file_info.total_pages} pages")
         
-        # 当选择 MinerU 时，走整PDF解析链路，返回单个整文 ContentChunk
+        # 当选择 MinerU 时，走整PDF解析链路（可按页数分片并行解析），每个分片产出一个 ContentChunk
         if (self.ocr_engine or "").lower() == "mineru":
             logger.info("Using MinerU ocr_pdf for whole-document parsing in ImagePDFProcessor")
             try:
-                markdown = await self.mineru_client.ocr_pdf(file_path)
-                return [
-                    ContentChunk(
-                        content=markdown,
-                        page_number=1,
-                        chunk_type=ChunkType.OCR,
-                        metadata={"ocr_engine": "mineru", "method": "mineru_pdf"}
-                    )
-                ]
+                # 只上传所选页面
+                page_nums = [page.page_number - 1 for page in file_info.pages]
+                document_pages = file_info.document_pages or file_info.total_pages
+                chunks = await parse_pages_with_mineru(
+                    self.mineru_client,
+                    file_path,
+                    page_nums,
+                    document_pages,
+                    shard_pages=self.mineru_shard_pages
+                )
             except Exception as e:
                 logger.error(f"MinerU whole-document parsing failed: {str(e)}")
                 raise
+            for chunk in chunks:
+                yield chunk
+            self._report_progress(file_info.total_pages, file_info.total_pages)
+            return
         
+        window = None
+        screens = None
         try:
-            # 打开PDF文档
-            doc = fitz.open(file_path)
+            # 每页渲染 DPI（固定模式下均为 self.dpi）
+            page_nums = [page.page_number - 1 for page in file_info.pages]
+            page_dpis = self._choose_page_dpis(file_path, page_nums)
             
-            # 创建信号量限制并发
+            # 渲染窗口：已渲染但尚未完成 OCR 的页面数量上限
+            # （OCR 并发数 + 预渲染页数），避免一次性渲染整份文档
+            render_window = asyncio.Semaphore(self.max_concurrent + self.render_lookahead)
+            
+            # 创建信号量限制 OCR 并发
             semaphore = asyncio.Semaphore(self.max_concurrent)
             
-            # 创建所有页面的处理任务
-            tasks = []
-            for page_num in range(file_info.total_pages):
-                task = self._process_page_with_semaphore(
-                    doc,
-                    page_num,
-                    semaphore
-                )
-                tasks.append(task)
+            # OCR 前逐页识别空白页与近似重复页（与渲染、OCR 并行）
+            screens = self._start_screening(file_path, page_nums)
+            
+            # 首次出现页面的处理任务，保留到引用它的最后一个重复页启动
+            page_tasks: Dict[int, asyncio.Task] = {}
             
-            # 并发执行所有任务
-            content_chunks = await asyncio.gather(*tasks)
+            def prune_page_tasks():
+                """丢弃不会再被重复页引用的页面任务"""
+                if screens.finished:
+                    for page_num in [p for p in page_tasks if not screens.is_referenced_later(p)]:
+                        del page_tasks[page_num]
             
-            # 关闭文档
-            doc.close()
+            async def run_page(page_num: int, dpi: int) -> ContentChunk:
+                """处理单页：空白页不 OCR，重复页等待首次出现页面的结果"""
+                if screens is None:
+                    return await self._process_page(file_path, page_num, dpi, render_window, semaphore)
+                
+                screen = await screens.get(page_num)
+                if screen.blank:
+                    page_tasks.pop(page_num, None)
+                    prune_page_tasks()
+                    return await self._skip_blank_page(screen)
+                if screen.duplicate_of is not None:
+                    page_tasks.pop(page_num, None)
+                    original = page_tasks[screen.duplicate_of]
+                    screens.release(screen.duplicate_of)
+                    prune_page_tasks()
+                    return await self._reuse_page(original, file_path, page_num, dpi, render_window, semaphore)
+                prune_page_tasks()
+                return await self._process_page(file_path, page_num, dpi, render_window, semaphore)
             
-            logger.info(f"Image PDF processed: {len(content_chunks)} pages")
+            def start_page(page_num: int, dpi: int) -> asyncio.Task:
+                """启动单页处理，登记任务供之后的重复页引用"""
+                task = asyncio.create_task(run_page(page_num, dpi))
+                if screens is not None:
+                    page_tasks[page_num] = task
+                return task
+            
+            # 按页序启动并产出；指定窗口时只保留窗口内的页面
+            window = PageWindow(
+                (partial(start_page, page_num, dpi) for page_num, dpi in zip(page_nums, page_dpis)),
+                size=self.page_window,
+                memory_guard=self.memory_guard
+            )
+            done_pages = 0
+            async for chunk in window:
+                done_pages += 1
+                self._report_progress(done_pages, file_info.total_pages)
+                yield chunk
             
-            return content_chunks
+            logger.info(f"Image PDF processed: {done_pages} pages")
             
         except Exception as e:
             logger.error(f"Failed to process image PDF: {str(e)}")
             raise
+        finally:
+            # 提前结束（出错或调用方停止迭代）时取消未完成的页面
+            if window is not None:
+                window.cancel()
+            if screens is not None:
+                screens.close()
+    
+    def _choose_page_dpis(self, file_path: str, page_nums: List[int]) -> List[int]:
+        """
+        选择每页的渲染 DPI
+        
+        Args:
+            file_path: PDF文件路径
+            page_nums: 页码列表（从0开始）
+            
+        Returns:
+            List[int]: 与 page_nums 对应的 DPI
+        """
+        if not self.dpi_policy.adaptive:
+            return [self.dpi] * len(page_nums)
+        
+        own_session = self.session is None
+        session = PDFDocumentSession(file_path) if own_session else self.session
+        try:
+            return [self.dpi_policy.for_page(session, page_num) for page_num in page_nums]
+        finally:
+            if own_session:
+                session.close()
+    
+    def _start_screening(self, file_path: str, page_nums: List[int]) -> Optional[PageScreenStream]:
+        """
+        启动空白页与近似重复页的流式筛选（均未启用时不筛选）
+        
+        Args:
+            file_path: PDF文件路径
+            page_nums: 页码列表（从0开始）
+            
+        Returns:
+            Optional[PageScreenStream]: 流式筛选；未启用时为 None
+        """
+        skip_blank = self.settings.pdf_skip_blank_pages
+        dedup = self.settings.pdf_dedup_pages
+        if not (skip_blank or dedup):
+            return None
+        
+        screens = PageScreenStream(
+            file_path,
+            page_nums,
+            skip_blank=skip_blank,
+            blank_ink_ratio=self.settings.pdf_blank_ink_ratio,
+            dedup=dedup,
+            dedup_max_diff=self.settings.pdf_dedup_max_diff
+        )
+        screens.start()
+        return screens
+    
+    async def _skip_blank_page(self, screen: PageScreen) -> ContentChunk:
+        """
+        空白页直接产出空内容片段
+        
+        Args:
+            screen: 页面筛选结果
+            
+        Returns:
+            ContentChunk: 内容片段
+        """
+        return ContentChunk(
+            content="",
+            page_number=screen.page_num + 1,
+            chunk_type=ChunkType.OCR,
+            metadata={
+                'method': 'blank_page',
+                'skipped': 'blank',
+                'ink_ratio': round(screen.ink_ratio, 6)
+            }
+        )
     
-    async def _process_page_with_semaphore(
+    async def _reuse_page(
         self,
-        doc: fitz.Document,
+        original: "asyncio.Task[ContentChunk]",
+        file_path: str,
         page_num: int,
+        dpi: int,
+        render_window: asyncio.Semaphore,
         semaphore: asyncio.Semaphore
     ) -> ContentChunk:
         """
-        使用信号量限制并发处理页面
+        重复页复用首次出现页面的 OCR 结果；首次出现页面处理失败时本页照常 OCR
         
         Args:
-            doc: PDF文档对象
+            original: 首次出现页面的处理任务
+            file_path: PDF文件路径
             page_num: 页码（从0开始）
-            semaphore: 信号量
+            dpi: 渲染 DPI
+            render_window: 渲染窗口信号量
+            semaphore: OCR 并发信号量
             
         Returns:
             ContentChunk: 内容片段
         """
-        async with semaphore:
-            return await self._process_page(doc, page_num)
+        source = await original
+        if 'error' in source.metadata:
+            return await self._process_page(file_path, page_num, dpi, render_window, semaphore)
+        
+        logger.info(f"Page {page_num + 1} reuses OCR result of page {source.page_number}")
+        return ContentChunk(
+            content=source.content,
+            page_number=page_num + 1,
+            chunk_type=source.chunk_type,
+            metadata={
+                'method': 'duplicate_page',
+                'duplicate_of': source.page_number,
+                'ocr_engine': source.metadata.get('ocr_engine')
+            }
+        )
     
     async def _process_page(
         self,
-        doc: fitz.Document,
-        page_num: int
+        file_path: str,
+        page_num: int,
+        dpi: int,
+        render_window: asyncio.Semaphore,
+        semaphore: asyncio.Semaphore
     ) -> ContentChunk:
         """
-        处理单个页面
+        处理单个页面（渲染 → OCR 两级流水线）
+        
+        页面先在进程池中渲染（占用渲染窗口），再等待 OCR 信号量；
+        OCR 完成后释放渲染窗口，后续页面才能开始渲染。
         
         Args:
-            doc: PDF文档对象
+            file_path: PDF文件路径
             page_num: 页码（从0开始）
+            dpi: 渲染 DPI
+            render_window: 渲染窗口信号量
+            semaphore: OCR 并发信号量
             
         Returns:
             ContentChunk: 内容片段
         """
         page_number = page_num + 1
-        logger.info(f"Processing page {page_number} with OCR")
         
         try:
-            # 获取页面
-            page = doc[page_num]
-            
-            # 渲染页面为Base64
-            base64_image = self.image_processor.render_page_to_base64(
-                page,
-                dpi=self.dpi,
-                optimize=True
-            )
-
-            # 调用 OCR 引擎
-            markdown_content, engine_used = await self._run_ocr(base64_image)
+            async with render_window:
+                # 在进程池中渲染页面为Base64
+                base64_image = await render_page_in_pool(
+                    file_path,
+                    page_num,
+                    dpi=dpi
+                )
+                
+                # 调用 OCR 引擎
+                async with semaphore:
+                    logger.info(f"Processing page {page_number} with OCR (dpi={dpi})")
+                    markdown_content, engine_used, cache_hit = await self._run_ocr(base64_image, dpi)
             
             # 创建内容片段
             chunk = ContentChunk(
@@ -158,9 +353,11 @@ class ImagePDFProcessor(BaseProcessor):
                 page_number=page_number,
                 chunk_type=ChunkType.OCR,
                 metadata={
-                    'dpi': self.dpi,
+                    'dpi': dpi,
+                    'ocr_bytes': len(base64_image),
                     'method': f'{engine_used}_ocr',
-                    'ocr_engine': engine_used
+                    'ocr_engine': engine_used,
+                    'ocr_cache_hit': cache_hit
                 }
             )
             
@@ -178,27 +375,10 @@ class ImagePDFProcessor(BaseProcessor):
                 metadata={'error': str(e), 'ocr_engine': self.ocr_engine}
             )
  
-    async def _run_ocr(self, base64_image: str) -> tuple[str, str]:
-        """根据配置的引擎执行 OCR。
+    async def _run_ocr(self, base64_image: str, dpi: int) -> tuple[str, str, bool]:
+        """根据配置的引擎执行 OCR（带结果缓存）。
 
         Returns:
-            (markdown, engine_used)
+            (markdown, engine_used, cache_hit)
         """
-        engine = (self.ocr_engine or "auto").lower()
-
-        # 明确指定 DeepSeek（逐页）
-        if engine == "deepseek":
-            markdown = await self.deepseek_client.ocr_image(base64_image)
-            return markdown, "deepseek"
-
-        # 明确指定 MinerU（逐页不支持）
-        if engine == "mineru":
-            raise MinerUAPIException(
-                message="MinerU 不支持逐页 image OCR",
-                details="请在处理器入口走 mineru 的整PDF解析链路（ocr_pdf）。"
-            )
-
-        # auto 模式：仅尝试 DeepSeek，失败则抛出由上层捕获
-        markdown = await self.deepseek_client.ocr_image(base64_image)
-        return markdown, "deepseek"
- 
+        return await self.ocr_runner.run(base64_image, dpi=dpi)
@@ -0,0 +1,68 @@
+"""
+MinerU 整文档解析
+把所选页面交给 MinerU 解析，按分片产出内容片段
+
+说明：
+- 未启用分片时，所选页面作为一个子文档（选中全部页面时直接上传原文件）提交
+- 启用分片时，按 shard_pages 页切分为多个子文档，作为一个 MinerU 批次并行解析，
+  结果按页序合并；每个分片产出一个内容片段，page_number 为分片首页，
+  metadata["pages"] 记录分片覆盖的页码范围，页面标记因此保留原始页码
+- contiguous=True 时在页码不连续处切分（混合模式下与本地提取的页面按页序交错）
+"""
+import logging
+from typing import List
+from app.core.base.processor import ContentChunk
+from app.models.enums import ChunkType
+from app.core.converters.pdf.page_selection import page_shard_pdfs, selected_pages_pdf, split_shards
+from app.services.external.mineru_client import MinerUClient
+from app.utils.page_ranges import format_page_ranges
+
+logger = logging.getLogger(__name__)
+
+
+async def parse_pages_with_mineru(
+    client: MinerUClient,
+    file_path: str,
+    page_nums: List[int],
+    document_pages: int,
+    shard_pages: int = 0,
+    contiguous: bool = False
+) -> List[ContentChunk]:
+    """
+    使用 MinerU 解析所选页面
+
+    Args:
+        client: MinerU 客户端
+        file_path: PDF文件路径
+        page_nums: 页码列表（从0开始，升序）
+        document_pages: 源文档总页数
+        shard_pages: 每个分片的页数，<= 0 时不按页数分片
+        contiguous: 是否在页码不连续处切分分片
+
+    Returns:
+        List[ContentChunk]: 按页序排列的内容片段（每个分片一个）
+    """
+    shards = split_shards(page_nums, shard_pages, contiguous=contiguous)
+
+    if len(shards) == 1:
+        with selected_pages_pdf(file_path, page_nums, document_pages) as pdf_path:
+            markdowns = [await client.ocr_pdf(pdf_path)]
+    else:
+        logger.info(f"Splitting {len(page_nums)} pages into {len(shards)} MinerU shards")
+        with page_shard_pdfs(file_path, shards) as shard_paths:
+            markdowns = await client.ocr_pdfs(shard_paths)
+
+    chunks = []
+    for shard, markdown in zip(shards, markdowns):
+        page_numbers = [page_num + 1 for page_num in shard]
+        chunks.append(ContentChunk(
+            content=markdown,
+            page_number=page_numbers[0] if page_numbers else 1,
+            chunk_type=ChunkType.OCR,
+            metadata={
+                "ocr_engine": "mineru",
+                "method": "mineru_pdf",
+                "pages": format_page_ranges(page_numbers),
+            }
+        ))
+    return chunks
@@ -4,16 +4,24 @@
 """
 import logging
 import asyncio
-import fitz  # PyMuPDF
-from typing import List
+from functools import partial
+from typing import List, Optional, AsyncIterator, Callable
 from app.core.base.processor import BaseProcessor, ContentChunk
 from app.models.file_info import PDFInfo
 from app.models.enums import ChunkType
-from app.core.common.image_processor import ImageProcessor
+from app.core.common.memory_guard import MemoryGuard
+from app.core.common.page_window import PageWindow
+from app.core.converters.pdf.page_renderer import render_page_in_pool
+from app.core.converters.pdf.page_selection import split_shards
+from app.core.converters.pdf.text_pdf_processor import extract_text_shard, make_text_chunk
+from app.core.common.process_pool import get_process_pool
+from app.core.converters.pdf.pdf_document import PDFDocumentSession
+from app.core.converters.pdf.mineru_pages import parse_pages_with_mineru
+from app.core.converters.pdf.page_layout import PageLayoutPlanner, PageLayout
+from app.core.converters.pdf.dpi_policy import create_dpi_policy
 from app.core.converters.pdf.text_extractor import TextExtractor
-from app.services.external.deepseek_client import DeepSeekClient
+from app.core.converters.pdf.ocr_runner import PageOCRRunner
 from app.services.external.mineru_client import MinerUClient
-from app.exceptions.service_exceptions import MinerUAPIException
 from app.config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -22,20 +30,51 @@ logger = logging.getLogger(__name__)
 class MixedPDFProcessor(BaseProcessor):
     """图文混排PDF处理器"""
     
-    def __init__(self, ocr_engine: str = "auto"):
+    def __init__(
+        self,
+        ocr_engine: str = "auto",
+        session: Optional[PDFDocumentSession] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        dpi: Optional[int] = None,
+        dpi_mode: str = "fixed",
+        mineru_shard_pages: Optional[int] = None,
+        page_window: Optional[int] = None,
+        memory_guard: Optional[MemoryGuard] = None
+    ):
         """初始化处理器
 
         Args:
-            ocr_engine: OCR 引擎选择："deepseek" / "mineru" / "auto"。
+            ocr_engine: OCR 引擎选择："deepseek" / "mineru" / "local" / "auto"。
+            session: 共享的文档会话（复用分析阶段已解析的页面特征）。
+            progress_callback: 进度回调，每按页序完成一页调用一次。
+            dpi: 渲染 DPI（为空时使用配置 PDF_RENDER_DPI）。
+            dpi_mode: "fixed" / "adaptive"（按页选择 DPI，dpi 作为上限）。
+            mineru_shard_pages: MinerU 分片页数（为空时使用配置 MINERU_SHARD_PAGES，0 表示不分片）。
+            page_window: 在途页面数上限（有界内存模式），为空时一次启动全部页面。
+            memory_guard: 内存上限检查器（有界内存模式），超限时暂停启动新页面。
         """
         self.settings = get_settings()
-        self.image_processor = ImageProcessor()
         self.text_extractor = TextExtractor()
-        self.deepseek_client = DeepSeekClient()
+        self.ocr_runner = PageOCRRunner(ocr_engine=ocr_engine)
         self.mineru_client = MinerUClient()
         self.ocr_engine = ocr_engine
-        self.dpi = self.settings.pdf_render_dpi
-        self.max_concurrent = self.settings.max_concurrent_api_calls
+        self.progress_callback = progress_callback
+        self.session = session
+        self.dpi = dpi or self.settings.pdf_render_dpi
+        self.dpi_policy = create_dpi_policy(self.dpi, dpi_mode)
+        # 实际并发由 API 限制器动态控制，这里只限制单个文档的在途页面数
+        self.max_concurrent = self.ocr_runner.max_concurrency
+        self.region_ocr_enabled = self.settings.pdf_region_ocr_enabled
+        self.layout_planner = PageLayoutPlanner(
+            min_size=self.settings.pdf_region_min_size,
+            max_coverage=self.settings.pdf_region_max_coverage
+        )
+        self.mineru_shard_pages = (
+            self.settings.mineru_shard_pages if mineru_shard_pages is None else mineru_shard_pages
+        )
+        self.mineru_hybrid = self.settings.mineru_hybrid_mixed
+        self.page_window = page_window
+        self.memory_guard = memory_guard
     
     async def process(
         self,
@@ -52,61 +91,205 @@ class MixedPDFProcessor(BaseProcessor):
         Returns:
             List[ContentChunk]: 内容片段列表
         """
+        return [chunk async for chunk in self.iter_chunks(file_path, file_info)]
+    
+    async def iter_chunks(
+        self,
+        file_path: str,
+        file_info: PDFInfo
+    ) -> AsyncIterator[ContentChunk]:
+        """
+        按页序产出内容片段：某页及其之前的页面都完成后立即产出
+        
+        Args:
+            file_path: PDF文件路径
+            file_info: PDF文件信息
+            
+        Yields:
+            ContentChunk: 内容片段
+        """
         logger.info(f"Processing mixed PDF: {file_path}, {file_info.total_pages} pages")
         
-        # 当选择 MinerU 时，走整PDF解析链路，返回单个整文 ContentChunk
+        # 当选择 MinerU 时：混合模式只把含图像的页面交给 MinerU，其余页面本地提取文本
+        if (self.ocr_engine or "").lower() == "mineru" and self.mineru_hybrid:
+            async for chunk in self._iter_chunks_hybrid(file_path, file_info):
+                yield chunk
+            return
+        
+        # 否则走整PDF解析链路（可按页数分片并行解析），每个分片产出一个 ContentChunk
         if (self.ocr_engine or "").lower() == "mineru":
             logger.info("Using MinerU ocr_pdf for whole-document parsing in MixedPDFProcessor")
             try:
-                markdown = await self.mineru_client.ocr_pdf(file_path)
-                return [
-                    ContentChunk(
-                        content=markdown,
-                        page_number=1,
-                        chunk_type=ChunkType.OCR,
-                        metadata={"ocr_engine": "mineru", "method": "mineru_pdf"}
-                    )
-                ]
+                # 只上传所选页面
+                page_nums = [page.page_number - 1 for page in file_info.pages]
+                document_pages = file_info.document_pages or file_info.total_pages
+                chunks = await parse_pages_with_mineru(
+                    self.mineru_client,
+                    file_path,
+                    page_nums,
+                    document_pages,
+                    shard_pages=self.mineru_shard_pages
+                )
             except Exception as e:
                 logger.error(f"MinerU whole-document parsing failed: {str(e)}")
                 raise
+            for chunk in chunks:
+                yield chunk
+            self._report_progress(file_info.total_pages, file_info.total_pages)
+            return
         
+        # 复用共享会话；未提供时自行打开
+        own_session = self.session is None
+        session = PDFDocumentSession(file_path) if own_session else self.session
+        
+        window = None
         try:
-            # 打开PDF文档
-            doc = fitz.open(file_path)
-            
             # 创建信号量限制并发
             semaphore = asyncio.Semaphore(self.max_concurrent)
             
-            # 创建所有页面的处理任务
-            tasks = []
-            for page_num in range(file_info.total_pages):
-                page_info = file_info.pages[page_num]
-                task = self._process_page_with_semaphore(
-                    doc,
-                    page_num,
-                    page_info,
-                    semaphore
-                )
-                tasks.append(task)
+            # 按页序启动所选页面并产出结果；指定窗口时只保留窗口内的页面
+            window = PageWindow(
+                (
+                    partial(
+                        self._process_page_with_semaphore,
+                        file_path,
+                        session,
+                        page_info.page_number - 1,
+                        page_info,
+                        semaphore
+                    )
+                    for page_info in file_info.pages
+                ),
+                size=self.page_window,
+                memory_guard=self.memory_guard
+            )
+            done_pages = 0
+            async for chunk in window:
+                done_pages += 1
+                self._report_progress(done_pages, file_info.total_pages)
+                yield chunk
             
-            # 并发执行所有任务
-            content_chunks = await asyncio.gather(*tasks)
+            logger.info(f"Mixed PDF processed: {done_pages} pages")
             
-            # 关闭文档
-            doc.close()
+        except Exception as e:
+            logger.error(f"Failed to process mixed PDF: {str(e)}")
+            raise
+        finally:
+            # 提前结束（出错或调用方停止迭代）时取消未完成的页面
+            if window is not None:
+                window.cancel()
+            if own_session:
+                session.close()
+    
+    async def _iter_chunks_hybrid(
+        self,
+        file_path: str,
+        file_info: PDFInfo
+    ) -> AsyncIterator[ContentChunk]:
+        """
+        MinerU 混合模式：含图像的页面（连续页面合并为一个子文档）作为一个批次交给 MinerU，
+        其余页面按 PDF_TEXT_SHARD_PAGES 分片在进程池中提取文本层，按页序交错产出
+        
+        MinerU 解析期间文本分片并行提取，位于第一个图像页之前的文本页即可产出。
+        
+        Args:
+            file_path: PDF文件路径
+            file_info: PDF文件信息
             
-            logger.info(f"Mixed PDF processed: {len(content_chunks)} pages")
+        Yields:
+            ContentChunk: 内容片段（MinerU 片段覆盖一段连续页面）
+        """
+        own_session = self.session is None
+        session = PDFDocumentSession(file_path) if own_session else self.session
+        
+        mineru_task = None
+        text_futures = []
+        try:
+            image_pages = [
+                page.page_number - 1 for page in file_info.pages
+                if self._needs_mineru(session, page)
+            ]
+            logger.info(
+                f"MinerU hybrid mode: {len(image_pages)}/{file_info.total_pages} pages "
+                f"sent to MinerU, the rest extracted locally"
+            )
+            if image_pages:
+                mineru_task = asyncio.create_task(parse_pages_with_mineru(
+                    self.mineru_client,
+                    file_path,
+                    image_pages,
+                    file_info.document_pages or file_info.total_pages,
+                    shard_pages=self.mineru_shard_pages,
+                    contiguous=True
+                ))
             
-            return content_chunks
+            # 其余页面分片在进程池中提取，与 MinerU 解析同时进行
+            image_page_set = set(image_pages)
+            text_pages = [
+                page.page_number - 1 for page in file_info.pages
+                if page.page_number - 1 not in image_page_set
+            ]
+            loop = asyncio.get_running_loop()
+            pool = get_process_pool()
+            shard_of_page = {}
+            for shard in split_shards(text_pages, self.settings.pdf_text_shard_pages):
+                future = loop.run_in_executor(pool, extract_text_shard, file_path, shard)
+                text_futures.append(future)
+                shard_of_page.update((page_num, future) for page_num in shard)
             
+            mineru_chunks = None
+            text_results = {}
+            for index, page_info in enumerate(file_info.pages, start=1):
+                page_num = page_info.page_number - 1
+                if page_num in image_page_set:
+                    if mineru_chunks is None:
+                        mineru_chunks = {chunk.page_number: chunk for chunk in await mineru_task}
+                    # 分片只在其首页产出，其余页面已包含在该分片中
+                    chunk = mineru_chunks.pop(page_info.page_number, None)
+                else:
+                    if page_num not in text_results:
+                        for shard_page, markdown, error in await shard_of_page[page_num]:
+                            text_results[shard_page] = (markdown, error)
+                    chunk = make_text_chunk(page_info.page_number, *text_results.pop(page_num))
+                
+                self._report_progress(index, file_info.total_pages)
+                if chunk is not None:
+                    yield chunk
+        
         except Exception as e:
-            logger.error(f"Failed to process mixed PDF: {str(e)}")
+            logger.error(f"Failed to process mixed PDF in MinerU hybrid mode: {str(e)}")
             raise
+        finally:
+            if mineru_task is not None and not mineru_task.done():
+                mineru_task.cancel()
+            for future in text_futures:
+                if not future.done():
+                    future.cancel()
+            if own_session:
+                session.close()
+    
+    def _needs_mineru(self, session: PDFDocumentSession, page_info) -> bool:
+        """
+        混合模式下页面是否交给 MinerU：含图像，且图像不全是可忽略的小图标
+        
+        Args:
+            session: 文档会话
+            page_info: 页面信息
+            
+        Returns:
+            bool: 是否交给 MinerU
+        """
+        if not page_info.has_images:
+            return False
+        if not self.region_ocr_enabled:
+            return True
+        layout = self._plan_layout(session, page_info.page_number - 1)
+        return layout is None or bool(layout.regions)
     
     async def _process_page_with_semaphore(
         self,
-        doc: fitz.Document,
+        file_path: str,
+        session: PDFDocumentSession,
         page_num: int,
         page_info,
         semaphore: asyncio.Semaphore
@@ -115,7 +298,8 @@ class MixedPDFProcessor(BaseProcessor):
         使用信号量限制并发处理页面
         
         Args:
-            doc: PDF文档对象
+            file_path: PDF文件路径
+            session: 文档会话
             page_num: 页码（从0开始）
             page_info: 页面信息
             semaphore: 信号量
@@ -124,11 +308,12 @@ class MixedPDFProcessor(BaseProcessor):
             ContentChunk: 内容片段
         """
         async with semaphore:
-            return await self._process_page(doc, page_num, page_info)
+            return await self._process_page(file_path, session, page_num, page_info)
     
     async def _process_page(
         self,
-        doc: fitz.Document,
+        file_path: str,
+        session: PDFDocumentSession,
         page_num: int,
         page_info
     ) -> ContentChunk:
@@ -136,7 +321,8 @@ class MixedPDFProcessor(BaseProcessor):
         处理单个页面
         
         Args:
-            doc: PDF文档对象
+            file_path: PDF文件路径
+            session: 文档会话
             page_num: 页码（从0开始）
             page_info: 页面信息
             
@@ -144,43 +330,159 @@ class MixedPDFProcessor(BaseProcessor):
             ContentChunk: 内容片段
         """
         page_number = page_num + 1
-        page = doc[page_num]
         
         # 判断页面是否有图像
         if page_info.has_images:
-            # 有图像 → OCR整页
-            logger.info(f"Processing page {page_number} with OCR (has images)")
-            return await self._process_with_ocr(page, page_number)
+            layout = self._plan_layout(session, page_num) if self.region_ocr_enabled else None
+            
+            if layout is None:
+                # 图表占满页面（或未启用区域识别）→ OCR整页
+                logger.info(f"Processing page {page_number} with OCR (has images)")
+                return await self._process_with_ocr(file_path, session, page_num, page_number)
+            
+            if layout.regions:
+                # 保留文本层，只 OCR 图像/表格区域
+                logger.info(
+                    f"Processing page {page_number} with region OCR "
+                    f"({len(layout.regions)} regions, coverage={layout.coverage:.0%})"
+                )
+                return await self._process_with_regions(file_path, session, page_num, page_number, layout)
+            
+            # 图像都是可忽略的小图标 → 提取文本层
+            logger.info(f"Processing page {page_number} with text extraction (only negligible images)")
+            return self._process_with_text_extraction(session, page_num, page_number)
         else:
             # 无图像 → 提取文本层
             logger.info(f"Processing page {page_number} with text extraction (no images)")
-            return self._process_with_text_extraction(page, page_number)
+            return self._process_with_text_extraction(session, page_num, page_number)
+    
+    def _plan_layout(self, session: PDFDocumentSession, page_num: int) -> Optional[PageLayout]:
+        """
+        规划页面版面（文本层片段 + 图像/表格区域）
+        
+        Args:
+            session: 文档会话
+            page_num: 页码（从0开始）
+            
+        Returns:
+            Optional[PageLayout]: 版面；需要整页 OCR 时返回 None
+        """
+        try:
+            return self.layout_planner.plan(
+                tuple(session.page(page_num).rect),
+                session.get_blocks(page_num),
+                session.get_image_bboxes(page_num) + session.get_table_bboxes(page_num)
+            )
+        except Exception as e:
+            logger.warning(f"Failed to plan layout for page {page_num + 1}, falling back to page OCR: {str(e)}")
+            return None
+    
+    async def _process_with_regions(
+        self,
+        file_path: str,
+        session: PDFDocumentSession,
+        page_num: int,
+        page_number: int,
+        layout: PageLayout
+    ) -> ContentChunk:
+        """
+        区域级处理：文本块保留文本层，图像/表格区域单独渲染并 OCR，按阅读顺序合并
+        
+        Args:
+            file_path: PDF文件路径
+            session: 文档会话
+            page_num: 页码（从0开始）
+            page_number: 页码（从1开始）
+            layout: 页面版面
+            
+        Returns:
+            ContentChunk: 内容片段
+        """
+        try:
+            dpi = self.dpi_policy.for_page(session, page_num)
+            parts = []
+            engines = set()
+            cache_hits = []
+            ocr_bytes = 0
+            
+            for item in layout.items:
+                if item.kind == 'text':
+                    text = self.text_extractor.extract_text(
+                        session.page(page_num),
+                        blocks=item.blocks
+                    )
+                    content = self.text_extractor.text_to_markdown(text)
+                else:
+                    # 只渲染区域（在进程池中执行）
+                    base64_image = await render_page_in_pool(
+                        file_path,
+                        page_num,
+                        dpi=dpi,
+                        clip=item.bbox
+                    )
+                    ocr_bytes += len(base64_image)
+                    content, engine_used, cache_hit = await self._run_ocr(base64_image, dpi)
+                    engines.add(engine_used)
+                    cache_hits.append(cache_hit)
+                
+                if content and content.strip():
+                    parts.append(content.strip())
+            
+            return ContentChunk(
+                content="\n\n".join(parts),
+                page_number=page_number,
+                chunk_type=ChunkType.MIXED,
+                metadata={
+                    'dpi': dpi,
+                    'method': 'region_ocr',
+                    'ocr_engine': ",".join(sorted(engines)),
+                    'ocr_cache_hit': all(cache_hits),
+                    'regions': len(layout.regions),
+                    'region_coverage': round(layout.coverage, 4),
+                    'ocr_bytes': ocr_bytes
+                }
+            )
+            
+        except Exception as e:
+            logger.error(f"Failed to process regions of page {page_number}: {str(e)}")
+            return ContentChunk(
+                content=f"[Error OCR page {page_number}: {str(e)}]",
+                page_number=page_number,
+                chunk_type=ChunkType.MIXED,
+                metadata={'error': str(e), 'ocr_engine': self.ocr_engine}
+            )
     
     async def _process_with_ocr(
         self,
-        page: fitz.Page,
+        file_path: str,
+        session: PDFDocumentSession,
+        page_num: int,
         page_number: int
     ) -> ContentChunk:
         """
         使用OCR处理页面
         
         Args:
-            page: PDF页面对象
+            file_path: PDF文件路径
+            session: 文档会话
+            page_num: 页码（从0开始）
             page_number: 页码（从1开始）
             
         Returns:
             ContentChunk: 内容片段
         """
         try:
-            # 渲染页面为Base64
-            base64_image = self.image_processor.render_page_to_base64(
-                page,
-                dpi=self.dpi,
-                optimize=True
+            dpi = self.dpi_policy.for_page(session, page_num)
+            
+            # 在进程池中渲染页面为Base64（不阻塞事件循环）
+            base64_image = await render_page_in_pool(
+                file_path,
+                page_num,
+                dpi=dpi
             )
 
             # 调用 OCR 引擎
-            markdown_content, engine_used = await self._run_ocr(base64_image)
+            markdown_content, engine_used, cache_hit = await self._run_ocr(base64_image, dpi)
             
             # 创建内容片段
             chunk = ContentChunk(
@@ -188,9 +490,11 @@ class MixedPDFProcessor(BaseProcessor):
                 page_number=page_number,
                 chunk_type=ChunkType.OCR,
                 metadata={
-                    'dpi': self.dpi,
+                    'dpi': dpi,
+                    'ocr_bytes': len(base64_image),
                     'method': f'{engine_used}_ocr',
-                    'ocr_engine': engine_used
+                    'ocr_engine': engine_used,
+                    'ocr_cache_hit': cache_hit
                 }
             )
             
@@ -207,14 +511,16 @@ class MixedPDFProcessor(BaseProcessor):
     
     def _process_with_text_extraction(
         self,
-        page: fitz.Page,
+        session: PDFDocumentSession,
+        page_num: int,
         page_number: int
     ) -> ContentChunk:
         """
-        使用文本提取处理页面
+        使用文本提取处理页面（复用会话中已解析的文本块）
         
         Args:
-            page: PDF页面对象
+            session: 文档会话
+            page_num: 页码（从0开始）
             page_number: 页码（从1开始）
             
         Returns:
@@ -222,7 +528,10 @@ class MixedPDFProcessor(BaseProcessor):
         """
         try:
             # 提取文本
-            text = self.text_extractor.extract_text(page)
+            text = self.text_extractor.extract_text(
+                session.page(page_num),
+                blocks=session.get_blocks(page_num)
+            )
             
             # 转换为Markdown
             markdown_content = self.text_extractor.text_to_markdown(text)
@@ -246,27 +555,10 @@ class MixedPDFProcessor(BaseProcessor):
                 metadata={'error': str(e)}
             )
 
-    async def _run_ocr(self, base64_image: str) -> tuple[str, str]:
-        """根据配置的引擎执行 OCR。
+    async def _run_ocr(self, base64_image: str, dpi: int) -> tuple[str, str, bool]:
+        """根据配置的引擎执行 OCR（带结果缓存）。
 
         Returns:
-            (markdown, engine_used)
+            (markdown, engine_used, cache_hit)
         """
-        engine = (self.ocr_engine or "auto").lower()
-
-        # 明确指定 DeepSeek（逐页）
-        if engine == "deepseek":
-            markdown = await self.deepseek_client.ocr_image(base64_image)
-            return markdown, "deepseek"
-
-        # 明确指定 MinerU（逐页不支持）
-        if engine == "mineru":
-            raise MinerUAPIException(
-                message="MinerU 不支持逐页 image OCR",
-                details="请在处理器入口走 mineru 的整PDF解析链路（ocr_pdf）。"
-            )
-
-        # auto 模式：仅尝试 DeepSeek，失败则抛出由上层捕获
-        markdown = await self.deepseek_client.ocr_image(base64_image)
-        return markdown, "deepseek"
-
+        return await self.ocr_runner.run(base64_image, dpi=dpi)
@@ -0,0 +1,204 @@
+"""
+页面 OCR 执行器
+统一 ImagePDFProcessor / MixedPDFProcessor 的逐页 OCR 调用：
+按配置选择引擎，并在调用前查询 OCR 结果缓存；
+未命中缓存的调用经全局 OCR 调度器排队，与其他任务公平分享并发预算
+（每次 API 尝试单独排队，重试退避期间不占用调度名额）；
+单页耗时超过延迟分位数阈值时发起对冲请求：auto 模式使用 OCR_HEDGE_ENGINE，
+明确指定 deepseek 时只对冲到同一引擎，保证结果来自所选引擎；
+local 引擎在本机进程池中识别，不占用 API 调度名额，也不做对冲
+"""
+import time
+import uuid
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from app.services.external.deepseek_client import DeepSeekClient
+from app.services.external.local_ocr_client import LocalOCRClient
+from app.services.external.base_ocr_client import BaseOCRClient
+from app.services.external.ocr_hedger import get_ocr_hedger
+from app.services.external.ocr_scheduler import get_ocr_scheduler
+from app.services.storage.ocr_cache import get_ocr_cache
+from app.exceptions.service_exceptions import MinerUAPIException
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class PageOCRRunner:
+    """页面 OCR 执行器"""
+    
+    def __init__(
+        self,
+        ocr_engine: str = "auto",
+        flow_id: Optional[str] = None,
+        weight: float = 1.0
+    ):
+        """
+        初始化执行器
+        
+        Args:
+            ocr_engine: OCR 引擎选择："deepseek" / "mineru" / "local" / "auto"
+            flow_id: 调度器中的任务标识（为空时每个执行器即一个任务）
+            weight: 调度权重
+        """
+        self.settings = get_settings()
+        self.ocr_engine = ocr_engine
+        self.deepseek_client = DeepSeekClient()
+        self.local_client = LocalOCRClient()
+        self.cache = get_ocr_cache()
+        self.scheduler = get_ocr_scheduler()
+        self.flow_id = flow_id or uuid.uuid4().hex[:12]
+        self.weight = weight
+        self.hedger = get_ocr_hedger("deepseek")
+        self.hedge_engine = self._resolve_hedge_engine(self.settings.ocr_hedge_engine)
+    
+    @property
+    def max_concurrency(self) -> int:
+        """单个文档同时 OCR 的页面数上限（与 API 并发限制器的上限一致）"""
+        return self.deepseek_client.limiter.max_limit
+    
+    async def run(self, base64_image: str, dpi: int) -> tuple[str, str, bool]:
+        """
+        对单页图像执行 OCR（优先读取缓存）
+        
+        Args:
+            base64_image: Base64编码的页面图像
+            dpi: 渲染分辨率（参与缓存键计算）
+            
+        Returns:
+            (markdown, engine_used, cache_hit)
+        """
+        engine = (self.ocr_engine or "auto").lower()
+        
+        # 明确指定 MinerU（逐页不支持）
+        if engine == "mineru":
+            raise MinerUAPIException(
+                message="MinerU 不支持逐页 image OCR",
+                details="请在处理器入口走 mineru 的整PDF解析链路（ocr_pdf）。"
+            )
+        
+        # local：本机识别；deepseek / auto：以 DeepSeek 为主引擎，auto 模式下慢页面可对冲到备用引擎
+        primary_engine = "local" if engine == "local" else "deepseek"
+        hedge_engine = self.hedge_engine if engine == "auto" else primary_engine
+        
+        # 结果按实际使用的引擎缓存；auto 模式两种引擎的结果都可以使用
+        lookup_engines = [primary_engine]
+        if hedge_engine != primary_engine:
+            lookup_engines.append(hedge_engine)
+        for lookup_engine in lookup_engines:
+            cached = self.cache.get(self._cache_key(base64_image, lookup_engine, dpi))
+            if cached is not None:
+                logger.info("OCR cache hit")
+                return cached, lookup_engine, True
+        
+        if primary_engine == "local":
+            markdown = await self.local_client.ocr_image(base64_image)
+            self.cache.put(self._cache_key(base64_image, primary_engine, dpi), markdown)
+            return markdown, primary_engine, False
+        
+        (markdown, engine_used), hedged = await self.hedger.run(
+            lambda started: self._call_engine(primary_engine, base64_image, started),
+            lambda started: self._call_engine(hedge_engine, base64_image, started)
+        )
+        if hedged:
+            logger.info(f"Hedged OCR request to {engine_used} finished first")
+        self.cache.put(self._cache_key(base64_image, engine_used, dpi), markdown)
+        
+        return markdown, engine_used, False
+    
+    async def _call_engine(
+        self,
+        engine: str,
+        base64_image: str,
+        started: asyncio.Event
+    ) -> tuple[str, str]:
+        """
+        调用指定引擎（远程 API 经调度器排队）
+        
+        Args:
+            engine: 引擎名称
+            base64_image: Base64编码的页面图像
+            started: 首次拿到调度名额时置位（对冲计时从此开始）
+            
+        Returns:
+            (markdown, engine)
+        """
+        if engine == "local":
+            started.set()
+            return await self.local_client.ocr_image(base64_image), engine
+        
+        # 每次尝试单独获取调度名额，重试退避期间名额交给其他任务
+        first_slot: list = []
+        
+        @asynccontextmanager
+        async def attempt_slot() -> AsyncIterator[None]:
+            async with self.scheduler.slot(self.flow_id, weight=self.weight):
+                if not first_slot:
+                    first_slot.append(time.monotonic())
+                    started.set()
+                yield
+        
+        markdown = await self._get_client(engine).ocr_image(base64_image, slot=attempt_slot)
+        
+        # 只记录主引擎（DeepSeek）的延迟，用于计算对冲阈值
+        if engine == "deepseek":
+            self.hedger.latencies.record(time.monotonic() - first_slot[0])
+        return markdown, engine
+    
+    def _get_client(self, engine: str) -> BaseOCRClient:
+        """
+        获取引擎对应的客户端
+        
+        Args:
+            engine: 引擎名称
+            
+        Returns:
+            BaseOCRClient: OCR 客户端
+        """
+        return self.local_client if engine == "local" else self.deepseek_client
+    
+    def _resolve_hedge_engine(self, engine: str) -> str:
+        """
+        解析对冲引擎配置（为空时与主引擎相同）
+        
+        Args:
+            engine: 配置的引擎名称
+            
+        Returns:
+            str: 对冲引擎名称
+        """
+        engine = (engine or "deepseek").lower()
+        if engine not in ("deepseek", "local"):
+            logger.warning(f"Unsupported OCR hedge engine '{engine}', hedging with deepseek")
+            engine = "deepseek"
+        return engine
+    
+    def _cache_key(self, base64_image: str, engine: str, dpi: int) -> str:
+        """
+        计算 OCR 缓存键
+        
+        Args:
+            base64_image: Base64编码的页面图像
+            engine: 引擎名称
+            dpi: 渲染分辨率
+            
+        Returns:
+            str: 缓存键
+        """
+        if engine == "local":
+            return self.cache.make_key(
+                base64_image,
+                engine=engine,
+                prompt="",
+                dpi=dpi,
+                model=self.local_client.model
+            )
+        return self.cache.make_key(
+            base64_image,
+            engine=engine,
+            prompt=DeepSeekClient.DEFAULT_PROMPT,
+            dpi=dpi,
+            model=self.deepseek_client.model
+        )
@@ -0,0 +1,137 @@
+"""
+页面版面规划
+把混排页拆分为“文本层片段”和“需要 OCR 的区域”，并按阅读顺序排列
+
+说明：
+- 图像与表格的边界框作为 OCR 区域（重叠区域先合并）
+- 落在区域内的文本块由区域 OCR 覆盖，其余文本块保留文本层
+- 文本块保持 PyMuPDF 的原始顺序，区域插入到其下方第一个文本块之前
+- 区域覆盖页面比例过高时（如扫描页叠加文本层）返回 None，由调用方整页 OCR
+"""
+import logging
+from dataclasses import dataclass, field
+from typing import List, Optional
+import fitz  # PyMuPDF
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LayoutItem:
+    """版面元素"""
+    kind: str  # 'text' / 'region'
+    bbox: tuple
+    blocks: list = field(default_factory=list)  # kind == 'text' 时的文本块
+
+
+@dataclass
+class PageLayout:
+    """页面版面"""
+    items: List[LayoutItem]
+    coverage: float = 0.0  # OCR 区域占页面面积比例
+
+    @property
+    def regions(self) -> List[LayoutItem]:
+        """需要 OCR 的区域"""
+        return [item for item in self.items if item.kind == 'region']
+
+
+class PageLayoutPlanner:
+    """页面版面规划器"""
+
+    def __init__(self, min_size: float = 24, max_coverage: float = 0.85):
+        """
+        初始化规划器
+
+        Args:
+            min_size: 区域最小宽/高（pt），更小的区域（装饰线、图标）直接忽略
+            max_coverage: 区域面积占比上限，超过时放弃区域级处理
+        """
+        self.min_size = min_size
+        self.max_coverage = max_coverage
+
+    def plan(
+        self,
+        page_rect: tuple,
+        blocks: list,
+        region_bboxes: List[tuple]
+    ) -> Optional[PageLayout]:
+        """
+        规划页面版面
+
+        Args:
+            page_rect: 页面边界 (x0, y0, x1, y1)
+            blocks: 页面文本块（get_text("blocks") 结果）
+            region_bboxes: 图像与表格的边界框
+
+        Returns:
+            Optional[PageLayout]: 版面；需要整页 OCR 时返回 None
+        """
+        page = fitz.Rect(page_rect)
+        page_area = page.get_area()
+        if page_area <= 0:
+            return None
+
+        regions = self._merge_regions([
+            fitz.Rect(bbox) & page for bbox in region_bboxes
+        ])
+        regions = [
+            r for r in regions
+            if r.width >= self.min_size and r.height >= self.min_size
+        ]
+
+        coverage = sum(r.get_area() for r in regions) / page_area
+        if coverage >= self.max_coverage:
+            return None
+
+        # 区域内的文本块由 OCR 覆盖，其余保留文本层
+        text_blocks = []
+        for block in blocks:
+            if block[6] != 0 or not block[4].strip():
+                continue
+            rect = fitz.Rect(block[:4])
+            center = fitz.Point((rect.x0 + rect.x1) / 2, (rect.y0 + rect.y1) / 2)
+            if not any(r.contains(center) for r in regions):
+                text_blocks.append(block)
+
+        # 区域按纵坐标插入到原始顺序的文本块之间
+        pending = sorted(regions, key=lambda r: (r.y0, r.x0))
+        items: List[LayoutItem] = []
+        for block in text_blocks:
+            while pending and pending[0].y0 <= block[1]:
+                items.append(LayoutItem(kind='region', bbox=tuple(pending.pop(0))))
+            if items and items[-1].kind == 'text':
+                items[-1].blocks.append(block)
+            else:
+                items.append(LayoutItem(kind='text', bbox=tuple(block[:4]), blocks=[block]))
+        for rect in pending:
+            items.append(LayoutItem(kind='region', bbox=tuple(rect)))
+
+        return PageLayout(items=items, coverage=coverage)
+
+    def _merge_regions(self, regions: List[fitz.Rect]) -> List[fitz.Rect]:
+        """
+        合并相互重叠的区域
+
+        Args:
+            regions: 区域列表
+
+        Returns:
+            List[fitz.Rect]: 互不重叠的区域列表
+        """
+        merged: List[fitz.Rect] = []
+        for rect in regions:
+            if rect.is_empty:
+                continue
+            rect = fitz.Rect(rect)
+            changed = True
+            while changed:
+                changed = False
+                for other in merged:
+                    if rect.intersects(other):
+                        merged.remove(other)
+                        rect |= other
+                        changed = True
+                        break
+            merged.append(rect)
+        return merged
@@ -0,0 +1,116 @@
+"""
+页面渲染器
+在进程池中把 PDF 页面渲染为 Base64 图像，避免阻塞事件循环
+
+说明：
+- 工作进程自行打开 PDF（按路径+修改时间缓存少量已打开文档），
+  进程间只传递页码与 Base64 结果
+- 渲染与 OCR 形成两级流水线：后续页面在进程池中渲染时，
+  前面的页面正在等待 OCR 返回
+"""
+import os
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Optional
+import fitz  # PyMuPDF
+from app.core.common.image_processor import ImageProcessor
+from app.core.common.process_pool import get_process_pool
+
+logger = logging.getLogger(__name__)
+
+# 每个工作进程内缓存的已打开文档数量
+_MAX_OPEN_DOCUMENTS = 2
+
+# 工作进程内的文档缓存：(路径, 修改时间, 大小) -> fitz.Document
+_open_documents: "OrderedDict[tuple, fitz.Document]" = OrderedDict()
+
+
+def _get_document(file_path: str) -> fitz.Document:
+    """
+    获取（并缓存）工作进程内已打开的文档
+
+    Args:
+        file_path: PDF文件路径
+
+    Returns:
+        fitz.Document: 文档对象
+    """
+    stat = os.stat(file_path)
+    key = (file_path, stat.st_mtime_ns, stat.st_size)
+
+    doc = _open_documents.get(key)
+    if doc is not None:
+        _open_documents.move_to_end(key)
+        return doc
+
+    doc = fitz.open(file_path)
+    _open_documents[key] = doc
+
+    while len(_open_documents) > _MAX_OPEN_DOCUMENTS:
+        _, old_doc = _open_documents.popitem(last=False)
+        old_doc.close()
+
+    return doc
+
+
+def render_page_to_base64(
+    file_path: str,
+    page_num: int,
+    dpi: int,
+    max_size: int = 2048,
+    clip: Optional[tuple] = None
+) -> str:
+    """
+    渲染单页（或页面内的区域）为Base64（在工作进程中执行）
+
+    Args:
+        file_path: PDF文件路径
+        page_num: 页码（从0开始）
+        dpi: 渲染分辨率
+        max_size: 最大尺寸
+        clip: 区域边界框 (x0, y0, x1, y1)，为空时渲染整页
+
+    Returns:
+        str: Base64编码的图像
+    """
+    doc = _get_document(file_path)
+    return ImageProcessor().render_page_to_base64(
+        doc[page_num],
+        dpi=dpi,
+        optimize=True,
+        max_size=max_size,
+        clip=fitz.Rect(clip) if clip is not None else None
+    )
+
+
+async def render_page_in_pool(
+    file_path: str,
+    page_num: int,
+    dpi: int,
+    max_size: int = 2048,
+    clip: Optional[tuple] = None
+) -> str:
+    """
+    在共享进程池中渲染单页（或页面内的区域）
+
+    Args:
+        file_path: PDF文件路径
+        page_num: 页码（从0开始）
+        dpi: 渲染分辨率
+        max_size: 最大尺寸
+        clip: 区域边界框 (x0, y0, x1, y1)，为空时渲染整页
+
+    Returns:
+        str: Base64编码的图像
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_process_pool(),
+        render_page_to_base64,
+        file_path,
+        page_num,
+        dpi,
+        max_size,
+        clip
+    )
@@ -0,0 +1,456 @@
+"""
+页面预筛选
+OCR 之前在低分辨率灰度图上识别空白页与近似重复页，减少外部 OCR 调用
+
+说明：
+- 空白页：去掉页边后，深色像素占比低于阈值（扫描件中的空白分隔页）
+- 近似重复页：先用差值哈希（dHash）与缩略签名图找出候选的更早页面，再以较高分辨率
+  渲染两页逐像素复核，差异像素占比不超过阈值时视为重复，复用首次出现页面的 OCR 结果
+- 哈希与签名图只用于快速筛选：文字页在低分辨率下彼此相似，填写内容不同的同一张表格
+  也很接近，必须经过像素复核
+- 逐页流式筛选：空白检测、哈希与签名图按分片在进程池中计算（只提前少量分片，
+  不阻塞渲染），去重状态（首次出现页面的哈希与签名图，每页约 2KB）保留在主进程，
+  候选页的像素复核也在进程池中执行；每页只等待自己的筛选结果
+"""
+import asyncio
+import logging
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import fitz  # PyMuPDF
+from PIL import Image, ImageChops
+from app.core.common.process_pool import get_process_pool
+from app.core.converters.pdf.page_renderer import _get_document
+from app.core.converters.pdf.page_selection import split_shards
+
+logger = logging.getLogger(__name__)
+
+# 空白检测与哈希使用的缩略图长边像素
+THUMBNAIL_LONG_SIDE = 512
+
+# 重复页复核使用的长边像素（约 90 DPI，单个字符的改动仍可见）
+VERIFY_LONG_SIDE = 1024
+
+# 忽略的页边比例（扫描件边缘常有阴影或装订孔）
+PAGE_MARGIN = 0.05
+
+# 灰度低于该值的像素视为深色像素
+INK_LEVEL = 192
+
+# 两页灰度差超过该值的像素视为差异像素
+DIFF_LEVEL = 64
+
+# dHash 边长（hash_size × hash_size 位）
+HASH_SIZE = 16
+
+# 候选重复页的哈希汉明距离上限
+HASH_MAX_DISTANCE = 10
+
+# 签名图：缩略图按该倍数缩小（区域平均），排除整体相似但内容不同的文字页
+SIGNATURE_SCALE = 8
+
+# 候选重复页的签名图最大灰度差
+SIGNATURE_MAX_DIFF = 12
+
+# 进程池中每个筛选分片的页数
+SCREEN_SHARD_PAGES = 8
+
+# 同时在进程池中计算的筛选分片数（其余工作进程留给页面渲染）
+SCREEN_LOOKAHEAD_SHARDS = 2
+
+
+@dataclass
+class PageScreen:
+    """页面预筛选结果"""
+    page_num: int  # 页码（从0开始）
+    blank: bool = False
+    ink_ratio: float = 0.0  # 深色像素占比
+    duplicate_of: Optional[int] = None  # 重复页对应的首次出现页码（从0开始）
+
+
+@dataclass
+class PageFingerprint:
+    """页面指纹（在工作进程中计算，用于空白检测与去重）"""
+    page_num: int  # 页码（从0开始）
+    ink_ratio: float  # 深色像素占比
+    blank: bool = False
+    page_hash: Optional[int] = None  # dHash（未启用去重或空白页时为空）
+    signature: Optional[Image.Image] = None  # 签名图（未启用去重或空白页时为空）
+    rect: Optional[Tuple[float, float, float, float]] = None  # 页面尺寸
+
+
+def _render_gray(page: fitz.Page, long_side: int) -> Image.Image:
+    """
+    把去掉页边的页面渲染为灰度图
+
+    Args:
+        page: 页面对象
+        long_side: 整页长边像素
+
+    Returns:
+        Image.Image: 灰度图
+    """
+    rect = page.rect
+    clip = fitz.Rect(
+        rect.x0 + rect.width * PAGE_MARGIN,
+        rect.y0 + rect.height * PAGE_MARGIN,
+        rect.x1 - rect.width * PAGE_MARGIN,
+        rect.y1 - rect.height * PAGE_MARGIN
+    )
+    zoom = long_side / max(rect.width, rect.height, 1)
+    pix = page.get_pixmap(
+        matrix=fitz.Matrix(zoom, zoom),
+        colorspace=fitz.csGRAY,
+        alpha=False,
+        clip=clip
+    )
+    return Image.frombytes("L", (pix.width, pix.height), pix.samples, "raw", "L", pix.stride)
+
+
+def _ink_ratio(image: Image.Image) -> float:
+    """深色像素占比"""
+    histogram = image.histogram()
+    return sum(histogram[:INK_LEVEL]) / max(image.width * image.height, 1)
+
+
+def _dhash(image: Image.Image) -> int:
+    """
+    差值哈希：缩小为 (HASH_SIZE + 1) × HASH_SIZE 后比较每行相邻像素
+
+    Args:
+        image: 灰度图
+
+    Returns:
+        int: HASH_SIZE × HASH_SIZE 位哈希
+    """
+    small = image.resize((HASH_SIZE + 1, HASH_SIZE), Image.BOX)
+    pixels = small.tobytes()
+    value = 0
+    for row in range(HASH_SIZE):
+        start = row * (HASH_SIZE + 1)
+        for col in range(start, start + HASH_SIZE):
+            value = (value << 1) | (pixels[col] > pixels[col + 1])
+    return value
+
+
+def _signature(image: Image.Image) -> Image.Image:
+    """签名图：区域平均缩小后的灰度图"""
+    return image.resize(
+        (max(image.width // SIGNATURE_SCALE, 1), max(image.height // SIGNATURE_SCALE, 1)),
+        Image.BOX
+    )
+
+
+def _max_diff(first: Image.Image, second: Image.Image) -> int:
+    """两张灰度图的最大灰度差；尺寸不同时返回 255"""
+    if first.size != second.size:
+        return 255
+    return ImageChops.difference(first, second).getextrema()[1]
+
+
+def _diff_ratio(first: Image.Image, second: Image.Image) -> float:
+    """
+    差异像素占比；尺寸不同时返回 1.0
+
+    Args:
+        first: 灰度图
+        second: 灰度图
+
+    Returns:
+        float: 差异像素占比
+    """
+    if first.size != second.size:
+        return 1.0
+    histogram = ImageChops.difference(first, second).histogram()
+    return sum(histogram[DIFF_LEVEL:]) / max(first.width * first.height, 1)
+
+
+def _fingerprint_page(
+    page: fitz.Page,
+    skip_blank: bool,
+    blank_ink_ratio: float,
+    dedup: bool
+) -> PageFingerprint:
+    """
+    计算页面指纹
+
+    Args:
+        page: 页面对象
+        skip_blank: 是否识别空白页
+        blank_ink_ratio: 空白页深色像素占比阈值
+        dedup: 是否计算去重用的哈希与签名图
+
+    Returns:
+        PageFingerprint: 页面指纹
+    """
+    thumbnail = _render_gray(page, THUMBNAIL_LONG_SIDE)
+    fingerprint = PageFingerprint(page_num=page.number, ink_ratio=_ink_ratio(thumbnail))
+
+    if skip_blank and fingerprint.ink_ratio < blank_ink_ratio:
+        fingerprint.blank = True
+    elif dedup:
+        fingerprint.page_hash = _dhash(thumbnail)
+        fingerprint.signature = _signature(thumbnail)
+        fingerprint.rect = tuple(page.rect)
+    return fingerprint
+
+
+class DuplicateIndex:
+    """首次出现（非空白、非重复）页面的哈希与签名图，用于查找候选重复页"""
+
+    def __init__(self):
+        self._originals: List[PageFingerprint] = []
+
+    def add(self, fingerprint: PageFingerprint):
+        """
+        登记首次出现的页面
+
+        Args:
+            fingerprint: 页面指纹
+        """
+        self._originals.append(fingerprint)
+
+    def candidates(self, fingerprint: PageFingerprint) -> List[int]:
+        """
+        哈希与签名图都接近、且页面尺寸相同的更早页面
+
+        Args:
+            fingerprint: 当前页指纹
+
+        Returns:
+            List[int]: 候选页码（从0开始，按页序）
+        """
+        return [
+            original.page_num for original in self._originals
+            if bin(fingerprint.page_hash ^ original.page_hash).count('1') <= HASH_MAX_DISTANCE
+            and _max_diff(fingerprint.signature, original.signature) <= SIGNATURE_MAX_DIFF
+            and fingerprint.rect == original.rect
+        ]
+
+
+def fingerprint_pages(
+    file_path: str,
+    page_nums: List[int],
+    skip_blank: bool,
+    blank_ink_ratio: float,
+    dedup: bool
+) -> List[PageFingerprint]:
+    """
+    计算一个分片的页面指纹（在工作进程中执行）
+
+    Args:
+        file_path: PDF文件路径
+        page_nums: 分片页码列表（从0开始）
+        skip_blank: 是否识别空白页
+        blank_ink_ratio: 空白页深色像素占比阈值
+        dedup: 是否计算去重用的哈希与签名图
+
+    Returns:
+        List[PageFingerprint]: 与 page_nums 对应的页面指纹
+    """
+    doc = _get_document(file_path)
+    return [_fingerprint_page(doc[page_num], skip_blank, blank_ink_ratio, dedup) for page_num in page_nums]
+
+
+def find_duplicate(
+    file_path: str,
+    page_num: int,
+    candidates: List[int],
+    max_diff: float
+) -> Optional[int]:
+    """
+    以较高分辨率逐像素复核候选重复页（在工作进程中执行）
+
+    Args:
+        file_path: PDF文件路径
+        page_num: 当前页码（从0开始）
+        candidates: 候选的首次出现页码（从0开始）
+        max_diff: 允许的差异像素占比
+
+    Returns:
+        Optional[int]: 重复的页码（从0开始）；没有时为 None
+    """
+    doc = _get_document(file_path)
+    verify_image = _render_gray(doc[page_num], VERIFY_LONG_SIDE)
+    for original_num in candidates:
+        if _diff_ratio(verify_image, _render_gray(doc[original_num], VERIFY_LONG_SIDE)) <= max_diff:
+            return original_num
+    return None
+
+
+class PageScreenStream:
+    """
+    流式页面筛选
+
+    后台任务按页序在共享进程池中计算分片指纹，在主进程中去重，
+    每页的筛选结果就绪后即可获取；同时记录首次出现页面还会被多少尚未启动的重复页引用。
+    筛选失败时其余页面视为普通页面（照常 OCR）。
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        page_nums: List[int],
+        skip_blank: bool,
+        blank_ink_ratio: float,
+        dedup: bool,
+        dedup_max_diff: float,
+        shard_pages: int = SCREEN_SHARD_PAGES,
+        lookahead_shards: int = SCREEN_LOOKAHEAD_SHARDS
+    ):
+        """
+        初始化筛选
+
+        Args:
+            file_path: PDF文件路径
+            page_nums: 页码列表（从0开始，升序）
+            skip_blank: 是否识别空白页
+            blank_ink_ratio: 空白页深色像素占比阈值
+            dedup: 是否识别近似重复页
+            dedup_max_diff: 重复页允许的差异像素占比
+            shard_pages: 每个分片的页数
+            lookahead_shards: 同时在进程池中计算的分片数
+        """
+        self.file_path = file_path
+        self.page_nums = list(page_nums)
+        self.skip_blank = skip_blank
+        self.blank_ink_ratio = blank_ink_ratio
+        self.dedup = dedup
+        self.dedup_max_diff = dedup_max_diff
+        self.shard_pages = shard_pages
+        self.lookahead_shards = max(lookahead_shards, 1)
+
+        # 全部页面筛选完成（或失败）后为 True
+        self.finished = False
+        self.blank_pages = 0
+        self.duplicate_pages = 0
+
+        self._results: Dict[int, "asyncio.Future[PageScreen]"] = {}
+        # 首次出现页码 -> 已筛选但尚未启动的重复页数量
+        self._pending_refs: Counter = Counter()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """启动后台筛选任务"""
+        loop = asyncio.get_running_loop()
+        self._results = {page_num: loop.create_future() for page_num in self.page_nums}
+        self._task = asyncio.create_task(self._run())
+
+    async def get(self, page_num: int) -> PageScreen:
+        """
+        等待某页的筛选结果
+
+        Args:
+            page_num: 页码（从0开始）
+
+        Returns:
+            PageScreen: 筛选结果
+        """
+        return await self._results[page_num]
+
+    def release(self, original_num: int):
+        """
+        引用首次出现页面的重复页已启动
+
+        Args:
+            original_num: 首次出现页码（从0开始）
+        """
+        self._pending_refs[original_num] -= 1
+        if self._pending_refs[original_num] <= 0:
+            del self._pending_refs[original_num]
+
+    def is_referenced_later(self, page_num: int) -> bool:
+        """
+        页面结果是否还可能被尚未启动的重复页引用
+
+        Args:
+            page_num: 页码（从0开始）
+
+        Returns:
+            bool: 筛选未完成，或仍有引用它的重复页尚未启动时为 True
+        """
+        return not self.finished or self._pending_refs[page_num] > 0
+
+    def close(self):
+        """停止后台筛选，取消尚未就绪的结果"""
+        if self._task is not None:
+            self._task.cancel()
+        for future in self._results.values():
+            if not future.done():
+                future.cancel()
+
+    async def _run(self):
+        """按分片计算指纹并按页序去重"""
+        loop = asyncio.get_running_loop()
+        pool = get_process_pool()
+        shards = iter(split_shards(self.page_nums, self.shard_pages))
+        in_flight: deque = deque()
+
+        def submit_shard():
+            shard = next(shards, None)
+            if shard:
+                in_flight.append(loop.run_in_executor(
+                    pool,
+                    fingerprint_pages,
+                    self.file_path,
+                    shard,
+                    self.skip_blank,
+                    self.blank_ink_ratio,
+                    self.dedup
+                ))
+
+        index = DuplicateIndex()
+        try:
+            for _ in range(self.lookahead_shards):
+                submit_shard()
+
+            while in_flight:
+                fingerprints = await in_flight.popleft()
+                submit_shard()
+
+                for fingerprint in fingerprints:
+                    screen = PageScreen(
+                        page_num=fingerprint.page_num,
+                        blank=fingerprint.blank,
+                        ink_ratio=fingerprint.ink_ratio
+                    )
+                    if fingerprint.blank:
+                        self.blank_pages += 1
+                    elif fingerprint.page_hash is not None:
+                        candidates = index.candidates(fingerprint)
+                        if candidates:
+                            screen.duplicate_of = await loop.run_in_executor(
+                                pool,
+                                find_duplicate,
+                                self.file_path,
+                                fingerprint.page_num,
+                                candidates,
+                                self.dedup_max_diff
+                            )
+                        if screen.duplicate_of is None:
+                            index.add(fingerprint)
+                        else:
+                            self.duplicate_pages += 1
+                            self._pending_refs[screen.duplicate_of] += 1
+                    self._resolve(screen)
+
+            if self.blank_pages or self.duplicate_pages:
+                logger.info(
+                    f"Page screening: {self.blank_pages} blank pages skipped, "
+                    f"{self.duplicate_pages} duplicate pages"
+                )
+        except Exception as e:
+            # 筛选只是优化，失败时其余页面照常 OCR
+            logger.warning(f"Page screening failed, OCR remaining pages: {str(e)}")
+            for page_num in self.page_nums:
+                self._resolve(PageScreen(page_num=page_num))
+        finally:
+            for future in in_flight:
+                future.cancel()
+            self.finished = True
+
+    def _resolve(self, screen: PageScreen):
+        """设置某页的筛选结果（已设置或已取消时忽略）"""
+        future = self._results[screen.page_num]
+        if not future.done():
+            future.set_result(screen)
@@ -0,0 +1,170 @@
+"""
+页面选择
+按页码范围（如 "1-20,35"）与最大页数选择页面，以及按所选页面生成子文档
+
+说明：
+- 页码从 1 开始，范围两端均包含；重复与乱序的页码会被去重并排序
+- 页面选择在分析之前完成，未选中的页面不做任何解析、渲染或 OCR
+- 整文档解析引擎（MinerU）可把所选页面按页数切分为多个分片子文档并行解析
+"""
+import os
+import shutil
+import logging
+import tempfile
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+import fitz  # PyMuPDF
+from app.utils.page_ranges import contiguous_runs, parse_page_ranges
+from app.exceptions.converter_exceptions import InvalidPageRangeException
+
+logger = logging.getLogger(__name__)
+
+
+def select_pages(
+    total_pages: int,
+    pages: Optional[str] = None,
+    max_pages: Optional[int] = None
+) -> List[int]:
+    """
+    计算需要处理的页码
+
+    Args:
+        total_pages: 文档总页数
+        pages: 页码范围（为空时表示全部页面）
+        max_pages: 最多处理的页数（超出部分按页序截断）
+
+    Returns:
+        List[int]: 页码列表（从0开始，升序）
+
+    Raises:
+        InvalidPageRangeException: 所选页码全部超出文档范围
+    """
+    if pages:
+        selected = set()
+        for start, end in parse_page_ranges(pages):
+            selected.update(range(start - 1, min(end, total_pages)))
+        page_nums = sorted(selected)
+        if not page_nums:
+            raise InvalidPageRangeException(
+                message="所选页码超出文档范围",
+                details=f"所选页码 '{pages}' 超出文档范围（共 {total_pages} 页）"
+            )
+    else:
+        page_nums = list(range(total_pages))
+
+    if max_pages and len(page_nums) > max_pages:
+        logger.warning(
+            f"Page selection truncated: {len(page_nums)} pages selected, "
+            f"max_pages={max_pages}"
+        )
+        page_nums = page_nums[:max_pages]
+
+    return page_nums
+
+
+def extract_pages(file_path: str, page_nums: List[int], output_path: str):
+    """
+    把所选页面复制为新的 PDF 文件
+
+    Args:
+        file_path: 源 PDF 路径
+        page_nums: 页码列表（从0开始）
+        output_path: 输出路径
+    """
+    with fitz.open(file_path) as src:
+        _write_pages(src, page_nums, output_path)
+
+
+def _write_pages(src: fitz.Document, page_nums: List[int], output_path: str):
+    """把已打开文档中的所选页面写为新的 PDF（连续页面一次复制）"""
+    with fitz.open() as dst:
+        for start, end in contiguous_runs(list(page_nums)):
+            dst.insert_pdf(src, from_page=start, to_page=end)
+        dst.save(output_path, garbage=3, deflate=True)
+
+
+def split_shards(page_nums: List[int], shard_pages: int, contiguous: bool = False) -> List[List[int]]:
+    """
+    按页数把所选页面切分为分片
+
+    Args:
+        page_nums: 页码列表（从0开始，升序）
+        shard_pages: 每个分片的页数，<= 0 时不按页数切分
+        contiguous: 是否在页码不连续处切分（每个分片只包含连续页面）
+
+    Returns:
+        List[List[int]]: 分片列表，每个分片为页码列表
+    """
+    page_nums = list(page_nums)
+    if contiguous:
+        groups = [list(range(start, end + 1)) for start, end in contiguous_runs(page_nums)] or [[]]
+    else:
+        groups = [page_nums]
+
+    shards = []
+    for group in groups:
+        if shard_pages <= 0 or len(group) <= shard_pages:
+            shards.append(group)
+        else:
+            shards.extend(group[i:i + shard_pages] for i in range(0, len(group), shard_pages))
+    return shards
+
+
+@contextmanager
+def selected_pages_pdf(
+    file_path: str,
+    page_nums: List[int],
+    total_pages: int
+) -> Iterator[str]:
+    """
+    获取只包含所选页面的 PDF 路径（用于整文档解析引擎）
+
+    选中全部页面时直接返回原文件；否则生成临时子文档，退出时删除。
+
+    Args:
+        file_path: 源 PDF 路径
+        page_nums: 页码列表（从0开始）
+        total_pages: 源文档总页数
+
+    Yields:
+        str: PDF 路径
+    """
+    if list(page_nums) == list(range(total_pages)):
+        yield file_path
+        return
+
+    fd, temp_path = tempfile.mkstemp(suffix=".pdf", prefix="pages_")
+    os.close(fd)
+    try:
+        extract_pages(file_path, page_nums, temp_path)
+        yield temp_path
+    finally:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+@contextmanager
+def page_shard_pdfs(file_path: str, shards: List[List[int]]) -> Iterator[List[str]]:
+    """
+    把每个分片的页面写为临时子文档，退出时删除
+
+    Args:
+        file_path: 源 PDF 路径
+        shards: 分片列表（见 split_shards）
+
+    Yields:
+        List[str]: 与 shards 一一对应的子文档路径
+    """
+    temp_dir = tempfile.mkdtemp(prefix="shards_")
+    paths = []
+    try:
+        with fitz.open(file_path) as src:
+            for index, page_nums in enumerate(shards):
+                path = os.path.join(temp_dir, f"shard_{index:03d}.pdf")
+                _write_pages(src, page_nums, path)
+                paths.append(path)
+        yield paths
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
@@ -4,8 +4,11 @@ PDF分析器
 """
 import logging
 import os
+from typing import Optional
 import fitz  # PyMuPDF
 from app.core.base.analyzer import BaseAnalyzer
+from app.core.converters.pdf.pdf_document import PDFDocumentSession
+from app.core.converters.pdf.page_selection import select_pages
 from app.models.file_info import PDFInfo, PageInfo
 from app.models.enums import PDFType
 from app.config import get_settings
@@ -21,52 +24,65 @@ class PDFAnalyzer(BaseAnalyzer):
         self.settings = get_settings()
         self.text_threshold = self.settings.pdf_text_threshold
     
-    def analyze(self, file_path: str) -> PDFInfo:
+    def analyze(
+        self,
+        file_path: str,
+        session: Optional[PDFDocumentSession] = None,
+        pages: Optional[str] = None,
+        max_pages: Optional[int] = None
+    ) -> PDFInfo:
         """
         分析PDF文档
         
+        先按页码范围与最大页数选出页面，只分析选中的页面。
+        
         Args:
             file_path: PDF文件路径
+            session: 共享的文档会话（为空时自行打开并在分析后关闭）
+            pages: 页码范围，如 "1-20,35"（为空时表示全部页面）
+            max_pages: 最多处理的页数
             
         Returns:
             PDFInfo: PDF文件信息
         """
+        own_session = session is None
+        if own_session:
+            session = PDFDocumentSession(file_path)
+        
         try:
-            # 打开PDF文档
-            doc = fitz.open(file_path)
-            
             # 获取基本信息
-            total_pages = len(doc)
+            document_pages = session.page_count
             file_size = os.path.getsize(file_path)
             
-            # 分析每一页
+            # 选择页面（在逐页分析之前完成）
+            page_nums = select_pages(document_pages, pages=pages, max_pages=max_pages)
+            total_pages = len(page_nums)
+            
+            # 分析选中的页面
             pages_info = []
-            for page_num in range(total_pages):
-                page = doc[page_num]
-                page_info = self.get_page_info(page, page_num + 1)
+            for page_num in page_nums:
+                page_info = self.get_page_info(session, page_num)
                 pages_info.append(page_info)
             
             # 检测PDF类型
             pdf_type = self.detect_pdf_type(pages_info)
             
             # 获取元数据
-            metadata = self._extract_metadata(doc)
-            
-            # 关闭文档
-            doc.close()
+            metadata = self._extract_metadata(session.doc)
             
             # 构建PDFInfo
             pdf_info = PDFInfo(
                 file_path=file_path,
                 file_size=file_size,
                 total_pages=total_pages,
+                document_pages=document_pages,
                 pdf_type=pdf_type,
                 pages=pages_info,
                 metadata=metadata
             )
             
             logger.info(
-                f"PDF analyzed: {total_pages} pages, type={pdf_type}, "
+                f"PDF analyzed: {total_pages}/{document_pages} pages, type={pdf_type}, "
                 f"size={file_size} bytes"
             )
             
@@ -75,25 +91,30 @@ class PDFAnalyzer(BaseAnalyzer):
         except Exception as e:
             logger.error(f"Failed to analyze PDF: {str(e)}")
             raise
+        finally:
+            if own_session:
+                session.close()
     
-    def get_page_info(self, page: fitz.Page, page_number: int) -> PageInfo:
+    def get_page_info(self, session: PDFDocumentSession, page_num: int) -> PageInfo:
         """
         获取单页信息
 
         Args:
-            page: PyMuPDF页面对象
-            page_number: 页码（从1开始）
+            session: 文档会话（页面特征在会话内缓存，供处理器复用）
+            page_num: 页码（从0开始）
 
         Returns:
             PageInfo: 页面信息
         """
+        page_number = page_num + 1
+
         # 提取文本层内容
-        text = page.get_text()
+        text = session.get_text(page_num)
         text_length = len(text.strip())
         has_text = text_length >= self.text_threshold
 
         # 获取页面图像列表
-        image_list = page.get_images()
+        image_list = session.get_images(page_num)
         image_count = len(image_list)
 
         # ================================
@@ -103,7 +124,8 @@ class PDFAnalyzer(BaseAnalyzer):
         # 
         # 当前策略：
         # 1. 纯图片页面：全部使用OCR识别（包括表格）
-        # 2. 带图表的文本页：也走OCR流程（保留视觉结构）
+        # 2. 带图表的文本页：保留文本层，只对图像/表格区域做OCR
+        #    （区域占满页面时仍整页OCR，见 PageLayoutPlanner）
         # 3. 纯文本页：直接提取文本层
         # 
         # 好用场景：
@@ -117,18 +139,14 @@ class PDFAnalyzer(BaseAnalyzer):
         # 
         # 后续优化方向（阶段4+）：
         # - 引入MinerU引擎，专门优化表格识别
-        # - 表格区域单独处理，与文本区域分离
+        # - 表格区域单独处理，与文本区域分离（已实现：区域级OCR）
         # ================================
         
         # 检测表格
-        has_tables = False
-        try:
-            tables = page.find_tables()
-            has_tables = len(tables.tables) > 0
-            if has_tables:
-                logger.debug(f"Page {page_number}: Found {len(tables.tables)} table(s)")
-        except Exception as e:
-            logger.warning(f"Failed to detect tables on page {page_number}: {str(e)}")
+        table_bboxes = session.get_table_bboxes(page_num)
+        has_tables = len(table_bboxes) > 0
+        if has_tables:
+            logger.debug(f"Page {page_number}: Found {len(table_bboxes)} table(s)")
 
         # 综合判断是否有"图表"（图像 或 表格）
         # 如果有图像或表格，就需要用OCR处理整页以保留视觉结构
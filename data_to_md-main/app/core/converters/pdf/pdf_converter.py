@@ -2,16 +2,23 @@
 PDF转换器
 实现PDF到Markdown的转换
 """
+import asyncio
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, AsyncIterator, Callable, Iterable, Optional
 from app.core.base.converter import BaseConverter, ConversionResult
-from app.core.base.processor import BaseProcessor
+from app.core.base.processor import BaseProcessor, ContentChunk
 from app.core.converters.pdf.pdf_analyzer import PDFAnalyzer
 from app.core.converters.pdf.image_pdf_processor import ImagePDFProcessor
 from app.core.converters.pdf.mixed_pdf_processor import MixedPDFProcessor
+from app.core.converters.pdf.text_pdf_processor import TextPDFProcessor
+from app.core.converters.pdf.pdf_document import PDFDocumentSession
 from app.core.common.markdown_generator import MarkdownGenerator
+from app.core.common.chunk_spool import ChunkSpool
+from app.core.common.memory_guard import MemoryGuard
 from app.models.enums import PDFType
-from app.exceptions.converter_exceptions import ConversionFailedException
+from app.models.file_info import PDFInfo
+from app.exceptions.converter_exceptions import ConversionFailedException, InvalidPageRangeException
+from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 
@@ -40,76 +47,418 @@ class PDFConverter(BaseConverter):
         """
         logger.info(f"Starting PDF conversion: {file_path}")
         
+        # 整个转换过程共享同一个文档会话（只打开一次，页面特征只解析一次）
+        session = PDFDocumentSession(file_path)
+        
         try:
             # 1. 分析PDF
-            pdf_info = self.analyzer.analyze(file_path)
+            pdf_info = self.analyzer.analyze(
+                file_path,
+                session=session,
+                pages=options.get('pages') if options else None,
+                max_pages=self._max_pages(options)
+            )
             logger.info(f"PDF analyzed: type={pdf_info.pdf_type}, pages={pdf_info.total_pages}")
             
             # 2. 选择处理器（带 OCR 引擎配置）
             ocr_engine = options.get('ocr_engine', 'auto') if options else 'auto'
-            processor = self._select_processor(pdf_info.pdf_type, ocr_engine=ocr_engine)
+            progress_callback = options.get('progress_callback') if options else None
+            memory_guard = self._create_memory_guard(pdf_info, options)
+            processor = self._select_processor(
+                pdf_info.pdf_type,
+                ocr_engine=ocr_engine,
+                session=session,
+                progress_callback=progress_callback,
+                dpi=options.get('dpi') if options else None,
+                dpi_mode=options.get('dpi_mode', 'fixed') if options else 'fixed',
+                mineru_shard_pages=options.get('mineru_shard_pages') if options else None,
+                memory_guard=memory_guard
+            )
+            if progress_callback:
+                progress_callback(0, pdf_info.total_pages)
             logger.info(f"Selected processor: {processor.__class__.__name__} (ocr_engine={ocr_engine})")
             
+            # 有界内存模式：已完成的页面落盘，Markdown 直接写入文件
+            if memory_guard is not None:
+                spool = ChunkSpool(get_settings().spool_dir)
+                try:
+                    async for chunk in processor.iter_chunks(file_path, pdf_info):
+                        spool.append(chunk)
+                        self._release_page(session, chunk)
+                    return await self._finish_spooled(
+                        spool, pdf_info, self._create_markdown_generator(options), memory_guard
+                    )
+                except BaseException:
+                    spool.discard()
+                    raise
+            
             # 3. 处理内容
             content_chunks = await processor.process(file_path, pdf_info)
             logger.info(f"Content processed: {len(content_chunks)} chunks")
             
             # 4. 生成Markdown
-            show_page_number = options.get('show_page_number', True)
-            include_metadata = options.get('include_metadata', True)
-            no_pagination_and_metadata = options.get('no_pagination_and_metadata', False)
-            
-            markdown_generator = MarkdownGenerator(
-                show_page_number=show_page_number,
-                include_metadata=include_metadata,
-                no_pagination_and_metadata=no_pagination_and_metadata
-            )
+            markdown_generator = self._create_markdown_generator(options)
             markdown = markdown_generator.generate(content_chunks, pdf_info)
-            logger.info(
-                f"Markdown generated: {len(markdown)} characters "
-                f"(mode: page_num={show_page_number}, metadata={include_metadata})"
-            )
+            logger.info(f"Markdown generated: {len(markdown)} characters")
             
             # 5. 构建结果
-            result = ConversionResult(
-                markdown=markdown,
-                metadata={
-                    'total_pages': pdf_info.total_pages,
-                    'pdf_type': pdf_info.pdf_type,
-                    'file_size': pdf_info.file_size,
-                    'ocr_pages': len([c for c in content_chunks if c.chunk_type == 'ocr']),
-                    'text_pages': len([c for c in content_chunks if c.chunk_type == 'text']),
-                },
-                status='success'
-            )
+            result = self._build_result(markdown, pdf_info, content_chunks)
             
             logger.info("PDF conversion completed successfully")
             return result
             
+        except InvalidPageRangeException:
+            raise
+        except Exception as e:
+            logger.error(f"PDF conversion failed: {str(e)}")
+            raise ConversionFailedException(
+                message="PDF转换失败",
+                details=str(e)
+            )
+        finally:
+            session.close()
+    
+    async def convert_stream(
+        self,
+        file_path: str,
+        options: Dict[str, Any]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        流式转换PDF为Markdown
+        
+        依次产出事件：
+        - {'event': 'start', 'total_pages', 'pdf_type'}
+        - {'event': 'page', 'page_number', 'chunk_type', 'markdown'}（按页序）
+        - {'event': 'result', 'result': ConversionResult}（完整文档，与 convert 结果一致）
+        
+        Args:
+            file_path: PDF文件路径
+            options: 转换选项
+            
+        Yields:
+            Dict[str, Any]: 转换事件
+        """
+        logger.info(f"Starting streaming PDF conversion: {file_path}")
+        
+        session = PDFDocumentSession(file_path)
+        
+        try:
+            # 1. 分析PDF
+            pdf_info = self.analyzer.analyze(
+                file_path,
+                session=session,
+                pages=options.get('pages') if options else None,
+                max_pages=self._max_pages(options)
+            )
+            logger.info(f"PDF analyzed: type={pdf_info.pdf_type}, pages={pdf_info.total_pages}")
+            
+            yield {
+                'event': 'start',
+                'total_pages': pdf_info.total_pages,
+                'document_pages': pdf_info.document_pages or pdf_info.total_pages,
+                'pdf_type': pdf_info.pdf_type,
+            }
+            
+            # 2. 选择处理器
+            ocr_engine = options.get('ocr_engine', 'auto') if options else 'auto'
+            progress_callback = options.get('progress_callback') if options else None
+            memory_guard = self._create_memory_guard(pdf_info, options)
+            processor = self._select_processor(
+                pdf_info.pdf_type,
+                ocr_engine=ocr_engine,
+                session=session,
+                progress_callback=progress_callback,
+                dpi=options.get('dpi') if options else None,
+                dpi_mode=options.get('dpi_mode', 'fixed') if options else 'fixed',
+                mineru_shard_pages=options.get('mineru_shard_pages') if options else None,
+                memory_guard=memory_guard
+            )
+            if progress_callback:
+                progress_callback(0, pdf_info.total_pages)
+            markdown_generator = self._create_markdown_generator(options)
+            
+            # 3. 逐页处理并产出（有界内存模式下已完成的页面落盘）
+            spool = ChunkSpool(get_settings().spool_dir) if memory_guard is not None else None
+            content_chunks = spool if spool is not None else []
+            try:
+                async for chunk in processor.iter_chunks(file_path, pdf_info):
+                    content_chunks.append(chunk)
+                    if spool is not None:
+                        self._release_page(session, chunk)
+                    yield {
+                        'event': 'page',
+                        'page_number': chunk.page_number,
+                        'chunk_type': chunk.chunk_type,
+                        'markdown': markdown_generator.render_page(chunk),
+                    }
+                
+                # 4. 生成完整Markdown并构建结果
+                if spool is not None:
+                    result = await self._finish_spooled(spool, pdf_info, markdown_generator, memory_guard)
+                else:
+                    markdown = markdown_generator.generate(content_chunks, pdf_info)
+                    result = self._build_result(markdown, pdf_info, content_chunks)
+            except BaseException:
+                if spool is not None:
+                    spool.discard()
+                raise
+            yield {
+                'event': 'result',
+                'result': result,
+            }
+            
+            logger.info("Streaming PDF conversion completed successfully")
+            
+        except InvalidPageRangeException:
+            raise
         except Exception as e:
             logger.error(f"PDF conversion failed: {str(e)}")
             raise ConversionFailedException(
                 message="PDF转换失败",
                 details=str(e)
             )
+        finally:
+            session.close()
+    
+    def _max_pages(self, options: Dict[str, Any]) -> int:
+        """
+        计算实际生效的最大处理页数（不超过服务端 PDF_MAX_PAGES）
+        
+        Args:
+            options: 转换选项
+            
+        Returns:
+            int: 最大处理页数
+        """
+        limit = get_settings().pdf_max_pages
+        requested = (options or {}).get('max_pages')
+        return min(requested, limit) if requested else limit
+    
+    def _create_memory_guard(self, pdf_info: PDFInfo, options: Dict[str, Any]) -> Optional[MemoryGuard]:
+        """
+        判断是否使用有界内存模式，使用时创建内存上限检查器
+        
+        选项 bounded_memory 为空时，处理页数不少于 PDF_BOUNDED_MEMORY_PAGES（非 0）即启用。
+        
+        Args:
+            pdf_info: PDF信息
+            options: 转换选项
+            
+        Returns:
+            Optional[MemoryGuard]: 内存上限检查器；不使用有界内存模式时为 None
+        """
+        settings = get_settings()
+        requested = (options or {}).get('bounded_memory')
+        if requested is None:
+            threshold = settings.pdf_bounded_memory_pages
+            requested = threshold > 0 and pdf_info.total_pages >= threshold
+        if not requested:
+            return None
+        
+        logger.info(
+            f"Bounded-memory conversion: {pdf_info.total_pages} pages, "
+            f"window={settings.pdf_page_window}, ceiling={settings.pdf_memory_ceiling_mb}MB"
+        )
+        return MemoryGuard(settings.pdf_memory_ceiling_mb)
+    
+    def _release_page(self, session: PDFDocumentSession, chunk: ContentChunk):
+        """
+        有界内存模式：页面产出后释放其特征缓存（文本块、表格区域等）
+        
+        Args:
+            session: 文档会话
+            chunk: 已产出的内容片段
+        """
+        if chunk.page_number:
+            session.release(chunk.page_number - 1)
+    
+    async def _finish_spooled(
+        self,
+        spool: ChunkSpool,
+        pdf_info: PDFInfo,
+        markdown_generator: MarkdownGenerator,
+        memory_guard: MemoryGuard
+    ) -> ConversionResult:
+        """
+        有界内存模式：从落盘文件流式生成Markdown并写入磁盘，构建转换结果
+        
+        结果的 markdown 为空，markdown_path 指向生成的文件，content_chunks 为落盘队列
+        （由调用方保存后调用 discard 删除）。
+        
+        Args:
+            spool: 落盘队列（包含全部页面）
+            pdf_info: PDF信息
+            markdown_generator: Markdown生成器
+            memory_guard: 内存上限检查器
+            
+        Returns:
+            ConversionResult: 转换结果
+        """
+        spool.close()
+        markdown_path = spool.path.with_suffix('.md')
+        
+        def write_markdown():
+            with open(markdown_path, 'w', encoding='utf-8') as f:
+                markdown_generator.write(spool, pdf_info, f)
+        
+        try:
+            # 逐页读取落盘文件并写入 Markdown，在线程中执行，不阻塞事件循环
+            await asyncio.to_thread(write_markdown)
+        except BaseException:
+            markdown_path.unlink(missing_ok=True)
+            raise
+        logger.info(f"Markdown written: {markdown_path.stat().st_size} bytes")
+        
+        memory_guard.exceeded()  # 记录结束时的内存
+        result = self._build_result(None, pdf_info, spool, markdown_path=str(markdown_path))
+        result.metadata.update({
+            'bounded_memory': True,
+            'peak_rss_mb': round(memory_guard.peak_rss / 1024 / 1024, 1),
+            'memory_throttled': memory_guard.throttled,
+        })
+        return result
     
-    def _select_processor(self, pdf_type: PDFType, ocr_engine: str = "auto") -> BaseProcessor:
+    def _create_markdown_generator(self, options: Dict[str, Any]) -> MarkdownGenerator:
+        """
+        根据转换选项创建Markdown生成器
+        
+        Args:
+            options: 转换选项
+            
+        Returns:
+            MarkdownGenerator: Markdown生成器
+        """
+        options = options or {}
+        return MarkdownGenerator(
+            show_page_number=options.get('show_page_number', True),
+            include_metadata=options.get('include_metadata', True),
+            no_pagination_and_metadata=options.get('no_pagination_and_metadata', False)
+        )
+    
+    def _build_result(
+        self,
+        markdown: Optional[str],
+        pdf_info: PDFInfo,
+        content_chunks: Iterable[ContentChunk],
+        markdown_path: Optional[str] = None
+    ) -> ConversionResult:
+        """
+        构建转换结果
+        
+        Args:
+            markdown: 完整Markdown（有界内存模式下为空）
+            pdf_info: PDF信息
+            content_chunks: 内容片段（列表或落盘队列，只遍历一次）
+            markdown_path: 有界内存模式下写入磁盘的Markdown文件
+            
+        Returns:
+            ConversionResult: 转换结果
+        """
+        ocr_pages = text_pages = mixed_pages = blank_pages = duplicate_pages = failed_pages = 0
+        for chunk in content_chunks:
+            if chunk.chunk_type == 'ocr':
+                ocr_pages += 1
+            elif chunk.chunk_type == 'text':
+                text_pages += 1
+            elif chunk.chunk_type == 'mixed':
+                mixed_pages += 1
+            if chunk.metadata.get('skipped') == 'blank':
+                blank_pages += 1
+            if 'duplicate_of' in chunk.metadata:
+                duplicate_pages += 1
+            if 'error' in chunk.metadata:
+                failed_pages += 1
+        
+        return ConversionResult(
+            markdown=markdown,
+            metadata={
+                'total_pages': pdf_info.total_pages,
+                'document_pages': pdf_info.document_pages or pdf_info.total_pages,
+                'pdf_type': pdf_info.pdf_type,
+                'file_size': pdf_info.file_size,
+                'ocr_pages': ocr_pages,
+                'text_pages': text_pages,
+                'mixed_pages': mixed_pages,
+                'blank_pages_skipped': blank_pages,
+                'duplicate_pages': duplicate_pages,
+                'failed_pages': failed_pages,
+            },
+            status='success',
+            content_chunks=content_chunks,
+            file_info=pdf_info,
+            markdown_path=markdown_path
+        )
+    
+    def _select_processor(
+        self,
+        pdf_type: PDFType,
+        ocr_engine: str = "auto",
+        session: PDFDocumentSession = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        dpi: Optional[int] = None,
+        dpi_mode: str = "fixed",
+        mineru_shard_pages: Optional[int] = None,
+        memory_guard: Optional[MemoryGuard] = None
+    ) -> BaseProcessor:
         """
         根据PDF类型选择处理器
         
         Args:
             pdf_type: PDF类型
+            ocr_engine: OCR 引擎
+            session: 共享的文档会话
+            progress_callback: 进度回调
+            dpi: 渲染 DPI（为空时使用配置）
+            dpi_mode: 渲染分辨率模式（fixed / adaptive）
+            mineru_shard_pages: MinerU 分片页数（为空时使用配置）
+            memory_guard: 有界内存模式的内存上限检查器（为空时不限制在途页面数）
             
         Returns:
             BaseProcessor: 处理器实例
         """
+        # 有界内存模式下逐页处理的处理器只保留窗口内的页面
+        page_window = get_settings().pdf_page_window if memory_guard is not None else None
+
         if pdf_type == PDFType.IMAGE:
-            return ImagePDFProcessor(ocr_engine=ocr_engine)
+            # 纯图片PDF在进程池中渲染，会话仅用于自适应 DPI 读取页面尺寸
+            return ImagePDFProcessor(
+                ocr_engine=ocr_engine,
+                progress_callback=progress_callback,
+                dpi=dpi,
+                dpi_mode=dpi_mode,
+                session=session,
+                mineru_shard_pages=mineru_shard_pages,
+                page_window=page_window,
+                memory_guard=memory_guard
+            )
         elif pdf_type == PDFType.MIXED:
-            return MixedPDFProcessor(ocr_engine=ocr_engine)
+            return MixedPDFProcessor(
+                ocr_engine=ocr_engine,
+                session=session,
+                progress_callback=progress_callback,
+                dpi=dpi,
+                dpi_mode=dpi_mode,
+                mineru_shard_pages=mineru_shard_pages,
+                page_window=page_window,
+                memory_guard=memory_guard
+            )
+        elif pdf_type == PDFType.TEXT and (
+            (ocr_engine or "").lower() != "mineru" or get_settings().mineru_hybrid_mixed
+        ):
+            # 纯文本PDF无需 OCR：按页分片在进程池中并行提取文本层
+            return TextPDFProcessor(progress_callback=progress_callback)
         elif pdf_type == PDFType.TEXT:
-            # 纯文本PDF也使用混排处理器（会自动提取文本）
-            return MixedPDFProcessor(ocr_engine=ocr_engine)
+            # 关闭 MinerU 混合模式时，纯文本PDF也按用户选择整文档交给 MinerU
+            return MixedPDFProcessor(
+                ocr_engine=ocr_engine,
+                session=session,
+                progress_callback=progress_callback,
+                dpi=dpi,
+                dpi_mode=dpi_mode,
+                mineru_shard_pages=mineru_shard_pages,
+                page_window=page_window,
+                memory_guard=memory_guard
+            )
         else:
             raise ConversionFailedException(
                 message=f"不支持的PDF类型: {pdf_type}"
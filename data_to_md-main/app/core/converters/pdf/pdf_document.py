@@ -0,0 +1,212 @@
+"""
+PDF 文档会话
+一次转换内共享的已打开文档与逐页特征缓存
+
+说明：
+- 文档在首次访问时才打开，整个转换过程只打开一次
+- 每页的文本块、图像列表与位置、表格检测结果只解析一次，
+  供 PDFAnalyzer 与各处理器共同使用
+"""
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import fitz  # PyMuPDF
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PageFeatures:
+    """单页特征缓存"""
+    blocks: Optional[list] = None
+    images: Optional[list] = None
+    image_bboxes: Optional[List[tuple]] = None
+    table_bboxes: Optional[List[tuple]] = None
+    min_font_size: Optional[float] = None
+    min_font_size_loaded: bool = False
+
+
+class PDFDocumentSession:
+    """PDF 文档会话"""
+    
+    def __init__(self, file_path: str):
+        """
+        初始化会话（不立即打开文档）
+        
+        Args:
+            file_path: PDF文件路径
+        """
+        self.file_path = file_path
+        self._doc: Optional[fitz.Document] = None
+        self._features: Dict[int, PageFeatures] = {}
+    
+    def __enter__(self) -> "PDFDocumentSession":
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    @property
+    def doc(self) -> fitz.Document:
+        """已打开的文档对象（首次访问时打开）"""
+        if self._doc is None:
+            self._doc = fitz.open(self.file_path)
+        return self._doc
+    
+    @property
+    def page_count(self) -> int:
+        """文档总页数"""
+        return len(self.doc)
+    
+    def page(self, page_num: int) -> fitz.Page:
+        """
+        获取页面对象
+        
+        Args:
+            page_num: 页码（从0开始）
+            
+        Returns:
+            fitz.Page: 页面对象
+        """
+        return self.doc[page_num]
+    
+    def features(self, page_num: int) -> PageFeatures:
+        """
+        获取页面特征缓存
+        
+        Args:
+            page_num: 页码（从0开始）
+            
+        Returns:
+            PageFeatures: 页面特征
+        """
+        features = self._features.get(page_num)
+        if features is None:
+            features = PageFeatures()
+            self._features[page_num] = features
+        return features
+    
+    def release(self, page_num: int):
+        """
+        释放页面特征缓存（有界内存模式下页面产出后调用）
+        
+        Args:
+            page_num: 页码（从0开始）
+        """
+        self._features.pop(page_num, None)
+    
+    def get_blocks(self, page_num: int) -> list:
+        """
+        获取页面文本块（get_text("blocks")，已缓存）
+        
+        Args:
+            page_num: 页码（从0开始）
+            
+        Returns:
+            list: (x0, y0, x1, y1, text, block_no, block_type) 列表
+        """
+        features = self.features(page_num)
+        if features.blocks is None:
+            features.blocks = self.page(page_num).get_text("blocks")
+        return features.blocks
+    
+    def get_text(self, page_num: int) -> str:
+        """
+        获取页面文本层（由文本块拼接，不再单独解析）
+        
+        Args:
+            page_num: 页码（从0开始）
+            
+        Returns:
+            str: 页面文本
+        """
+        return "".join(
+            block[4] for block in self.get_blocks(page_num) if block[6] == 0
+        )
+    
+    def get_images(self, page_num: int) -> list:
+        """
+        获取页面图像列表（get_images()，已缓存）
+        
+        Args:
+            page_num: 页码（从0开始）
+            
+        Returns:
+            list: 图像列表
+        """
+        features = self.features(page_num)
+        if features.images is None:
+            features.images = self.page(page_num).get_images()
+        return features.images
+    
+    def get_image_bboxes(self, page_num: int) -> List[tuple]:
+        """
+        获取页面上图像的放置区域（get_image_info()，已缓存）
+        
+        Args:
+            page_num: 页码（从0开始）
+            
+        Returns:
+            List[tuple]: 图像边界框列表（已裁剪到页面范围内）
+        """
+        features = self.features(page_num)
+        if features.image_bboxes is None:
+            page = self.page(page_num)
+            bboxes = []
+            for info in page.get_image_info():
+                rect = fitz.Rect(info["bbox"]) & page.rect
+                if not rect.is_empty:
+                    bboxes.append(tuple(rect))
+            features.image_bboxes = bboxes
+        return features.image_bboxes
+    
+    def get_table_bboxes(self, page_num: int) -> List[tuple]:
+        """
+        获取页面表格区域（find_tables()，已缓存）
+        
+        Args:
+            page_num: 页码（从0开始）
+            
+        Returns:
+            List[tuple]: 表格边界框列表
+        """
+        features = self.features(page_num)
+        if features.table_bboxes is None:
+            try:
+                tables = self.page(page_num).find_tables()
+                features.table_bboxes = [tuple(t.bbox) for t in tables.tables]
+            except Exception as e:
+                logger.warning(f"Failed to detect tables on page {page_num + 1}: {str(e)}")
+                features.table_bboxes = []
+        return features.table_bboxes
+    
+    def get_min_font_size(self, page_num: int) -> Optional[float]:
+        """
+        获取页面文本层的最小字号（已缓存）
+        
+        Args:
+            page_num: 页码（从0开始）
+            
+        Returns:
+            Optional[float]: 最小字号（pt），无文本层时为 None
+        """
+        features = self.features(page_num)
+        if not features.min_font_size_loaded:
+            sizes = [
+                span["size"]
+                for block in self.page(page_num).get_text("dict")["blocks"]
+                if block.get("type") == 0
+                for line in block["lines"]
+                for span in line["spans"]
+                if span["text"].strip() and span["size"] >= 1
+            ]
+            features.min_font_size = min(sizes) if sizes else None
+            features.min_font_size_loaded = True
+        return features.min_font_size
+    
+    def close(self):
+        """关闭文档并释放特征缓存"""
+        if self._doc is not None:
+            self._doc.close()
+            self._doc = None
+        self._features.clear()
@@ -17,7 +17,7 @@ class TextExtractor:
         """初始化提取器"""
         self.cleaner = ContentCleaner()
     
-    def extract_text(self, page: fitz.Page) -> str:
+    def extract_text(self, page: fitz.Page, blocks: list = None) -> str:
         """
         提取页面文本
 
@@ -28,6 +28,7 @@ class TextExtractor:
 
         Args:
             page: PyMuPDF页面对象
+            blocks: 已解析的文本块（为空时从页面提取）
 
         Returns:
             str: 提取的文本，段落已正确分隔
@@ -36,7 +37,8 @@ class TextExtractor:
             # 使用 blocks 模式提取文本
             # blocks 返回格式: (x0, y0, x1, y1, "text", block_no, block_type)
             # block_type: 0=文本块, 1=图像块
-            blocks = page.get_text("blocks")
+            if blocks is None:
+                blocks = page.get_text("blocks")
 
             # 过滤出文本块
             text_blocks = []
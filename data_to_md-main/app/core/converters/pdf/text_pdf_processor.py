@@ -0,0 +1,158 @@
+"""
+纯文本PDF处理器
+处理纯文本PDF（所有页面都有文本层且没有图像）
+
+说明：
+- 所选页面按 PDF_TEXT_SHARD_PAGES 页切分为分片，分片在共享进程池中并行提取，
+  吞吐随 CPU 核数增长，不阻塞事件循环
+- 工作进程自行打开 PDF，进程间只传递页码与 Markdown 结果
+- 分片按页序产出：某个分片及其之前的分片都完成后，逐页产出内容片段
+"""
+import asyncio
+import logging
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+import fitz  # PyMuPDF
+from app.core.base.processor import BaseProcessor, ContentChunk
+from app.models.file_info import PDFInfo
+from app.models.enums import ChunkType
+from app.core.converters.pdf.page_selection import split_shards
+from app.core.converters.pdf.text_extractor import TextExtractor
+from app.core.common.process_pool import get_process_pool
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def extract_text_shard(file_path: str, page_nums: List[int]) -> List[Tuple[int, str, Optional[str]]]:
+    """
+    提取一个分片内各页的 Markdown（在工作进程中执行）
+
+    Args:
+        file_path: PDF文件路径
+        page_nums: 页码列表（从0开始）
+
+    Returns:
+        List[Tuple[int, str, Optional[str]]]: (页码, Markdown, 错误信息) 列表
+    """
+    extractor = TextExtractor()
+    results = []
+    with fitz.open(file_path) as doc:
+        for page_num in page_nums:
+            try:
+                text = extractor.extract_text(doc[page_num])
+                results.append((page_num, extractor.text_to_markdown(text), None))
+            except Exception as e:
+                results.append((page_num, "", str(e)))
+    return results
+
+
+def make_text_chunk(page_number: int, markdown: str, error: Optional[str]) -> ContentChunk:
+    """
+    根据 extract_text_shard 的单页结果构造内容片段
+
+    Args:
+        page_number: 页码（从1开始）
+        markdown: 页面 Markdown
+        error: 提取失败时的错误信息
+
+    Returns:
+        ContentChunk: 内容片段
+    """
+    if error is not None:
+        logger.error(f"Failed to extract text from page {page_number}: {error}")
+        return ContentChunk(
+            content=f"[Error extracting text from page {page_number}: {error}]",
+            page_number=page_number,
+            chunk_type=ChunkType.TEXT,
+            metadata={'error': error}
+        )
+    return ContentChunk(
+        content=markdown,
+        page_number=page_number,
+        chunk_type=ChunkType.TEXT,
+        metadata={'method': 'text_extraction'}
+    )
+
+
+class TextPDFProcessor(BaseProcessor):
+    """纯文本PDF处理器"""
+
+    def __init__(
+        self,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        shard_pages: Optional[int] = None
+    ):
+        """初始化处理器
+
+        Args:
+            progress_callback: 进度回调，每按页序完成一页调用一次。
+            shard_pages: 每个分片的页数（为空时使用配置 PDF_TEXT_SHARD_PAGES）。
+        """
+        self.settings = get_settings()
+        self.progress_callback = progress_callback
+        self.shard_pages = max(1, shard_pages or self.settings.pdf_text_shard_pages)
+
+    async def process(
+        self,
+        file_path: str,
+        file_info: PDFInfo
+    ) -> List[ContentChunk]:
+        """
+        处理纯文本PDF
+
+        Args:
+            file_path: PDF文件路径
+            file_info: PDF文件信息
+
+        Returns:
+            List[ContentChunk]: 内容片段列表
+        """
+        return [chunk async for chunk in self.iter_chunks(file_path, file_info)]
+
+    async def iter_chunks(
+        self,
+        file_path: str,
+        file_info: PDFInfo
+    ) -> AsyncIterator[ContentChunk]:
+        """
+        按页序产出内容片段：分片在进程池中并行提取
+
+        Args:
+            file_path: PDF文件路径
+            file_info: PDF文件信息
+
+        Yields:
+            ContentChunk: 内容片段
+        """
+        page_nums = [page.page_number - 1 for page in file_info.pages]
+        shards = split_shards(page_nums, self.shard_pages)
+        logger.info(
+            f"Processing text PDF: {file_path}, {file_info.total_pages} pages "
+            f"in {len(shards)} shards"
+        )
+
+        loop = asyncio.get_running_loop()
+        pool = get_process_pool()
+        futures = [
+            loop.run_in_executor(pool, extract_text_shard, file_path, shard)
+            for shard in shards
+        ]
+
+        try:
+            done_pages = 0
+            for future in futures:
+                for page_num, markdown, error in await future:
+                    done_pages += 1
+                    self._report_progress(done_pages, file_info.total_pages)
+                    yield make_text_chunk(page_num + 1, markdown, error)
+
+            logger.info(f"Text PDF processed: {done_pages} pages")
+
+        except Exception as e:
+            logger.error(f"Failed to process text PDF: {str(e)}")
+            raise
+        finally:
+            # 提前结束（出错或调用方停止迭代）时取消尚未开始的分片
+            for future in futures:
+                if not future.done():
+                    future.cancel()
@@ -24,6 +24,11 @@ class FileValidationException(ConverterException):
     pass
 
 
+class InvalidPageRangeException(FileValidationException):
+    """所选页码超出文档范围"""
+    pass
+
+
 class FileTooLargeException(ConverterException):
     """文件过大"""
     pass
@@ -24,6 +24,11 @@ class MinerUAPIException(APICallException):
     pass
 
 
+class LocalOCRException(ServiceException):
+    """本地 OCR 引擎异常"""
+    pass
+
+
 class TaskNotFoundException(ServiceException):
     """任务不存在"""
     pass
@@ -9,6 +9,10 @@ from fastapi.responses import JSONResponse
 from app.api.v1.endpoints import convert, health, status, image, batch, crawler, debug
 from app.config import get_settings
 from app.exceptions.base_exceptions import BaseAppException
+from app.services.external.deepseek_client import close_shared_http_client
+from app.services.external.mineru_client import close_mineru_http_client
+from app.core.common.process_pool import shutdown_process_pool
+from app.services.conversion.job_queue import get_job_queue
 
 # 配置日志
 logging.basicConfig(
@@ -28,11 +32,21 @@ async def lifespan(app: FastAPI):
     settings = get_settings()
     logger.info(f"Environment: {settings.app_env}")
     logger.info(f"DeepSeek API: {settings.deepseek_base_url}")
+    if settings.pdf_bounded_memory_pages > settings.pdf_max_pages:
+        logger.warning(
+            f"PDF_BOUNDED_MEMORY_PAGES ({settings.pdf_bounded_memory_pages}) exceeds PDF_MAX_PAGES "
+            f"({settings.pdf_max_pages}): bounded-memory mode is only used when requested explicitly"
+        )
+    get_job_queue().start()
     
     yield
     
     # 关闭时执行
     logger.info("Application shutting down...")
+    await get_job_queue().stop()
+    await close_shared_http_client()
+    await close_mineru_http_client()
+    shutdown_process_pool()
 
 
 # 创建 FastAPI 应用
@@ -19,7 +19,8 @@ class PDFInfo(BaseModel):
     """PDF文件信息"""
     file_path: str = Field(..., description="文件路径")
     file_size: int = Field(..., description="文件大小（字节）")
-    total_pages: int = Field(..., description="总页数")
+    total_pages: int = Field(..., description="总页数（选择页面时为所选页数）")
+    document_pages: int = Field(default=0, description="源文档总页数（0 表示与 total_pages 相同）")
     pdf_type: PDFType = Field(..., description="PDF类型")
     pages: List[PageInfo] = Field(default_factory=list, description="页面信息列表")
     metadata: Dict[str, Any] = Field(default_factory=dict, description="其他元数据")
@@ -27,7 +28,7 @@ class PDFInfo(BaseModel):
     def get_ocr_pages(self) -> List[int]:
         """获取需要OCR的页面列表"""
         if self.pdf_type == PDFType.IMAGE:
-            return list(range(1, self.total_pages + 1))
+            return [p.page_number for p in self.pages]
         elif self.pdf_type == PDFType.MIXED:
             return [p.page_number for p in self.pages if p.has_images]
         else:
@@ -36,7 +37,7 @@ class PDFInfo(BaseModel):
     def get_text_pages(self) -> List[int]:
         """获取可以直接提取文本的页面列表"""
         if self.pdf_type == PDFType.TEXT:
-            return list(range(1, self.total_pages + 1))
+            return [p.page_number for p in self.pages]
         elif self.pdf_type == PDFType.MIXED:
             return [p.page_number for p in self.pages if not p.has_images and p.has_text]
         else:
@@ -3,6 +3,7 @@
 """
 from typing import Optional, Literal
 from pydantic import BaseModel, Field, validator
+from app.utils.page_ranges import parse_page_ranges
 
 
 class ConvertOptions(BaseModel):
@@ -14,17 +15,32 @@ class ConvertOptions(BaseModel):
     - 兼容模式: no_pagination_and_metadata=True 等同于模式B
     """
     # PDF 转 Markdown 特有选项
-    dpi: int = Field(default=144, ge=72, le=300, description="图像渲染DPI（仅PDF有效）")
+    dpi: Optional[int] = Field(default=None, ge=72, le=300, description="图像渲染DPI，为空时使用服务端配置 PDF_RENDER_DPI（仅PDF有效）")
+    dpi_mode: Literal["fixed", "adaptive"] = Field(
+        default="fixed",
+        description="渲染分辨率模式（仅PDF有效）: fixed 所有页面使用 dpi / adaptive 按页面最小字号和尺寸选择，dpi 作为上限"
+    )
     show_page_number: bool = Field(default=True, description="是否在Markdown中显示页码标记（仅PDF有效）")
     include_metadata: bool = Field(default=True, description="是否在Markdown开头包含文档元数据（仅PDF有效）")
     no_pagination_and_metadata: bool = Field(
         default=False, 
         description="【兼容参数】是否取消分页和元数据.设为True等同于show_page_number=False且include_metadata=False（仅PDF有效）"
     )
-    max_pages: int = Field(default=100, ge=1, le=1000, description="最大处理页数（仅PDF有效）")
-    ocr_engine: Literal["deepseek", "mineru", "auto"] = Field(
+    max_pages: int = Field(default=100, ge=1, le=10000, description="最大处理页数，超出部分按页序截断，不超过服务端 PDF_MAX_PAGES（默认 100，处理更多页面需服务端调高）（仅PDF有效）")
+    pages: Optional[str] = Field(default=None, description="页码范围，如 \"1-20,35\"，为空时处理全部页面（仅PDF有效）")
+    ocr_engine: Literal["deepseek", "mineru", "local", "auto"] = Field(
         default="auto",
-        description="OCR 引擎选择（仅PDF有效）: deepseek / mineru / auto"
+        description="OCR 引擎选择（仅PDF有效）: deepseek / mineru / local（本机 CPU OCR）/ auto"
+    )
+    mineru_shard_pages: Optional[int] = Field(
+        default=None,
+        ge=0,
+        le=1000,
+        description="MinerU 分片页数：按该页数把文档切分为多个子文档作为一个批次并行解析，0 表示整文档提交，为空时使用服务端配置 MINERU_SHARD_PAGES（仅 ocr_engine=mineru 有效）"
+    )
+    bounded_memory: Optional[bool] = Field(
+        default=None,
+        description="有界内存模式：已完成的页面落盘、Markdown 直接写入文件，响应中 markdown_content 为空（通过下载或流式接口获取），为空时处理页数不少于服务端 PDF_BOUNDED_MEMORY_PAGES 即启用（处理页数不超过 PDF_MAX_PAGES，默认配置下不会自动启用）（仅PDF有效）"
     )
     
     # Office 文档转 PDF 选项
@@ -44,12 +60,35 @@ class ConvertOptions(BaseModel):
     include_frames: bool = Field(default=True, description="是否在输出中包含关键帧图像（仅视频有效）")
     
     # 其他选项
-    async_mode: bool = Field(default=True, alias="async", description="是否异步处理")
+    async_mode: bool = Field(
+        default=False,
+        alias="async",
+        description="是否异步处理：为 True 时立即返回任务ID（202），通过 /status/{task_id} 查询进度和结果"
+    )
+
+    @validator("pages")
+    def validate_pages(cls, v):
+        """验证页码范围格式"""
+        if v is not None:
+            v = v.strip() or None
+        if v is not None:
+            parse_page_ranges(v)
+        return v
 
     class Config:
         populate_by_name = True
 
 
+class RenderOptions(BaseModel):
+    """重新生成选项（仅输出模式，含义与 ConvertOptions 中的同名字段相同）"""
+    show_page_number: bool = Field(default=True, description="是否在Markdown中显示页码标记")
+    include_metadata: bool = Field(default=True, description="是否在Markdown开头包含文档元数据")
+    no_pagination_and_metadata: bool = Field(
+        default=False,
+        description="【兼容参数】是否取消分页和元数据.设为True等同于show_page_number=False且include_metadata=False"
+    )
+
+
 class ConvertRequest(BaseModel):
     """转换请求"""
     options: Optional[ConvertOptions] = Field(default_factory=ConvertOptions)
@@ -59,9 +98,10 @@ class ConvertRequest(BaseModel):
             "example": {
                 "options": {
                     "dpi": 144,
+                    "dpi_mode": "fixed",
                     "include_metadata": True,
                     "no_pagination_and_metadata": False,
-                    "async": True,
+                    "async": False,
                     "max_pages": 100,
                     "ocr_engine": "auto"
                 }
@@ -34,6 +34,9 @@ class ConversionMetadata(BaseModel):
     pages_processed: int = Field(default=0, description="处理的页数")
     ocr_pages: Optional[int] = Field(None, description="OCR处理的页数")
     text_pages: Optional[int] = Field(None, description="文本提取的页数")
+    blank_pages_skipped: Optional[int] = Field(None, description="OCR 前跳过的空白页数")
+    duplicate_pages: Optional[int] = Field(None, description="复用已识别页面结果的重复页数")
+    bounded_memory: bool = Field(default=False, description="是否使用有界内存模式（为 True 时 markdown_content 为空，通过 download_url 获取结果）")
     processing_time: float = Field(default=0, description="处理时间（秒）")
     file_size: int = Field(default=0, description="输出文件大小（字节）")
     output_type: Optional[str] = Field(default="markdown", description="输出类型: markdown/pdf")
@@ -78,6 +81,16 @@ class ConvertSyncResponse(BaseModel):
     metadata: Dict[str, Any] = Field(default_factory=dict, description="转换元数据")
 
 
+class RenderResponse(BaseModel):
+    """重新生成响应"""
+    success: bool = Field(..., description="是否成功")
+    task_id: str = Field(..., description="任务ID")
+    message: str = Field(..., description="提示信息")
+    markdown_content: str = Field(default="", description="重新生成的Markdown内容（有界内存模式任务为空）")
+    download_url: Optional[str] = Field(default=None, description="有界内存模式任务重新生成结果的下载链接")
+    metadata: Dict[str, Any] = Field(default_factory=dict, description="生成元数据")
+
+
 class StatusResponse(BaseModel):
     """状态查询响应"""
     success: bool = Field(..., description="是否成功")
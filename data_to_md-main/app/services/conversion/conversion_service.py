@@ -2,15 +2,26 @@
 转换服务
 统一的转换入口，协调转换流程
 """
+import os
+import asyncio
 import logging
 import time
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterator, Optional
+from app.config import get_settings
 from app.core.factory.file_type_detector import FileTypeDetector
 from app.core.factory.converter_factory import ConverterFactory
-from app.services.conversion.task_manager import TaskManager
+from app.services.conversion.task_manager import get_task_manager
+from app.services.conversion.job_queue import get_job_queue, ConversionJob
 from app.services.storage.file_service import FileService
-from app.models.enums import TaskStatus
-from app.exceptions.converter_exceptions import ConversionFailedException
+from app.services.storage.result_cache import get_result_cache
+from app.services.storage.chunk_store import get_chunk_store
+from app.core.base.converter import ConversionResult
+from app.core.common.markdown_generator import MarkdownGenerator
+from app.core.common.chunk_spool import ChunkSpool
+from app.models.enums import TaskStatus, FileType
+from app.models.task import Task
+from app.exceptions.converter_exceptions import ConversionFailedException, InvalidPageRangeException
+from app.exceptions.service_exceptions import TaskNotFoundException
 
 logger = logging.getLogger(__name__)
 
@@ -22,8 +33,10 @@ class ConversionService:
         """初始化服务"""
         self.file_type_detector = FileTypeDetector()
         self.converter_factory = ConverterFactory()
-        self.task_manager = TaskManager()
+        self.task_manager = get_task_manager()
         self.file_service = FileService()
+        self.result_cache = get_result_cache()
+        self.chunk_store = get_chunk_store()
     
     async def convert(
         self,
@@ -42,94 +55,511 @@ class ConversionService:
         Returns:
             Dict[str, Any]: 转换结果
         """
-        start_time = time.time()
+        task = self.create_task(file_path, filename)
+        return await self.run_task(task.task_id, file_path, filename, options)
+    
+    def submit(
+        self,
+        file_path: str,
+        filename: str,
+        options: Dict[str, Any]
+    ) -> Task:
+        """
+        创建任务并提交到后台队列（异步模式），立即返回
         
-        # 1. 检测文件类型
+        Args:
+            file_path: 文件路径
+            filename: 文件名
+            options: 转换选项
+            
+        Returns:
+            Task: 任务对象（pending 状态）
+        """
+        task = self.create_task(file_path, filename)
+        
+        try:
+            get_job_queue().submit(ConversionJob(
+                task_id=task.task_id,
+                file_path=file_path,
+                filename=filename,
+                options=options
+            ))
+        except Exception as e:
+            self.task_manager.fail_task(
+                task_id=task.task_id,
+                error_message=str(e)
+            )
+            raise
+        
+        return task
+    
+    def create_task(self, file_path: str, filename: str) -> Task:
+        """
+        检测文件类型并创建待处理任务
+        
+        Args:
+            file_path: 文件路径
+            filename: 文件名
+            
+        Returns:
+            Task: 任务对象
+        """
         file_type = self.file_type_detector.detect(file_path)
         logger.info(f"File type detected: {file_type}")
         
-        # 2. 创建任务
-        task = self.task_manager.create_task(
+        return self.task_manager.create_task(
             filename=filename,
             file_path=file_path,
             file_type=file_type.value
         )
+    
+    async def run_task(
+        self,
+        task_id: str,
+        file_path: str,
+        filename: str,
+        options: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        执行已创建的转换任务（同步请求和后台 worker 共用）
+        
+        Args:
+            task_id: 任务ID
+            file_path: 文件路径
+            filename: 文件名
+            options: 转换选项
+            
+        Returns:
+            Dict[str, Any]: 转换结果
+        """
+        start_time = time.time()
+        task = self.task_manager.get_task(task_id)
+        file_type = FileType(task.file_type)
         
         try:
-            # 3. 更新任务状态为处理中
+            # 1. 更新任务状态为处理中
             self.task_manager.update_task_status(
-                task.task_id,
+                task_id,
                 TaskStatus.PROCESSING
             )
             
-            # 4. 创建转换器
+            # 2. 查询结果缓存（多文件输入不缓存）
+            cache_key = None
+            if self.result_cache.enabled and 'file_paths' not in (options or {}):
+                # 大文件哈希耗时较长，放到线程中计算，不阻塞事件循环
+                cache_key = await asyncio.to_thread(self.result_cache.make_key, file_path, options)
+                cached = self.result_cache.get(cache_key)
+                if cached is not None:
+                    return await self._complete_from_cache(task_id, filename, cached, start_time)
+            
+            # 3. 创建转换器
             converter = self.converter_factory.create_converter(file_type)
             
-            # 5. 执行转换
-            result = await converter.convert(file_path, options)
+            # 4. 执行转换（逐页上报进度）
+            result = await converter.convert(file_path, self._with_progress(task_id, options))
             
-            # 6. 根据 output_type 保存结果
-            if result.output_type == 'pdf':
-                # Office/图片 -> PDF
-                output_path = self.file_service.save_output_file(
-                    content=result.pdf_content,
-                    task_id=task.task_id,
-                    original_filename=filename,
-                    is_pdf=True
-                )
-                markdown_content = ""
-            else:
-                # PDF -> Markdown
-                output_path = self.file_service.save_output_file(
-                    content=result.markdown,
-                    task_id=task.task_id,
-                    original_filename=filename
-                )
-                markdown_content = result.markdown
+            # 5. 保存结果并完成任务
+            return await self._save_and_complete(task_id, filename, result, start_time, cache_key)
             
-            # 7. 计算处理时间
-            processing_time = time.time() - start_time
+        except Exception as e:
+            logger.error(f"Conversion failed: {str(e)}")
             
-            # 8. 更新任务为完成
-            metadata = result.metadata.copy()
-            metadata['processing_time'] = processing_time
-            metadata['output_file_size'] = self.file_service.get_file_size(output_path)
+            # 标记任务为失败
+            self.task_manager.fail_task(
+                task_id=task_id,
+                error_message=str(e)
+            )
             
-            self.task_manager.complete_task(
-                task_id=task.task_id,
-                result_path=output_path,
-                markdown_content=markdown_content,
-                metadata=metadata
+            # 请求参数错误（如页码超出文档范围）原样抛出，由接口返回 400
+            if isinstance(e, InvalidPageRangeException):
+                raise
+            raise ConversionFailedException(
+                message="文件转换失败",
+                details=str(e)
             )
+    
+    def _with_progress(self, task_id: str, options: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        在转换选项中附加进度回调
+        
+        转换器每完成一页调用 progress_callback(current_page, total_pages)，
+        进度写入任务管理器供 /status 查询。
+        
+        Args:
+            task_id: 任务ID
+            options: 转换选项
+            
+        Returns:
+            Dict[str, Any]: 附加回调后的选项副本
+        """
+        def progress_callback(current_page: int, total_pages: int):
+            self.task_manager.update_task_progress(task_id, current_page, total_pages)
+        
+        return {**(options or {}), 'progress_callback': progress_callback}
+    
+    async def convert_stream(
+        self,
+        file_path: str,
+        filename: str,
+        options: Dict[str, Any]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        流式转换文件为Markdown
+        
+        PDF 按页序产出 page 事件；其他类型（输出整份结果）退化为一次性转换。
+        最后产出 done 事件（含任务ID、下载地址和元数据），失败时产出 error 事件。
+        
+        Args:
+            file_path: 文件路径
+            filename: 文件名
+            options: 转换选项
             
-            logger.info(
-                f"Conversion completed: {task.task_id}, "
-                f"time={processing_time:.2f}s"
+        Yields:
+            Dict[str, Any]: 转换事件
+        """
+        start_time = time.time()
+        
+        # 1. 检测文件类型并创建任务
+        task = self.create_task(file_path, filename)
+        file_type = FileType(task.file_type)
+        response = None
+        
+        try:
+            self.task_manager.update_task_status(
+                task.task_id,
+                TaskStatus.PROCESSING
             )
             
-            # 9. 返回结果
-            return {
-                'task_id': task.task_id,
-                'status': 'completed',
-                'markdown_content': markdown_content,
-                'output_path': output_path,
-                'output_type': result.output_type,
-                'metadata': metadata
-            }
+            # 3. 查询结果缓存
+            cache_key = None
+            if self.result_cache.enabled and 'file_paths' not in (options or {}):
+                # 大文件哈希耗时较长，放到线程中计算，不阻塞事件循环
+                cache_key = await asyncio.to_thread(self.result_cache.make_key, file_path, options)
+                cached = self.result_cache.get(cache_key)
+                if cached is not None:
+                    response = await self._complete_from_cache(task.task_id, filename, cached, start_time)
+            
+            streamed = False
+            if response is None:
+                converter = self.converter_factory.create_converter(file_type)
+                convert_options = self._with_progress(task.task_id, options)
+                
+                if file_type == FileType.PDF:
+                    # 4a. PDF：逐页转发转换事件
+                    result = None
+                    async for event in converter.convert_stream(file_path, convert_options):
+                        if event['event'] == 'result':
+                            result = event['result']
+                        else:
+                            yield {'task_id': task.task_id, **event}
+                    streamed = True
+                else:
+                    # 4b. 其他类型：一次性转换
+                    result = await converter.convert(file_path, convert_options)
+                
+                response = await self._save_and_complete(task.task_id, filename, result, start_time, cache_key)
             
+            # 缓存命中或非PDF：整份文档作为一个片段返回
+            if not streamed and response['markdown_content']:
+                yield {
+                    'event': 'page',
+                    'task_id': task.task_id,
+                    'page_number': None,
+                    'chunk_type': None,
+                    'markdown': response['markdown_content'],
+                }
+            
+        except (GeneratorExit, asyncio.CancelledError):
+            # 客户端断开连接：转换未完成时标记任务失败，避免任务一直停留在处理中
+            if response is None:
+                logger.warning(f"Streaming conversion aborted: {task.task_id}, client disconnected")
+                self.task_manager.fail_task(
+                    task_id=task.task_id,
+                    error_message="client disconnected"
+                )
+            raise
         except Exception as e:
-            logger.error(f"Conversion failed: {str(e)}")
+            logger.error(f"Streaming conversion failed: {str(e)}")
             
-            # 标记任务为失败
             self.task_manager.fail_task(
                 task_id=task.task_id,
                 error_message=str(e)
             )
             
-            raise ConversionFailedException(
-                message="文件转换失败",
-                details=str(e)
+            yield {
+                'event': 'error',
+                'task_id': task.task_id,
+                'code': getattr(e, 'code', None),
+                'message': "文件转换失败",
+                'details': getattr(e, 'details', None) or str(e),
+            }
+            return
+        
+        # 5. 结束事件
+        yield {
+            'event': 'done',
+            'task_id': task.task_id,
+            'output_type': response['output_type'],
+            'download_url': f"/api/v1/download/{task.task_id}",
+            'metadata': response['metadata'],
+        }
+    
+    async def _save_and_complete(
+        self,
+        task_id: str,
+        filename: str,
+        result: ConversionResult,
+        start_time: float,
+        cache_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        保存转换结果、写入结果缓存并完成任务
+        
+        Args:
+            task_id: 任务ID
+            filename: 文件名
+            result: 转换结果
+            start_time: 开始时间
+            cache_key: 结果缓存键（为空时不写缓存）
+            
+        Returns:
+            Dict[str, Any]: 转换结果
+        """
+        # 根据 output_type 保存结果
+        if result.output_type == 'pdf':
+            # Office/图片 -> PDF
+            output_path = self.file_service.save_output_file(
+                content=result.pdf_content,
+                task_id=task_id,
+                original_filename=filename,
+                is_pdf=True
+            )
+            markdown_content = ""
+        elif result.markdown_path:
+            # PDF -> Markdown（有界内存模式）：Markdown 已写入磁盘，不在任务中保留全文
+            output_path = self.file_service.move_output_file(
+                source_path=result.markdown_path,
+                task_id=task_id,
+                original_filename=filename
+            )
+            markdown_content = ""
+        else:
+            # PDF -> Markdown
+            output_path = self.file_service.save_output_file(
+                content=result.markdown,
+                task_id=task_id,
+                original_filename=filename
+            )
+            markdown_content = result.markdown
+        
+        # 保存逐页内容片段，供按新的输出选项重新生成
+        chunks_path = None
+        if result.content_chunks is not None and result.file_info is not None:
+            try:
+                # 逐页压缩写入并执行保留策略，放到线程中执行，不阻塞事件循环
+                chunks_path = await asyncio.to_thread(
+                    self.chunk_store.save, task_id, result.content_chunks, result.file_info
+                )
+            finally:
+                if isinstance(result.content_chunks, ChunkSpool):
+                    result.content_chunks.discard()
+        
+        # 计算处理时间
+        processing_time = time.time() - start_time
+        
+        # 更新任务为完成
+        metadata = result.metadata.copy()
+        metadata['processing_time'] = processing_time
+        metadata['output_file_size'] = self.file_service.get_file_size(output_path)
+        metadata['cache_hit'] = False
+        
+        # 有页面处理失败（如 OCR 服务故障）的结果不缓存，避免在缓存有效期内重复返回失败内容
+        if cache_key and metadata.get('failed_pages'):
+            logger.warning(f"Result not cached: {task_id} has {metadata['failed_pages']} failed pages")
+        elif cache_key:
+            # 复制输出文件与片段文件、配额清理都是磁盘操作，放到线程中执行，不阻塞事件循环
+            await asyncio.to_thread(
+                self.result_cache.put,
+                cache_key,
+                output_path,
+                result.output_type,
+                result.metadata,
+                chunks_path=chunks_path
             )
+        
+        self.task_manager.complete_task(
+            task_id=task_id,
+            result_path=output_path,
+            markdown_content=markdown_content,
+            metadata=metadata
+        )
+        
+        logger.info(
+            f"Conversion completed: {task_id}, "
+            f"time={processing_time:.2f}s"
+        )
+        
+        return {
+            'task_id': task_id,
+            'status': 'completed',
+            'markdown_content': markdown_content,
+            'output_path': output_path,
+            'output_type': result.output_type,
+            'metadata': metadata
+        }
+    
+    async def _complete_from_cache(
+        self,
+        task_id: str,
+        filename: str,
+        cached: Dict[str, Any],
+        start_time: float
+    ) -> Dict[str, Any]:
+        """
+        使用缓存结果完成任务
+        
+        Args:
+            task_id: 任务ID
+            filename: 文件名
+            cached: 缓存条目（output_path / output_type / metadata）
+            start_time: 开始时间
+            
+        Returns:
+            Dict[str, Any]: 转换结果
+        """
+        output_type = cached['output_type']
+        output_path = self.file_service.copy_output_file(
+            source_path=cached['output_path'],
+            task_id=task_id,
+            original_filename=filename,
+            is_pdf=(output_type == 'pdf')
+        )
+        
+        if output_type == 'pdf' or cached['metadata'].get('bounded_memory'):
+            # 有界内存模式的结果不在任务中保留全文，通过下载获取
+            markdown_content = ""
+        else:
+            with open(output_path, 'r', encoding='utf-8') as f:
+                markdown_content = f.read()
+        
+        if cached.get('chunks_path'):
+            await asyncio.to_thread(self.chunk_store.copy, cached['chunks_path'], task_id)
+        
+        processing_time = time.time() - start_time
+        
+        metadata = dict(cached['metadata'])
+        metadata['processing_time'] = processing_time
+        metadata['output_file_size'] = self.file_service.get_file_size(output_path)
+        metadata['cache_hit'] = True
+        
+        self.task_manager.complete_task(
+            task_id=task_id,
+            result_path=output_path,
+            markdown_content=markdown_content,
+            metadata=metadata
+        )
+        
+        logger.info(
+            f"Conversion served from cache: {task_id}, "
+            f"time={processing_time:.3f}s"
+        )
+        
+        return {
+            'task_id': task_id,
+            'status': 'completed',
+            'markdown_content': markdown_content,
+            'output_path': output_path,
+            'output_type': output_type,
+            'metadata': metadata
+        }
+    
+    def render(self, task_id: str, options: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        按新的输出选项重新生成任务的Markdown（同步执行，接口在线程中调用）
+        
+        使用转换时保存的逐页内容片段，不重新上传和 OCR；不修改任务原有的输出文件。
+        有界内存模式的任务从压缩文件中逐个读取片段，Markdown 写入文件并通过下载地址获取，
+        markdown_content 为空。
+        
+        Args:
+            task_id: 任务ID
+            options: 输出选项（show_page_number / include_metadata / no_pagination_and_metadata）
+            
+        Returns:
+            Dict[str, Any]: 重新生成的Markdown（或下载地址）与元数据
+            
+        Raises:
+            TaskNotFoundException: 任务没有保存的内容片段（不存在、已过期清理或不是 PDF 转 Markdown）
+        """
+        start_time = time.time()
+        
+        opened = self.chunk_store.open(task_id)
+        if opened is None:
+            raise TaskNotFoundException(
+                message=f"任务的页面内容不存在: {task_id}",
+                details="只有 PDF 转 Markdown 的任务可以重新生成，页面内容超过 CHUNK_STORE_TTL_HOURS 后会被清理"
+            )
+        content_chunks, file_info = opened
+        
+        options = options or {}
+        markdown_generator = MarkdownGenerator(
+            show_page_number=options.get('show_page_number', True),
+            include_metadata=options.get('include_metadata', True),
+            no_pagination_and_metadata=options.get('no_pagination_and_metadata', False)
+        )
+        
+        download_url = None
+        if self._is_bounded_task(task_id, file_info.total_pages):
+            # 有界内存模式：逐页写入文件，不在内存中拼出全文
+            render_path = self.chunk_store.render_path(task_id)
+            tmp_path = render_path.with_name(f".{render_path.name}.{os.getpid()}.tmp")
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    markdown_generator.write(content_chunks, file_info, f)
+                os.replace(tmp_path, render_path)
+            finally:
+                tmp_path.unlink(missing_ok=True)
+            self.chunk_store.enforce_retention()
+            markdown_content = ""
+            chunk_count = content_chunks.count
+            download_url = f"/api/v1/render/{task_id}/download"
+        else:
+            chunks = list(content_chunks)
+            markdown_content = markdown_generator.generate(chunks, file_info)
+            chunk_count = len(chunks)
+        render_time = time.time() - start_time
+        
+        logger.info(f"Markdown re-rendered: {task_id}, time={render_time * 1000:.1f}ms")
+        
+        return {
+            'task_id': task_id,
+            'markdown_content': markdown_content,
+            'download_url': download_url,
+            'metadata': {
+                'total_pages': file_info.total_pages,
+                'chunks': chunk_count,
+                'render_time': render_time,
+                'bounded_memory': download_url is not None,
+            }
+        }
+    
+    def _is_bounded_task(self, task_id: str, total_pages: int) -> bool:
+        """
+        判断任务是否按有界内存模式转换（重新生成时同样不在内存中保留全文）
+        
+        Args:
+            task_id: 任务ID
+            total_pages: 处理页数
+            
+        Returns:
+            bool: 是否为有界内存模式任务
+        """
+        try:
+            return bool(self.task_manager.get_task(task_id).metadata.get('bounded_memory'))
+        except TaskNotFoundException:
+            # 任务状态已淘汰：按转换时自动选择有界内存模式的页数阈值判断
+            threshold = get_settings().pdf_bounded_memory_pages
+            return threshold > 0 and total_pages >= threshold
     
     def get_task_status(self, task_id: str) -> Dict[str, Any]:
         """
@@ -157,7 +587,11 @@ class ConversionService:
             result['result'] = {
                 'markdown_content': task.markdown_content,
                 'download_url': f"/api/v1/download/{task.task_id}",
-                'metadata': task.metadata
+                'metadata': {
+                    **task.metadata,
+                    'pages_processed': task.metadata.get('total_pages', 0),
+                    'file_size': task.metadata.get('output_file_size', 0),
+                }
             }
         elif task.status == TaskStatus.FAILED:
             result['error'] = {
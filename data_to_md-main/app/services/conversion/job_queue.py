@@ -0,0 +1,157 @@
+"""
+异步任务队列
+async=true 的转换请求入队后立即返回，由后台 worker 依次执行
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional
+from app.config import get_settings
+from app.exceptions.service_exceptions import TaskProcessingException
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ConversionJob:
+    """待执行的转换任务"""
+    task_id: str
+    file_path: str
+    filename: str
+    options: Dict[str, Any]
+
+
+class ConversionJobQueue:
+    """
+    转换任务队列
+
+    固定数量的 worker 协程从队列中取任务执行，限制同时进行的转换数量；
+    任务状态与进度通过共享的 TaskManager 上报，供 /status 查询。
+    """
+
+    def __init__(self, workers: int, max_size: int):
+        """
+        初始化队列
+
+        Args:
+            workers: worker 数量
+            max_size: 排队任务上限（0 表示不限制）
+        """
+        self.workers = max(1, workers)
+        self.max_size = max_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._running = 0
+
+    def start(self):
+        """在当前事件循环中启动 worker（重复调用无副作用）"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._worker_tasks:
+            return
+
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(index), name=f"conversion-worker-{index}")
+            for index in range(self.workers)
+        ]
+        logger.info(f"Conversion job queue started: {self.workers} workers")
+
+    async def stop(self):
+        """停止所有 worker（未执行的任务保持 pending 状态）"""
+        for task in self._worker_tasks:
+            task.cancel()
+        if self._worker_tasks:
+            await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+
+        self._worker_tasks = []
+        self._queue = None
+        self._loop = None
+        logger.info("Conversion job queue stopped")
+
+    def submit(self, job: ConversionJob):
+        """
+        提交任务
+
+        Args:
+            job: 转换任务
+
+        Raises:
+            TaskProcessingException: 队列已满
+        """
+        self.start()
+
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise TaskProcessingException(
+                message="任务队列已满，请稍后重试",
+                details=f"排队任务数已达上限 {self.max_size}"
+            )
+
+        logger.info(f"Job queued: {job.task_id} (queue size={self._queue.qsize()})")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        队列统计
+
+        Returns:
+            Dict[str, Any]: worker 数、排队数、执行中数量
+        """
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "running": self._running,
+            "max_size": self.max_size,
+        }
+
+    async def _worker(self, index: int):
+        """
+        worker 主循环
+
+        Args:
+            index: worker 编号
+        """
+        # 延迟导入，避免与 ConversionService 循环依赖
+        from app.services.conversion.conversion_service import ConversionService
+
+        service = ConversionService()
+
+        while True:
+            job = await self._queue.get()
+            self._running += 1
+            try:
+                logger.info(f"Worker {index} processing job: {job.task_id}")
+                await service.run_task(job.task_id, job.file_path, job.filename, job.options)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 失败状态已由 run_task 写入任务管理器
+                logger.error(f"Job {job.task_id} failed: {str(e)}")
+            finally:
+                self._running -= 1
+                self._queue.task_done()
+
+
+# 进程内共享的任务队列
+_job_queue: Optional[ConversionJobQueue] = None
+
+
+def get_job_queue() -> ConversionJobQueue:
+    """
+    获取共享的任务队列
+
+    Returns:
+        ConversionJobQueue: 任务队列实例
+    """
+    global _job_queue
+
+    if _job_queue is None:
+        settings = get_settings()
+        _job_queue = ConversionJobQueue(
+            workers=settings.max_concurrent_tasks,
+            max_size=settings.task_queue_max_size
+        )
+
+    return _job_queue
@@ -2,24 +2,34 @@
 任务管理器
 管理转换任务的生命周期
 """
+import time
 import uuid
 import logging
-from typing import Dict, Optional
+from typing import List, Optional
 from datetime import datetime
 from app.models.task import Task
 from app.models.enums import TaskStatus
+from app.services.conversion.task_store import TaskStore, create_task_store
 from app.exceptions.service_exceptions import TaskNotFoundException
 
 logger = logging.getLogger(__name__)
 
+# 过期任务淘汰的最小间隔（秒），在创建任务时顺带执行
+EVICT_INTERVAL_SECONDS = 60
+
 
 class TaskManager:
     """任务管理器"""
     
-    def __init__(self):
-        """初始化管理器"""
-        # 简单的内存存储（生产环境应使用数据库或Redis）
-        self._tasks: Dict[str, Task] = {}
+    def __init__(self, store: Optional[TaskStore] = None):
+        """
+        初始化管理器
+        
+        Args:
+            store: 任务存储，为空时按配置创建（默认 SQLite，多个 worker 共享）
+        """
+        self._store = store or create_task_store()
+        self._last_evict = 0.0
     
     def create_task(
         self,
@@ -51,9 +61,11 @@ class TaskManager:
             total_pages=0
         )
         
-        self._tasks[task_id] = task
+        self._store.put(task)
         logger.info(f"Task created: {task_id}")
         
+        self._evict_expired()
+        
         return task
     
     def get_task(self, task_id: str) -> Task:
@@ -69,7 +81,7 @@ class TaskManager:
         Raises:
             TaskNotFoundException: 任务不存在
         """
-        task = self._tasks.get(task_id)
+        task = self._store.get(task_id)
         if not task:
             raise TaskNotFoundException(
                 message=f"任务不存在: {task_id}"
@@ -96,6 +108,7 @@ class TaskManager:
         
         if status == TaskStatus.COMPLETED:
             task.completed_at = datetime.now()
+        self._store.put(task)
         
         logger.info(f"Task {task_id} status updated: {status}")
     
@@ -115,6 +128,7 @@ class TaskManager:
         """
         task = self.get_task(task_id)
         task.update_progress(current_page, total_pages)
+        self._store.put(task)
         
         logger.debug(f"Task {task_id} progress: {current_page}/{total_pages}")
     
@@ -136,6 +150,7 @@ class TaskManager:
         """
         task = self.get_task(task_id)
         task.mark_completed(result_path, markdown_content, metadata)
+        self._store.put(task)
         
         logger.info(f"Task {task_id} completed")
     
@@ -153,6 +168,7 @@ class TaskManager:
         """
         task = self.get_task(task_id)
         task.mark_failed(error_message)
+        self._store.put(task)
         
         logger.error(f"Task {task_id} failed: {error_message}")
     
@@ -163,18 +179,40 @@ class TaskManager:
         Args:
             task_id: 任务ID
         """
-        if task_id in self._tasks:
-            del self._tasks[task_id]
-            logger.info(f"Task {task_id} deleted")
+        self._store.delete(task_id)
+        logger.info(f"Task {task_id} deleted")
     
-    def list_tasks(self) -> list[Task]:
+    def list_tasks(
+        self,
+        status: Optional[TaskStatus] = None,
+        limit: Optional[int] = None
+    ) -> List[Task]:
         """
-        列出所有任务
+        按创建时间倒序列出任务
         
+        Args:
+            status: 只列出该状态的任务，为空时列出全部
+            limit: 最多返回的任务数，为空时不限制
+            
         Returns:
-            list[Task]: 任务列表
+            List[Task]: 任务列表
         """
-        return list(self._tasks.values())
+        return self._store.list(status=status, limit=limit)
+    
+    def _evict_expired(self):
+        """按间隔淘汰过期任务（淘汰失败不影响任务创建）"""
+        now = time.monotonic()
+        if now - self._last_evict < EVICT_INTERVAL_SECONDS:
+            return
+        self._last_evict = now
+        
+        try:
+            evicted = self._store.evict_expired()
+        except Exception as e:
+            logger.warning(f"Failed to evict expired tasks: {str(e)}")
+            return
+        if evicted:
+            logger.info(f"Expired tasks evicted: {evicted}")
     
     def _generate_task_id(self) -> str:
         """
@@ -185,3 +223,21 @@ class TaskManager:
         """
         return f"task_{uuid.uuid4().hex[:12]}"
 
+
+# 进程内共享的任务管理器（任务状态保存在任务存储中，SQLite 存储在 worker 之间共享）
+_task_manager: Optional[TaskManager] = None
+
+
+def get_task_manager() -> TaskManager:
+    """
+    获取共享的任务管理器
+    
+    Returns:
+        TaskManager: 任务管理器实例
+    """
+    global _task_manager
+    
+    if _task_manager is None:
+        _task_manager = TaskManager()
+    
+    return _task_manager
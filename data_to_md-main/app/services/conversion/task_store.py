@@ -0,0 +1,277 @@
+"""
+任务存储
+保存转换任务状态，供状态查询使用
+
+说明：
+- sqlite（默认）：SQLite WAL 模式的单文件数据库，同一主机上的所有 uvicorn worker 共享，
+  任一 worker 创建的任务都能在其他 worker 查询到
+- memory：进程内字典，仅单进程部署或测试使用
+- 按任务ID主键查询；按状态 + 创建时间、更新时间建索引，用于列表查询与过期淘汰
+- 过期淘汰：更新时间早于 TTL 的任务被删除（TASK_TTL_HOURS）
+"""
+import os
+import time
+import sqlite3
+import logging
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional
+from app.config import get_settings
+from app.models.task import Task
+from app.models.enums import TaskStatus
+
+logger = logging.getLogger(__name__)
+
+
+class TaskStore(ABC):
+    """任务存储基类"""
+
+    def __init__(self, ttl_seconds: float):
+        """
+        初始化存储
+
+        Args:
+            ttl_seconds: 任务保留时间（秒，按最后更新时间计算），0 表示不淘汰
+        """
+        self.ttl_seconds = ttl_seconds
+
+    @abstractmethod
+    def put(self, task: Task):
+        """
+        写入任务（新建或覆盖）
+
+        Args:
+            task: 任务对象
+        """
+        pass
+
+    @abstractmethod
+    def get(self, task_id: str) -> Optional[Task]:
+        """
+        按任务ID读取任务
+
+        Args:
+            task_id: 任务ID
+
+        Returns:
+            Optional[Task]: 任务对象，不存在时为 None
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, task_id: str):
+        """
+        删除任务
+
+        Args:
+            task_id: 任务ID
+        """
+        pass
+
+    @abstractmethod
+    def list(self, status: Optional[TaskStatus] = None, limit: Optional[int] = None) -> List[Task]:
+        """
+        按创建时间倒序列出任务
+
+        Args:
+            status: 只列出该状态的任务，为空时列出全部
+            limit: 最多返回的任务数，为空时不限制
+
+        Returns:
+            List[Task]: 任务列表
+        """
+        pass
+
+    @abstractmethod
+    def evict_expired(self) -> int:
+        """
+        删除过期任务
+
+        Returns:
+            int: 删除的任务数
+        """
+        pass
+
+    def close(self):
+        """释放资源"""
+        pass
+
+    def _expire_before(self) -> Optional[float]:
+        """过期时间点（Unix 时间戳），不淘汰时为 None"""
+        if self.ttl_seconds <= 0:
+            return None
+        return time.time() - self.ttl_seconds
+
+
+class MemoryTaskStore(TaskStore):
+    """进程内任务存储"""
+
+    def __init__(self, ttl_seconds: float = 0):
+        super().__init__(ttl_seconds)
+        self._tasks: Dict[str, Task] = {}
+
+    def put(self, task: Task):
+        self._tasks[task.task_id] = task
+
+    def get(self, task_id: str) -> Optional[Task]:
+        return self._tasks.get(task_id)
+
+    def delete(self, task_id: str):
+        self._tasks.pop(task_id, None)
+
+    def list(self, status: Optional[TaskStatus] = None, limit: Optional[int] = None) -> List[Task]:
+        tasks = [task for task in self._tasks.values() if status is None or task.status == status]
+        tasks.sort(key=lambda task: task.created_at, reverse=True)
+        return tasks[:limit] if limit is not None else tasks
+
+    def evict_expired(self) -> int:
+        expire_before = self._expire_before()
+        if expire_before is None:
+            return 0
+        expired = [
+            task_id for task_id, task in self._tasks.items()
+            if task.updated_at.timestamp() < expire_before
+        ]
+        for task_id in expired:
+            del self._tasks[task_id]
+        return len(expired)
+
+
+class SQLiteTaskStore(TaskStore):
+    """SQLite 任务存储（WAL 模式，多进程共享）"""
+
+    _SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS tasks (
+            task_id TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL,
+            data TEXT NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_tasks_status_created ON tasks (status, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_created ON tasks (created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_updated ON tasks (updated_at)",
+    )
+
+    def __init__(self, db_path: str, ttl_seconds: float = 0, busy_timeout: float = 5.0):
+        """
+        初始化存储
+
+        Args:
+            db_path: 数据库文件路径
+            ttl_seconds: 任务保留时间（秒），0 表示不淘汰
+            busy_timeout: 其他进程写入时等待锁的秒数
+        """
+        super().__init__(ttl_seconds)
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.busy_timeout = busy_timeout
+
+        # 每个进程一个连接；进程内多线程共用，由锁串行化
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                for statement in self._SCHEMA:
+                    conn.execute(statement)
+
+    def _connection(self) -> sqlite3.Connection:
+        """获取当前进程的连接（fork 后的子进程重新打开）"""
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(
+                str(self.db_path),
+                timeout=self.busy_timeout,
+                check_same_thread=False,
+                isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def put(self, task: Task):
+        with self._lock:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO tasks (task_id, status, created_at, updated_at, data) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    task.task_id,
+                    TaskStatus(task.status).value,
+                    task.created_at.timestamp(),
+                    task.updated_at.timestamp(),
+                    task.model_dump_json(),
+                )
+            )
+
+    def get(self, task_id: str) -> Optional[Task]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT data FROM tasks WHERE task_id = ?", (task_id,)
+            ).fetchone()
+        return Task.model_validate_json(row[0]) if row else None
+
+    def delete(self, task_id: str):
+        with self._lock:
+            self._connection().execute("DELETE FROM tasks WHERE task_id = ?", (task_id,))
+
+    def list(self, status: Optional[TaskStatus] = None, limit: Optional[int] = None) -> List[Task]:
+        sql = "SELECT data FROM tasks"
+        params = []
+        if status is not None:
+            sql += " WHERE status = ?"
+            params.append(TaskStatus(status).value)
+        sql += " ORDER BY created_at DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._connection().execute(sql, params).fetchall()
+        return [Task.model_validate_json(row[0]) for row in rows]
+
+    def evict_expired(self) -> int:
+        expire_before = self._expire_before()
+        if expire_before is None:
+            return 0
+        with self._lock:
+            cursor = self._connection().execute(
+                "DELETE FROM tasks WHERE updated_at < ?", (expire_before,)
+            )
+        return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+
+def create_task_store() -> TaskStore:
+    """
+    按配置创建任务存储
+
+    Returns:
+        TaskStore: 任务存储实例
+
+    Raises:
+        ValueError: 未知的存储类型
+    """
+    settings = get_settings()
+    ttl_seconds = settings.task_ttl_hours * 3600
+    backend = settings.task_store_backend.lower()
+
+    if backend == "sqlite":
+        logger.info(f"Task store: sqlite ({settings.task_db_path})")
+        return SQLiteTaskStore(settings.task_db_path, ttl_seconds=ttl_seconds)
+    if backend == "memory":
+        logger.info("Task store: memory (not shared between workers)")
+        return MemoryTaskStore(ttl_seconds=ttl_seconds)
+
+    raise ValueError(f"Unknown TASK_STORE_BACKEND: {settings.task_store_backend}")
@@ -0,0 +1,343 @@
+"""
+自适应并发控制（AIMD）
+进程内按外部服务共享，限制同时在途的 API 请求数
+
+规则：
+- 加性增：请求成功且延迟不超过目标时，每完成约 limit 个请求上限 +1
+- 乘性减：遇到限流（429/503）或超时时上限减半；
+  同一轮拥塞中已在途的请求再次失败不重复减半
+- Retry-After：服务端返回等待时间时，在此之前不再发起新请求
+- 其他错误（参数错误等）不影响上限
+"""
+import time
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+import httpx
+from openai import APITimeoutError
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# 视为服务端过载的 HTTP 状态码
+THROTTLE_STATUS_CODES = {429, 503}
+
+
+def parse_retry_after(headers: Any) -> Optional[float]:
+    """
+    解析 Retry-After 响应头
+
+    支持 retry-after-ms、秒数与 HTTP 日期三种形式。
+
+    Args:
+        headers: 响应头（支持 .get 的映射）
+
+    Returns:
+        Optional[float]: 等待秒数，无法解析时为 None
+    """
+    if not headers:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return max(0.0, float(value) / 1000.0)
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_exception(exc: BaseException) -> Tuple[Optional[str], Optional[float]]:
+    """
+    判断异常是否表示服务端过载
+
+    Args:
+        exc: 请求抛出的异常
+
+    Returns:
+        ("timeout" / "throttled" / None, Retry-After 秒数)
+    """
+    if isinstance(exc, (TimeoutError, httpx.TimeoutException, APITimeoutError)):
+        return "timeout", None
+
+    response = getattr(exc, "response", None)
+    status_code = getattr(exc, "status_code", None) or getattr(response, "status_code", None)
+    if status_code in THROTTLE_STATUS_CODES:
+        return "throttled", parse_retry_after(getattr(response, "headers", None))
+
+    return None, None
+
+
+class ConcurrencyPermit:
+    """一次请求占用的并发名额，用于上报不以异常形式出现的限流响应"""
+
+    def __init__(self):
+        self.throttled = False
+        self.retry_after: Optional[float] = None
+
+    def mark_throttled(self, retry_after: Optional[float] = None):
+        """
+        标记本次请求被限流
+
+        Args:
+            retry_after: 服务端要求的等待秒数
+        """
+        self.throttled = True
+        self.retry_after = retry_after
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD 自适应并发限制器"""
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int,
+        min_limit: int = 1,
+        max_limit: int = 16,
+        latency_target: float = 0.0,
+        decrease_factor: float = 0.5
+    ):
+        """
+        初始化限制器
+
+        Args:
+            name: 外部服务名称（用于日志与指标）
+            initial_limit: 初始并发上限
+            min_limit: 并发下限
+            max_limit: 并发上限
+            latency_target: 目标延迟（秒），超过时不再增大上限；0 表示不限制
+            decrease_factor: 过载时的缩减系数
+        """
+        self.name = name
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+
+        self._limit = float(min(self.max_limit, max(self.min_limit, initial_limit)))
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+
+        self.successes = 0
+        self.throttles = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    @property
+    def limit(self) -> int:
+        """当前并发上限"""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """在途请求数"""
+        return self._in_flight
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[ConcurrencyPermit]:
+        """
+        占用一个并发名额，退出时按结果调整上限
+
+        块内抛出的异常按 classify_exception 判断是否过载；
+        以正常响应返回的限流（如 HTTP 429）通过 permit.mark_throttled 上报。
+
+        Yields:
+            ConcurrencyPermit: 并发名额
+        """
+        await self._wait_for_slot()
+
+        permit = ConcurrencyPermit()
+        started = time.monotonic()
+        self._in_flight += 1
+        try:
+            yield permit
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            kind, retry_after = classify_exception(e)
+            if kind:
+                self._on_overload(started, retry_after, timeout=kind == "timeout")
+            else:
+                self.errors += 1
+            raise
+        else:
+            if permit.throttled:
+                self._on_overload(started, permit.retry_after)
+            else:
+                self._on_success(time.monotonic() - started)
+        finally:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._wake_waiters()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        限制器统计
+
+        Returns:
+            Dict[str, Any]: 当前上限、在途与排队数量、各类结果计数
+        """
+        return {
+            "limit": self.limit,
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "in_flight": self._in_flight,
+            "waiting": len(self._waiters),
+            "retry_after_remaining": round(max(0.0, self._blocked_until - time.monotonic()), 2),
+            "successes": self.successes,
+            "throttles": self.throttles,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+        }
+
+    async def _wait_for_slot(self):
+        """等待 Retry-After 结束并且在途请求数低于上限"""
+        self._bind_loop()
+
+        while True:
+            delay = self._blocked_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            if self._in_flight < self.limit:
+                return
+
+            waiter = self._loop.create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                else:
+                    # 已被唤醒但随即取消：把名额转给下一个等待者
+                    self._wake_waiters()
+                raise
+
+    def _bind_loop(self):
+        """绑定当前事件循环；循环变化时丢弃旧循环上的等待者与计数"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._waiters.clear()
+            self._in_flight = 0
+
+    def _wake_waiters(self):
+        """按空闲名额唤醒等待者"""
+        free = self.limit - self._in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def _on_success(self, latency: float):
+        """
+        成功请求：延迟达标时加性增
+
+        Args:
+            latency: 请求耗时（秒）
+        """
+        self.successes += 1
+        if self.latency_target and latency > self.latency_target:
+            return
+        if self._limit < self.max_limit:
+            self._limit = min(float(self.max_limit), self._limit + 1.0 / self._limit)
+            self._wake_waiters()
+
+    def _on_overload(self, started: float, retry_after: Optional[float], timeout: bool = False):
+        """
+        过载（限流或超时）：乘性减，并按 Retry-After 暂停发起新请求
+
+        Args:
+            started: 请求开始时间（monotonic）
+            retry_after: 服务端要求的等待秒数
+            timeout: 是否为超时
+        """
+        if timeout:
+            self.timeouts += 1
+        else:
+            self.throttles += 1
+
+        now = time.monotonic()
+        if retry_after:
+            self._blocked_until = max(self._blocked_until, now + retry_after)
+
+        # 上次减半之前发出的请求属于同一轮拥塞，不重复减半
+        if started < self._last_decrease:
+            return
+
+        previous = self.limit
+        self._limit = max(float(self.min_limit), self._limit * self.decrease_factor)
+        self._last_decrease = now
+        logger.warning(
+            f"{self.name} overloaded ({'timeout' if timeout else 'throttled'}), "
+            f"concurrency limit {previous} -> {self.limit}"
+            + (f", retry after {retry_after:.1f}s" if retry_after else "")
+        )
+
+
+# 进程内按服务共享的限制器
+_limiters: Dict[str, AdaptiveConcurrencyLimiter] = {}
+
+
+def get_concurrency_limiter(name: str) -> AdaptiveConcurrencyLimiter:
+    """
+    获取指定外部服务的共享限制器
+
+    Args:
+        name: 服务名称，如 "deepseek" / "mineru"
+
+    Returns:
+        AdaptiveConcurrencyLimiter: 限制器实例
+    """
+    limiter = _limiters.get(name)
+    if limiter is None:
+        settings = get_settings()
+        if settings.api_concurrency_adaptive:
+            limiter = AdaptiveConcurrencyLimiter(
+                name,
+                initial_limit=settings.max_concurrent_api_calls,
+                min_limit=settings.api_concurrency_min,
+                max_limit=settings.api_concurrency_max,
+                latency_target=settings.api_latency_target
+            )
+        else:
+            # 关闭自适应时退化为固定上限
+            limit = settings.max_concurrent_api_calls
+            limiter = AdaptiveConcurrencyLimiter(
+                name,
+                initial_limit=limit,
+                min_limit=limit,
+                max_limit=limit
+            )
+        _limiters[name] = limiter
+    return limiter
+
+
+def get_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    所有限制器的统计信息
+
+    Returns:
+        Dict[str, Dict[str, Any]]: 服务名 -> 统计
+    """
+    return {name: limiter.stats() for name, limiter in _limiters.items()}
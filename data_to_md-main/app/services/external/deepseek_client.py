@@ -1,37 +1,130 @@
 """
 DeepSeek OCR API 客户端
 封装 DeepSeek-OCR API 调用
+
+说明：
+- 基于 AsyncOpenAI，调用全程不阻塞事件循环
+- 进程内共享一个带连接池的 httpx.AsyncClient（可用时启用 HTTP/2），
+  多个页面的 OCR 请求复用同一组连接并真正并发
+- 在途请求数由进程内共享的自适应限制器（AIMD）控制，限流/超时时自动降低并发
+- 调用方可传入调度名额（slot），每次尝试前获取、结束后释放，重试退避期间不占用名额
 """
 import re
-import time
+import asyncio
 import logging
-from typing import Optional
-from openai import OpenAI
+from contextlib import nullcontext
+from typing import AsyncContextManager, Callable, Optional
+import httpx
+from openai import AsyncOpenAI
 from app.config import get_settings
 from app.exceptions.service_exceptions import DeepSeekAPIException
 from app.services.external.base_ocr_client import BaseOCRClient
+from app.services.external.concurrency_limiter import get_concurrency_limiter
 
 logger = logging.getLogger(__name__)
 
+# 进程级共享的 HTTP 连接池（按事件循环绑定，循环变化时重建）
+_shared_http_client: Optional[httpx.AsyncClient] = None
+_shared_http_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _http2_available() -> bool:
+    """检查是否安装了 HTTP/2 依赖（h2）"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def get_shared_http_client() -> httpx.AsyncClient:
+    """
+    获取进程内共享的 httpx.AsyncClient
+
+    连接池中的连接与创建它的事件循环绑定，因此当运行循环变化
+    （或客户端已关闭）时重新创建。
+
+    Returns:
+        httpx.AsyncClient: 共享客户端
+    """
+    global _shared_http_client, _shared_http_loop
+
+    loop = asyncio.get_running_loop()
+    if (
+        _shared_http_client is None
+        or _shared_http_client.is_closed
+        or _shared_http_loop is not loop
+    ):
+        settings = get_settings()
+        http2 = settings.deepseek_http2 and _http2_available()
+        if settings.deepseek_http2 and not http2:
+            logger.warning("h2 is not installed, DeepSeek client falls back to HTTP/1.1")
+
+        _shared_http_client = httpx.AsyncClient(
+            http2=http2,
+            timeout=httpx.Timeout(settings.deepseek_timeout),
+            limits=httpx.Limits(
+                max_connections=settings.deepseek_max_connections,
+                max_keepalive_connections=settings.deepseek_max_connections,
+            ),
+        )
+        _shared_http_loop = loop
+        logger.info(
+            f"DeepSeek HTTP pool created: http2={http2}, "
+            f"max_connections={settings.deepseek_max_connections}"
+        )
+
+    return _shared_http_client
+
+
+async def close_shared_http_client():
+    """关闭共享连接池（应用关闭时调用）"""
+    global _shared_http_client, _shared_http_loop
+
+    if _shared_http_client is not None and not _shared_http_client.is_closed:
+        await _shared_http_client.aclose()
+    _shared_http_client = None
+    _shared_http_loop = None
+
 
 class DeepSeekClient(BaseOCRClient):
     """DeepSeek OCR API 客户端，实现统一 OCR 接口"""
     
+    # 默认提示词
+    DEFAULT_PROMPT = "<|grounding|>Convert the document to markdown."
+    
     def __init__(self):
         """初始化客户端"""
         settings = get_settings()
-        self.client = OpenAI(
-            base_url=settings.deepseek_base_url,
-            api_key=settings.deepseek_api_key,
-        )
+        self.base_url = settings.deepseek_base_url
+        self.api_key = settings.deepseek_api_key
         self.model = settings.deepseek_model
         self.max_tokens = settings.deepseek_max_tokens
         self.timeout = settings.deepseek_timeout
+        self.limiter = get_concurrency_limiter("deepseek")
+    
+    def _get_client(self) -> AsyncOpenAI:
+        """
+        构建绑定共享连接池的 AsyncOpenAI 客户端
+
+        重试由 _retry_with_backoff 统一负责，因此关闭 SDK 内置重试。
+
+        Returns:
+            AsyncOpenAI: 异步客户端
+        """
+        return AsyncOpenAI(
+            base_url=self.base_url,
+            api_key=self.api_key,
+            http_client=get_shared_http_client(),
+            timeout=self.timeout,
+            max_retries=0,
+        )
     
     async def ocr_image(
         self,
         image_base64: str,
-        prompt: str = None
+        prompt: str = None,
+        slot: Optional[Callable[[], AsyncContextManager]] = None
     ) -> str:
         """
         调用OCR API识别图像
@@ -39,6 +132,7 @@ class DeepSeekClient(BaseOCRClient):
         Args:
             image_base64: Base64编码的图像
             prompt: 自定义提示词
+            slot: 返回调度名额上下文的函数，每次尝试在名额内发起（为空时不排队）
             
         Returns:
             str: Markdown格式的识别结果
@@ -47,15 +141,16 @@ class DeepSeekClient(BaseOCRClient):
             DeepSeekAPIException: API调用失败
         """
         if prompt is None:
-            prompt = "<|grounding|>Convert the document to markdown."
+            prompt = self.DEFAULT_PROMPT
         
         try:
             # 构建请求
             request_data = self._build_request(image_base64, prompt)
             
             # 调用API（带重试）
+            client = self._get_client()
             response = await self._retry_with_backoff(
-                lambda: self.client.chat.completions.create(**request_data)
+                lambda: self._create_completion(client, request_data, slot)
             )
             
             # 解析响应
@@ -73,6 +168,31 @@ class DeepSeekClient(BaseOCRClient):
                 details=str(e)
             )
     
+    async def _create_completion(
+        self,
+        client: AsyncOpenAI,
+        request_data: dict,
+        slot: Optional[Callable[[], AsyncContextManager]] = None
+    ):
+        """
+        在调度名额与并发限制器的名额内发起一次 API 调用
+        
+        限流（429）与超时由限制器识别并降低并发；Retry-After 期间
+        重试请求会在获取名额时等待。两种名额都只在本次尝试期间占用，
+        重试退避时已释放，其他任务可以使用。
+        
+        Args:
+            client: 异步客户端
+            request_data: 请求参数
+            slot: 返回调度名额上下文的函数（为空时不排队）
+            
+        Returns:
+            API响应对象
+        """
+        async with (slot() if slot else nullcontext()):
+            async with self.limiter.acquire():
+                return await client.chat.completions.create(**request_data)
+    
     def _build_request(self, image_base64: str, prompt: str) -> dict:
         """
         构建API请求体
@@ -134,10 +254,10 @@ class DeepSeekClient(BaseOCRClient):
         initial_delay: float = 2.0
     ):
         """
-        带指数退避的重试机制
+        带指数退避的重试机制（退避期间让出事件循环）
         
         Args:
-            func: 要执行的函数
+            func: 返回协程的函数（每次重试重新调用）
             max_retries: 最大重试次数
             initial_delay: 初始延迟（秒）
             
@@ -149,7 +269,7 @@ class DeepSeekClient(BaseOCRClient):
         
         for attempt in range(max_retries + 1):
             try:
-                return func()
+                return await func()
             except Exception as e:
                 last_exception = e
                 if attempt < max_retries:
@@ -157,7 +277,7 @@ class DeepSeekClient(BaseOCRClient):
                         f"API call failed (attempt {attempt + 1}/{max_retries + 1}), "
                         f"retrying in {delay}s: {str(e)}"
                     )
-                    time.sleep(delay)
+                    await asyncio.sleep(delay)
                     delay *= 2  # 指数退避
                 else:
                     logger.error(f"API call failed after {max_retries + 1} attempts")
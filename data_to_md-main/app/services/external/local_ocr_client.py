@@ -0,0 +1,257 @@
+"""
+本地 CPU OCR 客户端
+在共享进程池中运行本地 OCR 引擎，不依赖网络与外部服务
+
+说明：
+- 后端（可选依赖，按 LOCAL_OCR_BACKEND 选择，auto 时按以下顺序探测）：
+    * rapidocr:  rapidocr_onnxruntime（ONNX 模型，内置中英文模型）
+    * tesseract: pytesseract + 系统安装的 tesseract（语言由 LOCAL_OCR_LANG 指定）
+- 识别结果按行聚合为段落，输出纯文本 Markdown（不识别表格/公式结构），
+  适合版式简单的扫描文本页与离线基准测试
+- 引擎在每个工作进程中只加载一次
+"""
+import re
+import base64
+import asyncio
+import logging
+import statistics
+from typing import Any, Dict, List, Optional, Tuple
+from app.config import get_settings
+from app.core.common.process_pool import get_process_pool
+from app.exceptions.service_exceptions import LocalOCRException
+from app.services.external.base_ocr_client import BaseOCRClient
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_BACKENDS = ("rapidocr", "tesseract")
+
+# 文本行：(x0, y0, x1, y1, text)
+TextLine = Tuple[float, float, float, float, str]
+
+# 工作进程内已加载的引擎：后端名 -> 引擎对象
+_engines: Dict[str, Any] = {}
+
+# 中日韩字符（含全角标点）之间的空格
+_CJK_SPACE_PATTERN = re.compile(r"(?<=[\u3000-\u9fff\uff00-\uffef]) +(?=[\u3000-\u9fff\uff00-\uffef])")
+
+
+def backend_available(backend: str) -> bool:
+    """
+    检查后端依赖是否已安装
+
+    Args:
+        backend: 后端名称
+
+    Returns:
+        bool: 是否可用
+    """
+    try:
+        if backend == "rapidocr":
+            import rapidocr_onnxruntime  # noqa: F401
+        elif backend == "tesseract":
+            import pytesseract
+            pytesseract.get_tesseract_version()
+        else:
+            return False
+        return True
+    except Exception:
+        return False
+
+
+def resolve_backend(backend: str) -> str:
+    """
+    解析后端配置（auto 时选择第一个可用的后端）
+
+    Args:
+        backend: 配置的后端名称
+
+    Returns:
+        str: 后端名称
+
+    Raises:
+        LocalOCRException: 后端不支持或依赖未安装
+    """
+    backend = (backend or "auto").lower()
+    candidates = SUPPORTED_BACKENDS if backend == "auto" else (backend,)
+
+    for candidate in candidates:
+        if candidate in SUPPORTED_BACKENDS and backend_available(candidate):
+            return candidate
+
+    raise LocalOCRException(
+        message="本地 OCR 引擎不可用",
+        details=(
+            f"LOCAL_OCR_BACKEND={backend}，请安装 rapidocr_onnxruntime，"
+            f"或安装 pytesseract 与 tesseract"
+        )
+    )
+
+
+def lines_to_markdown(lines: List[TextLine]) -> str:
+    """
+    把识别出的文本行按阅读顺序合并为 Markdown 段落
+
+    同一水平线上的文本框合并为一行；行间距明显大于行高时分段。
+
+    Args:
+        lines: 文本行列表
+
+    Returns:
+        str: Markdown 文本
+    """
+    lines = [line for line in lines if line[4].strip()]
+    if not lines:
+        return ""
+
+    # 按垂直位置合并同一行的文本框
+    rows: List[List[TextLine]] = []
+    for line in sorted(lines, key=lambda item: ((item[1] + item[3]) / 2, item[0])):
+        center = (line[1] + line[3]) / 2
+        if rows:
+            last = rows[-1]
+            top = min(item[1] for item in last)
+            bottom = max(item[3] for item in last)
+            if top <= center <= bottom:
+                last.append(line)
+                continue
+        rows.append([line])
+
+    heights = [max(item[3] for item in row) - min(item[1] for item in row) for row in rows]
+    line_height = statistics.median(heights) or 1.0
+
+    paragraphs: List[List[str]] = []
+    previous_bottom: Optional[float] = None
+    for row in rows:
+        top = min(item[1] for item in row)
+        text = " ".join(item[4].strip() for item in sorted(row, key=lambda item: item[0]))
+        if previous_bottom is None or top - previous_bottom > 0.75 * line_height:
+            paragraphs.append([])
+        paragraphs[-1].append(text)
+        previous_bottom = max(item[3] for item in row)
+
+    markdown = "\n\n".join("\n".join(paragraph) for paragraph in paragraphs)
+    return _CJK_SPACE_PATTERN.sub("", markdown)
+
+
+def _get_engine(backend: str) -> Any:
+    """获取（并缓存）工作进程内的 OCR 引擎"""
+    engine = _engines.get(backend)
+    if engine is None:
+        if backend == "rapidocr":
+            from rapidocr_onnxruntime import RapidOCR
+            engine = RapidOCR()
+        else:
+            import pytesseract
+            engine = pytesseract
+        _engines[backend] = engine
+    return engine
+
+
+def _recognize_rapidocr(image_bytes: bytes) -> List[TextLine]:
+    """使用 RapidOCR 识别文本行"""
+    result, _ = _get_engine("rapidocr")(image_bytes)
+    lines = []
+    for box, text, _score in result or []:
+        xs = [point[0] for point in box]
+        ys = [point[1] for point in box]
+        lines.append((min(xs), min(ys), max(xs), max(ys), text))
+    return lines
+
+
+def _recognize_tesseract(image_bytes: bytes, lang: str) -> List[TextLine]:
+    """使用 Tesseract 识别文本行"""
+    from io import BytesIO
+    from PIL import Image
+
+    pytesseract = _get_engine("tesseract")
+    with Image.open(BytesIO(image_bytes)) as image:
+        data = pytesseract.image_to_data(image, lang=lang, output_type=pytesseract.Output.DICT)
+
+    words: Dict[tuple, List[int]] = {}
+    for index, text in enumerate(data["text"]):
+        if text.strip():
+            key = (data["block_num"][index], data["par_num"][index], data["line_num"][index])
+            words.setdefault(key, []).append(index)
+
+    lines = []
+    for indexes in words.values():
+        x0 = min(data["left"][i] for i in indexes)
+        y0 = min(data["top"][i] for i in indexes)
+        x1 = max(data["left"][i] + data["width"][i] for i in indexes)
+        y1 = max(data["top"][i] + data["height"][i] for i in indexes)
+        lines.append((x0, y0, x1, y1, " ".join(data["text"][i] for i in indexes)))
+    return lines
+
+
+def recognize_image(base64_image: str, backend: str, lang: str) -> str:
+    """
+    识别 Base64 图像（在工作进程中执行）
+
+    Args:
+        base64_image: Base64编码的图像
+        backend: 后端名称
+        lang: Tesseract 语言
+
+    Returns:
+        str: Markdown 文本
+    """
+    image_bytes = base64.b64decode(base64_image)
+    if backend == "rapidocr":
+        lines = _recognize_rapidocr(image_bytes)
+    else:
+        lines = _recognize_tesseract(image_bytes, lang)
+    return lines_to_markdown(lines)
+
+
+class LocalOCRClient(BaseOCRClient):
+    """本地 CPU OCR 客户端，实现统一 OCR 接口"""
+
+    def __init__(self):
+        """初始化客户端"""
+        settings = get_settings()
+        self.backend_setting = settings.local_ocr_backend
+        self.lang = settings.local_ocr_lang
+        self._backend: Optional[str] = None
+
+    @property
+    def backend(self) -> str:
+        """实际使用的后端（首次访问时探测）"""
+        if self._backend is None:
+            self._backend = resolve_backend(self.backend_setting)
+            logger.info(f"Local OCR backend: {self._backend}")
+        return self._backend
+
+    @property
+    def model(self) -> str:
+        """参与缓存键计算的模型标识"""
+        return f"{self.backend}:{self.lang}" if self.backend == "tesseract" else self.backend
+
+    async def ocr_image(self, base64_image: str) -> str:
+        """
+        在进程池中识别单张图像
+
+        Args:
+            base64_image: Base64编码的图像
+
+        Returns:
+            str: Markdown 文本
+
+        Raises:
+            LocalOCRException: 引擎不可用或识别失败
+        """
+        backend = self.backend
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                get_process_pool(),
+                recognize_image,
+                base64_image,
+                backend,
+                self.lang
+            )
+        except Exception as e:
+            logger.error(f"Local OCR failed: {str(e)}")
+            raise LocalOCRException(
+                message="本地 OCR 识别失败",
+                details=str(e)
+            )
@@ -7,14 +7,19 @@ MinerU OCR API 客户端
 - 支持 PDF URL 解析
 - 支持本地文件上传解析
 - 返回结果为 ZIP 包（包含 markdown、json 等文件）
+- API 请求经进程内共享的自适应限制器（AIMD）控制并发，遇到限流时降低并发
+- 进程内共享一个带连接池的 httpx.AsyncClient，上传链接申请、上传、轮询、下载复用连接
+- 上传按块流式读取文件，结果 ZIP 流式下载到 SpooledTemporaryFile，
+  内存占用与 PDF / ZIP 大小无关
+- 多个 PDF（如同一文档的页面分片）可作为一个批次提交，并发上传与下载
+- 任务状态由进程内共享的轮询器查询（同一批次合并查询、按进度与指数退避调整间隔、全局限速）
 """
 import asyncio
 import logging
 import os
-import time
+import tempfile
 import zipfile
-from io import BytesIO
-from typing import Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 from urllib.parse import urljoin
 
 import httpx
@@ -22,6 +27,12 @@ import httpx
 from app.config import get_settings
 from app.exceptions.service_exceptions import MinerUAPIException
 from app.services.external.base_ocr_client import BaseOCRClient
+from app.services.external.concurrency_limiter import (
+    THROTTLE_STATUS_CODES,
+    get_concurrency_limiter,
+    parse_retry_after,
+)
+from app.services.external.mineru_poller import get_mineru_poller
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +44,75 @@ MINERU_GET_TASK = "extract/task/{task_id}"
 MINERU_FILE_UPLOAD = "file-urls/batch"
 MINERU_BATCH_RESULTS = "extract-results/batch/{batch_id}"
 
+# 单个批次最多包含的文件数
+MINERU_MAX_BATCH_FILES = 200
+
+# 上传/下载的分块大小
+_CHUNK_SIZE = 1024 * 1024
+# 结果 ZIP 超过该大小时落盘
+_SPOOL_MAX_SIZE = 16 * 1024 * 1024
+
+# 进程级共享的 HTTP 连接池（按事件循环绑定，循环变化时重建）
+_shared_http_client: Optional[httpx.AsyncClient] = None
+_shared_http_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_mineru_http_client() -> httpx.AsyncClient:
+    """
+    获取进程内共享的 MinerU httpx.AsyncClient
+
+    连接池中的连接与创建它的事件循环绑定，因此当运行循环变化
+    （或客户端已关闭）时重新创建。
+
+    Returns:
+        httpx.AsyncClient: 共享客户端
+    """
+    global _shared_http_client, _shared_http_loop
+
+    loop = asyncio.get_running_loop()
+    if (
+        _shared_http_client is None
+        or _shared_http_client.is_closed
+        or _shared_http_loop is not loop
+    ):
+        settings = get_settings()
+        _shared_http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.mineru_timeout),
+            limits=httpx.Limits(
+                max_connections=settings.mineru_max_connections,
+                max_keepalive_connections=settings.mineru_max_connections,
+            ),
+        )
+        _shared_http_loop = loop
+        logger.info(f"MinerU HTTP pool created: max_connections={settings.mineru_max_connections}")
+
+    return _shared_http_client
+
+
+async def close_mineru_http_client():
+    """关闭共享连接池（应用关闭时调用）"""
+    global _shared_http_client, _shared_http_loop
+
+    if _shared_http_client is not None and not _shared_http_client.is_closed:
+        await _shared_http_client.aclose()
+    _shared_http_client = None
+    _shared_http_loop = None
+
+
+def _data_id(index: int) -> str:
+    """批次内第 index 个文件的 data_id"""
+    return f"part_{index}"
+
+
+async def _iter_file(file_path: str, chunk_size: int = _CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """按块读取文件（读盘在线程中执行，不阻塞事件循环）"""
+    with open(file_path, "rb") as f:
+        while True:
+            chunk = await asyncio.to_thread(f.read, chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
 
 class MinerUClient(BaseOCRClient):
     """MinerU OCR API 客户端，实现统一 OCR 接口。
@@ -47,8 +127,8 @@ class MinerUClient(BaseOCRClient):
         self.api_key: str = settings.mineru_api_key
         self.base_url: str = settings.mineru_base_url or MINERU_API_BASE
         self.timeout: int = settings.mineru_timeout
-        self.poll_interval: float = 2.0  # 轮询间隔（秒）
-        self.max_polls: int = 300  # 最多轮询 300 次 = 10 分钟
+        self.poll_timeout: float = settings.mineru_poll_timeout  # 等待任务完成的最长时间（秒）
+        self.limiter = get_concurrency_limiter("mineru")
 
         if not self.api_key:
             logger.warning(
@@ -69,6 +149,14 @@ class MinerUClient(BaseOCRClient):
         rel = (path or "").lstrip("/")
         return f"{base}/{rel}"
 
+    async def _send(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """在并发限制器名额内发送请求；429/503 响应上报为限流（遵守 Retry-After）"""
+        async with self.limiter.acquire() as permit:
+            resp = await get_mineru_http_client().request(method, url, **kwargs)
+            if resp.status_code in THROTTLE_STATUS_CODES:
+                permit.mark_throttled(parse_retry_after(resp.headers))
+            return resp
+
     async def ocr_image(self, base64_image: str) -> str:
         """MinerU 主要是 PDF 处理，不支持单张图片。此方法抛出异常。"""
         raise MinerUAPIException(
@@ -85,32 +173,58 @@ class MinerUClient(BaseOCRClient):
         3. 轮询任务状态直到完成
         4. 下载结果 ZIP，提取 markdown
         """
+        markdowns = await self.ocr_pdfs([file_path])
+        return markdowns[0]
+
+    async def ocr_pdfs(self, file_paths: List[str]) -> List[str]:
+        """把多个本地 PDF 作为一个 MinerU 批次解析（用于分片并行解析）。
+
+        一次申请全部上传链接，并发上传，等待整个批次完成后并发下载结果；
+        文件数超过 MINERU_MAX_BATCH_FILES 时拆成多个批次并发处理。
+
+        Args:
+            file_paths: PDF 文件路径列表
+
+        Returns:
+            List[str]: 与 file_paths 顺序一致的 markdown 列表
+        """
         if not self.api_key:
             raise MinerUAPIException(
                 message="MinerU 未正确配置",
                 details="请设置 MINERU_API_KEY 环境变量"
             )
 
-        if not os.path.exists(file_path):
-            raise MinerUAPIException(
-                message="PDF 文件不存在",
-                details=file_path,
-            )
+        if len(file_paths) > MINERU_MAX_BATCH_FILES:
+            batches = await asyncio.gather(*(
+                self.ocr_pdfs(file_paths[i:i + MINERU_MAX_BATCH_FILES])
+                for i in range(0, len(file_paths), MINERU_MAX_BATCH_FILES)
+            ))
+            return [markdown for batch in batches for markdown in batch]
+
+        for file_path in file_paths:
+            if not os.path.exists(file_path):
+                raise MinerUAPIException(
+                    message="PDF 文件不存在",
+                    details=file_path,
+                )
 
         try:
             # 第 1 步：申请上传链接
-            batch_id, upload_url = await self._request_upload_url(file_path)
-            logger.info(f"Got upload URL, batch_id={batch_id}")
+            batch_id, upload_urls = await self._request_upload_urls(file_paths)
+            logger.info(f"Got {len(upload_urls)} upload URL(s), batch_id={batch_id}")
 
             # 第 2 步：上传文件
-            await self._upload_file(upload_url, file_path)
+            await asyncio.gather(*(
+                self._upload_file(upload_url, file_path)
+                for upload_url, file_path in zip(upload_urls, file_paths)
+            ))
             logger.info(f"File uploaded successfully")
 
             # 第 3 步：轮询任务状态
-            markdown = await self._poll_and_get_result(batch_id)
+            markdowns = await self._poll_and_get_results(batch_id, len(file_paths))
             logger.info(f"MinerU processing completed")
 
-            return markdown
+            return markdowns
 
         except MinerUAPIException:
             raise
@@ -121,20 +235,20 @@ class MinerUClient(BaseOCRClient):
                 details=str(e),
             )
 
-    async def _request_upload_url(self, file_path: str) -> tuple[str, str]:
-        """申请文件上传链接。返回 (batch_id, upload_url)"""
+    async def _request_upload_urls(self, file_paths: List[str]) -> tuple[str, List[str]]:
+        """申请批次内各文件的上传链接。返回 (batch_id, upload_urls)"""
         url = self._build_url(MINERU_FILE_UPLOAD)
         headers = self._get_headers()
         payload = {
             "files": [
-                {"name": os.path.basename(file_path), "data_id": "auto_upload"}
+                {"name": os.path.basename(file_path), "data_id": _data_id(index)}
+                for index, file_path in enumerate(file_paths)
             ],
             "model_version": "vlm"
         }
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                resp = await client.post(url, json=payload, headers=headers)
+            resp = await self._send("POST", url, json=payload, headers=headers)
         except Exception as e:
             logger.error(f"Request upload URL failed: {str(e)}")
             raise MinerUAPIException(
@@ -161,21 +275,30 @@ class MinerUClient(BaseOCRClient):
                     details=f"Code: {data.get('code')}, Msg: {data.get('msg')}",
                 )
             batch_id = data["data"]["batch_id"]
-            upload_url = data["data"]["file_urls"][0]
-            return batch_id, upload_url
+            upload_urls = data["data"]["file_urls"]
         except KeyError as e:
             raise MinerUAPIException(
                 message="申请上传链接响应格式错误",
                 details=f"Missing key: {str(e)}",
             )
 
+        if len(upload_urls) != len(file_paths):
+            raise MinerUAPIException(
+                message="申请上传链接响应格式错误",
+                details=f"Expected {len(file_paths)} upload URLs, got {len(upload_urls)}",
+            )
+        return batch_id, upload_urls
+
     async def _upload_file(self, upload_url: str, file_path: str) -> None:
-        """上传文件到 MinerU 服务器。"""
+        """流式上传文件到 MinerU 服务器（显式 Content-Length，不使用分块编码）。"""
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                with open(file_path, "rb") as f:
-                    # 注意：MinerU 上传时不需要设置 Content-Type
-                    resp = await client.put(upload_url, content=f.read())
+            # 注意：MinerU 上传时不需要设置 Content-Type
+            resp = await self._send(
+                "PUT",
+                upload_url,
+                content=_iter_file(file_path),
+                headers={"Content-Length": str(os.path.getsize(file_path))},
+            )
         except Exception as e:
             logger.error(f"Upload file failed: {str(e)}")
             raise MinerUAPIException(
@@ -194,107 +317,100 @@ class MinerUClient(BaseOCRClient):
                 details=f"HTTP {resp.status_code}: {resp.text}",
             )
 
-    async def _poll_and_get_result(self, batch_id: str) -> str:
-        """轮询任务状态，直到完成。返回 markdown 内容。"""
-        url = self._build_url(MINERU_BATCH_RESULTS.format(batch_id=batch_id))
-        headers = self._get_headers()
-
-        poll_count = 0
-        while poll_count < self.max_polls:
-            await asyncio.sleep(self.poll_interval)
-            poll_count += 1
+    async def _poll_and_get_results(self, batch_id: str, files: int) -> List[str]:
+        """等待共享轮询器报告批次完成，并发下载各文件结果。返回按提交顺序排列的 markdown。"""
+        results = await get_mineru_poller().wait(
+            batch_id,
+            self._fetch_batch_results,
+            timeout=self.poll_timeout,
+            files=files,
+        )
 
-            try:
-                async with httpx.AsyncClient(timeout=self.timeout) as client:
-                    resp = await client.get(url, headers=headers)
-            except Exception as e:
-                logger.warning(f"Poll task status failed: {str(e)}, retrying...")
-                continue
+        # 按 data_id 对应到提交顺序（缺少 data_id 时按返回顺序）
+        by_data_id = {result.get("data_id"): result for result in results}
+        ordered = [by_data_id.get(_data_id(index), results[index]) for index in range(files)]
 
-            if resp.status_code != 200:
-                logger.warning(
-                    f"Poll task status failed: HTTP {resp.status_code}, retrying..."
+        zip_urls = []
+        for index, result in enumerate(ordered):
+            if result.get("state") == "failed":
+                raise MinerUAPIException(
+                    message="MinerU 任务失败",
+                    details=f"Error: {result.get('err_msg', '')}"
+                    + (f" (file {index + 1}/{files})" if files > 1 else ""),
                 )
-                continue
-
-            try:
-                data = resp.json()
-                if data.get("code") != 0:
-                    logger.warning(
-                        f"Poll task failed: Code {data.get('code')}, retrying..."
-                    )
-                    continue
-
-                # 检查状态
-                result = data["data"]["extract_result"][0]
-                state = result.get("state")
-                err_msg = result.get("err_msg", "")
-
-                if state == "done":
-                    # 任务完成，下载结果
-                    zip_url = result.get("full_zip_url")
-                    if not zip_url:
-                        raise MinerUAPIException(
-                            message="任务完成但无结果 URL",
-                            details="Missing full_zip_url in response",
-                        )
-                    markdown = await self._download_and_extract_markdown(zip_url)
-                    logger.info("Task completed successfully")
-                    return markdown
-
-                elif state == "failed":
-                    raise MinerUAPIException(
-                        message="MinerU 任务失败",
-                        details=f"Error: {err_msg}",
-                    )
-
-                elif state in ["pending", "running", "converting", "waiting-file"]:
-                    # 继续等待
-                    progress = result.get("extract_progress", {})
-                    extracted = progress.get("extracted_pages", 0)
-                    total = progress.get("total_pages", 0)
-                    logger.info(
-                        f"Task running: {state}, progress {extracted}/{total}"
-                    )
-                    continue
-                else:
-                    logger.warning(f"Unknown state: {state}, retrying...")
-                    continue
+            zip_url = result.get("full_zip_url")
+            if not zip_url:
+                raise MinerUAPIException(
+                    message="任务完成但无结果 URL",
+                    details="Missing full_zip_url in response",
+                )
+            zip_urls.append(zip_url)
 
-            except KeyError as e:
-                logger.warning(f"Parse response failed: {str(e)}, retrying...")
-                continue
+        markdowns = await asyncio.gather(*(
+            self._download_and_extract_markdown(zip_url) for zip_url in zip_urls
+        ))
+        logger.info("Task completed successfully")
+        return list(markdowns)
 
-        raise MinerUAPIException(
-            message="MinerU 任务超时",
-            details=f"Task did not complete within {self.max_polls * self.poll_interval} seconds",
-        )
+    async def _fetch_batch_results(self, batch_id: str) -> List[Dict[str, Any]]:
+        """查询一次批次状态，返回 extract_result 列表（供共享轮询器调用）。"""
+        url = self._build_url(MINERU_BATCH_RESULTS.format(batch_id=batch_id))
+        resp = await self._send("GET", url, headers=self._get_headers())
 
-    async def _download_and_extract_markdown(self, zip_url: str) -> str:
-        """下载结果 ZIP 文件，提取 markdown 内容。"""
-        try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                resp = await client.get(zip_url)
-        except Exception as e:
-            logger.error(f"Download result ZIP failed: {str(e)}")
+        if resp.status_code != 200:
             raise MinerUAPIException(
-                message="下载结果失败",
-                details=str(e),
+                message="查询任务状态失败",
+                details=f"HTTP {resp.status_code}",
             )
 
-        if resp.status_code != 200:
-            logger.error(
-                "Download result ZIP failed: status=%s",
-                resp.status_code,
+        data = resp.json()
+        if data.get("code") != 0:
+            raise MinerUAPIException(
+                message="查询任务状态失败",
+                details=f"Code: {data.get('code')}, Msg: {data.get('msg')}",
             )
+
+        try:
+            return data["data"]["extract_result"]
+        except (KeyError, TypeError) as e:
             raise MinerUAPIException(
-                message="下载结果失败",
-                details=f"HTTP {resp.status_code}",
+                message="任务状态响应格式错误",
+                details=f"Missing key: {str(e)}",
             )
 
+    async def _download_and_extract_markdown(self, zip_url: str) -> str:
+        """流式下载结果 ZIP 到临时文件（较小时留在内存），提取 markdown 内容。"""
+        with tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_SIZE) as spool:
+            try:
+                async with get_mineru_http_client().stream("GET", zip_url) as resp:
+                    if resp.status_code != 200:
+                        logger.error(
+                            "Download result ZIP failed: status=%s",
+                            resp.status_code,
+                        )
+                        raise MinerUAPIException(
+                            message="下载结果失败",
+                            details=f"HTTP {resp.status_code}",
+                        )
+                    async for chunk in resp.aiter_bytes(_CHUNK_SIZE):
+                        spool.write(chunk)
+            except MinerUAPIException:
+                raise
+            except Exception as e:
+                logger.error(f"Download result ZIP failed: {str(e)}")
+                raise MinerUAPIException(
+                    message="下载结果失败",
+                    details=str(e),
+                )
+
+            spool.seek(0)
+            return self._extract_markdown(spool)
+
+    def _extract_markdown(self, zip_file) -> str:
+        """从结果 ZIP（文件对象）中提取 markdown 内容。"""
         try:
             # 解析 ZIP
-            with zipfile.ZipFile(BytesIO(resp.content)) as z:
+            with zipfile.ZipFile(zip_file) as z:
                 # 查找 markdown 文件（通常叫 document.md）
                 md_files = [f for f in z.namelist() if f.endswith(".md")]
                 if not md_files:
@@ -306,6 +422,8 @@ class MinerUClient(BaseOCRClient):
                 with z.open(md_files[0]) as f:
                     markdown = f.read().decode("utf-8")
                     return markdown
+        except MinerUAPIException:
+            raise
         except zipfile.BadZipFile as e:
             logger.error(f"Parse result ZIP failed: {str(e)}")
             raise MinerUAPIException(
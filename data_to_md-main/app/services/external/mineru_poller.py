@@ -0,0 +1,331 @@
+"""
+MinerU 任务状态共享轮询器
+进程内所有等待 MinerU 结果的协程共用一个后台轮询循环
+
+规则：
+- 同一 batch_id 的多个等待者合并为一次状态查询（一个批次内的多个文件也只查一次）
+- 每个批次按自己的节奏轮询：
+    * 有页数进度时，按观测到的解析速度估计剩余时间，在剩余时间的一半处再查
+    * 没有进度（排队、等待文件）时按指数退避，间隔从 MINERU_POLL_INTERVAL 翻倍到 MINERU_POLL_MAX_INTERVAL
+    * 间隔带 ±25% 随机抖动，避免同时提交的任务在同一时刻集中查询
+- 全局限速：每 MINERU_POLL_INTERVAL 秒最多发出 MINERU_POLL_MAX_REQUESTS 个状态查询，
+  到期的批次按到期时间先后排队
+- 批次内所有文件都进入终态（done / failed）时唤醒等待者；查询失败按退避重试
+"""
+import random
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from app.config import get_settings
+from app.exceptions.service_exceptions import MinerUAPIException
+
+logger = logging.getLogger(__name__)
+
+# 查询一个批次的状态：batch_id -> extract_result 列表
+BatchFetcher = Callable[[str], Awaitable[List[Dict[str, Any]]]]
+
+# 批次内单个文件的终态
+TERMINAL_STATES = {"done", "failed"}
+
+
+def summarize_progress(results: List[Dict[str, Any]]) -> Tuple[int, int]:
+    """
+    汇总批次内各文件的页数进度
+
+    Args:
+        results: extract_result 列表
+
+    Returns:
+        (已解析页数, 总页数)；已完成的文件按全部页数计入
+    """
+    extracted = 0
+    total = 0
+    for result in results:
+        progress = result.get("extract_progress") or {}
+        pages = int(progress.get("total_pages") or 0)
+        done = pages if result.get("state") == "done" else int(progress.get("extracted_pages") or 0)
+        extracted += min(done, pages)
+        total += pages
+    return extracted, total
+
+
+def next_poll_delay(
+    attempt: int,
+    base_interval: float,
+    max_interval: float,
+    remaining: Optional[float] = None,
+    rng: Optional[random.Random] = None
+) -> float:
+    """
+    计算下一次轮询前的等待时间
+
+    Args:
+        attempt: 本批次已轮询次数（无进度时用于指数退避）
+        base_interval: 最小间隔（秒）
+        max_interval: 最大间隔（秒）
+        remaining: 按解析速度估计的剩余时间（秒），未知时为 None
+        rng: 随机数生成器
+
+    Returns:
+        float: 等待秒数
+    """
+    if remaining is not None:
+        delay = remaining / 2
+    else:
+        delay = base_interval * (2 ** min(attempt, 16))
+    delay = min(max_interval, max(base_interval, delay))
+    return delay * (rng or random).uniform(0.75, 1.25)
+
+
+class _BatchEntry:
+    """一个正在等待的批次"""
+
+    def __init__(self, batch_id: str, fetch: BatchFetcher, future: asyncio.Future, deadline: float, files: int = 1):
+        self.batch_id = batch_id
+        self.files = files
+        self.fetch = fetch
+        self.future = future
+        self.deadline = deadline
+        self.waiters = 0
+        self.due = 0.0
+        self.polls = 0
+        # 第一次观测到页数进度的 (时间, 已解析页数)，用于估计解析速度
+        self.first_progress: Optional[Tuple[float, int]] = None
+
+
+class MinerUBatchPoller:
+    """MinerU 批次状态共享轮询器"""
+
+    def __init__(
+        self,
+        base_interval: float = 2.0,
+        max_interval: float = 30.0,
+        max_requests: int = 4,
+        timeout: float = 600.0,
+        rng: Optional[random.Random] = None
+    ):
+        """
+        初始化轮询器
+
+        Args:
+            base_interval: 最小轮询间隔，同时是全局限速的时间窗口（秒）
+            max_interval: 最大轮询间隔（秒）
+            max_requests: 每个时间窗口内最多发出的状态查询数
+            timeout: 单个批次的默认等待超时（秒）
+            rng: 随机数生成器（用于抖动）
+        """
+        self.base_interval = base_interval
+        self.max_interval = max_interval
+        self.max_requests = max(1, max_requests)
+        self.timeout = timeout
+        self.rng = rng or random.Random()
+
+        self._entries: Dict[str, _BatchEntry] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._last_round = float("-inf")
+
+        self.requests = 0
+        self.rounds = 0
+        self.completed = 0
+
+    async def wait(
+        self,
+        batch_id: str,
+        fetch: BatchFetcher,
+        timeout: Optional[float] = None,
+        files: int = 1
+    ) -> List[Dict[str, Any]]:
+        """
+        等待批次内所有文件进入终态
+
+        同一 batch_id 的并发等待共享一次查询；fetch 取第一个等待者提供的。
+
+        Args:
+            batch_id: MinerU 批次 ID
+            fetch: 查询批次状态的协程函数
+            timeout: 等待超时（秒），为空时使用默认值
+            files: 批次内的文件数，返回的结果数达到该值且全部进入终态才算完成
+
+        Returns:
+            List[Dict[str, Any]]: 批次的 extract_result 列表
+
+        Raises:
+            MinerUAPIException: 等待超时
+        """
+        self._bind_loop()
+        now = self._loop.time()
+
+        entry = self._entries.get(batch_id)
+        if entry is None:
+            entry = _BatchEntry(
+                batch_id,
+                fetch,
+                self._loop.create_future(),
+                now + (timeout if timeout is not None else self.timeout),
+                files
+            )
+            entry.due = now + next_poll_delay(0, self.base_interval, self.max_interval, rng=self.rng)
+            self._entries[batch_id] = entry
+            self._ensure_running()
+
+        entry.waiters += 1
+        try:
+            return await asyncio.shield(entry.future)
+        finally:
+            entry.waiters -= 1
+            if entry.waiters == 0 and not entry.future.done():
+                # 没有等待者了：不再轮询该批次
+                entry.future.cancel()
+                if self._entries.get(batch_id) is entry:
+                    del self._entries[batch_id]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        轮询统计
+
+        Returns:
+            Dict[str, Any]: 等待中的批次数、查询次数、轮次数与完成数
+        """
+        return {
+            "pending_batches": len(self._entries),
+            "requests": self.requests,
+            "rounds": self.rounds,
+            "completed": self.completed,
+            "max_requests_per_interval": self.max_requests,
+        }
+
+    def _bind_loop(self):
+        """绑定当前事件循环；循环变化时丢弃旧循环上的批次"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._entries.clear()
+            self._task = None
+            self._wakeup = asyncio.Event()
+            self._last_round = float("-inf")
+
+    def _ensure_running(self):
+        """启动（或唤醒）后台轮询循环"""
+        if self._task is None or self._task.done():
+            self._task = self._loop.create_task(self._run())
+        else:
+            self._wakeup.set()
+
+    async def _run(self):
+        """后台轮询循环：取到期的批次，按全局限速分轮查询"""
+        while self._entries:
+            now = self._loop.time()
+            next_due = min(entry.due for entry in self._entries.values())
+            start_at = max(next_due, self._last_round + self.base_interval)
+            if start_at > now:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=start_at - now)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            due = sorted(
+                (entry for entry in self._entries.values() if entry.due <= now),
+                key=lambda entry: entry.due
+            )[:self.max_requests]
+            self._last_round = now
+            self.rounds += 1
+            await asyncio.gather(*(self._poll(entry) for entry in due))
+
+    async def _poll(self, entry: _BatchEntry):
+        """
+        查询一个批次并更新其下一次轮询时间
+
+        Args:
+            entry: 批次
+        """
+        entry.polls += 1
+        self.requests += 1
+        remaining = None
+        try:
+            results = await entry.fetch(entry.batch_id)
+        except Exception as e:
+            logger.warning(f"Poll MinerU batch {entry.batch_id} failed: {str(e)}, retrying...")
+        else:
+            if len(results) >= entry.files and all(result.get("state") in TERMINAL_STATES for result in results):
+                self._finish(entry, results=results)
+                return
+            remaining = self._estimate_remaining(entry, results)
+
+        now = self._loop.time()
+        if now >= entry.deadline:
+            self._finish(entry, error=MinerUAPIException(
+                message="MinerU 任务超时",
+                details=f"Batch {entry.batch_id} did not complete after {entry.polls} polls",
+            ))
+            return
+
+        delay = next_poll_delay(entry.polls, self.base_interval, self.max_interval, remaining, self.rng)
+        entry.due = min(now + delay, entry.deadline)
+
+    def _estimate_remaining(self, entry: _BatchEntry, results: List[Dict[str, Any]]) -> Optional[float]:
+        """
+        按观测到的解析速度估计批次剩余耗时
+
+        Args:
+            entry: 批次
+            results: 本次查询到的 extract_result 列表
+
+        Returns:
+            Optional[float]: 剩余秒数；尚无进度或速度未知时为 None
+        """
+        extracted, total = summarize_progress(results)
+        states = {result.get("state") for result in results}
+        logger.info(f"MinerU batch {entry.batch_id}: {'/'.join(sorted(map(str, states)))}, progress {extracted}/{total}")
+
+        if not total:
+            return None
+        now = self._loop.time()
+        if entry.first_progress is None:
+            entry.first_progress = (now, extracted)
+            return None
+
+        first_time, first_pages = entry.first_progress
+        if extracted <= first_pages or now <= first_time:
+            return None
+        rate = (extracted - first_pages) / (now - first_time)
+        return (total - extracted) / rate
+
+    def _finish(self, entry: _BatchEntry, results: Optional[List[Dict[str, Any]]] = None, error: Optional[Exception] = None):
+        """结束批次并唤醒等待者"""
+        if self._entries.get(entry.batch_id) is entry:
+            del self._entries[entry.batch_id]
+        if entry.future.done():
+            return
+        if error is not None:
+            entry.future.set_exception(error)
+        else:
+            self.completed += 1
+            entry.future.set_result(results)
+
+
+# 进程内共享的轮询器
+_poller: Optional[MinerUBatchPoller] = None
+
+
+def get_mineru_poller() -> MinerUBatchPoller:
+    """
+    获取进程内共享的 MinerU 轮询器
+
+    Returns:
+        MinerUBatchPoller: 轮询器实例
+    """
+    global _poller
+
+    if _poller is None:
+        settings = get_settings()
+        _poller = MinerUBatchPoller(
+            base_interval=settings.mineru_poll_interval,
+            max_interval=settings.mineru_poll_max_interval,
+            max_requests=settings.mineru_poll_max_requests,
+            timeout=settings.mineru_poll_timeout
+        )
+    return _poller
@@ -0,0 +1,234 @@
+"""
+OCR 对冲请求（hedged requests）
+单页 OCR 超过延迟分位数阈值仍未返回时，再发起一次请求（同一引擎或配置的备用引擎），
+取先完成者的结果并取消另一个，削减长尾页面拖慢整份文档的情况
+
+说明：
+- 阈值：最近成功调用延迟的 OCR_HEDGE_PERCENTILE 分位数，不低于 OCR_HEDGE_MIN_DELAY；
+  样本少于 OCR_HEDGE_MIN_SAMPLES 时不对冲
+- 计时从主请求拿到调度名额后开始，排队等待不计入
+- 节省时间为估算值：对冲胜出时，按历史样本中超过已耗时的延迟均值估计主请求的剩余耗时
+"""
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# 一次 OCR 调用：参数为“已拿到名额”事件，调用方在真正开始请求时 set()
+OCRCall = Callable[[asyncio.Event], Awaitable[Any]]
+
+
+class LatencyTracker:
+    """最近 N 次成功调用的延迟样本"""
+
+    def __init__(self, window: int = 200):
+        """
+        初始化样本窗口
+
+        Args:
+            window: 保留的样本数量
+        """
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, latency: float):
+        """
+        记录一次延迟
+
+        Args:
+            latency: 耗时（秒）
+        """
+        self._samples.append(latency)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        计算延迟分位数
+
+        Args:
+            q: 分位（0-1）
+
+        Returns:
+            Optional[float]: 分位数，无样本时为 None
+        """
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+        return ordered[index]
+
+    def expected_remaining(self, elapsed: float) -> float:
+        """
+        估计已耗时 elapsed 的请求还需多久完成
+
+        Args:
+            elapsed: 已耗时（秒）
+
+        Returns:
+            float: 估计剩余耗时（秒），历史上没有更慢的样本时为 0
+        """
+        slower = [latency for latency in self._samples if latency > elapsed]
+        if not slower:
+            return 0.0
+        return sum(slower) / len(slower) - elapsed
+
+
+class OCRHedger:
+    """OCR 对冲执行器"""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        percentile: float = 0.95,
+        min_delay: float = 5.0,
+        min_samples: int = 20,
+        window: int = 200
+    ):
+        """
+        初始化执行器
+
+        Args:
+            enabled: 是否启用对冲
+            percentile: 触发对冲的延迟分位
+            min_delay: 最小对冲延迟（秒）
+            min_samples: 开始对冲所需的最少样本数
+            window: 延迟样本窗口
+        """
+        self.enabled = enabled
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.latencies = LatencyTracker(window)
+
+        self.calls = 0
+        self.hedges_fired = 0
+        self.hedge_wins = 0
+        self.saved_seconds = 0.0
+
+    def hedge_delay(self) -> Optional[float]:
+        """
+        当前对冲阈值
+
+        Returns:
+            Optional[float]: 主请求超过该耗时（秒）后发起对冲；不对冲时为 None
+        """
+        if not self.enabled or len(self.latencies) < self.min_samples:
+            return None
+        return max(self.min_delay, self.latencies.percentile(self.percentile))
+
+    async def run(self, primary: OCRCall, hedge: OCRCall) -> Tuple[Any, bool]:
+        """
+        执行 OCR 调用，超过阈值时发起对冲请求
+
+        Args:
+            primary: 主请求
+            hedge: 对冲请求（同一引擎或备用引擎）
+
+        Returns:
+            (结果, 是否由对冲请求返回)
+        """
+        self.calls += 1
+        started = asyncio.Event()
+        primary_task = asyncio.create_task(primary(started))
+        tasks = [primary_task]
+
+        try:
+            # 等待主请求拿到调度名额（或提前结束）
+            started_waiter = asyncio.create_task(started.wait())
+            tasks.append(started_waiter)
+            await asyncio.wait({primary_task, started_waiter}, return_when=asyncio.FIRST_COMPLETED)
+
+            delay = self.hedge_delay()
+            if delay is None:
+                return await primary_task, False
+
+            start = time.monotonic()
+            done, _ = await asyncio.wait({primary_task}, timeout=delay)
+            if done:
+                return primary_task.result(), False
+
+            self.hedges_fired += 1
+            logger.info(f"OCR call exceeded {delay:.1f}s, sending hedged request")
+            hedge_task = asyncio.create_task(hedge(asyncio.Event()))
+            tasks.append(hedge_task)
+
+            pending = {primary_task, hedge_task}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((t for t in done if not t.cancelled() and t.exception() is None), None)
+                if winner is None:
+                    continue
+                if winner is hedge_task:
+                    self.hedge_wins += 1
+                    self.saved_seconds += self.latencies.expected_remaining(time.monotonic() - start)
+                return winner.result(), winner is hedge_task
+
+            # 两个请求都失败：抛出主请求的异常
+            return primary_task.result(), False
+        finally:
+            # 取消落后的请求
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        对冲统计
+
+        Returns:
+            Dict[str, Any]: 当前阈值、对冲次数、对冲胜出次数、估算节省时间
+        """
+        delay = self.hedge_delay()
+        return {
+            "enabled": self.enabled,
+            "hedge_delay": round(delay, 3) if delay is not None else None,
+            "samples": len(self.latencies),
+            "calls": self.calls,
+            "hedges_fired": self.hedges_fired,
+            "hedge_wins": self.hedge_wins,
+            "hedge_rate": round(self.hedges_fired / self.calls, 4) if self.calls else 0.0,
+            "saved_seconds": round(self.saved_seconds, 2),
+        }
+
+
+# 进程内按主引擎共享的对冲执行器
+_hedgers: Dict[str, OCRHedger] = {}
+
+
+def get_ocr_hedger(engine: str) -> OCRHedger:
+    """
+    获取指定主引擎的共享对冲执行器
+
+    Args:
+        engine: 主 OCR 引擎名称
+
+    Returns:
+        OCRHedger: 对冲执行器
+    """
+    hedger = _hedgers.get(engine)
+    if hedger is None:
+        settings = get_settings()
+        hedger = OCRHedger(
+            enabled=settings.ocr_hedge_enabled,
+            percentile=settings.ocr_hedge_percentile,
+            min_delay=settings.ocr_hedge_min_delay,
+            min_samples=settings.ocr_hedge_min_samples
+        )
+        _hedgers[engine] = hedger
+    return hedger
+
+
+def get_hedger_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    所有对冲执行器的统计信息
+
+    Returns:
+        Dict[str, Dict[str, Any]]: 引擎名 -> 统计
+    """
+    return {engine: hedger.stats() for engine, hedger in _hedgers.items()}
@@ -0,0 +1,305 @@
+"""
+全局 OCR 调度器
+所有转换任务的逐页 OCR 调用共享同一份并发预算，并按任务做加权公平排队（WFQ）
+
+说明：
+- 进程内：同时在途的 OCR 调用数不超过 DeepSeek 并发限制器的当前上限；
+  名额空出时，优先放行虚拟完成时间最小的请求（自计时公平排队，SCFQ），
+  因此大文档持续排队时，新到的小文档也能按权重分到名额，很快完成
+- 进程间：通过 {cache_dir}/ocr_slots 下的文件锁（flock）共享全局名额，
+  同一目录下的所有 uvicorn worker 合计不超过 OCR_SCHEDULER_GLOBAL_SLOTS；
+  进程退出时锁自动释放。不支持 fcntl 的平台只做进程内调度
+"""
+import os
+import heapq
+import asyncio
+import logging
+import itertools
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+from app.config import get_settings
+from app.services.external.concurrency_limiter import get_concurrency_limiter
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# 全局名额被其他进程占满时的重试间隔（秒）
+_GLOBAL_RETRY_INTERVAL = 0.05
+
+
+class FileSlotPool:
+    """基于文件锁的跨进程名额池"""
+
+    def __init__(self, directory: str, slots: int):
+        """
+        初始化名额池
+
+        Args:
+            directory: 锁文件目录（同一进程组内的 worker 需使用同一目录）
+            slots: 名额数量
+        """
+        self.directory = Path(directory)
+        self.slots = slots
+        self._fds: Dict[int, int] = {}
+        self._held: set = set()
+
+    def try_acquire(self) -> Optional[int]:
+        """
+        非阻塞获取一个名额
+
+        Returns:
+            Optional[int]: 名额编号，全部被占用时为 None
+        """
+        for slot in range(self.slots):
+            if slot in self._held:
+                continue
+            fd = self._open(slot)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                continue
+            self._held.add(slot)
+            return slot
+        return None
+
+    def release(self, slot: int):
+        """
+        释放名额
+
+        Args:
+            slot: 名额编号
+        """
+        if slot in self._held:
+            fcntl.flock(self._fds[slot], fcntl.LOCK_UN)
+            self._held.discard(slot)
+
+    def release_all(self):
+        """释放本进程持有的全部名额"""
+        for slot in list(self._held):
+            self.release(slot)
+
+    def _open(self, slot: int) -> int:
+        """打开（必要时创建）名额对应的锁文件"""
+        fd = self._fds.get(slot)
+        if fd is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd = os.open(str(self.directory / f"slot-{slot}.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+            self._fds[slot] = fd
+        return fd
+
+
+@dataclass(order=True)
+class _Ticket:
+    """一次排队中的 OCR 请求"""
+    finish: float
+    seq: int
+    flow_id: str = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    global_slot: Optional[int] = field(default=None, compare=False)
+    cancelled: bool = field(default=False, compare=False)
+
+
+@dataclass
+class _Flow:
+    """一个任务（文档）的排队状态"""
+    last_finish: float = 0.0
+    queued: int = 0
+    running: int = 0
+    served: int = 0
+
+
+class OCRScheduler:
+    """全局 OCR 调度器（加权公平排队）"""
+
+    def __init__(
+        self,
+        capacity: Callable[[], int],
+        global_slots: Optional[FileSlotPool] = None
+    ):
+        """
+        初始化调度器
+
+        Args:
+            capacity: 返回进程内并发上限的函数（随自适应限制器变化）
+            global_slots: 跨进程名额池（为空时只做进程内调度）
+        """
+        self.capacity = capacity
+        self.global_slots = global_slots
+
+        self._heap: List[_Ticket] = []
+        self._flows: Dict[str, _Flow] = {}
+        self._virtual_time = 0.0
+        self._running = 0
+        self._seq = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._retry_handle: Optional[asyncio.TimerHandle] = None
+
+    @asynccontextmanager
+    async def slot(self, flow_id: str, weight: float = 1.0, cost: float = 1.0) -> AsyncIterator[None]:
+        """
+        排队获取一个 OCR 名额
+
+        Args:
+            flow_id: 任务标识（同一文档的页面使用同一标识）
+            weight: 任务权重，权重越大分到的名额越多
+            cost: 本次请求的代价（默认每页 1）
+
+        Yields:
+            None
+        """
+        self._bind_loop()
+
+        flow = self._flows.setdefault(flow_id, _Flow())
+        start = max(self._virtual_time, flow.last_finish)
+        flow.last_finish = start + cost / max(weight, 1e-6)
+        flow.queued += 1
+
+        ticket = _Ticket(
+            finish=flow.last_finish,
+            seq=next(self._seq),
+            flow_id=flow_id,
+            future=self._loop.create_future()
+        )
+        heapq.heappush(self._heap, ticket)
+        self._dispatch()
+
+        try:
+            await ticket.future
+        except asyncio.CancelledError:
+            if ticket.future.done() and not ticket.future.cancelled():
+                # 已放行但随即取消：归还名额
+                self._release(ticket)
+            else:
+                ticket.cancelled = True
+                flow.queued -= 1
+                self._forget_idle(flow_id)
+            raise
+
+        try:
+            yield
+        finally:
+            self._release(ticket)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        调度器统计
+
+        Returns:
+            Dict[str, Any]: 并发上限、在途与排队数量、各任务的排队情况
+        """
+        return {
+            "capacity": self.capacity(),
+            "running": self._running,
+            "queued": sum(flow.queued for flow in self._flows.values()),
+            "global_slots": self.global_slots.slots if self.global_slots else None,
+            "flows": {
+                flow_id: {"queued": flow.queued, "running": flow.running, "served": flow.served}
+                for flow_id, flow in self._flows.items()
+            },
+        }
+
+    def _bind_loop(self):
+        """绑定当前事件循环；循环变化时丢弃旧循环上的排队状态"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._heap.clear()
+            self._flows.clear()
+            self._running = 0
+            self._virtual_time = 0.0
+            self._retry_handle = None
+            if self.global_slots is not None:
+                self.global_slots.release_all()
+
+    def _dispatch(self):
+        """在并发上限内，按虚拟完成时间依次放行排队请求"""
+        while self._heap and self._running < self.capacity():
+            ticket = self._heap[0]
+            if ticket.cancelled:
+                heapq.heappop(self._heap)
+                continue
+
+            if self.global_slots is not None:
+                slot = self.global_slots.try_acquire()
+                if slot is None:
+                    # 其他进程占满全局名额，稍后重试
+                    self._schedule_retry()
+                    return
+                ticket.global_slot = slot
+
+            heapq.heappop(self._heap)
+            self._virtual_time = max(self._virtual_time, ticket.finish)
+            flow = self._flows[ticket.flow_id]
+            flow.queued -= 1
+            flow.running += 1
+            self._running += 1
+            ticket.future.set_result(None)
+
+    def _schedule_retry(self):
+        """全局名额不足时定时重新调度"""
+        if self._retry_handle is None or self._retry_handle.cancelled():
+            def retry():
+                self._retry_handle = None
+                self._dispatch()
+            self._retry_handle = self._loop.call_later(_GLOBAL_RETRY_INTERVAL, retry)
+
+    def _release(self, ticket: _Ticket):
+        """
+        归还名额并放行下一个请求
+
+        Args:
+            ticket: 已放行的请求
+        """
+        if ticket.global_slot is not None:
+            self.global_slots.release(ticket.global_slot)
+            ticket.global_slot = None
+
+        flow = self._flows.get(ticket.flow_id)
+        if flow is not None:
+            flow.running -= 1
+            flow.served += 1
+            self._forget_idle(ticket.flow_id)
+
+        self._running = max(0, self._running - 1)
+        self._dispatch()
+
+    def _forget_idle(self, flow_id: str):
+        """删除没有排队与在途请求的任务"""
+        flow = self._flows.get(flow_id)
+        if flow is not None and flow.queued <= 0 and flow.running <= 0:
+            del self._flows[flow_id]
+
+
+# 进程内共享的调度器
+_ocr_scheduler: Optional[OCRScheduler] = None
+
+
+def get_ocr_scheduler() -> OCRScheduler:
+    """
+    获取共享的 OCR 调度器
+
+    Returns:
+        OCRScheduler: 调度器实例
+    """
+    global _ocr_scheduler
+
+    if _ocr_scheduler is None:
+        settings = get_settings()
+        limiter = get_concurrency_limiter("deepseek")
+
+        global_slots = None
+        slots = settings.ocr_scheduler_global_slots or limiter.max_limit
+        if fcntl is not None:
+            global_slots = FileSlotPool(os.path.join(settings.cache_dir, "ocr_slots"), slots)
+        else:
+            logger.warning("fcntl is not available, OCR scheduler only limits this process")
+
+        _ocr_scheduler = OCRScheduler(capacity=lambda: limiter.limit, global_slots=global_slots)
+
+    return _ocr_scheduler
@@ -0,0 +1,395 @@
+"""
+逐页内容片段存储
+按任务保存 PDF 转换得到的 ContentChunk 列表，切换输出模式时直接重新生成 Markdown，
+无需重新上传和 OCR
+
+说明：
+- 每个任务一个文件 {chunk_dir}/{task_id}.json.gz：gzip 压缩的紧凑 JSON，
+  包含生成 Markdown 所需的文件信息（不含逐页分析结果）与片段列表
+- 片段按 [content, page_number, chunk_type, metadata] 数组保存，不重复字段名
+- 写入先落临时文件再原子替换，读取时文件缺失或损坏视为不存在
+- 读取时逐个解析片段，不把整个记录读入内存（有界内存模式的大文档可流式重新生成）
+- 保留策略：写入时清理超过 CHUNK_STORE_TTL_HOURS 的文件，总大小超过 CHUNK_STORE_MAX_MB 时
+  按最近使用时间淘汰（重新生成会更新使用时间）；同目录下的重新生成结果 {task_id}.render.md 一并计入
+"""
+import os
+import re
+import gzip
+import json
+import time
+import shutil
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+from app.config import get_settings
+from app.core.base.processor import ContentChunk
+from app.core.common.chunk_spool import restore_chunk_type
+from app.models.file_info import PDFInfo
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+# 任务ID只允许这些字符，避免拼出目录之外的路径
+_TASK_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]+$')
+
+
+# 流式读取时每次解压的字符数
+_READ_BLOCK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+
+
+def _dumps(value) -> str:
+    """紧凑 JSON 序列化"""
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=str)
+
+
+class _RecordReader:
+    """从文本流中逐个读取 JSON 值与分隔符（不把整个记录读入内存）"""
+
+    def __init__(self, f: TextIO):
+        self._f = f
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """读取下一块数据，已到文件末尾时返回 False"""
+        data = self._f.read(_READ_BLOCK_SIZE)
+        if not data:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + data
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """跳过空白，返回下一个字符（不消费）"""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos].isspace():
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise ValueError("unexpected end of chunk record")
+
+    def expect(self, chars: str) -> str:
+        """消费一个分隔符，必须是 chars 中的字符"""
+        char = self.peek()
+        if char not in chars:
+            raise ValueError(f"unexpected {char!r} in chunk record")
+        self._pos += 1
+        return char
+
+    def value(self) -> Any:
+        """读取一个 JSON 值（缓冲区中的值不完整时继续读取）"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._pos)
+                # 缓冲区末尾的数字可能被截断，读到下一块后再确认
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            self._fill()
+
+
+def _read_header(reader: _RecordReader) -> Dict[str, Any]:
+    """
+    读取记录头（chunks 之前的字段），读取后位于片段数组开头
+
+    Args:
+        reader: 记录读取器
+
+    Returns:
+        Dict[str, Any]: 记录头字段
+
+    Raises:
+        ValueError: 格式错误或没有 chunks 字段
+    """
+    header = {}
+    reader.expect('{')
+    while True:
+        key = reader.value()
+        reader.expect(':')
+        if key == 'chunks':
+            reader.expect('[')
+            return header
+        header[key] = reader.value()
+        reader.expect(',')
+
+
+class StoredChunks:
+    """
+    已保存的内容片段（可重复迭代，每次迭代从压缩文件中逐个读取）
+
+    用于有界内存模式任务的重新生成，MarkdownGenerator.write 回退时会再次迭代。
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        # 最近一次完整迭代的片段数
+        self.count = 0
+
+    def __iter__(self) -> Iterator[ContentChunk]:
+        count = 0
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            reader = _RecordReader(f)
+            _read_header(reader)
+            if reader.peek() != ']':
+                while True:
+                    content, page_number, chunk_type, metadata = reader.value()
+                    yield ContentChunk(
+                        content=content,
+                        page_number=page_number,
+                        chunk_type=restore_chunk_type(chunk_type),
+                        metadata=metadata
+                    )
+                    count += 1
+                    if reader.expect(',]') == ']':
+                        break
+        self.count = count
+
+
+class ChunkStore:
+    """逐页内容片段存储"""
+
+    def __init__(
+        self,
+        store_dir: str,
+        enabled: bool = True,
+        compress_level: int = 6,
+        ttl_seconds: float = 0,
+        max_bytes: int = 0
+    ):
+        """
+        初始化存储
+
+        Args:
+            store_dir: 存储目录
+            enabled: 是否启用
+            compress_level: gzip 压缩级别（1-9）
+            ttl_seconds: 文件保留时间（秒，按最近使用时间计算），0 表示不过期
+            max_bytes: 目录总大小上限（字节），0 表示不限制
+        """
+        self.store_dir = Path(store_dir)
+        self.enabled = enabled
+        self.compress_level = compress_level
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+
+    def path(self, task_id: str) -> Optional[Path]:
+        """
+        获取任务的片段文件路径
+
+        Args:
+            task_id: 任务ID
+
+        Returns:
+            Optional[Path]: 文件路径；任务ID不合法时为 None
+        """
+        if not _TASK_ID_PATTERN.match(task_id or ''):
+            return None
+        return self.store_dir / f"{task_id}.json.gz"
+
+    def render_path(self, task_id: str) -> Optional[Path]:
+        """
+        获取任务重新生成的 Markdown 文件路径（有界内存模式任务的重新生成结果）
+
+        Args:
+            task_id: 任务ID
+
+        Returns:
+            Optional[Path]: 文件路径；任务ID不合法时为 None
+        """
+        if not _TASK_ID_PATTERN.match(task_id or ''):
+            return None
+        return self.store_dir / f"{task_id}.render.md"
+
+    def save(self, task_id: str, chunks: Iterable[ContentChunk], file_info: PDFInfo) -> Optional[str]:
+        """
+        保存任务的内容片段（逐个片段写入压缩流，不在内存中拼出整个记录）
+
+        Args:
+            task_id: 任务ID
+            chunks: 内容片段（列表或落盘队列）
+            file_info: 生成 Markdown 使用的文件信息
+
+        Returns:
+            Optional[str]: 保存的文件路径；未启用或写入失败时为 None
+        """
+        path = self.path(task_id)
+        if not self.enabled or path is None:
+            return None
+
+        header = {
+            'version': FORMAT_VERSION,
+            'file_info': file_info.model_dump(mode='json', exclude={'pages'}),
+        }
+        count = 0
+
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            self.store_dir.mkdir(parents=True, exist_ok=True)
+            with gzip.open(tmp_path, 'wb', compresslevel=self.compress_level) as f:
+                # 与整体序列化 {version, file_info, chunks} 的结果逐字节一致
+                f.write(_dumps(header)[:-1].encode('utf-8'))
+                f.write(b',"chunks":[')
+                for chunk in chunks:
+                    if count:
+                        f.write(b',')
+                    f.write(_dumps([chunk.content, chunk.page_number, chunk.chunk_type, chunk.metadata]).encode('utf-8'))
+                    count += 1
+                f.write(b']}')
+            os.replace(tmp_path, path)
+        except OSError as e:
+            tmp_path.unlink(missing_ok=True)
+            logger.warning(f"Failed to save content chunks for {task_id}: {str(e)}")
+            return None
+
+        logger.debug(f"Content chunks saved: {task_id}, {count} chunks, {path.stat().st_size} bytes")
+        self.enforce_retention()
+        return str(path)
+
+    def open(self, task_id: str) -> Optional[Tuple[StoredChunks, PDFInfo]]:
+        """
+        打开任务的内容片段（只读取文件信息，片段在迭代时逐个读取）
+
+        Args:
+            task_id: 任务ID
+
+        Returns:
+            Optional[Tuple[StoredChunks, PDFInfo]]: (可重复迭代的内容片段, 文件信息)；不存在或损坏时为 None
+        """
+        path = self.path(task_id)
+        if not self.enabled or path is None:
+            return None
+
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                header = _read_header(_RecordReader(f))
+            if header.get('version') != FORMAT_VERSION:
+                return None
+            file_info = PDFInfo(**header['file_info'])
+            # 更新使用时间，用于保留策略
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Failed to load content chunks for {task_id}: {str(e)}")
+            return None
+
+        return StoredChunks(path), file_info
+
+    def load(self, task_id: str) -> Optional[Tuple[List[ContentChunk], PDFInfo]]:
+        """
+        读取任务的内容片段
+
+        Args:
+            task_id: 任务ID
+
+        Returns:
+            Optional[Tuple[List[ContentChunk], PDFInfo]]: (内容片段列表, 文件信息)；不存在或损坏时为 None
+        """
+        opened = self.open(task_id)
+        if opened is None:
+            return None
+        stored_chunks, file_info = opened
+
+        try:
+            chunks = list(stored_chunks)
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Failed to load content chunks for {task_id}: {str(e)}")
+            return None
+
+        return chunks, file_info
+
+    def copy(self, source_path: str, task_id: str) -> Optional[str]:
+        """
+        复制已有的片段文件给另一个任务（用于结果缓存命中）
+
+        Args:
+            source_path: 源片段文件路径
+            task_id: 目标任务ID
+
+        Returns:
+            Optional[str]: 保存的文件路径；未启用或复制失败时为 None
+        """
+        path = self.path(task_id)
+        if not self.enabled or path is None:
+            return None
+
+        try:
+            self.store_dir.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(source_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to copy content chunks for {task_id}: {str(e)}")
+            return None
+
+        self.enforce_retention()
+        return str(path)
+
+    def enforce_retention(self):
+        """删除过期文件，并按最近使用时间淘汰直到不超过总大小上限"""
+        if self.ttl_seconds <= 0 and self.max_bytes <= 0:
+            return
+
+        now = time.time()
+        entries = []
+        total_bytes = 0
+        try:
+            paths = list(self.store_dir.iterdir())
+        except OSError:
+            return
+
+        for path in paths:
+            # 跳过写入中的临时文件
+            if path.name.startswith('.'):
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if self.ttl_seconds > 0 and now - stat.st_mtime > self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total_bytes += stat.st_size
+
+        if self.max_bytes <= 0:
+            return
+        for _, size, path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total_bytes -= size
+            logger.debug(f"Content chunks evicted: {path.name}")
+
+
+# 进程内共享的存储实例
+_chunk_store: Optional[ChunkStore] = None
+
+
+def get_chunk_store() -> ChunkStore:
+    """
+    获取共享的内容片段存储
+
+    Returns:
+        ChunkStore: 存储实例
+    """
+    global _chunk_store
+
+    if _chunk_store is None:
+        settings = get_settings()
+        _chunk_store = ChunkStore(
+            store_dir=settings.chunk_dir,
+            enabled=settings.chunk_store_enabled,
+            ttl_seconds=settings.chunk_store_ttl_hours * 3600,
+            max_bytes=settings.chunk_store_max_mb * 1024 * 1024
+        )
+
+    return _chunk_store
@@ -114,6 +114,78 @@ class FileService:
                 details=str(e)
             )
     
+    def copy_output_file(
+        self,
+        source_path: str,
+        task_id: str,
+        original_filename: str,
+        is_pdf: bool = False
+    ) -> str:
+        """
+        复制已有结果作为任务的输出文件（用于缓存命中）
+        
+        Args:
+            source_path: 源文件路径
+            task_id: 任务ID
+            original_filename: 原始文件名
+            is_pdf: 是否为PDF文件
+            
+        Returns:
+            str: 保存的文件路径
+            
+        Raises:
+            StorageException: 复制失败
+        """
+        try:
+            output_filename = self._generate_output_filename(original_filename, task_id, is_pdf=is_pdf)
+            file_path = self.output_dir / output_filename
+            shutil.copyfile(source_path, file_path)
+            
+            logger.info(f"Output file copied: {file_path}")
+            return str(file_path)
+            
+        except Exception as e:
+            logger.error(f"Failed to copy output file: {str(e)}")
+            raise StorageException(
+                message="复制输出文件失败",
+                details=str(e)
+            )
+    
+    def move_output_file(
+        self,
+        source_path: str,
+        task_id: str,
+        original_filename: str
+    ) -> str:
+        """
+        移动已写入磁盘的Markdown作为任务的输出文件（用于有界内存模式）
+        
+        Args:
+            source_path: 源文件路径
+            task_id: 任务ID
+            original_filename: 原始文件名
+            
+        Returns:
+            str: 保存的文件路径
+            
+        Raises:
+            StorageException: 移动失败
+        """
+        try:
+            output_filename = self._generate_output_filename(original_filename, task_id)
+            file_path = self.output_dir / output_filename
+            shutil.move(source_path, file_path)
+            
+            logger.info(f"Output file moved: {file_path}")
+            return str(file_path)
+            
+        except Exception as e:
+            logger.error(f"Failed to move output file: {str(e)}")
+            raise StorageException(
+                message="移动输出文件失败",
+                details=str(e)
+            )
+    
     def get_file_path(self, task_id: str, is_output: bool = True) -> Optional[str]:
         """
         获取文件路径
@@ -0,0 +1,219 @@
+"""
+OCR 结果缓存
+按页面图像内容寻址的磁盘缓存，避免相同页面重复调用 OCR 接口
+
+说明：
+- 键：渲染后图像 + OCR 引擎 + 提示词 + DPI + 模型 的 SHA-256
+- 值：OCR 返回的 Markdown 文本，存放在 {cache_dir}/ocr/ 下
+- 淘汰：按最近访问时间（LRU）淘汰，总大小不超过 OCR_CACHE_MAX_MB
+"""
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Dict, Any
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class OCRResultCache:
+    """OCR 结果缓存（磁盘 + LRU 容量限制）"""
+    
+    def __init__(self, cache_dir: str, max_bytes: int, enabled: bool = True):
+        """
+        初始化缓存
+        
+        Args:
+            cache_dir: 缓存目录
+            max_bytes: 缓存总大小上限（字节）
+            enabled: 是否启用
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        
+        self.hits = 0
+        self.misses = 0
+        
+        # key -> 文件大小，按访问先后排列（最近访问在末尾）
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def make_key(
+        image_base64: str,
+        engine: str,
+        prompt: str,
+        dpi: int,
+        model: str
+    ) -> str:
+        """
+        计算缓存键
+        
+        Args:
+            image_base64: Base64编码的页面图像
+            engine: OCR 引擎
+            prompt: 提示词
+            dpi: 渲染分辨率
+            model: 模型名称
+            
+        Returns:
+            str: 缓存键（十六进制 SHA-256）
+        """
+        digest = hashlib.sha256()
+        for part in (engine, prompt or "", str(dpi), model or ""):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        digest.update(image_base64.encode('ascii'))
+        return digest.hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """
+        读取缓存
+        
+        Args:
+            key: 缓存键
+            
+        Returns:
+            Optional[str]: 命中时返回 Markdown，否则返回 None
+        """
+        if not self.enabled:
+            return None
+        
+        with self._lock:
+            self._ensure_loaded()
+            
+            if key not in self._index:
+                self.misses += 1
+                return None
+            
+            path = self._entry_path(key)
+            try:
+                markdown = path.read_text(encoding='utf-8')
+                os.utime(path)  # 更新访问时间，重启后仍能按 LRU 恢复
+            except OSError:
+                # 文件被外部清理，视为未命中
+                self._total_bytes -= self._index.pop(key)
+                self.misses += 1
+                return None
+            
+            self._index.move_to_end(key)
+            self.hits += 1
+            return markdown
+    
+    def put(self, key: str, markdown: str):
+        """
+        写入缓存
+        
+        Args:
+            key: 缓存键
+            markdown: OCR 结果
+        """
+        if not self.enabled:
+            return
+        
+        data = markdown.encode('utf-8')
+        
+        with self._lock:
+            self._ensure_loaded()
+            
+            path = self._entry_path(key)
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+                tmp_path.write_bytes(data)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logger.warning(f"Failed to write OCR cache entry: {str(e)}")
+                return
+            
+            if key in self._index:
+                self._total_bytes -= self._index.pop(key)
+            self._index[key] = len(data)
+            self._total_bytes += len(data)
+            
+            self._evict()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计
+        
+        Returns:
+            Dict[str, Any]: 命中/未命中次数、条目数、占用大小
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'entries': len(self._index),
+                'size_bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+            }
+    
+    def _entry_path(self, key: str) -> Path:
+        """缓存条目路径（按前两位分目录）"""
+        return self.cache_dir / key[:2] / f"{key}.md"
+    
+    def _ensure_loaded(self):
+        """首次使用时扫描缓存目录，按修改时间重建 LRU 索引"""
+        if self._loaded:
+            return
+        
+        entries = []
+        if self.cache_dir.exists():
+            for path in self.cache_dir.glob("*/*.md"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, path.stem, stat.st_size))
+        
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total_bytes += size
+        
+        self._loaded = True
+        self._evict()
+    
+    def _evict(self):
+        """淘汰最久未访问的条目，直到总大小不超过上限"""
+        while self._total_bytes > self.max_bytes and self._index:
+            key, size = self._index.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                self._entry_path(key).unlink()
+            except OSError:
+                pass
+            logger.debug(f"OCR cache evicted: {key}")
+
+
+# 进程内共享的缓存实例
+_ocr_cache: Optional[OCRResultCache] = None
+
+
+def get_ocr_cache() -> OCRResultCache:
+    """
+    获取共享的 OCR 结果缓存
+    
+    Returns:
+        OCRResultCache: 缓存实例
+    """
+    global _ocr_cache
+    
+    if _ocr_cache is None:
+        settings = get_settings()
+        _ocr_cache = OCRResultCache(
+            cache_dir=str(Path(settings.cache_dir) / "ocr"),
+            max_bytes=settings.ocr_cache_max_mb * 1024 * 1024,
+            enabled=settings.ocr_cache_enabled
+        )
+    
+    return _ocr_cache
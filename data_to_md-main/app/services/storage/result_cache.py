@@ -0,0 +1,306 @@
+"""
+转换结果缓存
+整文档级缓存：相同文件 + 相同转换选项直接复用上次的输出
+
+说明：
+- 键：上传文件内容的 SHA-256 + 规范化后的选项指纹（含影响输出内容的服务端配置，
+  运维调整这些配置后旧条目不再命中）
+- 值：输出文件副本 + 元数据（meta.json），PDF 还有逐页内容片段副本，
+  存放在 {cache_dir}/results/{key}/ 下
+- 过期：超过 RESULT_CACHE_TTL_HOURS 的条目视为失效
+- 配额：总大小超过 RESULT_CACHE_MAX_MB 时按最近使用时间淘汰
+"""
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Optional, Dict, Any
+from app.config import get_settings
+from app.models.request import ConvertOptions
+
+logger = logging.getLogger(__name__)
+
+# 不影响输出内容的选项，不参与指纹计算
+_IGNORED_OPTIONS = {'async_mode'}
+
+# 影响输出内容的服务端配置，按当前生效值参与指纹
+_OUTPUT_SETTINGS = (
+    'pdf_text_threshold',
+    'pdf_adaptive_min_dpi',
+    'pdf_adaptive_glyph_px',
+    'pdf_adaptive_long_side',
+    'pdf_region_ocr_enabled',
+    'pdf_region_min_size',
+    'pdf_region_max_coverage',
+    'pdf_skip_blank_pages',
+    'pdf_blank_ink_ratio',
+    'pdf_dedup_pages',
+    'pdf_dedup_max_diff',
+    'mineru_hybrid_mixed',
+    'local_ocr_backend',
+    'local_ocr_lang',
+    'ocr_hedge_engine',
+)
+
+_META_FILE = "meta.json"
+
+_CHUNKS_FILE = "chunks.json.gz"
+
+
+class ConversionResultCache:
+    """转换结果缓存"""
+    
+    def __init__(
+        self,
+        cache_dir: str,
+        ttl_seconds: int,
+        max_bytes: int,
+        enabled: bool = True
+    ):
+        """
+        初始化缓存
+        
+        Args:
+            cache_dir: 缓存目录
+            ttl_seconds: 条目有效期（秒）
+            max_bytes: 缓存总大小上限（字节）
+            enabled: 是否启用
+        """
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def fingerprint_options(options: Dict[str, Any]) -> str:
+        """
+        计算转换选项指纹
+        
+        只取 ConvertOptions 中定义的字段，缺省字段按默认值（DPI、MinerU 分片页数按服务端配置）
+        补齐，从而使 {} 与显式传入默认值得到相同指纹；最大页数按实际生效值（不超过 PDF_MAX_PAGES）
+        计算，并附加影响输出内容的服务端配置。
+        
+        Args:
+            options: 转换选项
+            
+        Returns:
+            str: 规范化后的选项 JSON
+        """
+        normalized = ConvertOptions().model_dump()
+        for name in ConvertOptions.model_fields:
+            if name in (options or {}):
+                normalized[name] = options[name]
+        
+        # 未指定 DPI / 分片页数时按实际生效的配置值参与指纹
+        settings = get_settings()
+        if normalized.get('dpi') is None:
+            normalized['dpi'] = settings.pdf_render_dpi
+        if normalized.get('mineru_shard_pages') is None:
+            normalized['mineru_shard_pages'] = settings.mineru_shard_pages
+        
+        # 超出 PDF_MAX_PAGES 的页数被截断，按实际处理的页数上限参与指纹
+        if normalized.get('max_pages'):
+            normalized['max_pages'] = min(normalized['max_pages'], settings.pdf_max_pages)
+        else:
+            normalized['max_pages'] = settings.pdf_max_pages
+        
+        normalized['settings'] = {name: getattr(settings, name) for name in _OUTPUT_SETTINGS}
+        
+        for name in _IGNORED_OPTIONS:
+            normalized.pop(name, None)
+        
+        return json.dumps(normalized, sort_keys=True, default=str)
+    
+    def make_key(self, file_path: str, options: Dict[str, Any]) -> str:
+        """
+        计算缓存键
+        
+        Args:
+            file_path: 上传文件路径
+            options: 转换选项
+            
+        Returns:
+            str: 缓存键（十六进制 SHA-256）
+        """
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        
+        digest.update(b'\0')
+        digest.update(self.fingerprint_options(options).encode('utf-8'))
+        return digest.hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        读取缓存
+        
+        Args:
+            key: 缓存键
+            
+        Returns:
+            Optional[Dict[str, Any]]: 命中时返回 output_path / output_type / metadata / chunks_path
+        """
+        if not self.enabled:
+            return None
+        
+        entry_dir = self.cache_dir / key
+        with self._lock:
+            meta = self._read_meta(entry_dir)
+            
+            if meta is None:
+                self.misses += 1
+                return None
+            
+            output_path = entry_dir / meta['output_name']
+            if self._is_expired(meta) or not output_path.exists():
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                self.misses += 1
+                return None
+            
+            # 更新访问时间，用于配额淘汰
+            os.utime(entry_dir / _META_FILE)
+            self.hits += 1
+            
+            chunks_path = entry_dir / _CHUNKS_FILE
+            return {
+                'output_path': str(output_path),
+                'output_type': meta['output_type'],
+                'metadata': meta['metadata'],
+                'chunks_path': str(chunks_path) if chunks_path.exists() else None,
+            }
+    
+    def put(
+        self,
+        key: str,
+        output_path: str,
+        output_type: str,
+        metadata: Dict[str, Any],
+        chunks_path: Optional[str] = None
+    ):
+        """
+        写入缓存
+        
+        Args:
+            key: 缓存键
+            output_path: 输出文件路径
+            output_type: 输出类型（markdown / pdf）
+            metadata: 转换元数据
+            chunks_path: 逐页内容片段文件路径（可选）
+        """
+        if not self.enabled:
+            return
+        
+        entry_dir = self.cache_dir / key
+        tmp_dir = self.cache_dir / f".{key}.{os.getpid()}.tmp"
+        output_name = f"output{Path(output_path).suffix}"
+        
+        with self._lock:
+            try:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                tmp_dir.mkdir(parents=True)
+                shutil.copyfile(output_path, tmp_dir / output_name)
+                if chunks_path:
+                    shutil.copyfile(chunks_path, tmp_dir / _CHUNKS_FILE)
+                
+                meta = {
+                    'created_at': time.time(),
+                    'output_name': output_name,
+                    'output_type': output_type,
+                    'metadata': metadata,
+                }
+                with open(tmp_dir / _META_FILE, 'w', encoding='utf-8') as f:
+                    json.dump(meta, f, ensure_ascii=False, default=str)
+                
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                os.replace(tmp_dir, entry_dir)
+            except OSError as e:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                logger.warning(f"Failed to write result cache entry: {str(e)}")
+                return
+            
+            self._enforce_quota()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计
+        
+        Returns:
+            Dict[str, Any]: 命中/未命中次数
+        """
+        return {
+            'enabled': self.enabled,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+    
+    def _read_meta(self, entry_dir: Path) -> Optional[Dict[str, Any]]:
+        """读取条目元数据，不存在或损坏时返回 None"""
+        try:
+            with open(entry_dir / _META_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def _is_expired(self, meta: Dict[str, Any]) -> bool:
+        """判断条目是否过期"""
+        return time.time() - meta.get('created_at', 0) > self.ttl_seconds
+    
+    def _enforce_quota(self):
+        """清理过期条目，并按最近访问时间淘汰直到不超过配额"""
+        entries = []
+        total_bytes = 0
+        
+        for entry_dir in self.cache_dir.iterdir():
+            if not entry_dir.is_dir() or entry_dir.name.startswith('.'):
+                continue
+            
+            meta = self._read_meta(entry_dir)
+            if meta is None or self._is_expired(meta):
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                continue
+            
+            size = sum(p.stat().st_size for p in entry_dir.iterdir() if p.is_file())
+            accessed = (entry_dir / _META_FILE).stat().st_mtime
+            entries.append((accessed, size, entry_dir))
+            total_bytes += size
+        
+        for _, size, entry_dir in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total_bytes -= size
+            logger.debug(f"Result cache evicted: {entry_dir.name}")
+
+
+# 进程内共享的缓存实例
+_result_cache: Optional[ConversionResultCache] = None
+
+
+def get_result_cache() -> ConversionResultCache:
+    """
+    获取共享的转换结果缓存
+    
+    Returns:
+        ConversionResultCache: 缓存实例
+    """
+    global _result_cache
+    
+    if _result_cache is None:
+        settings = get_settings()
+        _result_cache = ConversionResultCache(
+            cache_dir=str(Path(settings.cache_dir) / "results"),
+            ttl_seconds=settings.result_cache_ttl_hours * 3600,
+            max_bytes=settings.result_cache_max_mb * 1024 * 1024,
+            enabled=settings.result_cache_enabled
+        )
+    
+    return _result_cache
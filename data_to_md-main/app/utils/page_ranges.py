@@ -0,0 +1,73 @@
+"""
+页码范围解析
+"""
+import re
+from typing import List, Tuple
+
+_RANGE_PATTERN = re.compile(r"^\s*(\d+)\s*(?:-\s*(\d+)\s*)?$")
+
+
+def parse_page_ranges(spec: str) -> List[Tuple[int, int]]:
+    """
+    解析页码范围字符串
+
+    Args:
+        spec: 页码范围，如 "1-20,35"
+
+    Returns:
+        List[Tuple[int, int]]: (起始页, 结束页) 列表，页码从 1 开始
+
+    Raises:
+        ValueError: 格式错误
+    """
+    ranges = []
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        match = _RANGE_PATTERN.match(part)
+        if not match:
+            raise ValueError(f"无效的页码范围: '{part.strip()}'（示例: 1-20,35）")
+        start = int(match.group(1))
+        end = int(match.group(2) or start)
+        if start < 1 or end < start:
+            raise ValueError(f"无效的页码范围: '{part.strip()}'")
+        ranges.append((start, end))
+
+    if not ranges:
+        raise ValueError("页码范围不能为空")
+    return ranges
+
+
+def format_page_ranges(page_numbers: List[int]) -> str:
+    """
+    把页码列表格式化为页码范围字符串（parse_page_ranges 的逆操作）
+
+    Args:
+        page_numbers: 页码列表（从 1 开始）
+
+    Returns:
+        str: 页码范围，如 "1-20,35"
+    """
+    parts = []
+    for start, end in contiguous_runs(sorted(set(page_numbers))):
+        parts.append(str(start) if start == end else f"{start}-{end}")
+    return ",".join(parts)
+
+
+def contiguous_runs(numbers: List[int]) -> List[Tuple[int, int]]:
+    """
+    把升序整数列表切分为连续区间
+
+    Args:
+        numbers: 升序整数列表
+
+    Returns:
+        List[Tuple[int, int]]: (起始, 结束) 列表，两端均包含
+    """
+    runs: List[Tuple[int, int]] = []
+    for number in numbers:
+        if runs and number == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], number)
+        else:
+            runs.append((number, number))
+    return runs
@@ -0,0 +1,82 @@
+"""
+固定 DPI 与自适应 DPI 对比
+
+逐页统计两种模式下的渲染 DPI、上传字节数与渲染耗时；
+加 --ocr 时同时调用 DeepSeek OCR（需配置 DEEPSEEK_API_KEY）统计 OCR 延迟。
+
+用法：
+    python benchmarks/bench_adaptive_dpi.py <pdf路径> [--dpi 144] [--pages 10] [--ocr]
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.common.image_processor import ImageProcessor  # noqa: E402
+from app.core.converters.pdf.dpi_policy import create_dpi_policy  # noqa: E402
+from app.core.converters.pdf.pdf_document import PDFDocumentSession  # noqa: E402
+
+
+async def run_mode(mode, session, page_count, dpi, max_size, ocr_client):
+    policy = create_dpi_policy(dpi, mode)
+    processor = ImageProcessor()
+    dpis, sizes, render_ms, ocr_ms = [], [], [], []
+
+    for page_num in range(page_count):
+        page_dpi = policy.for_page(session, page_num)
+
+        start = time.perf_counter()
+        b64 = processor.render_page_to_base64(session.page(page_num), dpi=page_dpi, max_size=max_size)
+        render_ms.append((time.perf_counter() - start) * 1000)
+
+        dpis.append(page_dpi)
+        sizes.append(len(b64))
+
+        if ocr_client is not None:
+            start = time.perf_counter()
+            await ocr_client.ocr_image(b64)
+            ocr_ms.append((time.perf_counter() - start) * 1000)
+
+    line = (
+        f"{mode:<9} pages={page_count:<4} "
+        f"dpi={min(dpis)}-{max(dpis)}  "
+        f"upload={statistics.mean(sizes) / 1024:8.1f} KiB/page  "
+        f"render={statistics.mean(render_ms):7.1f} ms/page"
+    )
+    if ocr_ms:
+        line += (
+            f"  ocr mean={statistics.mean(ocr_ms):7.0f} ms"
+            f"  p50={statistics.median(ocr_ms):7.0f} ms"
+        )
+    print(line)
+    return statistics.mean(sizes)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Fixed vs adaptive DPI benchmark")
+    parser.add_argument("pdf", help="PDF 文件路径")
+    parser.add_argument("--dpi", type=int, default=144, help="固定 DPI / 自适应上限")
+    parser.add_argument("--max-size", type=int, default=2048)
+    parser.add_argument("--pages", type=int, default=10, help="参与测试的页数")
+    parser.add_argument("--ocr", action="store_true", help="同时测量 DeepSeek OCR 延迟")
+    args = parser.parse_args()
+
+    ocr_client = None
+    if args.ocr:
+        from app.services.external.deepseek_client import DeepSeekClient
+        ocr_client = DeepSeekClient()
+
+    with PDFDocumentSession(args.pdf) as session:
+        page_count = min(args.pages, session.page_count)
+        print(f"{args.pdf}: dpi={args.dpi}, max_size={args.max_size}")
+        fixed_bytes = await run_mode("fixed", session, page_count, args.dpi, args.max_size, ocr_client)
+        adaptive_bytes = await run_mode("adaptive", session, page_count, args.dpi, args.max_size, ocr_client)
+        print(f"bytes ratio (adaptive/fixed)={adaptive_bytes / fixed_bytes:.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
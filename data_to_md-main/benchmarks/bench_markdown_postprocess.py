@@ -0,0 +1,99 @@
+"""
+Markdown 后处理基准
+在合成的多页 Markdown 上对比原有的多遍后处理（拼接整文档后串联替换）
+与单遍后处理器（按片段流式处理），统计耗时与内存峰值，并校验输出一致
+
+用法：
+    python benchmarks/bench_markdown_postprocess.py [--mb 50] [--page-kb 64]
+"""
+import argparse
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.common.markdown_postprocessor import (  # noqa: E402
+    MarkdownPostProcessor,
+    reference_post_process,
+)
+
+WORDS = ["数据", "转换", "markdown", "table", "页面", "OCR", "result", "模型", "the", "value"]
+
+
+def make_page(rng: random.Random, size: int) -> str:
+    """生成一页带标题、段落、代码块、表格与特殊标记的 OCR 风格 Markdown"""
+    lines = []
+    length = 0
+    while length < size:
+        kind = rng.random()
+        if kind < 0.08:
+            line = f"{'#' * rng.randint(1, 4)} {' '.join(rng.choices(WORDS, k=4))}"
+        elif kind < 0.12:
+            line = "```markdown\n" + "  ".join(rng.choices(WORDS, k=6)) + "\n```"
+        elif kind < 0.2:
+            line = "| " + " | ".join(rng.choices(WORDS, k=4)) + " |"
+        elif kind < 0.3:
+            line = ""
+        else:
+            line = "\t".join(rng.choices(WORDS, k=rng.randint(5, 15))) + "  "
+            if rng.random() < 0.1:
+                line += "<|end_of_sentence|>"
+        lines.append(line)
+        length += len(line) + 1
+    return "\r\n".join(lines)
+
+
+def build_parts(total_bytes: int, page_bytes: int):
+    """按 MarkdownGenerator.generate 的方式拼出片段列表"""
+    rng = random.Random(0)
+    parts = ["---\ntitle: bench\n---\n"]
+    size = 0
+    page = 0
+    while size < total_bytes:
+        page += 1
+        content = make_page(rng, page_bytes)
+        parts.extend([f"\n\n<!-- Page {page} (ocr) -->\n\n", content, "\n\n---\n\n"])
+        size += len(content.encode("utf-8"))
+    return parts, page
+
+
+def run(label, func, parts):
+    """计时并用 tracemalloc 统计内存峰值（两次运行，避免跟踪开销影响计时）"""
+    gc.collect()
+    start = time.perf_counter()
+    result = func(parts)
+    elapsed = time.perf_counter() - start
+    del result
+
+    gc.collect()
+    tracemalloc.start()
+    result = func(parts)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<12} time={elapsed:6.2f}s  peak={peak / 1024 / 1024:7.1f} MB")
+    return result, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Markdown post-processing benchmark")
+    parser.add_argument("--mb", type=float, default=50, help="合成文档大小（MB）")
+    parser.add_argument("--page-kb", type=int, default=64, help="每页大小（KB）")
+    args = parser.parse_args()
+
+    parts, pages = build_parts(int(args.mb * 1024 * 1024), args.page_kb * 1024)
+    print(f"input: {sum(len(p.encode('utf-8')) for p in parts) / 1024 / 1024:.1f} MB, {pages} pages")
+
+    processor = MarkdownPostProcessor()
+    old, old_time = run("multi-pass", lambda p: reference_post_process("".join(p)), parts)
+    new, new_time = run("single-pass", processor.process_parts, parts)
+
+    assert old == new, "outputs differ"
+    print(f"identical output ({len(new.encode('utf-8')) / 1024 / 1024:.1f} MB), speedup {old_time / new_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
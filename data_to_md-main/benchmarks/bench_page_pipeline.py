@@ -0,0 +1,58 @@
+"""
+页面流水线离线基准
+使用本地 OCR 引擎（ocr_engine="local"）跑完整的 分析 → 渲染 → OCR → Markdown 流水线，
+统计首页延迟、总耗时与吞吐，不依赖网络与外部服务
+
+用法：
+    python benchmarks/bench_page_pipeline.py <pdf路径> [--pages 1-10] [--dpi 144] [--dpi-mode fixed]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# 基准测试需要真实执行每一页，关闭 OCR 缓存
+os.environ.setdefault("OCR_CACHE_ENABLED", "false")
+
+from app.core.converters.pdf.pdf_converter import PDFConverter  # noqa: E402
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Offline page pipeline benchmark")
+    parser.add_argument("pdf", help="PDF 文件路径")
+    parser.add_argument("--pages", default=None, help="页码范围，如 1-10")
+    parser.add_argument("--dpi", type=int, default=None)
+    parser.add_argument("--dpi-mode", default="fixed", choices=["fixed", "adaptive"])
+    args = parser.parse_args()
+
+    options = {
+        "ocr_engine": "local",
+        "pages": args.pages,
+        "dpi": args.dpi,
+        "dpi_mode": args.dpi_mode,
+    }
+
+    start = time.perf_counter()
+    first_page = None
+    pages = 0
+    chars = 0
+    async for event in PDFConverter().convert_stream(args.pdf, options):
+        if event["event"] == "page":
+            pages += 1
+            chars += len(event["markdown"])
+            if first_page is None:
+                first_page = time.perf_counter() - start
+    total = time.perf_counter() - start
+
+    print(
+        f"{args.pdf}: pages={pages}  first_page={first_page or 0:.2f}s  "
+        f"total={total:.2f}s  {pages / total:.2f} pages/s  chars={chars}"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
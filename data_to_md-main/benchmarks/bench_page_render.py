@@ -0,0 +1,79 @@
+"""
+页面渲染微基准测试
+
+对比两条渲染路径的单页耗时与输出大小：
+- legacy: pixmap → PNG → PIL 解码 → LANCZOS 缩放 → PNG 再编码 → Base64
+- direct: 按目标尺寸光栅化 → 由 pixmap 缓冲区一次编码 PNG → Base64
+
+用法：
+    python benchmarks/bench_page_render.py <pdf路径> [--dpi 144] [--max-size 2048] [--pages 10]
+"""
+import argparse
+import base64
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.common.image_processor import ImageProcessor  # noqa: E402
+
+
+def render_legacy(processor: ImageProcessor, page: fitz.Page, dpi: int, max_size: int) -> str:
+    """旧路径：两次PNG编码 + 一次解码 + 缩放"""
+    image = processor.render_page_to_image(page, dpi)
+    image = processor.optimize_image(image, max_size)
+    return processor.image_to_base64(image)
+
+
+def render_direct(processor: ImageProcessor, page: fitz.Page, dpi: int, max_size: int) -> str:
+    """新路径：按目标尺寸渲染，一次编码"""
+    return processor.render_page_to_base64(page, dpi=dpi, optimize=True, max_size=max_size)
+
+
+def bench(name, func, processor, doc, page_count, dpi, max_size):
+    timings = []
+    sizes = []
+    for page_num in range(page_count):
+        page = doc[page_num]
+        start = time.perf_counter()
+        b64 = func(processor, page, dpi, max_size)
+        timings.append((time.perf_counter() - start) * 1000)
+        sizes.append(len(base64.b64decode(b64)))
+
+    print(
+        f"{name:<8} pages={page_count:<4} "
+        f"mean={statistics.mean(timings):8.1f} ms  "
+        f"median={statistics.median(timings):8.1f} ms  "
+        f"png={statistics.mean(sizes) / 1024:8.1f} KiB/page"
+    )
+    return statistics.mean(timings), statistics.mean(sizes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Page render micro-benchmark")
+    parser.add_argument("pdf", help="PDF 文件路径")
+    parser.add_argument("--dpi", type=int, default=144)
+    parser.add_argument("--max-size", type=int, default=2048)
+    parser.add_argument("--pages", type=int, default=10, help="参与测试的页数")
+    args = parser.parse_args()
+
+    processor = ImageProcessor()
+    doc = fitz.open(args.pdf)
+    page_count = min(args.pages, len(doc))
+
+    print(f"{args.pdf}: dpi={args.dpi}, max_size={args.max_size}")
+    legacy_ms, legacy_bytes = bench("legacy", render_legacy, processor, doc, page_count, args.dpi, args.max_size)
+    direct_ms, direct_bytes = bench("direct", render_direct, processor, doc, page_count, args.dpi, args.max_size)
+    print(
+        f"speedup={legacy_ms / direct_ms:.2f}x  "
+        f"bytes ratio={direct_bytes / legacy_bytes:.2f}"
+    )
+    doc.close()
+
+
+if __name__ == "__main__":
+    main()
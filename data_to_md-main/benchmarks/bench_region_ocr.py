@@ -0,0 +1,83 @@
+"""
+区域级 OCR 载荷对比
+
+对含图像/表格的页面，对比两种处理方式发送给 OCR 的图像字节数：
+- page:   整页渲染
+- region: 保留文本层，只渲染图像/表格区域（PageLayoutPlanner 规划）
+
+用法：
+    python benchmarks/bench_region_ocr.py <pdf路径> [--dpi 144] [--max-size 2048]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import get_settings  # noqa: E402
+from app.core.common.image_processor import ImageProcessor  # noqa: E402
+from app.core.converters.pdf.page_layout import PageLayoutPlanner  # noqa: E402
+from app.core.converters.pdf.pdf_document import PDFDocumentSession  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Region OCR payload benchmark")
+    parser.add_argument("pdf", help="PDF 文件路径")
+    parser.add_argument("--dpi", type=int, default=144)
+    parser.add_argument("--max-size", type=int, default=2048)
+    args = parser.parse_args()
+
+    settings = get_settings()
+    processor = ImageProcessor()
+    planner = PageLayoutPlanner(
+        min_size=settings.pdf_region_min_size,
+        max_coverage=settings.pdf_region_max_coverage
+    )
+
+    page_total = 0
+    region_total = 0
+    counts = {"page": 0, "region": 0, "text": 0}
+
+    with PDFDocumentSession(args.pdf) as session:
+        for page_num in range(session.page_count):
+            region_bboxes = session.get_image_bboxes(page_num) + session.get_table_bboxes(page_num)
+            if not region_bboxes:
+                continue
+
+            page = session.page(page_num)
+            page_bytes = len(processor.render_page_to_base64(page, dpi=args.dpi, max_size=args.max_size))
+            layout = planner.plan(tuple(page.rect), session.get_blocks(page_num), region_bboxes)
+
+            if layout is None:
+                mode, region_bytes = "page", page_bytes
+            else:
+                region_bytes = sum(
+                    len(processor.render_page_to_base64(
+                        page, dpi=args.dpi, max_size=args.max_size, clip=fitz.Rect(item.bbox)
+                    ))
+                    for item in layout.regions
+                )
+                mode = "region" if layout.regions else "text"
+
+            counts[mode] += 1
+            page_total += page_bytes
+            region_total += region_bytes
+            print(
+                f"page {page_num + 1:<4} mode={mode:<6} "
+                f"page={page_bytes / 1024:8.1f} KiB  region={region_bytes / 1024:8.1f} KiB"
+            )
+
+    if page_total:
+        print(
+            f"pages={sum(counts.values())} ({counts})  "
+            f"page={page_total / 1024:.1f} KiB  region={region_total / 1024:.1f} KiB  "
+            f"ratio={region_total / page_total:.2f}"
+        )
+    else:
+        print("no pages with images or tables")
+
+
+if __name__ == "__main__":
+    main()
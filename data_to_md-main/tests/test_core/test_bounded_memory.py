@@ -0,0 +1,212 @@
+"""
+有界内存模式测试
+
+测试场景：
+1. 页面滑动窗口 - 按页序产出，在途页面数不超过窗口大小，超过内存上限时逐页处理
+2. 落盘队列 - 片段写入后可重复读取，类型与内存中一致
+3. 纯图片PDF转换 - 有界内存模式写入磁盘的 Markdown 与普通模式一致，页面产出后释放特征缓存
+"""
+import asyncio
+import hashlib
+import os
+import fitz
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+from app.config import get_settings
+from app.core.base.processor import ContentChunk
+from app.core.common.chunk_spool import ChunkSpool
+from app.core.common.page_window import PageWindow
+from app.core.converters.pdf.image_pdf_processor import ImagePDFProcessor
+from app.core.converters.pdf.pdf_converter import PDFConverter
+from app.core.converters.pdf.pdf_document import PDFDocumentSession
+from app.models.enums import ChunkType
+
+
+class FakeGuard:
+    """始终超过内存上限的检查器"""
+
+    def exceeded(self) -> bool:
+        return True
+
+
+def make_starters(count: int, in_flight: list, peak: list):
+    """生成按页序排列的启动函数，记录在途页面数峰值"""
+    async def run(page_num: int):
+        in_flight[0] += 1
+        peak[0] = max(peak[0], in_flight[0])
+        await asyncio.sleep(0.001 * ((page_num * 7) % 5))
+        in_flight[0] -= 1
+        return page_num
+
+    return [lambda page_num=page_num: run(page_num) for page_num in range(count)]
+
+
+@pytest.fixture
+def image_pdf(tmp_path):
+    """生成 8 页扫描件（每页一张内容不同的图片）"""
+    path = tmp_path / "scanned.pdf"
+    doc = fitz.open()
+    for index in range(8):
+        source = fitz.open()
+        page = source.new_page(width=595, height=842)
+        page.insert_text((72, 100), f"Scanned page {index + 1}", fontsize=24)
+        pixmap = page.get_pixmap(dpi=72)
+        source.close()
+        doc.new_page(width=595, height=842).insert_image(fitz.Rect(0, 0, 595, 842), pixmap=pixmap)
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+@pytest.fixture
+def spool_settings(tmp_path, monkeypatch):
+    """落盘目录指向临时目录，窗口设为 2 页"""
+    settings = get_settings()
+    monkeypatch.setattr(settings, "spool_dir", str(tmp_path / "spool"))
+    monkeypatch.setattr(settings, "pdf_page_window", 2)
+    return settings
+
+
+class TestPageWindow:
+    """页面滑动窗口测试类"""
+
+    @pytest.mark.asyncio
+    async def test_window_bounds_in_flight_pages(self):
+        """
+        测试：窗口限制在途页面数
+
+        验证点：
+        1. 结果按页序产出
+        2. 在途页面数不超过窗口大小
+        """
+        in_flight, peak = [0], [0]
+        results = [page async for page in PageWindow(make_starters(20, in_flight, peak), size=3)]
+
+        assert results == list(range(20))
+        assert peak[0] <= 3
+
+    @pytest.mark.asyncio
+    async def test_unbounded_window_starts_all_pages(self):
+        """测试：窗口为空时一次启动全部页面"""
+        in_flight, peak = [0], [0]
+        results = [page async for page in PageWindow(make_starters(10, in_flight, peak))]
+
+        assert results == list(range(10))
+        assert peak[0] == 10
+
+    @pytest.mark.asyncio
+    async def test_memory_guard_throttles_to_one_page(self):
+        """测试：超过内存上限时逐页处理且不停止"""
+        in_flight, peak = [0], [0]
+        window = PageWindow(make_starters(6, in_flight, peak), size=4, memory_guard=FakeGuard())
+        results = [page async for page in window]
+
+        assert results == list(range(6))
+        assert peak[0] == 1
+
+
+class TestChunkSpool:
+    """落盘队列测试类"""
+
+    def test_round_trip(self, tmp_path):
+        """
+        测试：片段落盘后读取
+
+        验证点：
+        1. 内容、页码、元数据一致，类型还原为 ChunkType
+        2. 可重复迭代
+        3. discard 删除文件
+        """
+        chunks = [
+            ContentChunk(content="# 标题\n正文", page_number=1, chunk_type=ChunkType.OCR, metadata={'dpi': 144}),
+            ContentChunk(content="", page_number=2, chunk_type=ChunkType.OCR, metadata={'skipped': 'blank'}),
+            ContentChunk(content="text", page_number=3, chunk_type=ChunkType.TEXT),
+        ]
+        spool = ChunkSpool(str(tmp_path))
+        for chunk in chunks:
+            spool.append(chunk)
+
+        assert len(spool) == 3
+        assert list(spool) == chunks
+        spool.close()
+        assert list(spool) == chunks
+        assert all(isinstance(chunk.chunk_type, ChunkType) for chunk in spool)
+
+        spool.discard()
+        assert not spool.path.exists()
+
+
+class TestBoundedMemoryConversion:
+    """有界内存模式转换测试类"""
+
+    @pytest.mark.asyncio
+    async def test_bounded_output_matches_normal_mode(self, image_pdf, spool_settings):
+        """
+        测试：有界内存模式与普通模式结果一致
+
+        验证点：
+        1. Markdown 写入磁盘，结果中不保留全文，内容与普通模式一致
+        2. 片段从落盘文件读取，页面统计一致
+        3. discard 后落盘文件被删除
+        """
+        async def fake_ocr(self, base64_image, dpi):
+            digest = hashlib.sha256(base64_image.encode('ascii')).hexdigest()[:12]
+            return f"## Page\n\nOCR {digest}\n", "deepseek", False
+
+        converter = PDFConverter()
+        with patch.object(ImagePDFProcessor, "_run_ocr", fake_ocr):
+            # 不输出元数据（其中的转换时间两次不同）
+            options = {'ocr_engine': 'deepseek', 'include_metadata': False}
+            normal = await converter.convert(image_pdf, {**options, 'bounded_memory': False})
+            bounded = await converter.convert(image_pdf, {**options, 'bounded_memory': True})
+
+        assert normal.markdown_path is None
+        assert bounded.markdown is None
+        assert Path(bounded.markdown_path).read_text(encoding='utf-8') == normal.markdown
+        assert list(bounded.content_chunks) == normal.content_chunks
+        assert bounded.metadata['bounded_memory'] is True
+        assert bounded.metadata['ocr_pages'] == normal.metadata['ocr_pages'] == 8
+
+        bounded.content_chunks.discard()
+        os.remove(bounded.markdown_path)
+        assert os.listdir(spool_settings.spool_dir) == []
+
+    @pytest.mark.asyncio
+    async def test_page_threshold_selects_bounded_mode(self, image_pdf, spool_settings, monkeypatch):
+        """测试：未指定选项时按 PDF_BOUNDED_MEMORY_PAGES 选择模式，失败时清理落盘文件"""
+        async def failing_ocr(self, base64_image, dpi):
+            raise RuntimeError("upstream error")
+
+        monkeypatch.setattr(spool_settings, "pdf_bounded_memory_pages", 8)
+        converter = PDFConverter()
+        with patch.object(ImagePDFProcessor, "_run_ocr", failing_ocr), \
+                patch.object(converter, "_finish_spooled", side_effect=RuntimeError("disk full")):
+            with pytest.raises(Exception):
+                await converter.convert(image_pdf, {'ocr_engine': 'deepseek'})
+
+        assert os.listdir(spool_settings.spool_dir) == []
+
+    @pytest.mark.asyncio
+    async def test_page_features_released_after_yield(self, image_pdf, spool_settings):
+        """测试：有界内存模式下页面产出后释放文档会话中的页面特征"""
+        async def fake_ocr(self, base64_image, dpi):
+            return "OCR result", "deepseek", False
+
+        released = []
+        original_release = PDFDocumentSession.release
+
+        def spy_release(session, page_num):
+            session.get_blocks(page_num)
+            released.append(page_num)
+            original_release(session, page_num)
+            assert page_num not in session._features
+
+        converter = PDFConverter()
+        with patch.object(ImagePDFProcessor, "_run_ocr", fake_ocr), \
+                patch.object(PDFDocumentSession, "release", spy_release):
+            result = await converter.convert(image_pdf, {'ocr_engine': 'deepseek', 'bounded_memory': True})
+
+        assert released == list(range(8))
+        result.content_chunks.discard()
+        os.remove(result.markdown_path)
@@ -0,0 +1,33 @@
+"""
+页面渲染分辨率策略测试
+"""
+from app.core.converters.pdf.dpi_policy import PageDPIPolicy
+
+A4 = (0, 0, 595, 842)
+A3 = (0, 0, 842, 1191)
+
+
+class TestPageDPIPolicy:
+    """渲染分辨率策略测试类"""
+
+    def test_fixed_mode_uses_request_dpi(self):
+        """测试：固定模式下所有页面使用请求 DPI"""
+        policy = PageDPIPolicy(dpi=200, mode="fixed")
+
+        assert policy.choose(A4, 24) == 200
+        assert policy.choose(A3, None) == 200
+
+    def test_adaptive_lowers_dpi_for_large_print(self):
+        """测试：字号越大，DPI 越低；不超过请求 DPI，不低于下限"""
+        policy = PageDPIPolicy(dpi=144, mode="adaptive", min_dpi=72, target_glyph_px=20)
+
+        assert policy.choose(A4, 8) == 144      # 小字号：保持上限
+        assert policy.choose(A4, 16) == 90      # 20px * 72 / 16pt
+        assert policy.choose(A4, 40) == 72      # 超大字号：下限
+
+    def test_adaptive_without_text_layer_uses_page_size(self):
+        """测试：无文本层时按页面长边选择 DPI"""
+        policy = PageDPIPolicy(dpi=144, mode="adaptive", target_long_side=1600)
+
+        assert policy.choose(A4, None) == 137   # 1600px * 72 / 842pt
+        assert policy.choose(A3, None) == 97    # 大幅面页面分辨率更低
@@ -0,0 +1,84 @@
+"""
+Markdown 单遍后处理器测试
+以原有的多遍实现为基准校验输出一致
+"""
+import random
+import pytest
+from unittest.mock import patch
+from app.core.base.processor import ContentChunk
+from app.core.common.markdown_generator import MarkdownGenerator
+from app.core.common.markdown_postprocessor import MarkdownPostProcessor, reference_post_process
+from app.models.enums import ChunkType
+
+# 覆盖原有规则各种边界情况的片段
+TOKENS = [
+    "```", "`", "#", "##", "#######", "# h", "## t\n", "```python\n", "\n```\n",
+    " ", "  ", "\t", "\n", "\n", "\n\n", "\r", "\r\n", "\x0c", "　", "\xa0",
+    "<|ref|>", "<|de", "t|>", "<|", "<|end_of_text|>", "<|end_of_sentence|>",
+    "a", "word", "中文", "---", "x y",
+]
+
+CASES = [
+    "",
+    "   \n\t\n",
+    "# Title\nbody\n## Sub\n### Sub2\ntext",
+    "intro\n```python\nprint(1)\n```\n\nafter",
+    "a ```\n\nb",
+    "```\n```js\ncode\n```",
+    "line<|end_of_sentence|>\r\nnext\rlast<|ref|>x<|det|>",
+    "<|de<|ref|>t|>",
+    "a\t\t b  \n\n\n\nc",
+    "text\n#\nafter\nmore",
+    "text\n## \nafter",
+]
+
+
+def random_document(rng: random.Random) -> str:
+    """由边界片段随机拼成文档"""
+    return "".join(rng.choice(TOKENS) for _ in range(rng.randint(0, 40)))
+
+
+def random_split(rng: random.Random, text: str):
+    """在随机位置把文档切分为若干片段"""
+    cuts = sorted(rng.sample(range(len(text) + 1), min(len(text) + 1, rng.randint(0, 4))))
+    return [text[start:end] for start, end in zip([0] + cuts, cuts + [len(text)])]
+
+
+class TestMarkdownPostProcessor:
+    """Markdown 单遍后处理器测试类"""
+
+    @pytest.mark.parametrize("text", CASES)
+    def test_matches_reference(self, text):
+        """测试：典型与边界输入的结果与原有实现一致"""
+        assert MarkdownPostProcessor().process(text) == reference_post_process(text)
+
+    def test_random_documents_match_reference(self):
+        """测试：随机文档按任意位置切分为片段处理，结果与处理拼接后的文档一致"""
+        rng = random.Random(0)
+        processor = MarkdownPostProcessor()
+        for _ in range(5000):
+            text = random_document(rng)
+            parts = random_split(rng, text)
+            assert processor.process_parts(parts) == reference_post_process(text), repr(parts)
+
+    @pytest.mark.parametrize("options", [
+        {},
+        {"include_metadata": False},
+        {"show_page_number": False},
+        {"no_pagination_and_metadata": True},
+    ])
+    def test_generate_matches_joined_post_process(self, options):
+        """测试：各输出模式下逐片段后处理的文档与拼接后整体后处理的结果一致"""
+        rng = random.Random(1)
+        chunks = [
+            ContentChunk(content=random_document(rng), page_number=index + 1, chunk_type=ChunkType.OCR)
+            for index in range(30)
+        ]
+        joined = lambda self, parts: reference_post_process("".join(parts))
+
+        with patch.object(MarkdownGenerator, "_generate_metadata", return_value="---\ntitle: doc\n---\n"):
+            markdown = MarkdownGenerator(**options).generate(chunks, None)
+            with patch.object(MarkdownPostProcessor, "process_parts", joined):
+                expected = MarkdownGenerator(**options).generate(chunks, None)
+
+        assert markdown == expected
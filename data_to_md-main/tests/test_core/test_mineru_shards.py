@@ -0,0 +1,166 @@
+"""
+MinerU 分片解析测试
+
+测试场景：
+1. 按页数切分分片，生成的子文档包含对应页面
+2. 分片结果按页序合并，页面标记保留原始页码
+"""
+import os
+import fitz
+import pytest
+from unittest.mock import Mock
+from app.core.converters.pdf.page_selection import split_shards, page_shard_pdfs
+from app.core.converters.pdf.mineru_pages import parse_pages_with_mineru
+from app.core.common.markdown_generator import MarkdownGenerator
+from app.utils.page_ranges import format_page_ranges
+
+
+@pytest.fixture
+def sample_pdf(tmp_path):
+    """生成 10 页文本 PDF，每页内容为页码"""
+    path = tmp_path / "sample.pdf"
+    doc = fitz.open()
+    for index in range(10):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Page {index + 1}")
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+class FakeMinerUClient:
+    """模拟 MinerU：把子文档每页的文本拼接为 markdown"""
+
+    def __init__(self):
+        self.batches = []
+
+    async def ocr_pdf(self, file_path):
+        return (await self.ocr_pdfs([file_path]))[0]
+
+    async def ocr_pdfs(self, file_paths):
+        self.batches.append(len(file_paths))
+        markdowns = []
+        for path in file_paths:
+            with fitz.open(path) as doc:
+                markdowns.append(" | ".join(page.get_text().strip() for page in doc))
+        return markdowns
+
+
+class TestShardSplitting:
+    """分片切分测试类"""
+
+    def test_split_shards(self):
+        """测试：按页数切分，最后一个分片可以较短；不启用时整体一个分片"""
+        assert split_shards([0, 1, 2, 3, 4], 2) == [[0, 1], [2, 3], [4]]
+        assert split_shards([0, 1, 2], 0) == [[0, 1, 2]]
+        assert split_shards([0, 1, 2], 5) == [[0, 1, 2]]
+
+    def test_shard_pdfs_contain_their_pages(self, sample_pdf):
+        """测试：每个子文档只包含分片内的页面，退出后临时文件被删除"""
+        with page_shard_pdfs(sample_pdf, [[0, 1, 2], [5, 8]]) as paths:
+            with fitz.open(paths[0]) as doc:
+                assert doc.page_count == 3
+            with fitz.open(paths[1]) as doc:
+                assert [page.get_text().strip() for page in doc] == ["Page 6", "Page 9"]
+
+        assert not any(os.path.exists(path) for path in paths)
+
+    def test_format_page_ranges(self):
+        """测试：页码列表格式化为范围字符串"""
+        assert format_page_ranges([1, 2, 3, 5, 7, 8]) == "1-3,5,7-8"
+
+
+class TestParseWithMinerU:
+    """分片解析测试类"""
+
+    @pytest.mark.asyncio
+    async def test_shards_are_one_batch_merged_in_order(self, sample_pdf):
+        """
+        测试：分片作为一个批次提交，结果按页序合并
+
+        验证点：
+        1. 只提交一个批次，包含全部分片
+        2. 每个分片一个片段，page_number 为分片首页
+        3. 页面标记显示分片覆盖的原始页码范围
+        """
+        client = FakeMinerUClient()
+        page_nums = [1, 2, 3, 4, 5, 6, 7]
+
+        chunks = await parse_pages_with_mineru(client, sample_pdf, page_nums, 10, shard_pages=3)
+
+        assert client.batches == [3]
+        assert [chunk.page_number for chunk in chunks] == [2, 5, 8]
+        assert chunks[0].content == "Page 2 | Page 3 | Page 4"
+        assert chunks[2].content == "Page 8"
+        markers = [MarkdownGenerator().render_page(chunk).split(" (")[0] for chunk in chunks]
+        assert markers == ["<!-- Page 2-4", "<!-- Page 5-7", "<!-- Page 8"]
+
+    @pytest.mark.asyncio
+    async def test_without_sharding_submits_one_document(self, sample_pdf):
+        """测试：不分片时整文档作为一个文件提交"""
+        client = FakeMinerUClient()
+
+        chunks = await parse_pages_with_mineru(client, sample_pdf, list(range(10)), 10)
+
+        assert client.batches == [1]
+        assert len(chunks) == 1
+        assert chunks[0].metadata["pages"] == "1-10"
+
+
+@pytest.fixture
+def mixed_pdf(tmp_path):
+    """生成 6 页混排 PDF：第 3、5、6 页为整页图片，其余为文本页"""
+    path = tmp_path / "mixed.pdf"
+    pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 200, 200), 0)
+    pixmap.set_rect(pixmap.irect, (200, 200, 200))
+    doc = fitz.open()
+    for index in range(6):
+        page = doc.new_page()
+        if index + 1 in (3, 5, 6):
+            page.insert_image(fitz.Rect(36, 36, 560, 800), pixmap=pixmap)
+        else:
+            page.insert_text((72, 72), f"Text page {index + 1} " * 10)
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+class TestHybridMode:
+    """MinerU 混合模式测试类"""
+
+    @pytest.mark.asyncio
+    async def test_only_image_pages_go_to_mineru(self, mixed_pdf):
+        """
+        测试：混排文档只把图片页交给 MinerU
+
+        验证点：
+        1. 连续图片页合并为一个子文档，同一批次提交
+        2. 文本页在进程池中分片提取（不在事件循环中逐页提取），结果按页序交错
+        """
+        from app.core.converters.pdf.pdf_analyzer import PDFAnalyzer
+        from app.core.converters.pdf.mixed_pdf_processor import MixedPDFProcessor
+
+        pdf_info = PDFAnalyzer().analyze(mixed_pdf)
+        processor = MixedPDFProcessor(ocr_engine="mineru")
+        processor.mineru_hybrid = True
+        submitted = []
+
+        async def fake_ocr_pdfs(paths):
+            pages = []
+            for path in paths:
+                with fitz.open(path) as doc:
+                    pages.append(doc.page_count)
+            submitted.append(pages)
+            return [f"mineru {count} pages" for count in pages]
+
+        processor.mineru_client.ocr_pdfs = fake_ocr_pdfs
+        processor._process_with_text_extraction = Mock(side_effect=AssertionError("text extracted on the event loop"))
+        chunks = await processor.process(mixed_pdf, pdf_info)
+
+        assert submitted == [[1, 2]]
+        assert [chunk.page_number for chunk in chunks] == [1, 2, 3, 4, 5]
+        assert [chunk.metadata.get("method") for chunk in chunks] == [
+            "text_extraction", "text_extraction", "mineru_pdf", "text_extraction", "mineru_pdf"
+        ]
+        assert chunks[4].metadata["pages"] == "5-6"
+        assert "Text page 4" in chunks[3].content
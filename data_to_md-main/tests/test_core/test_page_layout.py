@@ -0,0 +1,71 @@
+"""
+页面版面规划测试
+
+测试场景：
+1. 文本页中的小图 - 保留文本层，只 OCR 图像区域，按阅读顺序合并
+2. 区域占满页面 - 退回整页 OCR
+3. 过小的图像 - 忽略
+"""
+from app.core.converters.pdf.page_layout import PageLayoutPlanner
+
+PAGE = (0, 0, 600, 800)
+
+
+def text_block(x0, y0, x1, y1, text, block_no=0):
+    """构造文本块（与 get_text("blocks") 格式一致）"""
+    return (x0, y0, x1, y1, text, block_no, 0)
+
+
+class TestPageLayoutPlanner:
+    """页面版面规划器测试类"""
+
+    def test_regions_are_merged_in_reading_order(self):
+        """
+        测试：图像区域插入到其下方第一个文本块之前
+
+        验证点：
+        1. 区域外的文本块保留，区域内的文本块被区域覆盖
+        2. 相邻文本块合并为一个文本片段
+        """
+        planner = PageLayoutPlanner(min_size=24, max_coverage=0.85)
+        blocks = [
+            text_block(50, 50, 550, 100, "Intro"),
+            text_block(50, 110, 550, 160, "Body"),
+            text_block(200, 250, 300, 260, "Chart label"),  # 位于图像区域内
+            text_block(50, 420, 550, 470, "Conclusion"),
+        ]
+
+        layout = planner.plan(PAGE, blocks, [(150, 200, 450, 400)])
+
+        assert layout is not None
+        assert [item.kind for item in layout.items] == ['text', 'region', 'text']
+        assert [b[4] for b in layout.items[0].blocks] == ["Intro", "Body"]
+        assert layout.items[1].bbox == (150, 200, 450, 400)
+        assert [b[4] for b in layout.items[2].blocks] == ["Conclusion"]
+        assert len(layout.regions) == 1
+
+    def test_full_page_region_falls_back_to_page_ocr(self):
+        """测试：区域覆盖大部分页面时返回 None（整页 OCR）"""
+        planner = PageLayoutPlanner(min_size=24, max_coverage=0.85)
+        blocks = [text_block(50, 50, 550, 100, "Hidden OCR layer")]
+
+        assert planner.plan(PAGE, blocks, [(0, 0, 600, 800)]) is None
+
+    def test_overlapping_regions_are_merged(self):
+        """测试：相互重叠的图像/表格区域合并为一个区域"""
+        planner = PageLayoutPlanner(min_size=24, max_coverage=0.85)
+
+        layout = planner.plan(PAGE, [], [(100, 100, 300, 300), (250, 250, 400, 400)])
+
+        assert len(layout.regions) == 1
+        assert layout.regions[0].bbox == (100, 100, 400, 400)
+
+    def test_tiny_images_are_ignored(self):
+        """测试：小于最小尺寸的图像（装饰线、图标）不做 OCR"""
+        planner = PageLayoutPlanner(min_size=24, max_coverage=0.85)
+        blocks = [text_block(50, 50, 550, 100, "Text")]
+
+        layout = planner.plan(PAGE, blocks, [(10, 10, 20, 20), (50, 120, 550, 122)])
+
+        assert layout.regions == []
+        assert [item.kind for item in layout.items] == ['text']
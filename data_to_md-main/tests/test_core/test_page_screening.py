@@ -0,0 +1,178 @@
+"""
+页面预筛选测试
+
+测试场景：
+1. 空白页 - 识别为空白，只含页码的页面不视为空白
+2. 近似重复页 - 内容一致的页面指向首次出现的页面，填写内容不同的表格不视为重复
+3. 流式筛选 - 分片在进程池中计算，记录重复页引用，失败时照常 OCR
+4. 纯图片PDF处理 - 空白页不 OCR，重复页复用结果，转换元数据统计页数
+"""
+import fitz
+import pytest
+from unittest.mock import patch
+from app.core.converters.pdf.image_pdf_processor import ImagePDFProcessor
+from app.core.converters.pdf.page_screening import PageScreenStream
+from app.core.converters.pdf.pdf_analyzer import PDFAnalyzer
+from app.core.converters.pdf.pdf_converter import PDFConverter
+
+
+def add_form_page(doc: fitz.Document, amount: str = "1234.56"):
+    """添加一页表格（40 行）"""
+    page = doc.new_page(width=595, height=842)
+    for row in range(40):
+        page.insert_text((72, 80 + row * 18), f"Name: John Smith   Date: 2024-01-{row:02d}   Amount: {amount}", fontsize=10)
+
+
+@pytest.fixture
+def scanned_pdf(tmp_path):
+    """
+    生成 6 页文档：
+    1 表格，2 空白页，3 与第 1 页相同，4 金额不同的表格，5 只有页码，6 与第 4 页相同
+    """
+    path = tmp_path / "scanned.pdf"
+    doc = fitz.open()
+    add_form_page(doc)
+    doc.new_page(width=595, height=842)
+    add_form_page(doc)
+    add_form_page(doc, amount="1234.58")
+    doc.new_page(width=595, height=842).insert_text((72, 100), "Page 5", fontsize=10)
+    add_form_page(doc, amount="1234.58")
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+def make_stream(file_path: str, page_nums: list, skip_blank: bool = True, dedup: bool = True) -> PageScreenStream:
+    """每个分片 2 页的流式筛选（默认阈值）"""
+    return PageScreenStream(
+        file_path,
+        page_nums,
+        skip_blank=skip_blank,
+        blank_ink_ratio=0.0001,
+        dedup=dedup,
+        dedup_max_diff=0.00001,
+        shard_pages=2
+    )
+
+
+async def screen_all(stream: PageScreenStream, page_nums: list) -> list:
+    """按页序取出全部筛选结果并等待筛选结束"""
+    stream.start()
+    try:
+        screens = [await stream.get(page_num) for page_num in page_nums]
+        await stream._task
+    finally:
+        stream.close()
+    return screens
+
+
+class TestPageScreenStream:
+    """流式页面筛选测试类"""
+
+    @pytest.mark.asyncio
+    async def test_blank_and_duplicate_pages(self, scanned_pdf):
+        """
+        测试：空白页与重复页识别
+
+        验证点：
+        1. 空白页被识别，只有页码的页面保留
+        2. 重复页（跨分片）指向首次出现的页面
+        3. 只改动一个数字的表格不视为重复
+        """
+        stream = make_stream(scanned_pdf, list(range(6)))
+        screens = await screen_all(stream, list(range(6)))
+
+        assert [screen.blank for screen in screens] == [False, True, False, False, False, False]
+        assert [screen.duplicate_of for screen in screens] == [None, None, 0, None, None, 3]
+        assert screens[1].ink_ratio == 0
+        assert (stream.blank_pages, stream.duplicate_pages) == (1, 2)
+
+    @pytest.mark.asyncio
+    async def test_tracks_references(self, scanned_pdf):
+        """测试：筛选完成后，只有仍被未启动的重复页引用的页面视为会被引用"""
+        stream = make_stream(scanned_pdf, list(range(6)))
+        await screen_all(stream, list(range(6)))
+
+        assert stream.finished
+        assert [stream.is_referenced_later(page_num) for page_num in range(6)] == [
+            True, False, False, True, False, False
+        ]
+        stream.release(0)
+        assert not stream.is_referenced_later(0)
+
+    @pytest.mark.asyncio
+    async def test_disabled_checks(self, scanned_pdf):
+        """测试：关闭空白页与重复页识别"""
+        stream = make_stream(scanned_pdf, list(range(6)), skip_blank=False, dedup=False)
+        screens = await screen_all(stream, list(range(6)))
+
+        assert not any(screen.blank for screen in screens)
+        assert all(screen.duplicate_of is None for screen in screens)
+
+    @pytest.mark.asyncio
+    async def test_failure_falls_back_to_ocr(self, tmp_path):
+        """测试：筛选失败时所有页面视为普通页面"""
+        stream = make_stream(str(tmp_path / "missing.pdf"), [0, 1, 2])
+        stream.start()
+        try:
+            screens = [await stream.get(page_num) for page_num in range(3)]
+        finally:
+            stream.close()
+
+        assert all(not screen.blank and screen.duplicate_of is None for screen in screens)
+
+
+class TestImagePDFScreening:
+    """纯图片PDF处理中的预筛选测试类"""
+
+    @pytest.mark.asyncio
+    async def test_skipped_pages_are_not_sent_to_ocr(self, scanned_pdf):
+        """
+        测试：空白页与重复页不调用 OCR
+
+        验证点：
+        1. 只有第 1、4、5 页调用 OCR
+        2. 重复页内容与首次出现的页面一致，空白页内容为空
+        3. 转换元数据统计跳过与复用的页数
+        """
+        ocr_calls = []
+
+        async def fake_ocr(self, base64_image, dpi):
+            ocr_calls.append(base64_image)
+            return f"OCR result {len(ocr_calls)}", "deepseek", False
+
+        pdf_info = PDFAnalyzer().analyze(scanned_pdf)
+        with patch.object(ImagePDFProcessor, "_run_ocr", fake_ocr):
+            chunks = await ImagePDFProcessor(ocr_engine="deepseek").process(scanned_pdf, pdf_info)
+
+        assert len(ocr_calls) == 3
+        assert [chunk.page_number for chunk in chunks] == [1, 2, 3, 4, 5, 6]
+        assert chunks[1].content == ""
+        assert chunks[1].metadata['skipped'] == 'blank'
+        assert chunks[2].content == chunks[0].content
+        assert chunks[2].metadata['duplicate_of'] == 1
+        assert chunks[5].content == chunks[3].content
+        assert chunks[3].content != chunks[0].content
+
+        result = PDFConverter()._build_result("", pdf_info, chunks)
+        assert result.metadata['blank_pages_skipped'] == 1
+        assert result.metadata['duplicate_pages'] == 2
+
+    @pytest.mark.asyncio
+    async def test_duplicate_of_failed_page_runs_ocr(self, scanned_pdf):
+        """测试：首次出现的页面 OCR 失败时，重复页照常 OCR"""
+        ocr_calls = []
+
+        async def flaky_ocr(self, base64_image, dpi):
+            ocr_calls.append(base64_image)
+            if len(ocr_calls) == 1:
+                raise RuntimeError("upstream error")
+            return "OCR result", "deepseek", False
+
+        pdf_info = PDFAnalyzer().analyze(scanned_pdf, pages="1-3")
+        with patch.object(ImagePDFProcessor, "_run_ocr", flaky_ocr):
+            chunks = await ImagePDFProcessor(ocr_engine="deepseek").process(scanned_pdf, pdf_info)
+
+        assert 'error' in chunks[0].metadata
+        assert chunks[2].content == "OCR result"
+        assert 'duplicate_of' not in chunks[2].metadata
@@ -0,0 +1,98 @@
+"""
+页面选择测试
+
+测试场景：
+1. 页码范围解析 - "1-20,35" 形式，非法输入报错
+2. 页面选择 - 去重排序、超出文档范围的页码裁剪、max_pages 截断
+3. 分析器只分析所选页面，保留原始页码
+"""
+import fitz
+import pytest
+from app.utils.page_ranges import parse_page_ranges
+from app.core.converters.pdf.page_selection import select_pages, selected_pages_pdf
+from app.core.converters.pdf.pdf_analyzer import PDFAnalyzer
+from app.core.converters.pdf.pdf_converter import PDFConverter
+from app.exceptions.converter_exceptions import InvalidPageRangeException
+
+
+@pytest.fixture
+def sample_pdf(tmp_path):
+    """生成 5 页文本 PDF，每页内容为页码"""
+    path = tmp_path / "sample.pdf"
+    doc = fitz.open()
+    for index in range(5):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Page {index + 1} " * 20)
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+class TestPageRanges:
+    """页码范围解析测试类"""
+
+    def test_parse_ranges(self):
+        """测试：单页与范围混合"""
+        assert parse_page_ranges("1-20, 35") == [(1, 20), (35, 35)]
+
+    @pytest.mark.parametrize("spec", ["0-3", "5-2", "a", "1-", ","])
+    def test_invalid_ranges(self, spec):
+        """测试：页码从 1 开始、范围需递增、格式非法时报错"""
+        with pytest.raises(ValueError):
+            parse_page_ranges(spec)
+
+
+class TestSelectPages:
+    """页面选择测试类"""
+
+    def test_all_pages_by_default(self):
+        """测试：未指定时选择全部页面"""
+        assert select_pages(3) == [0, 1, 2]
+
+    def test_ranges_are_deduplicated_and_clipped(self):
+        """测试：重叠范围去重，超出文档的部分裁剪"""
+        assert select_pages(10, "8-20,2,1-2") == [0, 1, 7, 8, 9]
+
+    def test_max_pages_truncates(self):
+        """测试：超过 max_pages 时按页序截断"""
+        assert select_pages(900, max_pages=10) == list(range(10))
+        assert select_pages(900, "100-900", max_pages=2) == [99, 100]
+
+    def test_out_of_range_selection_fails(self):
+        """测试：所选页码全部超出文档范围时报错"""
+        with pytest.raises(InvalidPageRangeException):
+            select_pages(5, "6-10")
+
+
+class TestAnalyzerSelection:
+    """分析器页面选择测试类"""
+
+    def test_only_selected_pages_are_analyzed(self, sample_pdf):
+        """
+        测试：分析器只分析所选页面
+
+        验证点：
+        1. total_pages 为所选页数，document_pages 为源文档页数
+        2. PageInfo 保留原始页码
+        """
+        pdf_info = PDFAnalyzer().analyze(sample_pdf, pages="2,4-5")
+
+        assert pdf_info.total_pages == 3
+        assert pdf_info.document_pages == 5
+        assert [p.page_number for p in pdf_info.pages] == [2, 4, 5]
+
+    @pytest.mark.asyncio
+    async def test_out_of_range_selection_is_not_conversion_failure(self, sample_pdf):
+        """测试：页码超出文档范围时转换器抛出参数错误（接口返回 400），不包装为转换失败"""
+        with pytest.raises(InvalidPageRangeException):
+            await PDFConverter().convert(sample_pdf, {'pages': "6-10"})
+
+    def test_selected_pages_pdf(self, sample_pdf):
+        """测试：生成只包含所选页面的子文档，全选时直接使用原文件"""
+        with selected_pages_pdf(sample_pdf, [0, 1, 2, 3, 4], 5) as path:
+            assert path == sample_pdf
+
+        with selected_pages_pdf(sample_pdf, [1, 3], 5) as path:
+            with fitz.open(path) as doc:
+                assert doc.page_count == 2
+                assert "Page 4" in doc[1].get_text()
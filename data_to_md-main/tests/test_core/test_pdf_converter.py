@@ -169,7 +169,7 @@ class TestPDFConverter:
         converter = PDFConverter()
         
         with patch.object(converter.analyzer, 'analyze', return_value=mock_pdf_info_text):
-            with patch('app.core.converters.pdf.pdf_converter.MixedPDFProcessor') as MockProcessor:
+            with patch('app.core.converters.pdf.pdf_converter.TextPDFProcessor') as MockProcessor:
                 mock_processor = MockProcessor.return_value
 
                 async def mock_process(*args, **kwargs):
@@ -182,7 +182,7 @@ class TestPDFConverter:
                 
                 result = await converter.convert("test_text.pdf", {})
                 
-                # 验证使用了混排处理器（纯文本也用它）
+                # 验证使用了纯文本处理器
                 MockProcessor.assert_called_once()
                 
                 # 验证文本提取
@@ -203,7 +203,7 @@ class TestPDFConverter:
         converter = PDFConverter()
         
         with patch.object(converter.analyzer, 'analyze', return_value=mock_pdf_info_text):
-            with patch('app.core.converters.pdf.pdf_converter.MixedPDFProcessor') as MockProcessor:
+            with patch('app.core.converters.pdf.pdf_converter.TextPDFProcessor') as MockProcessor:
                 mock_processor = MockProcessor.return_value
 
                 async def mock_process(*args, **kwargs):
@@ -244,7 +244,7 @@ class TestPDFConverter:
         converter = PDFConverter()
         
         with patch.object(converter.analyzer, 'analyze', return_value=mock_pdf_info_text):
-            with patch('app.core.converters.pdf.pdf_converter.MixedPDFProcessor') as MockProcessor:
+            with patch('app.core.converters.pdf.pdf_converter.TextPDFProcessor') as MockProcessor:
                 mock_processor = MockProcessor.return_value
 
                 async def mock_process(*args, **kwargs):
@@ -285,7 +285,7 @@ class TestPDFConverter:
         converter = PDFConverter()
         
         with patch.object(converter.analyzer, 'analyze', return_value=mock_pdf_info_text):
-            with patch('app.core.converters.pdf.pdf_converter.MixedPDFProcessor') as MockProcessor:
+            with patch('app.core.converters.pdf.pdf_converter.TextPDFProcessor') as MockProcessor:
                 mock_processor = MockProcessor.return_value
 
                 async def mock_process(*args, **kwargs):
@@ -308,6 +308,40 @@ class TestPDFConverter:
                 assert 'title:' not in markdown
 
 
+    @pytest.mark.asyncio
+    async def test_convert_stream_emits_pages_in_order(self, mock_pdf_info_image):
+        """
+        测试：流式转换按页序输出页面事件，最后输出完整结果
+        
+        验证点：
+        1. 事件顺序为 start -> page... -> result
+        2. 页面按页序输出（即使后面的页面先完成）
+        3. 最终结果与非流式转换的结构一致
+        """
+        converter = PDFConverter()
+        
+        with patch.object(converter.analyzer, 'analyze', return_value=mock_pdf_info_image):
+            with patch('app.core.converters.pdf.pdf_converter.ImagePDFProcessor') as MockProcessor:
+                mock_processor = MockProcessor.return_value
+
+                async def mock_iter_chunks(*args, **kwargs):
+                    for page in (1, 2, 3):
+                        yield ContentChunk(page_number=page, chunk_type="ocr", content=f"OCR Page {page}")
+
+                mock_processor.iter_chunks = mock_iter_chunks
+                
+                events = [event async for event in converter.convert_stream("test_image.pdf", {})]
+                
+                assert [e['event'] for e in events] == ['start', 'page', 'page', 'page', 'result']
+                assert events[0]['total_pages'] == 3
+                assert [e['page_number'] for e in events[1:4]] == [1, 2, 3]
+                assert 'OCR Page 1' in events[1]['markdown']
+                assert '<!-- Page 1' in events[1]['markdown']
+                
+                result = events[-1]['result']
+                assert result.metadata['ocr_pages'] == 3
+                assert 'OCR Page 3' in result.markdown
+
     def test_processor_selection(self):
         """
         测试：根据PDF类型选择正确的处理器
@@ -315,7 +349,7 @@ class TestPDFConverter:
         验证点：
         1. 图片PDF -> ImagePDFProcessor
         2. 混排PDF -> MixedPDFProcessor
-        3. 文本PDF -> MixedPDFProcessor（也用混排处理器）
+        3. 文本PDF -> TextPDFProcessor
         """
         converter = PDFConverter()
         
@@ -329,9 +363,10 @@ class TestPDFConverter:
         processor_mixed = converter._select_processor(PDFType.MIXED)
         assert isinstance(processor_mixed, MixedPDFProcessor)
         
-        # 测试文本PDF（也用混排处理器）
+        # 测试文本PDF
+        from app.core.converters.pdf.text_pdf_processor import TextPDFProcessor
         processor_text = converter._select_processor(PDFType.TEXT)
-        assert isinstance(processor_text, MixedPDFProcessor)
+        assert isinstance(processor_text, TextPDFProcessor)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,51 @@
+"""
+纯文本PDF处理器测试
+"""
+import fitz
+import pytest
+from app.core.converters.pdf.pdf_analyzer import PDFAnalyzer
+from app.core.converters.pdf.pdf_document import PDFDocumentSession
+from app.core.converters.pdf.text_pdf_processor import TextPDFProcessor
+from app.core.converters.pdf.text_extractor import TextExtractor
+
+
+@pytest.fixture
+def text_pdf(tmp_path):
+    """生成 12 页纯文本 PDF"""
+    path = tmp_path / "text.pdf"
+    doc = fitz.open()
+    for index in range(12):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Page {index + 1} first paragraph.")
+        page.insert_text((72, 200), f"Page {index + 1} second paragraph.")
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+class TestTextPDFProcessor:
+    """纯文本PDF处理器测试类"""
+
+    @pytest.mark.asyncio
+    async def test_shards_are_merged_in_page_order(self, text_pdf):
+        """
+        测试：分片在进程池中提取，按页序产出
+
+        验证点：
+        1. 每页一个片段，页码连续
+        2. 内容与在主进程中逐页提取的结果一致
+        3. 进度按页上报
+        """
+        pdf_info = PDFAnalyzer().analyze(text_pdf, pages="2-12")
+        progress = []
+        processor = TextPDFProcessor(progress_callback=lambda done, total: progress.append(done), shard_pages=4)
+
+        chunks = await processor.process(text_pdf, pdf_info)
+
+        assert [chunk.page_number for chunk in chunks] == list(range(2, 13))
+        extractor = TextExtractor()
+        with PDFDocumentSession(text_pdf) as session:
+            expected = [extractor.extract_text(session.page(n)) for n in range(1, 12)]
+        assert [chunk.content for chunk in chunks] == expected
+        assert "Page 2 first paragraph." in chunks[0].content
+        assert progress == list(range(1, 12))
@@ -0,0 +1,183 @@
+"""
+逐页内容片段存储测试
+"""
+import os
+import gzip
+import json
+import time
+import pytest
+from unittest.mock import Mock
+from app.core.base.processor import ContentChunk
+from app.core.common.markdown_generator import MarkdownGenerator
+from app.models.enums import ChunkType, PDFType
+from app.models.file_info import PDFInfo, PageInfo
+from app.services.conversion.conversion_service import ConversionService
+from app.services.storage.chunk_store import ChunkStore
+from app.exceptions.service_exceptions import TaskNotFoundException
+
+
+@pytest.fixture
+def store(tmp_path):
+    """创建存储实例"""
+    return ChunkStore(store_dir=str(tmp_path / "chunks"))
+
+
+@pytest.fixture
+def chunks():
+    """OCR 与文本混合的内容片段"""
+    return [
+        ContentChunk(content=f"# Page {n}\n\n正文 {n} " * 20, page_number=n, chunk_type=ChunkType.OCR,
+                     metadata={'ocr_engine': 'deepseek', 'pages': f"{n}"})
+        if n % 2 else
+        ContentChunk(content=f"Text page {n}\n" * 20, page_number=n, chunk_type=ChunkType.TEXT,
+                     metadata={'method': 'text_extraction'})
+        for n in range(1, 41)
+    ]
+
+
+@pytest.fixture
+def file_info():
+    """文件信息"""
+    return PDFInfo(
+        file_path="/tmp/doc.pdf",
+        file_size=1024,
+        total_pages=40,
+        pdf_type=PDFType.MIXED,
+        pages=[PageInfo(page_number=n, has_text=True, text_length=10, has_images=False, image_count=0) for n in range(1, 41)],
+        metadata={'title': '测试文档'}
+    )
+
+
+class TestChunkStore:
+    """逐页内容片段存储测试类"""
+
+    def test_save_and_load_round_trip(self, store, chunks, file_info):
+        """
+        测试：保存后读取得到相同的片段，生成的 Markdown 一致
+
+        验证点：
+        1. 片段类型还原为 ChunkType，页面标记不变
+        2. 文件经过压缩，不保存逐页分析结果
+        """
+        path = store.save("task_abc123", chunks, file_info)
+        loaded_chunks, loaded_info = store.load("task_abc123")
+
+        assert loaded_chunks == chunks
+        assert all(isinstance(chunk.chunk_type, ChunkType) for chunk in loaded_chunks)
+        assert loaded_info.metadata == {'title': '测试文档'}
+        assert loaded_info.pages == []
+        generator = MarkdownGenerator(include_metadata=False)
+        assert generator.generate(loaded_chunks, loaded_info) == generator.generate(chunks, file_info)
+
+        raw_size = sum(len(chunk.content.encode('utf-8')) for chunk in chunks)
+        with open(path, 'rb') as f:
+            assert len(f.read()) < raw_size / 4
+
+    def test_missing_invalid_and_corrupt_records(self, store, chunks, file_info):
+        """测试：不存在、任务ID不合法或文件损坏时返回 None"""
+        assert store.load("task_missing") is None
+        assert store.save("../escape", chunks, file_info) is None
+        assert store.load("../escape") is None
+
+        store.save("task_bad", chunks, file_info)
+        with gzip.open(store.path("task_bad"), 'wb') as f:
+            f.write(json.dumps({'version': 1, 'chunks': []}).encode('utf-8'))
+        assert store.load("task_bad") is None
+
+        store.path("task_bad").write_bytes(b"not gzip")
+        assert store.load("task_bad") is None
+
+    def test_open_streams_chunks(self, store, chunks, file_info):
+        """测试：打开后可重复迭代，片段与整体读取一致"""
+        store.save("task_abc123", chunks, file_info)
+        stored_chunks, loaded_info = store.open("task_abc123")
+
+        assert loaded_info.total_pages == 40
+        assert list(stored_chunks) == chunks
+        assert list(stored_chunks) == chunks
+        assert stored_chunks.count == 40
+
+    def test_copy_creates_directory(self, tmp_path, store, chunks, file_info):
+        """测试：复制到尚未创建的目录"""
+        source = store.save("task_src", chunks, file_info)
+        fresh = ChunkStore(store_dir=str(tmp_path / "fresh"))
+
+        assert fresh.copy(source, "task_dst") is not None
+        assert fresh.load("task_dst")[0] == chunks
+
+    def test_retention(self, tmp_path, chunks, file_info):
+        """
+        测试：保留策略
+
+        验证点：
+        1. 超过保留时间的文件在写入时删除
+        2. 超过总大小上限时淘汰最久未使用的文件，读取会更新使用时间
+        """
+        store = ChunkStore(store_dir=str(tmp_path / "chunks"), ttl_seconds=3600)
+        store.save("task_old", chunks, file_info)
+        expired = time.time() - 7200
+        os.utime(store.path("task_old"), (expired, expired))
+        store.save("task_new", chunks, file_info)
+        assert not store.path("task_old").exists()
+        assert store.path("task_new").exists()
+
+        size = store.path("task_new").stat().st_size
+        store.max_bytes = size * 2
+        store.save("task_a", chunks, file_info)
+        for task_id, age in (("task_new", 30), ("task_a", 20)):
+            os.utime(store.path(task_id), (time.time() - age, time.time() - age))
+        store.open("task_new")
+        store.save("task_b", chunks, file_info)
+
+        assert store.path("task_new").exists()
+        assert not store.path("task_a").exists()
+        assert store.path("task_b").exists()
+
+    def test_disabled_store(self, tmp_path, chunks, file_info):
+        """测试：未启用时不写入"""
+        store = ChunkStore(store_dir=str(tmp_path / "chunks"), enabled=False)
+        assert store.save("task_abc123", chunks, file_info) is None
+        assert store.load("task_abc123") is None
+
+
+class TestRender:
+    """按新的输出选项重新生成测试类"""
+
+    def test_render_switches_output_mode(self, store, chunks, file_info):
+        """测试：重新生成的结果与用新选项直接生成的一致"""
+        service = ConversionService()
+        service.chunk_store = store
+        store.save("task_abc123", chunks, file_info)
+
+        result = service.render("task_abc123", {'no_pagination_and_metadata': True})
+
+        expected = MarkdownGenerator(no_pagination_and_metadata=True).generate(chunks, file_info)
+        assert result['markdown_content'] == expected
+        assert "<!-- Page" not in result['markdown_content']
+        assert result['metadata']['total_pages'] == 40
+
+        paginated = service.render("task_abc123", {'include_metadata': False})
+        assert paginated['markdown_content'].startswith("<!-- Page 1 (")
+
+    def test_bounded_task_renders_to_file(self, store, chunks, file_info):
+        """测试：有界内存模式任务的结果写入文件，不返回全文"""
+        service = ConversionService()
+        service.chunk_store = store
+        service.task_manager = Mock(get_task=Mock(return_value=Mock(metadata={'bounded_memory': True})))
+        store.save("task_abc123", chunks, file_info)
+
+        result = service.render("task_abc123", {'no_pagination_and_metadata': True})
+
+        expected = MarkdownGenerator(no_pagination_and_metadata=True).generate(chunks, file_info)
+        assert result['markdown_content'] == ""
+        assert result['download_url'] == "/api/v1/render/task_abc123/download"
+        assert result['metadata']['chunks'] == 40
+        assert store.render_path("task_abc123").read_text(encoding='utf-8') == expected
+
+    def test_render_unknown_task(self, store):
+        """测试：没有保存片段的任务抛出 TaskNotFoundException"""
+        service = ConversionService()
+        service.chunk_store = store
+
+        with pytest.raises(TaskNotFoundException):
+            service.render("task_missing", {})
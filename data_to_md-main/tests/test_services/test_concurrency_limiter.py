@@ -0,0 +1,123 @@
+"""
+自适应并发限制器测试
+"""
+import asyncio
+import time
+import httpx
+import pytest
+from app.services.external.concurrency_limiter import (
+    AdaptiveConcurrencyLimiter,
+    classify_exception,
+    parse_retry_after,
+)
+
+
+def throttled_error(retry_after: str = None) -> httpx.HTTPStatusError:
+    """构造 429 异常"""
+    headers = {"retry-after": retry_after} if retry_after else {}
+    request = httpx.Request("POST", "https://example.com")
+    response = httpx.Response(429, headers=headers, request=request)
+    return httpx.HTTPStatusError("Too Many Requests", request=request, response=response)
+
+
+class TestAdaptiveConcurrencyLimiter:
+    """自适应并发限制器测试类"""
+
+    @pytest.mark.asyncio
+    async def test_limit_caps_in_flight_requests(self):
+        """测试：在途请求数不超过当前上限"""
+        limiter = AdaptiveConcurrencyLimiter("test", initial_limit=2, max_limit=2)
+        peak = 0
+
+        async def call():
+            nonlocal peak
+            async with limiter.acquire():
+                peak = max(peak, limiter.in_flight)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(call() for _ in range(6)))
+
+        assert peak == 2
+        assert limiter.stats()["successes"] == 6
+
+    @pytest.mark.asyncio
+    async def test_additive_increase_on_success(self):
+        """测试：成功请求逐步增大上限，不超过 max_limit"""
+        limiter = AdaptiveConcurrencyLimiter("test", initial_limit=2, max_limit=4)
+
+        for _ in range(50):
+            async with limiter.acquire():
+                pass
+
+        assert limiter.limit == 4
+
+    @pytest.mark.asyncio
+    async def test_slow_requests_do_not_increase(self):
+        """测试：延迟超过目标时保持上限"""
+        limiter = AdaptiveConcurrencyLimiter("test", initial_limit=2, max_limit=8, latency_target=0.001)
+
+        for _ in range(5):
+            async with limiter.acquire():
+                await asyncio.sleep(0.01)
+
+        assert limiter.limit == 2
+
+    @pytest.mark.asyncio
+    async def test_throttle_halves_once_per_congestion_round(self):
+        """
+        测试：限流时上限减半
+
+        验证点：
+        1. 同时在途的请求一起失败只减半一次
+        2. 其他错误不影响上限
+        """
+        limiter = AdaptiveConcurrencyLimiter("test", initial_limit=8, max_limit=8)
+
+        async def fail(exc):
+            with pytest.raises(type(exc)):
+                async with limiter.acquire():
+                    await asyncio.sleep(0.01)
+                    raise exc
+
+        await asyncio.gather(*(fail(throttled_error()) for _ in range(4)))
+        assert limiter.limit == 4
+
+        await fail(ValueError("bad request"))
+        assert limiter.limit == 4
+
+        await fail(asyncio.TimeoutError())
+        assert limiter.limit == 2
+        assert limiter.stats()["throttles"] == 4
+        assert limiter.stats()["timeouts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_retry_after_blocks_new_requests(self):
+        """测试：Retry-After 期间不发起新请求"""
+        limiter = AdaptiveConcurrencyLimiter("test", initial_limit=4)
+
+        async with limiter.acquire() as permit:
+            permit.mark_throttled(retry_after=0.2)
+
+        start = time.monotonic()
+        async with limiter.acquire():
+            pass
+
+        assert time.monotonic() - start >= 0.15
+        assert limiter.limit == 2
+
+
+class TestClassification:
+    """过载判断测试类"""
+
+    def test_classify_exception(self):
+        """测试：429 携带 Retry-After，超时视为过载，其他错误不视为过载"""
+        assert classify_exception(throttled_error("3")) == ("throttled", 3.0)
+        assert classify_exception(httpx.ReadTimeout("timeout")) == ("timeout", None)
+        assert classify_exception(ValueError("x")) == (None, None)
+
+    def test_parse_retry_after(self):
+        """测试：支持毫秒、秒与 HTTP 日期"""
+        assert parse_retry_after({"retry-after-ms": "1500"}) == 1.5
+        assert parse_retry_after({"retry-after": "2"}) == 2.0
+        assert parse_retry_after({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}) == 0.0
+        assert parse_retry_after({}) is None
@@ -0,0 +1,41 @@
+"""
+流式转换服务测试
+
+测试场景：
+1. 客户端断开连接 - 未完成的任务标记为失败
+"""
+import pytest
+from unittest.mock import Mock
+from app.models.enums import FileType, TaskStatus
+from app.services.conversion.conversion_service import ConversionService
+from app.services.conversion.task_manager import TaskManager
+from app.services.conversion.task_store import MemoryTaskStore
+
+
+class FakeStreamConverter:
+    """产出一页后等待的转换器"""
+
+    async def convert_stream(self, file_path, options):
+        yield {'event': 'page', 'page_number': 1, 'chunk_type': 'ocr', 'markdown': "page 1"}
+        yield {'event': 'page', 'page_number': 2, 'chunk_type': 'ocr', 'markdown': "page 2"}
+
+
+class TestConvertStream:
+    """流式转换测试类"""
+
+    @pytest.mark.asyncio
+    async def test_client_disconnect_fails_task(self):
+        """测试：客户端在转换完成前断开，任务标记为失败而不是停留在处理中"""
+        service = ConversionService.__new__(ConversionService)
+        service.task_manager = TaskManager(store=MemoryTaskStore())
+        service.file_type_detector = Mock(detect=Mock(return_value=FileType.PDF))
+        service.converter_factory = Mock(create_converter=Mock(return_value=FakeStreamConverter()))
+        service.result_cache = Mock(enabled=False)
+
+        stream = service.convert_stream("a.pdf", "a.pdf", {})
+        event = await stream.__anext__()
+        await stream.aclose()
+
+        task = service.task_manager.get_task(event['task_id'])
+        assert task.status == TaskStatus.FAILED
+        assert task.error_message == "client disconnected"
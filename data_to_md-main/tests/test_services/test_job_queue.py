@@ -0,0 +1,91 @@
+"""
+异步任务队列测试
+"""
+import asyncio
+import pytest
+from unittest.mock import patch
+from app.services.conversion.job_queue import ConversionJobQueue, ConversionJob
+from app.services.conversion.task_manager import TaskManager
+from app.exceptions.service_exceptions import TaskProcessingException
+
+
+def make_job(task_id: str) -> ConversionJob:
+    """创建测试任务"""
+    return ConversionJob(task_id=task_id, file_path=f"{task_id}.pdf", filename=f"{task_id}.pdf", options={})
+
+
+class TestConversionJobQueue:
+    """异步任务队列测试类"""
+
+    @pytest.mark.asyncio
+    async def test_submitted_jobs_run_in_background(self):
+        """测试：提交后立即返回，任务由 worker 在后台执行"""
+        queue = ConversionJobQueue(workers=2, max_size=10)
+        done = []
+
+        async def fake_run_task(self, task_id, file_path, filename, options):
+            await asyncio.sleep(0.01)
+            done.append(task_id)
+
+        with patch(
+            'app.services.conversion.conversion_service.ConversionService.run_task',
+            fake_run_task
+        ):
+            queue.submit(make_job("task_a"))
+            queue.submit(make_job("task_b"))
+            assert done == []
+
+            await asyncio.wait_for(queue._queue.join(), timeout=5)
+            await queue.stop()
+
+        assert sorted(done) == ["task_a", "task_b"]
+
+    @pytest.mark.asyncio
+    async def test_failed_job_does_not_stop_worker(self):
+        """测试：单个任务失败后 worker 继续处理后续任务"""
+        queue = ConversionJobQueue(workers=1, max_size=10)
+        done = []
+
+        async def fake_run_task(self, task_id, file_path, filename, options):
+            if task_id == "task_bad":
+                raise RuntimeError("boom")
+            done.append(task_id)
+
+        with patch(
+            'app.services.conversion.conversion_service.ConversionService.run_task',
+            fake_run_task
+        ):
+            queue.submit(make_job("task_bad"))
+            queue.submit(make_job("task_ok"))
+            await asyncio.wait_for(queue._queue.join(), timeout=5)
+            await queue.stop()
+
+        assert done == ["task_ok"]
+
+    @pytest.mark.asyncio
+    async def test_full_queue_rejects_job(self):
+        """测试：排队数达到上限时拒绝提交"""
+        queue = ConversionJobQueue(workers=1, max_size=1)
+
+        # 不让出事件循环，worker 尚未取走任务
+        queue.submit(make_job("task_1"))
+        with pytest.raises(TaskProcessingException):
+            queue.submit(make_job("task_2"))
+
+        await queue.stop()
+
+
+class TestTaskProgress:
+    """任务进度测试类"""
+
+    def test_update_task_progress(self):
+        """测试：进度回调写入任务进度"""
+        manager = TaskManager()
+        task = manager.create_task(filename="a.pdf", file_path="a.pdf", file_type="pdf")
+
+        manager.update_task_progress(task.task_id, 3, 12)
+
+        task = manager.get_task(task.task_id)
+        assert task.current_page == 3
+        assert task.total_pages == 12
+        assert task.progress == 25
@@ -0,0 +1,65 @@
+"""
+本地 OCR 客户端测试
+"""
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.services.external.local_ocr_client import lines_to_markdown, resolve_backend
+from app.exceptions.service_exceptions import LocalOCRException
+from app.core.converters.pdf.ocr_runner import PageOCRRunner
+from app.services.storage.ocr_cache import OCRResultCache
+
+
+class TestLinesToMarkdown:
+    """文本行合并测试类"""
+
+    def test_boxes_on_same_line_are_joined(self):
+        """测试：同一水平线上的文本框按从左到右合并"""
+        lines = [
+            (500, 102, 520, 118, "2"),
+            (100, 100, 400, 120, "Chapter 1"),
+        ]
+
+        assert lines_to_markdown(lines) == "Chapter 1 2"
+
+    def test_large_gaps_start_new_paragraph(self):
+        """测试：行间距大于行高时分段，中文字符之间的空格被去掉"""
+        lines = [
+            (100, 100, 400, 120, "第一行"),
+            (100, 124, 400, 144, "第二 行"),
+            (100, 200, 400, 220, "Next paragraph"),
+        ]
+
+        assert lines_to_markdown(lines) == "第一行\n第二行\n\nNext paragraph"
+
+    def test_empty_result(self):
+        """测试：空白页返回空字符串"""
+        assert lines_to_markdown([(0, 0, 10, 10, "  ")]) == ""
+
+
+class TestLocalEngineSelection:
+    """本地引擎选择测试类"""
+
+    def test_unknown_backend_is_rejected(self):
+        """测试：不支持的后端给出明确错误"""
+        with pytest.raises(LocalOCRException):
+            resolve_backend("unknown")
+
+    @pytest.mark.asyncio
+    async def test_runner_uses_local_engine(self, tmp_path):
+        """测试：ocr_engine=local 时不调用 DeepSeek"""
+        with patch(
+            'app.services.external.local_ocr_client.LocalOCRClient.ocr_image',
+            new=AsyncMock(return_value="local text")
+        ), patch(
+            'app.services.external.deepseek_client.DeepSeekClient.ocr_image',
+            new=AsyncMock(side_effect=AssertionError("remote OCR called"))
+        ), patch(
+            'app.services.external.local_ocr_client.LocalOCRClient.model',
+            new="test-model"
+        ):
+            runner = PageOCRRunner(ocr_engine="local")
+            runner.cache = OCRResultCache(str(tmp_path), max_bytes=1024, enabled=False)
+
+            markdown, engine_used, cache_hit = await runner.run("aW1hZ2U=", dpi=144)
+
+        assert (markdown, engine_used, cache_hit) == ("local text", "local", False)
@@ -0,0 +1,179 @@
+"""
+MinerU 客户端传输层测试
+使用自定义 httpx 传输层模拟 MinerU 接口与对象存储
+"""
+import io
+import json
+import tracemalloc
+import zipfile
+import httpx
+import pytest
+from unittest.mock import patch
+from app.services.external.mineru_client import MinerUClient
+from app.services.external.mineru_poller import MinerUBatchPoller
+
+UPLOAD_URL = "https://oss.example.com/upload/doc.pdf"
+ZIP_URL = "https://cdn.example.com/result.zip"
+
+
+def make_zip(markdown: str) -> bytes:
+    """构造结果 ZIP"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as z:
+        z.writestr("full.md", markdown)
+        z.writestr("layout.json", "{}")
+    return buffer.getvalue()
+
+
+class FakeMinerU:
+    """模拟 MinerU：记录上传字节数与请求头"""
+
+    def __init__(self, markdown: str = "# Parsed"):
+        self.zip_bytes = make_zip(markdown)
+        self.uploaded = 0
+        self.upload_headers = None
+        self.requests = 0
+        self.files = []
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        url = str(request.url)
+        if url.endswith("file-urls/batch") and len(json.loads(request.content)["files"]) > 1:
+            self.files = json.loads(request.content)["files"]
+            return httpx.Response(200, json={
+                "code": 0,
+                "data": {
+                    "batch_id": "b2",
+                    "file_urls": [f"{UPLOAD_URL}.{i}" for i in range(len(self.files))],
+                },
+            })
+        if url.startswith(f"{UPLOAD_URL}."):
+            async for chunk in request.stream:
+                self.uploaded += len(chunk)
+            return httpx.Response(200)
+        if "extract-results/batch/b2" in url:
+            # 结果顺序与提交顺序不同，按 data_id 对应
+            return httpx.Response(200, json={
+                "code": 0,
+                "data": {"extract_result": [
+                    {"data_id": f["data_id"], "state": "done", "full_zip_url": f"{ZIP_URL}?{f['data_id']}"}
+                    for f in reversed(self.files)
+                ]},
+            })
+        if url.startswith(f"{ZIP_URL}?"):
+            return httpx.Response(200, content=make_zip(f"# {request.url.query.decode()}"))
+        if url.endswith("file-urls/batch"):
+            return httpx.Response(200, json={
+                "code": 0,
+                "data": {"batch_id": "b1", "file_urls": [UPLOAD_URL]},
+            })
+        if url == UPLOAD_URL:
+            self.upload_headers = request.headers
+            async for chunk in request.stream:
+                self.uploaded += len(chunk)
+            return httpx.Response(200)
+        if "extract-results/batch/b1" in url:
+            return httpx.Response(200, json={
+                "code": 0,
+                "data": {"extract_result": [{"state": "done", "full_zip_url": ZIP_URL}]},
+            })
+        if url == ZIP_URL:
+            return httpx.Response(200, content=self.zip_bytes)
+        return httpx.Response(404)
+
+
+class StreamingTransport(httpx.AsyncBaseTransport):
+    """把请求直接交给模拟服务（与 MockTransport 不同，不预先读取请求体）"""
+
+    def __init__(self, fake: FakeMinerU):
+        self.fake = fake
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self.fake.handler(request)
+
+
+@pytest.fixture
+def mineru_client():
+    """配置好 API Key、无轮询等待的客户端"""
+    client = MinerUClient()
+    client.api_key = "test-key"
+    client.base_url = "https://mineru.example.com/api/v4"
+    poller = MinerUBatchPoller(base_interval=0, max_interval=0)
+    with patch("app.services.external.mineru_client.get_mineru_poller", return_value=poller):
+        yield client
+
+
+class TestMinerUTransport:
+    """MinerU 传输层测试类"""
+
+    @pytest.mark.asyncio
+    async def test_ocr_pdf_reuses_one_client(self, mineru_client, tmp_path):
+        """
+        测试：完整流程复用同一个共享客户端
+
+        验证点：
+        1. 上传使用 Content-Length 而非分块编码，字节数完整
+        2. 从流式下载的 ZIP 中提取 markdown
+        """
+        pdf_path = tmp_path / "doc.pdf"
+        pdf_path.write_bytes(b"%PDF-1.4" + b"0" * 300_000)
+        fake = FakeMinerU("# Parsed")
+        http_client = httpx.AsyncClient(transport=StreamingTransport(fake))
+
+        with patch(
+            "app.services.external.mineru_client.get_mineru_http_client",
+            return_value=http_client,
+        ):
+            markdown = await mineru_client.ocr_pdf(str(pdf_path))
+
+        assert markdown == "# Parsed"
+        assert fake.uploaded == pdf_path.stat().st_size
+        assert fake.upload_headers["content-length"] == str(pdf_path.stat().st_size)
+        assert "transfer-encoding" not in fake.upload_headers
+        assert fake.requests == 4
+        await http_client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_upload_memory_is_flat(self, mineru_client, tmp_path):
+        """测试：上传大文件时内存占用不随文件大小增长"""
+        pdf_path = tmp_path / "large.pdf"
+        with open(pdf_path, "wb") as f:
+            f.truncate(64 * 1024 * 1024)
+        fake = FakeMinerU()
+        http_client = httpx.AsyncClient(transport=StreamingTransport(fake))
+
+        with patch(
+            "app.services.external.mineru_client.get_mineru_http_client",
+            return_value=http_client,
+        ):
+            tracemalloc.start()
+            await mineru_client._upload_file(UPLOAD_URL, str(pdf_path))
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        assert fake.uploaded == 64 * 1024 * 1024
+        assert peak < 8 * 1024 * 1024
+        await http_client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_ocr_pdfs_submits_one_batch(self, mineru_client, tmp_path):
+        """测试：多个分片作为一个批次提交，结果按提交顺序返回"""
+        paths = []
+        for index in range(3):
+            path = tmp_path / f"shard_{index}.pdf"
+            path.write_bytes(b"%PDF-1.4" + b"0" * 1000)
+            paths.append(str(path))
+        fake = FakeMinerU()
+        http_client = httpx.AsyncClient(transport=StreamingTransport(fake))
+
+        with patch(
+            "app.services.external.mineru_client.get_mineru_http_client",
+            return_value=http_client,
+        ):
+            markdowns = await mineru_client.ocr_pdfs(paths)
+
+        assert markdowns == ["# part_0", "# part_1", "# part_2"]
+        assert fake.uploaded == 3 * 1008
+        # 申请链接 1 次 + 上传 3 次 + 轮询 1 次 + 下载 3 次
+        assert fake.requests == 8
+        await http_client.aclose()
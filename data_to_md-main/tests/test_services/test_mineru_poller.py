@@ -0,0 +1,138 @@
+"""
+MinerU 共享轮询器测试
+"""
+import random
+import asyncio
+import pytest
+from app.services.external.mineru_poller import (
+    MinerUBatchPoller,
+    next_poll_delay,
+    summarize_progress,
+)
+from app.exceptions.service_exceptions import MinerUAPIException
+
+
+class FakeBatches:
+    """模拟批次状态：每个批次被查询 polls_needed 次后完成，按轮记录查询数"""
+
+    def __init__(self, poller: MinerUBatchPoller, polls_needed: int = 3):
+        self.poller = poller
+        self.polls_needed = polls_needed
+        self.polls = {}
+        self.per_round = {}
+
+    async def fetch(self, batch_id: str):
+        self.polls[batch_id] = self.polls.get(batch_id, 0) + 1
+        self.per_round[self.poller.rounds] = self.per_round.get(self.poller.rounds, 0) + 1
+        await asyncio.sleep(0)
+        if self.polls[batch_id] >= self.polls_needed:
+            return [{"state": "done", "full_zip_url": f"https://cdn/{batch_id}.zip"}]
+        return [{"state": "running", "extract_progress": {"extracted_pages": 1, "total_pages": 10}}]
+
+
+class TestMinerUBatchPoller:
+    """共享轮询器测试类"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_jobs_share_rate_limited_rounds(self):
+        """
+        测试：50 个并发任务的状态查询受全局限速
+
+        验证点：
+        1. 每轮最多 max_requests 个查询
+        2. 所有任务都拿到各自的结果
+        """
+        poller = MinerUBatchPoller(base_interval=0.01, max_interval=0.02, max_requests=5, rng=random.Random(0))
+        batches = FakeBatches(poller)
+
+        results = await asyncio.gather(*(
+            poller.wait(f"b{i}", batches.fetch) for i in range(50)
+        ))
+
+        assert [r[0]["full_zip_url"] for r in results] == [f"https://cdn/b{i}.zip" for i in range(50)]
+        assert max(batches.per_round.values()) <= 5
+        assert poller.stats()["pending_batches"] == 0
+
+    @pytest.mark.asyncio
+    async def test_waiters_on_same_batch_share_one_query(self):
+        """测试：同一批次的多个等待者共用一次查询"""
+        poller = MinerUBatchPoller(base_interval=0.001, max_interval=0.001)
+        batches = FakeBatches(poller, polls_needed=2)
+
+        results = await asyncio.gather(*(poller.wait("shared", batches.fetch) for _ in range(10)))
+
+        assert len(results) == 10
+        assert batches.polls["shared"] == 2
+
+    @pytest.mark.asyncio
+    async def test_fetch_errors_are_retried(self):
+        """测试：查询失败时按退避重试"""
+        poller = MinerUBatchPoller(base_interval=0.001, max_interval=0.001)
+        calls = []
+
+        async def flaky(batch_id):
+            calls.append(batch_id)
+            if len(calls) < 3:
+                raise MinerUAPIException(message="查询任务状态失败", details="HTTP 502")
+            return [{"state": "failed", "err_msg": "bad pdf"}]
+
+        results = await poller.wait("b1", flaky)
+
+        assert results == [{"state": "failed", "err_msg": "bad pdf"}]
+        assert len(calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_timeout(self):
+        """测试：超过等待时间仍未完成时抛出超时异常"""
+        poller = MinerUBatchPoller(base_interval=0.001, max_interval=0.001)
+        batches = FakeBatches(poller, polls_needed=10 ** 6)
+
+        with pytest.raises(MinerUAPIException, match="超时"):
+            await poller.wait("slow", batches.fetch, timeout=0.05)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_stops_polling(self):
+        """测试：等待者取消后不再轮询该批次"""
+        poller = MinerUBatchPoller(base_interval=0.001, max_interval=0.001)
+        batches = FakeBatches(poller, polls_needed=10 ** 6)
+
+        task = asyncio.create_task(poller.wait("b1", batches.fetch))
+        await asyncio.sleep(0.02)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        polls = batches.polls["b1"]
+        await asyncio.sleep(0.02)
+
+        assert batches.polls["b1"] == polls
+        assert poller.stats()["pending_batches"] == 0
+
+
+class TestPollDelay:
+    """轮询间隔测试类"""
+
+    def test_exponential_backoff_without_progress(self):
+        """测试：无进度时指数退避并封顶，抖动在 ±25% 以内"""
+        rng = random.Random(1)
+        delays = [next_poll_delay(n, 2.0, 30.0, rng=rng) for n in range(8)]
+
+        for n, delay in enumerate(delays):
+            expected = min(30.0, 2.0 * 2 ** n)
+            assert 0.75 * expected <= delay <= 1.25 * expected
+
+    def test_progress_seeds_delay(self):
+        """测试：有进度估计时在剩余时间的一半处再查"""
+        rng = random.Random(1)
+
+        delay = next_poll_delay(10, 2.0, 30.0, remaining=20.0, rng=rng)
+
+        assert 7.5 <= delay <= 12.5
+
+    def test_summarize_progress_counts_done_files_fully(self):
+        """测试：批次进度汇总，已完成文件计全部页数"""
+        results = [
+            {"state": "done", "extract_progress": {"extracted_pages": 0, "total_pages": 8}},
+            {"state": "running", "extract_progress": {"extracted_pages": 3, "total_pages": 12}},
+            {"state": "pending"},
+        ]
+
+        assert summarize_progress(results) == (11, 20)
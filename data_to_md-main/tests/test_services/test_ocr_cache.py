@@ -0,0 +1,65 @@
+"""
+OCR 结果缓存测试
+"""
+import pytest
+from app.services.storage.ocr_cache import OCRResultCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """创建缓存实例（上限 100 字节）"""
+    return OCRResultCache(cache_dir=str(tmp_path), max_bytes=100)
+
+
+class TestOCRResultCache:
+    """OCR 结果缓存测试类"""
+
+    def test_key_depends_on_all_inputs(self):
+        """测试：图像、引擎、提示词、DPI、模型任一变化都会改变缓存键"""
+        base = OCRResultCache.make_key("AAAA", "deepseek", "p", 144, "m")
+        assert base == OCRResultCache.make_key("AAAA", "deepseek", "p", 144, "m")
+        assert base != OCRResultCache.make_key("AAAB", "deepseek", "p", 144, "m")
+        assert base != OCRResultCache.make_key("AAAA", "mineru", "p", 144, "m")
+        assert base != OCRResultCache.make_key("AAAA", "deepseek", "q", 144, "m")
+        assert base != OCRResultCache.make_key("AAAA", "deepseek", "p", 200, "m")
+        assert base != OCRResultCache.make_key("AAAA", "deepseek", "p", 144, "n")
+
+    def test_hit_and_miss_counters(self, cache):
+        """测试：命中与未命中计数"""
+        key = cache.make_key("AAAA", "deepseek", "p", 144, "m")
+        assert cache.get(key) is None
+
+        cache.put(key, "# Page")
+        assert cache.get(key) == "# Page"
+
+        stats = cache.stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['entries'] == 1
+
+    def test_lru_eviction_by_size(self, cache):
+        """测试：超出容量时淘汰最久未访问的条目"""
+        cache.put("a" * 64, "x" * 40)
+        cache.put("b" * 64, "y" * 40)
+        cache.get("a" * 64)  # a 变为最近访问
+        cache.put("c" * 64, "z" * 40)
+
+        assert cache.get("b" * 64) is None
+        assert cache.get("a" * 64) == "x" * 40
+        assert cache.get("c" * 64) == "z" * 40
+        assert cache.stats()['size_bytes'] <= 100
+
+    def test_index_rebuilt_from_disk(self, tmp_path, cache):
+        """测试：新实例可以读取已有的缓存文件"""
+        key = cache.make_key("AAAA", "deepseek", "p", 144, "m")
+        cache.put(key, "# Page")
+
+        reopened = OCRResultCache(cache_dir=str(tmp_path), max_bytes=100)
+        assert reopened.get(key) == "# Page"
+
+    def test_disabled_cache(self, tmp_path):
+        """测试：禁用时不读写"""
+        cache = OCRResultCache(cache_dir=str(tmp_path), max_bytes=100, enabled=False)
+        cache.put("a" * 64, "x")
+        assert cache.get("a" * 64) is None
+        assert cache.stats()['entries'] == 0
@@ -0,0 +1,154 @@
+"""
+OCR 对冲请求测试
+"""
+import asyncio
+import pytest
+from app.core.converters.pdf.ocr_runner import PageOCRRunner
+from app.services.external.ocr_hedger import OCRHedger, LatencyTracker
+from app.services.storage.ocr_cache import OCRResultCache
+
+
+def make_call(result, delay, log=None, fail=False):
+    """构造 OCR 调用：拿到名额后等待 delay 秒返回 result"""
+    async def call(started):
+        started.set()
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            if log is not None:
+                log.append(f"{result} cancelled")
+            raise
+        if fail:
+            raise RuntimeError(f"{result} failed")
+        return result
+    return call
+
+
+def warmed_hedger(latency=0.01, **kwargs) -> OCRHedger:
+    """构造已有足够延迟样本的执行器"""
+    hedger = OCRHedger(min_delay=0.0, min_samples=5, **kwargs)
+    for _ in range(10):
+        hedger.latencies.record(latency)
+    return hedger
+
+
+class TestOCRHedger:
+    """OCR 对冲执行器测试类"""
+
+    @pytest.mark.asyncio
+    async def test_fast_primary_is_not_hedged(self):
+        """测试：主请求在阈值内返回时不发起对冲"""
+        hedger = warmed_hedger(latency=0.05)
+
+        result = await hedger.run(make_call("primary", 0.001), make_call("hedge", 0.001))
+
+        assert result == ("primary", False)
+        assert hedger.stats()["hedges_fired"] == 0
+
+    @pytest.mark.asyncio
+    async def test_slow_primary_is_hedged_and_cancelled(self):
+        """
+        测试：主请求超过阈值后发起对冲
+
+        验证点：
+        1. 返回先完成的对冲结果
+        2. 落后的主请求被取消
+        3. 统计对冲次数与胜出次数
+        """
+        hedger = warmed_hedger()
+        log = []
+
+        result = await hedger.run(make_call("primary", 5, log), make_call("hedge", 0.01, log))
+
+        assert result == ("hedge", True)
+        assert log == ["primary cancelled"]
+        stats = hedger.stats()
+        assert stats["hedges_fired"] == 1
+        assert stats["hedge_wins"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_hedge_waits_for_primary(self):
+        """测试：对冲请求失败时继续等待主请求"""
+        hedger = warmed_hedger()
+
+        result = await hedger.run(make_call("primary", 0.05), make_call("hedge", 0.0, fail=True))
+
+        assert result == ("primary", False)
+        assert hedger.stats()["hedge_wins"] == 0
+
+    @pytest.mark.asyncio
+    async def test_both_failures_raise_primary_error(self):
+        """测试：两个请求都失败时抛出主请求的异常"""
+        hedger = warmed_hedger()
+
+        with pytest.raises(RuntimeError, match="primary failed"):
+            await hedger.run(make_call("primary", 0.03, fail=True), make_call("hedge", 0.0, fail=True))
+
+    @pytest.mark.asyncio
+    async def test_no_hedging_without_samples(self):
+        """测试：延迟样本不足时不对冲"""
+        hedger = OCRHedger(min_delay=0.0, min_samples=5)
+
+        result = await hedger.run(make_call("primary", 0.05), make_call("hedge", 0.0))
+
+        assert result == ("primary", False)
+        assert hedger.hedge_delay() is None
+
+
+def hedging_runner(ocr_engine: str, tmp_path, calls: list) -> PageOCRRunner:
+    """构造主引擎很慢、对冲引擎配置为 local 的执行器"""
+    runner = PageOCRRunner(ocr_engine=ocr_engine)
+    runner.hedge_engine = "local"
+    runner.hedger = warmed_hedger()
+    runner.cache = OCRResultCache(str(tmp_path), max_bytes=1024 * 1024)
+
+    async def fake_call_engine(engine, base64_image, started):
+        calls.append(engine)
+        started.set()
+        await asyncio.sleep(5 if len(calls) == 1 else 0.001)
+        return f"{engine} text", engine
+
+    runner._call_engine = fake_call_engine
+    return runner
+
+
+class TestRunnerHedging:
+    """页面 OCR 执行器对冲测试类"""
+
+    @pytest.mark.asyncio
+    async def test_explicit_engine_hedges_to_same_engine(self, tmp_path):
+        """测试：明确指定 deepseek 时不对冲到 OCR_HEDGE_ENGINE"""
+        calls = []
+        runner = hedging_runner("deepseek", tmp_path, calls)
+
+        markdown, engine_used, cache_hit = await runner.run("aW1hZ2U=", dpi=144)
+
+        assert calls == ["deepseek", "deepseek"]
+        assert (markdown, engine_used, cache_hit) == ("deepseek text", "deepseek", False)
+
+    @pytest.mark.asyncio
+    async def test_auto_mode_reads_hedged_result_from_cache(self, tmp_path):
+        """测试：auto 模式对冲到备用引擎，其结果缓存后可被再次读取"""
+        calls = []
+        runner = hedging_runner("auto", tmp_path, calls)
+
+        first = await runner.run("aW1hZ2U=", dpi=144)
+        second = await runner.run("aW1hZ2U=", dpi=144)
+
+        assert calls == ["deepseek", "local"]
+        assert first == ("local text", "local", False)
+        assert second == ("local text", "local", True)
+
+
+class TestLatencyTracker:
+    """延迟样本测试类"""
+
+    def test_percentile_and_expected_remaining(self):
+        """测试：分位数与剩余耗时估计"""
+        tracker = LatencyTracker(window=100)
+        for latency in range(1, 101):
+            tracker.record(float(latency))
+
+        assert tracker.percentile(0.95) == 95.0
+        assert tracker.expected_remaining(90.0) == pytest.approx(5.5)
+        assert tracker.expected_remaining(200.0) == 0.0
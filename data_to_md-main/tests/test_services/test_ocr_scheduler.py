@@ -0,0 +1,147 @@
+"""
+全局 OCR 调度器测试
+"""
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+from app.services.external.deepseek_client import DeepSeekClient
+from app.services.external.ocr_scheduler import OCRScheduler, FileSlotPool
+
+
+class TestOCRScheduler:
+    """全局 OCR 调度器测试类"""
+
+    @pytest.mark.asyncio
+    async def test_capacity_is_shared_by_all_flows(self):
+        """测试：所有任务合计的在途请求数不超过并发上限"""
+        scheduler = OCRScheduler(capacity=lambda: 3)
+        peak = 0
+
+        async def page(flow_id):
+            nonlocal peak
+            async with scheduler.slot(flow_id):
+                peak = max(peak, scheduler.stats()["running"])
+                await asyncio.sleep(0.005)
+
+        await asyncio.gather(*(page(f"doc{i % 4}") for i in range(20)))
+
+        assert peak == 3
+        assert scheduler.stats()["queued"] == 0
+        assert scheduler.stats()["flows"] == {}
+
+    @pytest.mark.asyncio
+    async def test_small_document_is_not_starved(self):
+        """
+        测试：大文档排满队列后到达的小文档很快完成
+
+        验证点：小文档的 5 页与大文档交替放行，而不是排在 200 页之后
+        """
+        scheduler = OCRScheduler(capacity=lambda: 2)
+        order = []
+
+        async def page(flow_id):
+            async with scheduler.slot(flow_id):
+                order.append(flow_id)
+                await asyncio.sleep(0.001)
+
+        big = [asyncio.create_task(page("big")) for _ in range(200)]
+        await asyncio.sleep(0.01)
+        small = [asyncio.create_task(page("small")) for _ in range(5)]
+
+        await asyncio.gather(*small)
+        last_small = max(i for i, flow_id in enumerate(order) if flow_id == "small")
+        assert last_small < order.index("small") + 12
+
+        await asyncio.gather(*big)
+
+    @pytest.mark.asyncio
+    async def test_weight_controls_share(self):
+        """测试：权重为 2 的任务分到约两倍的名额"""
+        scheduler = OCRScheduler(capacity=lambda: 1)
+        order = []
+
+        async def page(flow_id, weight):
+            async with scheduler.slot(flow_id, weight=weight):
+                order.append(flow_id)
+                await asyncio.sleep(0)
+
+        await asyncio.gather(
+            *(page("heavy", 2.0) for _ in range(20)),
+            *(page("light", 1.0) for _ in range(20))
+        )
+
+        first = order[:30]
+        assert 19 <= first.count("heavy") <= 21
+
+    @pytest.mark.asyncio
+    async def test_cancelled_request_releases_queue_position(self):
+        """测试：排队中的请求被取消后不占用名额"""
+        scheduler = OCRScheduler(capacity=lambda: 1)
+        gate = asyncio.Event()
+
+        async def hold():
+            async with scheduler.slot("a"):
+                await gate.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        gate.set()
+        await holder
+
+        async with scheduler.slot("b"):
+            assert scheduler.stats()["running"] == 1
+
+
+class TestRetrySlots:
+    """重试与调度名额测试类"""
+
+    @pytest.mark.asyncio
+    async def test_backoff_does_not_hold_scheduler_slot(self):
+        """测试：每次尝试单独占用调度名额，重试退避期间名额已释放"""
+        scheduler = OCRScheduler(capacity=lambda: 1)
+        attempts = []
+        running_during_backoff = []
+
+        async def create(**request_data):
+            attempts.append(scheduler.stats()["running"])
+            if len(attempts) == 1:
+                raise RuntimeError("upstream error")
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="text"))])
+
+        async def fake_sleep(delay):
+            running_during_backoff.append(scheduler.stats()["running"])
+
+        fake_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        client = DeepSeekClient()
+        with patch.object(client, "_get_client", return_value=fake_client), \
+                patch("app.services.external.deepseek_client.asyncio.sleep", fake_sleep):
+            markdown = await client.ocr_image("aW1hZ2U=", slot=lambda: scheduler.slot("doc"))
+
+        assert markdown == "text"
+        assert attempts == [1, 1]
+        assert running_during_backoff == [0]
+
+
+class TestFileSlotPool:
+    """跨进程名额池测试类"""
+
+    def test_slots_are_exclusive_across_pools(self, tmp_path):
+        """测试：同一目录下的名额池（模拟多个 worker）共享名额"""
+        worker_a = FileSlotPool(str(tmp_path), slots=2)
+        worker_b = FileSlotPool(str(tmp_path), slots=2)
+
+        assert worker_a.try_acquire() == 0
+        assert worker_b.try_acquire() == 1
+        assert worker_a.try_acquire() is None
+        assert worker_b.try_acquire() is None
+
+        worker_a.release(0)
+        assert worker_b.try_acquire() == 0
@@ -0,0 +1,146 @@
+"""
+转换结果缓存测试
+"""
+import time
+import pytest
+from unittest.mock import Mock
+from app.config import get_settings
+from app.core.base.converter import ConversionResult
+from app.services.conversion.conversion_service import ConversionService
+from app.services.conversion.task_manager import TaskManager
+from app.services.conversion.task_store import MemoryTaskStore
+from app.services.storage.result_cache import ConversionResultCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """创建缓存实例"""
+    return ConversionResultCache(
+        cache_dir=str(tmp_path / "results"),
+        ttl_seconds=3600,
+        max_bytes=1024 * 1024
+    )
+
+
+@pytest.fixture
+def upload(tmp_path):
+    """模拟上传文件"""
+    path = tmp_path / "upload.pdf"
+    path.write_bytes(b"%PDF-1.4 test")
+    return str(path)
+
+
+@pytest.fixture
+def output(tmp_path):
+    """模拟输出文件"""
+    path = tmp_path / "output.md"
+    path.write_text("# Converted", encoding="utf-8")
+    return str(path)
+
+
+class TestConversionResultCache:
+    """转换结果缓存测试类"""
+
+    def test_options_fingerprint_is_normalized(self):
+        """测试：缺省选项与显式默认值指纹一致，async 不参与指纹"""
+        assert (
+            ConversionResultCache.fingerprint_options({})
+            == ConversionResultCache.fingerprint_options({'dpi': 144, 'async_mode': False})
+        )
+        assert (
+            ConversionResultCache.fingerprint_options({})
+            != ConversionResultCache.fingerprint_options({'show_page_number': False})
+        )
+
+    def test_fingerprint_covers_server_settings(self, monkeypatch):
+        """
+        测试：影响输出内容的服务端配置参与指纹
+
+        验证点：
+        1. 最大页数按实际生效值（不超过 PDF_MAX_PAGES）计算
+        2. 调高 PDF_MAX_PAGES 或修改筛选等配置后指纹变化
+        """
+        settings = get_settings()
+        monkeypatch.setattr(settings, "pdf_max_pages", 100)
+        assert (
+            ConversionResultCache.fingerprint_options({'max_pages': 500})
+            == ConversionResultCache.fingerprint_options({'max_pages': 1000})
+        )
+        before = ConversionResultCache.fingerprint_options({'max_pages': 500})
+
+        monkeypatch.setattr(settings, "pdf_max_pages", 2000)
+        raised = ConversionResultCache.fingerprint_options({'max_pages': 500})
+        assert raised != before
+
+        monkeypatch.setattr(settings, "pdf_skip_blank_pages", not settings.pdf_skip_blank_pages)
+        assert ConversionResultCache.fingerprint_options({'max_pages': 500}) != raised
+
+    def test_put_and_get(self, cache, upload, output):
+        """测试：写入后可以命中，并返回元数据"""
+        key = cache.make_key(upload, {})
+        assert cache.get(key) is None
+
+        cache.put(key, output, 'markdown', {'total_pages': 3})
+        cached = cache.get(key)
+
+        assert cached is not None
+        assert cached['output_type'] == 'markdown'
+        assert cached['metadata'] == {'total_pages': 3}
+        with open(cached['output_path'], encoding='utf-8') as f:
+            assert f.read() == "# Converted"
+        assert cache.stats()['hits'] == 1
+
+    def test_expired_entry_is_dropped(self, cache, upload, output):
+        """测试：过期条目不再命中"""
+        key = cache.make_key(upload, {})
+        cache.put(key, output, 'markdown', {})
+        cache.ttl_seconds = 0
+        time.sleep(0.01)
+
+        assert cache.get(key) is None
+
+    def test_quota_evicts_entries(self, cache, upload, output):
+        """测试：超过配额时淘汰旧条目"""
+        cache.max_bytes = 1
+        key = cache.make_key(upload, {})
+        cache.put(key, output, 'markdown', {})
+
+        assert cache.get(key) is None
+
+    def test_chunks_file_is_cached(self, cache, upload, output, tmp_path):
+        """测试：逐页内容片段随结果一起缓存，没有时返回 None"""
+        chunks = tmp_path / "task.json.gz"
+        chunks.write_bytes(b"chunks")
+        key = cache.make_key(upload, {})
+        cache.put(key, output, 'markdown', {}, chunks_path=str(chunks))
+
+        with open(cache.get(key)['chunks_path'], 'rb') as f:
+            assert f.read() == b"chunks"
+
+        other = cache.make_key(upload, {'show_page_number': False})
+        cache.put(other, output, 'markdown', {})
+        assert cache.get(other)['chunks_path'] is None
+
+
+class TestResultCaching:
+    """转换完成时写入结果缓存的测试类"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("failed_pages, cached", [(0, True), (2, False)])
+    async def test_results_with_failed_pages_are_not_cached(self, output, failed_pages, cached):
+        """测试：有页面处理失败的结果不写入缓存，任务照常完成"""
+        service = ConversionService.__new__(ConversionService)
+        service.task_manager = TaskManager(store=MemoryTaskStore())
+        service.file_service = Mock(
+            save_output_file=Mock(return_value=output),
+            get_file_size=Mock(return_value=11)
+        )
+        service.result_cache = Mock()
+        service.chunk_store = Mock()
+        task = service.task_manager.create_task(filename="a.pdf", file_path="a.pdf", file_type="pdf")
+
+        result = ConversionResult(markdown="# Converted", metadata={'failed_pages': failed_pages}, status='success')
+        response = await service._save_and_complete(task.task_id, "a.pdf", result, time.time(), cache_key="key")
+
+        assert response['status'] == 'completed'
+        assert service.result_cache.put.called is cached
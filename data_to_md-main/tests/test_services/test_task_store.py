@@ -0,0 +1,139 @@
+"""
+任务存储测试
+
+测试场景：
+1. SQLite 存储 - 读写、按状态与创建时间列出、过期淘汰
+2. 多进程共享 - 其他进程创建与更新的任务可查询
+3. 任务管理器 - 状态更新写回存储
+"""
+import multiprocessing
+import pytest
+from datetime import datetime, timedelta
+from app.models.enums import TaskStatus
+from app.models.task import Task
+from app.services.conversion.task_manager import TaskManager
+from app.services.conversion.task_store import MemoryTaskStore, SQLiteTaskStore
+from app.exceptions.service_exceptions import TaskNotFoundException
+
+
+def make_task(task_id: str, status: TaskStatus = TaskStatus.PENDING, age_seconds: float = 0) -> Task:
+    """创建测试任务（创建与更新时间为 age_seconds 秒之前）"""
+    timestamp = datetime.now() - timedelta(seconds=age_seconds)
+    return Task(
+        task_id=task_id,
+        filename=f"{task_id}.pdf",
+        file_path=f"{task_id}.pdf",
+        file_type="pdf",
+        status=status,
+        created_at=timestamp,
+        updated_at=timestamp
+    )
+
+
+def complete_in_worker(db_path: str, task_id: str):
+    """在其他进程中创建任务并标记完成"""
+    manager = TaskManager(store=SQLiteTaskStore(db_path))
+    task = make_task(task_id)
+    manager._store.put(task)
+    manager.update_task_progress(task_id, 5, 5)
+    manager.complete_task(task_id, "out.md", "# done", {'total_pages': 5})
+
+
+@pytest.fixture(params=["sqlite", "memory"])
+def store(request, tmp_path):
+    """两种存储实现（TTL 1 小时）"""
+    if request.param == "sqlite":
+        store = SQLiteTaskStore(str(tmp_path / "tasks.db"), ttl_seconds=3600)
+    else:
+        store = MemoryTaskStore(ttl_seconds=3600)
+    yield store
+    store.close()
+
+
+class TestTaskStore:
+    """任务存储测试类"""
+
+    def test_put_get_delete(self, store):
+        """测试：按任务ID读写与删除"""
+        task = make_task("task_a")
+        task.metadata = {'pdf_type': 'image', 'pages': [1, 2]}
+        store.put(task)
+
+        loaded = store.get("task_a")
+        assert loaded == task
+        assert loaded.status == TaskStatus.PENDING
+
+        store.delete("task_a")
+        assert store.get("task_a") is None
+
+    def test_list_by_status_and_time(self, store):
+        """
+        测试：列出任务
+
+        验证点：
+        1. 按创建时间倒序
+        2. 按状态过滤
+        3. 限制返回数量
+        """
+        store.put(make_task("task_old", TaskStatus.COMPLETED, age_seconds=30))
+        store.put(make_task("task_mid", TaskStatus.PROCESSING, age_seconds=20))
+        store.put(make_task("task_new", TaskStatus.COMPLETED, age_seconds=10))
+
+        assert [task.task_id for task in store.list()] == ["task_new", "task_mid", "task_old"]
+        assert [task.task_id for task in store.list(status=TaskStatus.COMPLETED)] == ["task_new", "task_old"]
+        assert [task.task_id for task in store.list(limit=1)] == ["task_new"]
+
+    def test_evict_expired(self, store):
+        """测试：更新时间超过 TTL 的任务被淘汰"""
+        store.put(make_task("task_expired", TaskStatus.COMPLETED, age_seconds=7200))
+        store.put(make_task("task_fresh", TaskStatus.PROCESSING, age_seconds=60))
+
+        assert store.evict_expired() == 1
+        assert store.get("task_expired") is None
+        assert store.get("task_fresh") is not None
+
+
+class TestSharedTaskStore:
+    """多进程共享测试类"""
+
+    def test_task_visible_across_processes(self, tmp_path):
+        """测试：其他进程（worker）创建并完成的任务可查询"""
+        db_path = str(tmp_path / "tasks.db")
+        manager = TaskManager(store=SQLiteTaskStore(db_path))
+
+        process = multiprocessing.get_context("spawn").Process(
+            target=complete_in_worker, args=(db_path, "task_remote")
+        )
+        process.start()
+        process.join(timeout=60)
+        assert process.exitcode == 0
+
+        task = manager.get_task("task_remote")
+        assert task.status == TaskStatus.COMPLETED
+        assert task.progress == 100
+        assert task.markdown_content == "# done"
+        assert task.metadata['total_pages'] == 5
+
+
+class TestTaskManager:
+    """任务管理器测试类"""
+
+    def test_updates_are_persisted(self, tmp_path):
+        """测试：状态、进度与失败信息写回存储，新的管理器实例可读取"""
+        db_path = str(tmp_path / "tasks.db")
+        manager = TaskManager(store=SQLiteTaskStore(db_path))
+        task = manager.create_task(filename="a.pdf", file_path="a.pdf", file_type="pdf")
+
+        manager.update_task_status(task.task_id, TaskStatus.PROCESSING)
+        manager.update_task_progress(task.task_id, 2, 8)
+        manager.fail_task(task.task_id, "upstream error")
+
+        loaded = TaskManager(store=SQLiteTaskStore(db_path)).get_task(task.task_id)
+        assert loaded.status == TaskStatus.FAILED
+        assert loaded.progress == 25
+        assert loaded.error_message == "upstream error"
+        assert [t.task_id for t in manager.list_tasks(status=TaskStatus.FAILED)] == [task.task_id]
+
+        manager.delete_task(task.task_id)
+        with pytest.raises(TaskNotFoundException):
+            manager.get_task(task.task_id)